@@ -1,23 +1,34 @@
 from django.contrib import admin
-from .models import Meeting
+from .models import Meeting, MeetingContent, ActionItem, Decision, AgendaTopic, Job, RecordingSession, Upload
+from . import search
+
+
+class MeetingContentInline(admin.StackedInline):
+    model = MeetingContent
+    fields = ('transcript', 'summary_json')
+    readonly_fields = ('summary_json',)
+    can_delete = False
 
 
 @admin.register(Meeting)
 class MeetingAdmin(admin.ModelAdmin):
     list_display = ('title', 'meeting_type', 'status', 'created_at', 'meeting_date')
     list_filter = ('meeting_type', 'status', 'created_at')
-    search_fields = ('title', 'description', 'transcript')
-    readonly_fields = ('created_at', 'updated_at', 'summary_json')
+    # Searched through the full-text index, see get_search_results
+    search_fields = ('title', 'description', 'content__transcript')
+    readonly_fields = ('created_at', 'updated_at', 'audio_format', 'audio_codec', 'audio_duration',
+                       'audio_sample_rate', 'audio_channels')
+    inlines = (MeetingContentInline,)
     
     fieldsets = (
         ('Meeting Information', {
             'fields': ('title', 'meeting_type', 'description', 'meeting_date')
         }),
-        ('Content', {
-            'fields': ('transcript', 'recording_file', 'transcript_file')
+        ('Files', {
+            'fields': ('recording_file', 'transcript_file')
         }),
-        ('Summary', {
-            'fields': ('summary_json',),
+        ('Audio', {
+            'fields': ('audio_format', 'audio_codec', 'audio_duration', 'audio_sample_rate', 'audio_channels'),
             'classes': ('collapse',)
         }),
         ('Processing', {
@@ -29,3 +40,58 @@ class MeetingAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+    
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return search.filter_queryset(queryset, search_term), False
+
+
+@admin.register(ActionItem)
+class ActionItemAdmin(admin.ModelAdmin):
+    list_display = ('task', 'owner', 'due_date', 'status', 'meeting', 'created_at')
+    list_filter = ('status', 'due_date')
+    search_fields = ('task', 'owner')
+    raw_id_fields = ('meeting',)
+    readonly_fields = ('created_at', 'updated_at')
+
+
+@admin.register(Decision)
+class DecisionAdmin(admin.ModelAdmin):
+    list_display = ('text', 'meeting', 'created_at')
+    search_fields = ('text',)
+    raw_id_fields = ('meeting',)
+    readonly_fields = ('created_at',)
+
+
+@admin.register(AgendaTopic)
+class AgendaTopicAdmin(admin.ModelAdmin):
+    list_display = ('topic', 'meeting', 'created_at')
+    search_fields = ('topic', 'description')
+    raw_id_fields = ('meeting',)
+    readonly_fields = ('created_at',)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'meeting', 'status', 'priority', 'attempts', 'run_after', 'locked_by', 'updated_at')
+    list_filter = ('kind', 'status', 'priority')
+    search_fields = ('locked_by', 'last_error')
+    raw_id_fields = ('meeting',)
+    readonly_fields = ('created_at', 'updated_at', 'finished_at', 'heartbeat_at', 'lease_expires_at', 'locked_by')
+
+
+@admin.register(RecordingSession)
+class RecordingSessionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'meeting', 'state', 'duration_minutes', 'stop_reason', 'host', 'pid', 'peak_rss_kb', 'queued_at', 'started_at')
+    list_filter = ('state', 'stop_reason', 'host')
+    raw_id_fields = ('meeting',)
+    readonly_fields = ('queued_at', 'started_at', 'finished_at', 'heartbeat_at', 'rss_kb', 'peak_rss_kb', 'cpu_seconds')
+
+
+@admin.register(Upload)
+class UploadAdmin(admin.ModelAdmin):
+    list_display = ('id', 'filename', 'state', 'offset', 'size', 'meeting', 'created_at', 'updated_at')
+    list_filter = ('state',)
+    raw_id_fields = ('meeting',)
+    readonly_fields = ('created_at', 'updated_at')
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class MeetingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'meeting'
+
+    def ready(self):
+        from . import response_cache, search
+        search.connect_signals()
+        response_cache.connect_signals()
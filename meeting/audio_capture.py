@@ -0,0 +1,271 @@
+"""
+Audio Capture
+Streams captured audio to disk as it arrives so memory use stays constant
+regardless of meeting length, plus a synthetic audio source that stands in
+for a PyAudio input stream in benchmarks and tests.
+"""
+
+import logging
+import math
+import os
+import struct
+import threading
+import time
+import wave
+
+logger = logging.getLogger(__name__)
+
+
+class ChunkRingBuffer:
+    """
+    Fixed-capacity FIFO of audio chunks shared by the capture thread and the
+    writer thread. Storage is preallocated; if the writer falls behind,
+    ``put()`` either overwrites the oldest chunk (counted in ``dropped``) or
+    with ``block=True`` waits for space.
+    """
+
+    def __init__(self, capacity, chunk_bytes):
+        self.capacity = capacity
+        self.chunk_bytes = chunk_bytes
+        self._storage = bytearray(capacity * chunk_bytes)
+        self._lengths = [0] * capacity
+        self._head = 0
+        self._count = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self.dropped = 0
+
+    def put(self, data, block=False):
+        if len(data) > self.chunk_bytes:
+            raise ValueError(f"Chunk of {len(data)} bytes exceeds slot size {self.chunk_bytes}")
+
+        with self._cond:
+            while block and self._count == self.capacity and not self._closed:
+                self._cond.wait()
+
+            if self._count == self.capacity:
+                self._head = (self._head + 1) % self.capacity
+                self._count -= 1
+                self.dropped += 1
+
+            slot = (self._head + self._count) % self.capacity
+            start = slot * self.chunk_bytes
+            self._storage[start:start + len(data)] = data
+            self._lengths[slot] = len(data)
+            self._count += 1
+            self._cond.notify()
+
+    def drain(self, timeout=None):
+        """
+        Remove and return all buffered chunks joined into one bytes object.
+        Returns None once the buffer is closed and empty.
+        """
+        with self._cond:
+            if not self._count and not self._closed:
+                self._cond.wait(timeout)
+            if not self._count:
+                return None if self._closed else b''
+
+            parts = []
+            for _ in range(self._count):
+                start = self._head * self.chunk_bytes
+                parts.append(self._storage[start:start + self._lengths[self._head]])
+                self._head = (self._head + 1) % self.capacity
+            self._count = 0
+            self._cond.notify_all()
+            return b''.join(parts)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class StreamingWavWriter:
+    """
+    Writes audio chunks to a WAV file from a background thread.
+
+    ``write()`` only copies the chunk into a ring buffer holding
+    ``buffer_seconds`` of audio, so the capture loop never blocks on disk.
+    The WAV header is patched on every flush and the file is fsynced every
+    ``fsync_interval`` seconds, so a crash loses at most a few seconds.
+    Live capture drops the oldest audio if the disk stalls; sources faster
+    than real time should pass ``drop_when_full=False`` to apply backpressure.
+    """
+
+    def __init__(self, path, channels, sample_width, rate, chunk_frames,
+                 buffer_seconds=5.0, fsync_interval=1.0, drop_when_full=True):
+        self.path = path
+        self.drop_when_full = drop_when_full
+        self.channels = channels
+        self.sample_width = sample_width
+        self.rate = rate
+        self.fsync_interval = fsync_interval
+
+        chunk_bytes = chunk_frames * channels * sample_width
+        capacity = max(2, math.ceil(buffer_seconds * rate / chunk_frames))
+        self._ring = ChunkRingBuffer(capacity, chunk_bytes)
+        self._file = None
+        self._wav = None
+        self._thread = None
+        self.frames_written = 0
+
+    @property
+    def dropped_chunks(self):
+        return self._ring.dropped
+
+    def start(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._file = open(self.path, 'wb')
+        self._wav = wave.open(self._file, 'wb')
+        self._wav.setnchannels(self.channels)
+        self._wav.setsampwidth(self.sample_width)
+        self._wav.setframerate(self.rate)
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def write(self, data):
+        self._ring.put(data, block=not self.drop_when_full)
+
+    def close(self):
+        self._ring.close()
+        if self._thread:
+            self._thread.join()
+        if self._wav:
+            self._wav.close()
+        if self._file:
+            self._file.close()
+        if self.dropped_chunks:
+            logger.warning(f"Dropped {self.dropped_chunks} audio chunk(s) writing {self.path}")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _run(self):
+        last_sync = time.monotonic()
+        while True:
+            data = self._ring.drain(timeout=0.5)
+            if data is None:
+                break
+            if data:
+                # writeframes() also rewrites the header with the new length
+                self._wav.writeframes(data)
+                self.frames_written += len(data) // (self.channels * self.sample_width)
+
+            if time.monotonic() - last_sync >= self.fsync_interval:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                last_sync = time.monotonic()
+
+
+def capture_stream(stream, writer, chunk_frames, should_continue, monitor=None):
+    """
+    Read chunks from a PyAudio-style stream into ``writer`` until told to stop
+    or the stream runs dry. ``monitor.observe()`` sees every chunk, e.g. a
+    ``RecordingController`` listening for the meeting to go quiet.
+    """
+    while should_continue():
+        try:
+            data = stream.read(chunk_frames, exception_on_overflow=False)
+        except Exception as e:
+            logger.error(f"Audio recording error: {e}")
+            continue
+        if not data:
+            break
+        writer.write(data)
+        if monitor is not None:
+            monitor.observe(data)
+
+
+class SyntheticAudioSource:
+    """
+    Stands in for a PyAudio input stream. Produces 16-bit PCM following
+    ``pattern``, a list of ``(seconds, 'speech' | 'silence')`` segments that
+    repeats until ``total_seconds`` of audio has been read. With
+    ``realtime=True`` reads are paced to the sample rate like a real device,
+    or ``speed`` times faster.
+    """
+
+    def __init__(self, rate=16000, channels=1, pattern=None, total_seconds=None, realtime=False, speed=1.0):
+        self.rate = rate
+        self.channels = channels
+        self.pattern = pattern or [(1.0, 'speech')]
+        self.total_frames = int(total_seconds * rate) if total_seconds is not None else None
+        self.realtime = realtime
+        self.speed = speed
+        self.frames_read = 0
+        self._started = None
+
+        # One second of each kind of audio, sliced as needed
+        self._blocks = {
+            'speech': self._tone_block(),
+            'silence': bytes(rate * channels * 2),
+        }
+        self._cycle_frames = sum(int(seconds * rate) for seconds, _ in self.pattern)
+
+    def _tone_block(self):
+        samples = []
+        for i in range(self.rate):
+            # Amplitude-modulated tone, loosely speech-like energy envelope
+            envelope = 0.6 + 0.4 * math.sin(2 * math.pi * 3 * i / self.rate)
+            value = int(9000 * envelope * math.sin(2 * math.pi * 220 * i / self.rate))
+            samples.extend([value] * self.channels)
+        return struct.pack(f'<{len(samples)}h', *samples)
+
+    def kind_at(self, frame):
+        """Whether the given frame falls in a 'speech' or 'silence' segment"""
+        offset = frame % self._cycle_frames
+        for seconds, kind in self.pattern:
+            length = int(seconds * self.rate)
+            if offset < length:
+                return kind
+            offset -= length
+        return self.pattern[-1][1]
+
+    def read(self, num_frames, exception_on_overflow=True):
+        if self.total_frames is not None:
+            num_frames = min(num_frames, self.total_frames - self.frames_read)
+            if num_frames <= 0:
+                return b''
+
+        if self.realtime:
+            if self._started is None:
+                self._started = time.monotonic()
+            due = self._started + (self.frames_read + num_frames) / self.rate / self.speed
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+        frame_bytes = self.channels * 2
+        out = bytearray()
+        remaining = num_frames
+        while remaining:
+            frame = self.frames_read + num_frames - remaining
+            block = self._blocks[self.kind_at(frame)]
+            start = (frame % self.rate) * frame_bytes
+            run = min(remaining, self.rate - frame % self.rate, self._frames_to_boundary(frame))
+            out += block[start:start + run * frame_bytes]
+            remaining -= run
+
+        self.frames_read += num_frames
+        return bytes(out)
+
+    def _frames_to_boundary(self, frame):
+        offset = frame % self._cycle_frames
+        for seconds, _ in self.pattern:
+            length = int(seconds * self.rate)
+            if offset < length:
+                return length - offset
+            offset -= length
+        return 1
+
+    def stop_stream(self):
+        pass
+
+    def close(self):
+        pass
@@ -0,0 +1,187 @@
+"""
+Audio Normalization
+Prepares recordings for speech providers. Any input becomes 16 kHz mono
+16-bit PCM, the rate speech models work at, with silence and long pauses
+cut out (see ``voice_activity``); each segment is then encoded with ``AUDIO_NORMALIZE_CODEC``
+(FLAC or Opus) when the provider accepts it. ffmpeg does the decoding and
+encoding when installed. Without it, WAV recordings are still converted
+here and segments are sent as WAV.
+"""
+
+import logging
+import os
+import shutil
+import subprocess
+import warnings
+import wave
+from dataclasses import dataclass
+
+from django.conf import settings
+
+from .meeting_recorder import AudioExtractor
+
+try:
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        import audioop
+except ImportError:
+    audioop = None
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+# File extension and ffmpeg encoder arguments of each codec
+CODECS = {
+    'wav': ('wav', ['-c:a', 'pcm_s16le']),
+    'flac': ('flac', ['-c:a', 'flac', '-compression_level', '5']),
+    'opus': ('ogg', ['-c:a', 'libopus', '-b:a', '24k', '-application', 'voip']),
+}
+
+
+@dataclass
+class NormalizedAudio:
+    path: str
+    speech: object  # voice_activity.SpeechMap: where the audio at ``path`` came from in the recording
+
+    @property
+    def duration(self):
+        return self.speech.kept_seconds
+
+
+def target_codec(formats):
+    """The codec to send to a provider accepting ``formats``"""
+    codec = getattr(settings, 'AUDIO_NORMALIZE_CODEC', 'flac')
+    if codec not in CODECS:
+        raise ValueError(f"Unknown AUDIO_NORMALIZE_CODEC: {codec}")
+    if codec == 'wav' or codec not in formats or not shutil.which('ffmpeg'):
+        return 'wav'
+    return codec
+
+
+def normalize(source, tmp_dir):
+    """
+    ``source`` as 16 kHz mono PCM WAV in ``tmp_dir`` with the silence
+    ``voice_activity`` finds removed, or None when it cannot be decoded here.
+    """
+    from .voice_activity import compact, detect
+
+    pcm = os.path.join(tmp_dir, 'normalized.wav')
+    if _is_normalized(source):
+        pcm = source
+    elif not _convert(source, pcm):
+        return None
+
+    speech = detect(pcm)
+    if speech.is_whole:
+        return NormalizedAudio(pcm, speech)
+
+    compacted = os.path.join(tmp_dir, 'speech.wav')
+    compact(pcm, speech, compacted)
+    if pcm != source:
+        os.remove(pcm)
+    logger.info(
+        f"Removed {speech.removed_seconds:.0f}s of {speech.duration:.0f}s ({speech.removed_fraction:.0%}) "
+        f"of silence from {source}"
+    )
+    return NormalizedAudio(compacted, speech)
+
+
+def encode(wav_path, codec):
+    """``wav_path`` encoded with ``codec`` next to it; the WAV itself for ``'wav'`` or if encoding fails"""
+    if codec == 'wav':
+        return wav_path
+    extension, arguments = CODECS[codec]
+    output = f'{os.path.splitext(wav_path)[0]}.{extension}'
+    result = subprocess.run(
+        ['ffmpeg', '-v', 'error', '-y', '-i', wav_path, *arguments, output],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        logger.warning(f"Could not encode {wav_path} as {codec}, sending WAV: {result.stderr.strip()}")
+        return wav_path
+    return output
+
+
+def copy_span(wav_path, start, end, out_path):
+    """Copy ``start``..``end`` seconds of ``wav_path`` into a new WAV file"""
+    with wave.open(wav_path, 'rb') as src:
+        rate = src.getframerate()
+        src.setpos(int(start * rate))
+        with wave.open(out_path, 'wb') as dst:
+            dst.setparams(src.getparams())
+            remaining = int((end - start) * rate)
+            while remaining > 0:
+                frames = src.readframes(min(remaining, rate * 10))
+                if not frames:
+                    break
+                dst.writeframes(frames)
+                remaining -= len(frames) // (src.getsampwidth() * src.getnchannels())
+
+
+class PcmConverter:
+    """
+    Converts consecutive blocks of mono or stereo PCM to 16 kHz mono 16-bit,
+    carrying the resampler's state from one block to the next. Needs audioop.
+    """
+
+    def __init__(self, rate, sample_width, channels):
+        if audioop is None:
+            raise RuntimeError('audioop is not available')
+        if channels > 2:
+            raise ValueError(f"Cannot downmix {channels} channels")
+        self.rate = rate
+        self.sample_width = sample_width
+        self.channels = channels
+        self._state = None
+
+    def convert(self, frames):
+        if self.sample_width == 1:
+            # 8-bit WAV samples are unsigned
+            frames = audioop.bias(frames, 1, -128)
+        if self.sample_width != 2:
+            frames = audioop.lin2lin(frames, self.sample_width, 2)
+        if self.channels == 2:
+            frames = audioop.tomono(frames, 2, 0.5, 0.5)
+        if self.rate != SAMPLE_RATE:
+            frames, self._state = audioop.ratecv(frames, 2, 1, self.rate, SAMPLE_RATE, self._state)
+        return frames
+
+
+def _is_normalized(path):
+    try:
+        with wave.open(path, 'rb') as wf:
+            return (wf.getframerate(), wf.getnchannels(), wf.getsampwidth()) == (SAMPLE_RATE, 1, 2)
+    except (wave.Error, EOFError):
+        return False
+
+
+def _convert(source, output):
+    if shutil.which('ffmpeg'):
+        result = AudioExtractor.extract_audio_from_video(source, output, sample_rate=SAMPLE_RATE, channels=1)
+        if result['success']:
+            return True
+        logger.warning(f"ffmpeg could not convert {source}: {result['error']}")
+    return _convert_wav(source, output)
+
+
+def _convert_wav(source, output):
+    """Downmix and resample PCM WAV without ffmpeg; False when the file is not a WAV this can handle"""
+    if audioop is None:
+        return False
+    try:
+        src = wave.open(source, 'rb')
+    except (wave.Error, EOFError):
+        return False
+    with src:
+        rate, width, channels = src.getframerate(), src.getsampwidth(), src.getnchannels()
+        if channels > 2:
+            return False
+        converter = PcmConverter(rate, width, channels)
+        with wave.open(output, 'wb') as dst:
+            dst.setnchannels(1)
+            dst.setsampwidth(2)
+            dst.setframerate(SAMPLE_RATE)
+            while frames := src.readframes(rate * 10):
+                dst.writeframes(converter.convert(frames))
+    return True
@@ -0,0 +1,419 @@
+"""
+Audio Probe
+Identifies uploaded recordings from their first bytes and reads duration,
+codec, sample rate and channel count from container headers, without
+decoding audio or reading more of the file than the headers occupy.
+Supports WAV, MP3, MP4/M4A and WebM, plus the FLAC and Ogg files written
+by ``audio_normalize``; ``ffprobe`` fills in what the headers do not say
+when it is installed.
+"""
+
+import json
+import os
+import shutil
+import struct
+import subprocess
+from dataclasses import dataclass
+
+# Container each allowed extension must contain
+EXTENSION_FORMATS = {
+    'wav': 'wav',
+    'mp3': 'mp3',
+    'mp4': 'mp4',
+    'm4a': 'mp4',
+    'webm': 'webm',
+}
+
+# Bytes needed to recognize every supported format
+SNIFF_BYTES = 12
+
+
+@dataclass
+class AudioInfo:
+    format: str
+    codec: str = ''
+    duration: float = None
+    sample_rate: int = None
+    channels: int = None
+
+    def as_meeting_fields(self):
+        return {
+            'audio_format': self.format,
+            'audio_codec': self.codec,
+            'audio_duration': round(self.duration, 3) if self.duration is not None else None,
+            'audio_sample_rate': self.sample_rate,
+            'audio_channels': self.channels,
+        }
+
+
+def sniff(head):
+    """The container format of a file starting with ``head``, or None if it is not one we accept"""
+    if head[:4] == b'RIFF' and head[8:12] == b'WAVE':
+        return 'wav'
+    if head[4:8] == b'ftyp':
+        return 'mp4'
+    if head[:4] == b'\x1a\x45\xdf\xa3':
+        return 'webm'
+    if head[:4] == b'fLaC':
+        return 'flac'
+    if head[:4] == b'OggS':
+        return 'ogg'
+    if head[:3] == b'ID3' or _mp3_header(head[:4]) is not None:
+        return 'mp3'
+    return None
+
+
+def check_header(filename, head):
+    """Raise ValueError unless ``head`` starts the kind of file ``filename``'s extension names"""
+    ext = filename.rsplit('.', 1)[-1].lower()
+    expected = EXTENSION_FORMATS.get(ext)
+    found = sniff(head)
+    if expected is None:
+        raise ValueError(f"File type not allowed: .{ext}")
+    if found != expected:
+        described = f'{found.upper()} data' if found else 'not a recognized audio or video file'
+        raise ValueError(f"File content does not match .{ext}: {described}")
+    return found
+
+
+def probe(path):
+    """``AudioInfo`` for the recording at ``path``; raises ValueError for unreadable files"""
+    with open(path, 'rb') as f:
+        info = probe_file(f)
+    if info.duration is None and shutil.which('ffprobe'):
+        info = _ffprobe(path, info)
+    return info
+
+
+def probe_file(f):
+    """``AudioInfo`` for an open binary file, which is left at its start"""
+    size = f.seek(0, os.SEEK_END)
+    f.seek(0)
+    try:
+        fmt = sniff(f.read(SNIFF_BYTES))
+        if fmt is None:
+            raise ValueError('Not a recognized audio or video file')
+        f.seek(0)
+        return PROBES[fmt](f, size)
+    except (struct.error, IndexError, ZeroDivisionError):
+        raise ValueError('Recording is truncated or corrupt')
+    finally:
+        f.seek(0)
+
+
+def _probe_wav(f, size):
+    info = AudioInfo('wav')
+    byte_rate = data_size = None
+    position = 12
+    while position + 8 <= size:
+        f.seek(position)
+        chunk_id, chunk_size = struct.unpack('<4sI', f.read(8))
+        if chunk_id == b'fmt ':
+            fmt = f.read(min(chunk_size, 40))
+            tag, info.channels, info.sample_rate, byte_rate, _, bits = struct.unpack('<HHIIHH', fmt[:16])
+            if tag == 0xFFFE and len(fmt) >= 26:
+                tag = struct.unpack('<H', fmt[24:26])[0]
+            info.codec = _WAV_CODECS.get(tag, f'wav_{tag:#x}')
+            if tag == 1:
+                info.codec = 'pcm_u8' if bits == 8 else f'pcm_s{bits}le'
+        elif chunk_id == b'data':
+            # Recorders that never finalized the header leave the size at 0 or 0xFFFFFFFF
+            data_size = chunk_size if 0 < chunk_size < 0xFFFFFFFF else size - position - 8
+            break
+        position += 8 + chunk_size + (chunk_size & 1)
+    if not info.codec or data_size is None:
+        raise ValueError('WAV file has no fmt or data chunk')
+    info.duration = min(data_size, size - position - 8) / byte_rate if byte_rate else None
+    return info
+
+
+_WAV_CODECS = {1: 'pcm', 3: 'pcm_f32le', 6: 'pcm_alaw', 7: 'pcm_mulaw', 0x55: 'mp3'}
+
+_MP3_BITRATES = {
+    (1, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (1, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (1, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (2, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (2, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_MP3_SAMPLE_RATES = {1: [44100, 48000, 32000], 2: [22050, 24000, 16000], 25: [11025, 12000, 8000]}
+
+
+def _mp3_header(data):
+    """``(version, layer, bitrate, sample_rate, channels, frame_length, samples)`` of a frame header, or None"""
+    if len(data) < 4 or data[0] != 0xFF or data[1] & 0xE0 != 0xE0:
+        return None
+    version = {3: 1, 2: 2, 0: 25}.get((data[1] >> 3) & 3)
+    layer = 4 - ((data[1] >> 1) & 3)
+    bitrate_index, rate_index = data[2] >> 4, (data[2] >> 2) & 3
+    if version is None or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    bitrate = _MP3_BITRATES[(1, layer) if version == 1 else (2, min(layer, 2))][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+    padding = (data[2] >> 1) & 1
+    channels = 1 if data[3] >> 6 == 3 else 2
+    if layer == 1:
+        samples, length = 384, (12 * bitrate // sample_rate + padding) * 4
+    else:
+        samples = 576 if layer == 3 and version != 1 else 1152
+        length = samples // 8 * bitrate // sample_rate + padding
+    return version, layer, bitrate, sample_rate, channels, length, samples
+
+
+def _probe_mp3(f, size):
+    start = 0
+    head = f.read(10)
+    if head[:3] == b'ID3':
+        tag_size = (head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9]
+        start = 10 + tag_size + (10 if head[5] & 0x10 else 0)
+    f.seek(start)
+    window = f.read(64 * 1024)
+    end = size
+    f.seek(max(0, size - 128))
+    if f.read(3) == b'TAG':
+        end -= 128
+
+    # The first header followed by another header where its frame length says
+    for i in range(len(window) - 4):
+        header = _mp3_header(window[i:i + 4])
+        if header is None:
+            continue
+        f.seek(start + i + header[5])
+        following = f.read(4)
+        if start + i + header[5] >= end or _mp3_header(following) is not None:
+            break
+    else:
+        raise ValueError('No MPEG audio frames found')
+
+    version, layer, bitrate, sample_rate, channels, _, samples = header
+    info = AudioInfo('mp3', codec=f'mp{layer}', sample_rate=sample_rate, channels=channels)
+    frame = window[i:i + 200]
+    side_info = (32 if channels == 2 else 17) if version == 1 else (17 if channels == 2 else 9)
+    xing = frame[4 + side_info:4 + side_info + 12]
+    if xing[:4] in (b'Xing', b'Info') and struct.unpack('>I', xing[4:8])[0] & 1:
+        info.duration = struct.unpack('>I', xing[8:12])[0] * samples / sample_rate
+    elif frame[36:40] == b'VBRI':
+        info.duration = struct.unpack('>I', frame[50:54])[0] * samples / sample_rate
+    else:
+        info.duration = (end - start - i) * 8 / bitrate
+    return info
+
+
+def _boxes(f, start, end):
+    """``(type, payload start, box end)`` of the MP4 boxes between ``start`` and ``end``"""
+    position = start
+    while position + 8 <= end:
+        f.seek(position)
+        box_size, box_type = struct.unpack('>I4s', f.read(8))
+        header = 8
+        if box_size == 1:
+            box_size = struct.unpack('>Q', f.read(8))[0]
+            header = 16
+        elif box_size == 0:
+            box_size = end - position
+        if box_size < header:
+            raise ValueError('Corrupt MP4 box')
+        yield box_type, position + header, min(position + box_size, end)
+        position += box_size
+
+
+def _child(f, start, end, path):
+    for box_type, payload, box_end in _boxes(f, start, end):
+        if box_type == path[0]:
+            return (payload, box_end) if len(path) == 1 else _child(f, payload, box_end, path[1:])
+    return None
+
+
+_MP4_CODECS = {b'mp4a': 'aac', b'Opus': 'opus', b'alac': 'alac', b'fLaC': 'flac', b'ac-3': 'ac3', b'ec-3': 'eac3'}
+
+
+def _probe_mp4(f, size):
+    moov = _child(f, 0, size, [b'moov'])
+    if moov is None:
+        raise ValueError('MP4 file has no moov box')
+    for box_type, trak, trak_end in _boxes(f, *moov):
+        if box_type != b'trak':
+            continue
+        mdia = _child(f, trak, trak_end, [b'mdia'])
+        hdlr = mdia and _child(f, *mdia, [b'hdlr'])
+        if not hdlr:
+            continue
+        f.seek(hdlr[0] + 8)
+        if f.read(4) != b'soun':
+            continue
+
+        info = AudioInfo('mp4')
+        mdhd = _child(f, *mdia, [b'mdhd'])
+        if mdhd:
+            f.seek(mdhd[0])
+            version = f.read(4)[0]
+            if version == 1:
+                f.seek(16, os.SEEK_CUR)
+                timescale, duration = struct.unpack('>IQ', f.read(12))
+            else:
+                f.seek(8, os.SEEK_CUR)
+                timescale, duration = struct.unpack('>II', f.read(8))
+            info.duration = duration / timescale if timescale else None
+        stsd = _child(f, *mdia, [b'minf', b'stbl', b'stsd'])
+        if stsd:
+            f.seek(stsd[0] + 8)
+            entry = f.read(36)
+            info.codec = _MP4_CODECS.get(entry[4:8], entry[4:8].decode('latin-1').strip())
+            info.channels = struct.unpack('>H', entry[24:26])[0]
+            info.sample_rate = struct.unpack('>I', entry[32:36])[0] >> 16
+        return info
+    raise ValueError('MP4 file has no audio track')
+
+
+def _vint(f, keep_marker=False):
+    first = f.read(1)
+    if not first:
+        raise ValueError('Truncated WebM element')
+    length = 9 - first[0].bit_length()
+    if length > 8:
+        raise ValueError('Corrupt WebM element')
+    value = first[0] if keep_marker else first[0] & (0xFF >> length)
+    rest = f.read(length - 1)
+    for byte in rest:
+        value = (value << 8) | byte
+    if not keep_marker and value == (1 << (7 * length)) - 1:
+        return length, None
+    return length, value
+
+
+def _elements(f, start, end):
+    """``(id, payload start, payload end)`` of the EBML elements between ``start`` and ``end``"""
+    position = start
+    while position < end:
+        f.seek(position)
+        id_length, element_id = _vint(f, keep_marker=True)
+        size_length, element_size = _vint(f)
+        payload = position + id_length + size_length
+        payload_end = end if element_size is None else payload + element_size
+        yield element_id, payload, min(payload_end, end)
+        position = payload_end
+
+
+def _read_uint(f, start, end):
+    f.seek(start)
+    return int.from_bytes(f.read(end - start), 'big')
+
+
+def _read_float(f, start, end):
+    f.seek(start)
+    return struct.unpack('>f' if end - start == 4 else '>d', f.read(end - start))[0]
+
+
+_WEBM_SEGMENT, _WEBM_INFO, _WEBM_TRACKS, _WEBM_CLUSTER = 0x18538067, 0x1549A966, 0x1654AE6B, 0x1F43B675
+
+
+def _probe_webm(f, size):
+    info = AudioInfo('webm')
+    segment = next(((s, e) for i, s, e in _elements(f, 0, size) if i == _WEBM_SEGMENT), None)
+    if segment is None:
+        raise ValueError('WebM file has no segment')
+    has_audio = False
+    timecode_scale, duration = 1_000_000, None
+    for element_id, start, end in _elements(f, *segment):
+        if element_id == _WEBM_INFO:
+            for child, s, e in _elements(f, start, end):
+                if child == 0x2AD7B1:
+                    timecode_scale = _read_uint(f, s, e)
+                elif child == 0x4489:
+                    duration = _read_float(f, s, e)
+        elif element_id == _WEBM_TRACKS:
+            for entry, s, e in _elements(f, start, end):
+                if entry != 0xAE:
+                    continue
+                track = {child: (cs, ce) for child, cs, ce in _elements(f, s, e)}
+                if 0x83 not in track or _read_uint(f, *track[0x83]) != 2 or has_audio:
+                    continue
+                has_audio = True
+                if 0x86 in track:
+                    f.seek(track[0x86][0])
+                    codec = f.read(track[0x86][1] - track[0x86][0]).decode('ascii', 'replace')
+                    info.codec = codec.removeprefix('A_').lower()
+                if 0xE1 in track:
+                    for child, cs, ce in _elements(f, *track[0xE1]):
+                        if child == 0xB5:
+                            info.sample_rate = int(_read_float(f, cs, ce))
+                        elif child == 0x9F:
+                            info.channels = _read_uint(f, cs, ce)
+        elif element_id == _WEBM_CLUSTER:
+            # Media data follows; browser recordings put their headers before it
+            break
+    if not has_audio:
+        raise ValueError('WebM file has no audio track')
+    if duration is not None:
+        info.duration = duration * timecode_scale / 1e9
+    return info
+
+
+def _probe_flac(f, size):
+    f.seek(4)
+    block_type, length = f.read(1)[0] & 0x7F, int.from_bytes(f.read(3), 'big')
+    if block_type != 0 or length < 34:
+        raise ValueError('FLAC file has no STREAMINFO block')
+    streaminfo = int.from_bytes(f.read(34)[10:18], 'big')
+    sample_rate = streaminfo >> 44
+    total_samples = streaminfo & 0xFFFFFFFFF
+    return AudioInfo(
+        'flac', codec='flac', sample_rate=sample_rate, channels=((streaminfo >> 41) & 7) + 1,
+        duration=total_samples / sample_rate if total_samples and sample_rate else None,
+    )
+
+
+def _probe_ogg(f, size):
+    header = f.read(27)
+    packet = f.read(header[26] + 19)[header[26]:]
+    if packet[:8] == b'OpusHead':
+        channels, pre_skip, input_rate = struct.unpack('<BHI', packet[9:16])
+        # Opus always decodes at 48 kHz; the header keeps the rate it was encoded from
+        info = AudioInfo('ogg', codec='opus', sample_rate=input_rate or 48000, channels=channels)
+        granule_rate = 48000
+    elif packet[:7] == b'\x01vorbis':
+        channels, rate = struct.unpack('<BI', packet[11:16])
+        info = AudioInfo('ogg', codec='vorbis', sample_rate=rate, channels=channels)
+        granule_rate, pre_skip = rate, 0
+    else:
+        raise ValueError('Ogg file has no Opus or Vorbis stream')
+
+    # The granule position of the last page counts every sample in the stream
+    f.seek(max(0, size - 64 * 1024))
+    tail = f.read()
+    last_page = tail.rfind(b'OggS')
+    if last_page >= 0 and len(tail) >= last_page + 14:
+        granule = struct.unpack('<q', tail[last_page + 6:last_page + 14])[0]
+        if granule > pre_skip:
+            info.duration = (granule - pre_skip) / granule_rate
+    return info
+
+
+PROBES = {
+    'wav': _probe_wav,
+    'mp3': _probe_mp3,
+    'mp4': _probe_mp4,
+    'webm': _probe_webm,
+    'flac': _probe_flac,
+    'ogg': _probe_ogg,
+}
+
+
+def _ffprobe(path, info):
+    """Fill the gaps in ``info`` from ffprobe, for files whose headers omit the duration"""
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams', path],
+            capture_output=True, text=True, timeout=30,
+        )
+        data = json.loads(result.stdout or '{}')
+    except (OSError, subprocess.TimeoutExpired, ValueError):
+        return info
+    stream = next((s for s in data.get('streams', []) if s.get('codec_type') == 'audio'), {})
+    duration = stream.get('duration') or data.get('format', {}).get('duration')
+    if duration is not None:
+        info.duration = float(duration)
+    info.codec = info.codec or stream.get('codec_name', '')
+    info.sample_rate = info.sample_rate or (int(stream['sample_rate']) if stream.get('sample_rate') else None)
+    info.channels = info.channels or stream.get('channels')
+    return info
@@ -0,0 +1,37 @@
+"""
+Benchmarks
+Performance scenarios run with ``python manage.py benchmark <name>``.
+Each module in this package registers its scenarios with ``@benchmark``.
+"""
+
+import importlib
+import pkgutil
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Register a benchmark function taking ``(out, quick)``"""
+    def decorator(func):
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+
+def load_all():
+    for module in pkgutil.iter_modules(__path__):
+        importlib.import_module(f'{__name__}.{module.name}')
+    return BENCHMARKS
+
+
+def peak_rss_mb():
+    """Peak resident set size of the current process in MB"""
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_isolated(func, *args):
+    """Run ``func(*args)`` in a fresh process so its peak RSS is measured on its own"""
+    import multiprocessing
+    with multiprocessing.get_context('fork').Pool(1) as pool:
+        return pool.apply(func, args)
@@ -0,0 +1,81 @@
+import random
+import time
+
+from django.db import connection
+from django.test import Client, override_settings
+
+from meeting.models import Meeting
+from . import benchmark
+
+TRANSCRIPT_WORDS = 9000  # about an hour of speech
+
+
+def _fill(meetings, rng):
+    words = ['budget', 'launch', 'hiring', 'roadmap', 'pricing', 'customer', 'release', 'design', 'we', 'will']
+    for i in range(meetings):
+        meeting = Meeting(title=f'Meeting {i}', meeting_type=rng.choice(['standup', 'client_call']), status='completed')
+        meeting.transcript = ' '.join(rng.choices(words, k=TRANSCRIPT_WORDS))
+        meeting.summary_json = {
+            'summary': ' '.join(rng.choices(words, k=40)),
+            'key_points': [' '.join(rng.choices(words, k=10)) for _ in range(5)],
+            'decisions': [' '.join(rng.choices(words, k=8)) for _ in range(3)],
+            'action_items': [{'task': ' '.join(rng.choices(words, k=6)), 'owner': 'Ana'} for _ in range(4)],
+            'agenda': [{'topic': 'Roadmap', 'description': 'Next quarter'}],
+        }
+        meeting.save()
+
+
+def _load(client, paths, seconds, conditional):
+    """Poll ``paths`` in turn for ``seconds``, replaying each path's last ETag when ``conditional``"""
+    etags = {}
+    queries = []
+    requests = not_modified = 0
+
+    def count_query(execute, sql, params, many, context):
+        queries.append(None)
+        return execute(sql, params, many, context)
+
+    deadline = time.perf_counter() + seconds
+    started = time.perf_counter()
+    with connection.execute_wrapper(count_query):
+        while time.perf_counter() < deadline:
+            for path in paths:
+                headers = {'HTTP_IF_NONE_MATCH': etags[path]} if conditional and path in etags else {}
+                response = client.get(path, **headers)
+                assert response.status_code in (200, 304), response.status_code
+                if response.has_header('ETag'):
+                    etags[path] = response['ETag']
+                requests += 1
+                not_modified += response.status_code == 304
+    elapsed = time.perf_counter() - started
+    return requests / elapsed, len(queries) / requests, not_modified / requests
+
+
+@benchmark('api_cache')
+@override_settings(ALLOWED_HOSTS=['testserver'], DEBUG=False)
+def api_cache(out, quick):
+    """Requests/sec and queries/request for polled meeting detail and list pages, with and without caching"""
+    meetings = 20 if quick else 200
+    seconds = 1 if quick else 5
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        _fill(meetings, random.Random(1))
+        ids = list(Meeting.objects.values_list('id', flat=True)[:10])
+        detail_paths = [f'/api/meetings/{i}/' for i in ids]
+        list_paths = ['/api/meetings/', '/api/meetings/?meeting_type=standup', '/api/meetings/?count=false']
+        out.write(f'{meetings} meetings with ~{TRANSCRIPT_WORDS}-word transcripts, {seconds}s per scenario, one client')
+
+        scenarios = [
+            ('detail, no cache', detail_paths, '', False),
+            ('detail, response cache', detail_paths, 'default', False),
+            ('detail, If-None-Match', detail_paths, 'default', True),
+            ('list, full responses', list_paths, 'default', False),
+            ('list, If-None-Match', list_paths, 'default', True),
+        ]
+        client = Client()
+        for label, paths, alias, conditional in scenarios:
+            with override_settings(RESPONSE_CACHE_ALIAS=alias):
+                rate, queries, hits = _load(client, paths, seconds, conditional)
+            out.write(f'  {label:<24} {rate:8.0f} req/s | {queries:4.1f} queries/request | {hits:4.0%} 304s')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
@@ -0,0 +1,47 @@
+import os
+import tempfile
+
+from meeting.audio_capture import StreamingWavWriter, SyntheticAudioSource, capture_stream
+from . import benchmark, peak_rss_mb, run_isolated
+
+RATE = 44100
+CHUNK = 1024
+
+
+def _capture(mode, seconds, path):
+    source = SyntheticAudioSource(rate=RATE, pattern=[(20, 'speech'), (5, 'silence')], total_seconds=seconds)
+    baseline = peak_rss_mb()
+
+    if mode == 'streaming':
+        with StreamingWavWriter(path, 1, 2, RATE, CHUNK, drop_when_full=False) as writer:
+            capture_stream(source, writer, CHUNK, lambda: True)
+    else:
+        # Previous behaviour: keep every chunk in a list and join at the end
+        import wave
+        frames = []
+        while True:
+            data = source.read(CHUNK)
+            if not data:
+                break
+            frames.append(data)
+        with wave.open(path, 'wb') as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(RATE)
+            wf.writeframes(b''.join(frames))
+
+    size_mb = os.path.getsize(path) / 1024 / 1024
+    os.remove(path)
+    return peak_rss_mb() - baseline, size_mb
+
+
+@benchmark('audio_capture')
+def audio_capture(out, quick):
+    """Peak RSS while capturing a long synthetic meeting to disk"""
+    seconds = 10 * 60 if quick else 2 * 60 * 60
+    out.write(f'Simulated capture: {seconds / 3600:.2f}h of 16-bit mono audio at {RATE}Hz')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ('buffered', 'streaming'):
+            rss_growth, size_mb = run_isolated(_capture, mode, seconds, os.path.join(tmp, f'{mode}.wav'))
+            out.write(f'  {mode:<10} file {size_mb:8.1f} MB   peak RSS growth {rss_growth:8.1f} MB')
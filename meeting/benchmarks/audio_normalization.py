@@ -0,0 +1,71 @@
+import os
+import shutil
+import tempfile
+import time
+import wave
+from contextlib import nullcontext
+from unittest import mock
+
+from django.test import override_settings
+
+from meeting import audio_normalize
+from meeting.audio_capture import StreamingWavWriter, SyntheticAudioSource, capture_stream
+from meeting.transcription import FakeTranscriptionProvider, transcribe_file
+from meeting.voice_activity import SpeechMap
+from . import benchmark
+
+MB = 1024 * 1024
+
+
+def write_extracted_meeting(path, seconds, lead_seconds=30, tail_seconds=60):
+    """
+    A recording as ``AudioExtractor`` used to write it: 44.1 kHz stereo PCM,
+    with silence before people join and after they leave
+    """
+    pattern = [(lead_seconds, 'silence')] + [(8, 'speech'), (1.5, 'silence')] * int(
+        (seconds - lead_seconds - tail_seconds) / 9.5) + [(tail_seconds, 'silence')]
+    source = SyntheticAudioSource(rate=44100, channels=2, pattern=pattern, total_seconds=seconds)
+    with StreamingWavWriter(path, 2, 2, 44100, 4096, drop_when_full=False) as writer:
+        capture_stream(source, writer, 4096, lambda: True)
+    return path
+
+
+def _as_is(source, tmp_dir):
+    with wave.open(source, 'rb') as wf:
+        return audio_normalize.NormalizedAudio(source, SpeechMap.whole(wf.getnframes() / wf.getframerate()))
+
+
+@benchmark('audio_normalization')
+def audio_normalization(out, quick):
+    """Bytes sent to the speech provider and end-to-end time per audio hour, before and after normalization"""
+    seconds = 10 * 60 if quick else 60 * 60
+    hours = seconds / 3600
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_extracted_meeting(os.path.join(tmp, 'meeting.wav'), seconds)
+        out.write(
+            f'{seconds / 60:.0f} min recording, 44.1 kHz stereo WAV ({os.path.getsize(path) / MB:.0f} MB); fake provider '
+            f'with 0.5s overhead, 1s per audio minute and 10 Mbit/s upload per request, 4 workers'
+        )
+
+        scenarios = [('as extracted, no normalization', 'wav', True), ('16 kHz mono WAV, trimmed', 'wav', False)]
+        for codec in ('flac', 'opus'):
+            if shutil.which('ffmpeg'):
+                scenarios.append((f'16 kHz mono {codec.upper()}, trimmed', codec, False))
+            else:
+                out.write(f'  16 kHz mono {codec.upper()}: skipped, ffmpeg is not installed')
+
+        for label, codec, unnormalized in scenarios:
+            provider = FakeTranscriptionProvider(latency=0.5, realtime_factor=1 / 60, upload_bytes_per_second=1.25 * MB,
+                                                 formats=('wav', 'flac', 'opus'))
+            with override_settings(AUDIO_NORMALIZE_CODEC=codec, TRANSCRIPTION_SEGMENT_SECONDS=120), \
+                    mock.patch.object(audio_normalize, 'normalize', _as_is) if unnormalized else nullcontext():
+                started = time.perf_counter()
+                result = transcribe_file(path, provider, max_workers=4)
+                elapsed = time.perf_counter() - started
+            first = next(s for s in result.segments if s.text)
+            out.write(
+                f'  {label:<32} sent {provider.bytes_sent / MB / hours:7.1f} MB/audio-h  '
+                f'{elapsed / hours:6.1f} s/audio-h  words={len(result.text.split())} '
+                f'first word at {first.start:.1f}s'
+            )
+
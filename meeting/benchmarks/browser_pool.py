@@ -0,0 +1,72 @@
+import statistics
+import time
+
+from meeting.browser_pool import BrowserPool, FakeBrowser, open_browser
+from . import benchmark
+
+LINK = 'https://meet.google.com/abc-defg-hij'
+
+
+def _join(lease, browser):
+    """
+    Seconds from admission until the bot is in the call and audio capture
+    starts, and MB used by all browsers during the meeting
+    """
+    started = time.perf_counter()
+    with open_browser(lease, browser) as driver:
+        driver.get(LINK)
+        joined = time.perf_counter() - started
+        memory_mb = sum(browser.rss_kb_by_session.values()) / 1024
+    return joined, memory_mb
+
+
+def _summary(latencies):
+    return f'median {statistics.median(latencies):4.2f} s, max {max(latencies):4.2f} s'
+
+
+@benchmark('browser_pool')
+def browser_pool(out, quick):
+    """Join-to-capture latency of the Google Meet recorder with and without warm browsers"""
+    meetings = 4 if quick else 12
+    size, max_meetings, max_rss_mb = 2, 5, 400
+    out.write(
+        f'{meetings} meetings one after another; fake Chrome with 2.5s cold start, 0.3s to join, 150 MB plus '
+        f'40 MB per meeting; pool of {size} recycled after {max_meetings} meetings or {max_rss_mb} MB'
+    )
+
+    browser = FakeBrowser(launch_seconds=2.5, page_load_seconds=0.3)
+    cold, memory = zip(*(_join(None, browser) for _ in range(meetings)))
+    out.write(
+        f'  new browser per meeting   {_summary(cold)} | {browser.launches} browser starts, '
+        f'peak {max(memory):.0f} MB'
+    )
+
+    browser = FakeBrowser(launch_seconds=2.5, page_load_seconds=0.3)
+    pool = BrowserPool(size=size, max_meetings=max_meetings, max_rss_mb=max_rss_mb, browser=browser)
+    started = time.perf_counter()
+    pool.fill(limit=size)
+    warmup = time.perf_counter() - started
+    warm, fill_seconds, peak_mb = [], 0.0, 0
+    for key in range(meetings):
+        joined, memory_mb = _join(pool.lease(key), browser)
+        warm.append(joined)
+        peak_mb = max(peak_mb, memory_mb)
+        pool.release(key)
+        # Between meetings the supervisor tops the pool up, off the join path
+        started = time.perf_counter()
+        pool.fill()
+        fill_seconds += time.perf_counter() - started
+    pool.close()
+    out.write(
+        f'  warm pool                 {_summary(warm)} | {browser.launches} browser starts '
+        f'({warmup:.1f} s warming up, {fill_seconds:.1f} s replacing recycled ones between meetings), '
+        f'peak {peak_mb:.0f} MB across the pool'
+    )
+
+    # More meetings at once than idle browsers: the ones without a lease start their own
+    browser = FakeBrowser(launch_seconds=2.5, page_load_seconds=0.3)
+    pool = BrowserPool(size=size, max_meetings=max_meetings, max_rss_mb=max_rss_mb, browser=browser)
+    pool.fill(limit=size)
+    burst = [_join(pool.lease(key), browser)[0] for key in range(size + 1)]
+    pool.close()
+    out.write(f'  {size + 1} meetings at once         {_summary(burst)} | the one without a warm browser starts cold')
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import time
+
+from django.db import connection
+
+from meeting.audio_capture import StreamingWavWriter, SyntheticAudioSource, capture_stream
+from meeting.diarization import EnergyDiarizer
+from meeting.live_transcription import LiveSession
+from meeting.models import Meeting
+from meeting.providers import FakeClient
+from meeting.summarization import SummaryEngine, count_tokens
+from meeting.tasks import save_summary
+from meeting.transcription import FakeTranscriptionProvider, transcribe_file
+from . import benchmark
+
+RATE = 44100  # what the Google Meet recorder captures
+CHUNK = 1024
+# Audio is played this many times faster than real time so an hour-long meeting takes a minute
+SPEED = 60
+
+
+def _source(seconds):
+    pattern = [(30, 'silence')] + [(8, 'speech'), (1.5, 'silence')] * int((seconds - 30) / 9.5 + 1)
+    return SyntheticAudioSource(rate=RATE, pattern=pattern, total_seconds=seconds, realtime=True, speed=SPEED)
+
+
+def _provider():
+    return FakeTranscriptionProvider(latency=0.5, realtime_factor=1 / 60)
+
+
+def _after_recording(meeting, path, llm):
+    """What ``process_meeting`` does once the recording is saved"""
+    result = transcribe_file(path, _provider(), max_workers=4, diarizer=EnergyDiarizer())
+    meeting.transcript = result.text
+    meeting.segments = result.to_table()
+    meeting.save(update_fields=['transcript', 'segments', 'updated_at'])
+    save_summary(meeting, SummaryEngine(llm).summarize(meeting.summary_input))
+
+
+@benchmark('live_transcription')
+def live_transcription(out, quick):
+    """Time from the end of a meeting to its saved summary, transcribing after the recording vs while it runs"""
+    seconds = 10 * 60 if quick else 60 * 60
+    out.write(
+        f'{seconds // 60} min meeting captured at 44.1 kHz, played {SPEED}x faster than real time; fake provider with '
+        f'0.5s overhead and 1s per audio minute, 4 workers; fake LLM with 2s per call'
+    )
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for label, live in (('after the recording', False), ('live', True)):
+                meeting = Meeting.objects.create(title=label, status='processing')
+                path = os.path.join(tmp, f'{"live" if live else "batch"}.wav')
+                llm = FakeClient(latency=2.0)
+                writer = StreamingWavWriter(path, 1, 2, RATE, CHUNK, drop_when_full=False).start()
+                session = None
+                if live:
+                    session = LiveSession(meeting, _provider(), llm.complete, EnergyDiarizer())
+                    writer = session.wrap(writer)
+
+                capture_stream(_source(seconds), writer, CHUNK, lambda: True)
+                ended = time.perf_counter()
+                writer.close()
+                if live:
+                    session.finish()
+                else:
+                    _after_recording(meeting, path, llm.complete)
+                latency = time.perf_counter() - ended
+
+                meeting = Meeting.objects.get(pk=meeting.pk)
+                out.write(
+                    f'  {label:<20} summary {latency:6.1f} s after the meeting ended | '
+                    f'{llm.llm.calls} LLM calls | {len(meeting.transcript.split())} words '
+                    f'({count_tokens(meeting.transcript)} tokens), {len(meeting.segments.speakers)} speaker(s) | '
+                    f'{meeting.status}'
+                )
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
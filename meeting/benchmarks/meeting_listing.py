@@ -0,0 +1,140 @@
+import datetime
+import os
+import random
+import tempfile
+import time
+from urllib.parse import parse_qs, urlparse
+
+from django.core.management import call_command
+from django.db import connections, models, transaction
+from django.test import override_settings
+from rest_framework.pagination import Cursor, PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from meeting.models import Meeting
+from meeting.pagination import MeetingCursorPagination
+from . import benchmark
+
+ALIAS = 'listing_benchmark'
+PAGE_SIZE = 10
+# The indexes Meeting had before keyset pagination
+OLD_INDEXES = [
+    models.Index(fields=['-created_at'], name='bench_created_idx'),
+    models.Index(fields=['meeting_type'], name='bench_type_idx'),
+]
+
+
+def _fill(meetings):
+    rng = random.Random(1)
+    connection = connections[ALIAS]
+    types = [choice for choice, _ in Meeting.MEETING_TYPES]
+    start = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+    columns = 'title, meeting_type, description, created_at, updated_at, meeting_date, status'
+    for first in range(0, meetings, 10000):
+        rows = []
+        for i in range(first, min(meetings, first + 10000)):
+            created = connection.ops.adapt_datetimefield_value(start + datetime.timedelta(seconds=90 * i))
+            # Most meetings complete; a few fail
+            status = rng.choices(['completed', 'pending', 'failed'], [95, 3, 2])[0]
+            rows.append((f'Meeting {i}', rng.choice(types), 'Weekly sync', created, created, created, status))
+        with transaction.atomic(using=ALIAS), connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {Meeting._meta.db_table} ({columns}, transcript_file, recording_file) "
+                f"VALUES (%s, %s, %s, %s, %s, %s, %s, '', '')",
+                rows
+            )
+
+
+def _request(**params):
+    return Request(APIRequestFactory().get('/api/meetings/', params))
+
+
+def _page_number(queryset, page):
+    paginator = PageNumberPagination()
+    paginator.page_size = PAGE_SIZE
+    return paginator.paginate_queryset(queryset.order_by('-created_at', '-id'), _request(page=page))
+
+
+def _cursor_at(queryset, depth):
+    """Cursor a client following ``next`` links would hold at page ``depth``"""
+    if depth == 1:
+        return None
+    row = queryset.order_by('-created_at', '-id').values_list('created_at', flat=True)[(depth - 1) * PAGE_SIZE - 1]
+    paginator = MeetingCursorPagination()
+    paginator.base_url = 'http://testserver/api/meetings/'
+    link = paginator.encode_cursor(Cursor(offset=0, reverse=False, position=str(row)))
+    return parse_qs(urlparse(link).query)['cursor'][0]
+
+
+def _keyset(queryset, cursor, count):
+    paginator = MeetingCursorPagination()
+    paginator.page_size = PAGE_SIZE
+    params = {'count': 'true' if count else 'false'}
+    if cursor:
+        params['cursor'] = cursor
+    return paginator.paginate_queryset(queryset, _request(**params))
+
+
+def _timed(func, repeat=3):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def _compare(out, label, queryset, depths):
+    for depth in depths:
+        cursor = _cursor_at(queryset, depth)
+        offset_ms = _timed(lambda: _page_number(queryset, depth))
+        keyset_ms = _timed(lambda: _keyset(queryset, cursor, True))
+        no_count_ms = _timed(lambda: _keyset(queryset, cursor, False))
+        out.write(
+            f'  {label:<22} page {depth:>6}: COUNT+OFFSET {offset_ms:8.2f}ms | '
+            f'cursor {keyset_ms:8.2f}ms | cursor, count=false {no_count_ms:7.2f}ms'
+        )
+
+
+@benchmark('meeting_listing')
+@override_settings(ALLOWED_HOSTS=['testserver'])
+def meeting_listing(out, quick):
+    """Latency of deep meeting list pages: page numbers versus cursors, and the list indexes"""
+    if connections['default'].vendor != 'sqlite':
+        out.write('  skipped: runs on a temporary SQLite database and needs a SQLite default database')
+        return
+
+    meetings = 100_000 if quick else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        connections.databases[ALIAS] = {**connections.databases['default'], 'NAME': os.path.join(tmp, 'listing.sqlite3')}
+        try:
+            call_command('migrate', database=ALIAS, verbosity=0)
+            started = time.perf_counter()
+            _fill(meetings)
+            out.write(f'{meetings} meetings, pages of {PAGE_SIZE}, built in {time.perf_counter() - started:.1f}s')
+
+            last_page = meetings // PAGE_SIZE
+            everything = Meeting.objects.using(ALIAS).all()
+            _compare(out, 'all meetings', everything, [1, last_page // 100, last_page // 2, last_page])
+
+            standups = everything.filter(meeting_type='standup')
+            failed = everything.filter(status='failed')
+            filtered = [
+                ('meeting_type=standup', standups, standups.count() // PAGE_SIZE),
+                ('status=failed', failed, failed.count() // PAGE_SIZE),
+            ]
+            for label, queryset, pages in filtered:
+                _compare(out, label, queryset, [1, pages])
+
+            # The same filtered pages with the indexes Meeting had before
+            connection = connections[ALIAS]
+            with connection.schema_editor() as editor:
+                for index in Meeting._meta.indexes:
+                    editor.remove_index(Meeting, index)
+                for index in OLD_INDEXES:
+                    editor.add_index(Meeting, index)
+            out.write('  with the old (-created_at) and (meeting_type) indexes:')
+            for label, queryset, pages in filtered:
+                _compare(out, label, queryset, [1, pages])
+        finally:
+            connections[ALIAS].close()
+            del connections.databases[ALIAS]
@@ -0,0 +1,130 @@
+import itertools
+import os
+import random
+import tempfile
+import time
+
+from django.core.management import call_command
+from django.db import connections
+from django.db.models import Q
+
+from meeting import search
+from meeting.models import Meeting, MeetingContent
+from . import benchmark
+
+ALIAS = 'search_benchmark'
+TRANSCRIPT_WORDS = 700  # ~4KB
+VOCABULARY = 20000
+
+
+def _vocabulary(rng):
+    syllables = ['ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'to', 'vi', 'de', 'po', 'an', 'el', 'ir', 'ob', 'us']
+    words = set()
+    while len(words) < VOCABULARY:
+        words.add(''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def _build_corpus(meetings, rng):
+    """Transcripts drawn from a Zipf-like word distribution; returns the vocabulary by frequency"""
+    vocabulary = _vocabulary(rng)
+    weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+
+    def words(count):
+        return ' '.join(rng.choices(vocabulary, cum_weights=weights, k=count))
+
+    for start in range(0, meetings, 1000):
+        ids = range(start + 1, min(meetings, start + 1000) + 1)
+        Meeting.objects.using(ALIAS).bulk_create([
+            Meeting(id=i, title=f'Meeting {i} {rng.choice(vocabulary[:2000])}', meeting_type='team_meeting',
+                    description=words(12), status='completed')
+            for i in ids
+        ])
+        MeetingContent.objects.using(ALIAS).bulk_create([
+            MeetingContent(
+                meeting_id=i,
+                transcript=words(TRANSCRIPT_WORDS),
+                summary_json={
+                    'summary': words(40),
+                    'action_items': [{'task': words(6), 'owner': 'Ana'}],
+                    'decisions': [words(8)],
+                }
+            )
+            for i in ids
+        ])
+    return vocabulary
+
+
+def _icontains(query, lookups):
+    queryset = Meeting.objects.using(ALIAS)
+    for word in search.terms(query):
+        condition = Q()
+        for lookup in lookups:
+            condition |= Q(**{lookup: word})
+        queryset = queryset.filter(condition)
+    return queryset
+
+
+def _first_page(queryset):
+    """What the list endpoint runs: a count plus the newest ten ids"""
+    return queryset.count(), list(queryset.order_by('-created_at').values_list('id', flat=True)[:10])
+
+
+def _timed(func, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - started) / repeat * 1000, result
+
+
+@benchmark('meeting_search')
+def meeting_search(out, quick):
+    """Search latency with the full-text index versus icontains filters"""
+    if connections['default'].vendor != 'sqlite':
+        out.write('  skipped: runs on a temporary SQLite database and needs a SQLite default database')
+        return
+
+    meetings = 5_000 if quick else 100_000
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        connections.databases[ALIAS] = {**connections.databases['default'], 'NAME': os.path.join(tmp, 'search.sqlite3')}
+        try:
+            call_command('migrate', database=ALIAS, verbosity=0)
+            started = time.perf_counter()
+            vocabulary = _build_corpus(meetings, rng)
+            out.write(
+                f'{meetings} meetings with ~{TRANSCRIPT_WORDS}-word transcripts, '
+                f'built in {time.perf_counter() - started:.1f}s'
+            )
+            started = time.perf_counter()
+            search.rebuild(using=ALIAS)
+            out.write(
+                f'  index built in {time.perf_counter() - started:.1f}s, database '
+                f'{os.path.getsize(connections.databases[ALIAS]["NAME"]) / 1024 / 1024:.0f} MB'
+            )
+
+            queries = [
+                ('common word', vocabulary[20], None),
+                ('rare word', vocabulary[15000], None),
+                ('two words', f'{vocabulary[300]} {vocabulary[800]}', None),
+                ('action items only', vocabulary[200], ['action_items']),
+            ]
+            api_lookups = ['title__icontains', 'description__icontains', 'meeting_type__icontains']
+            all_lookups = sorted(set(search.FALLBACK_LOOKUPS[field] for field in search.FIELDS))
+            repeat = 5 if quick else 2
+
+            for label, query, fields in queries:
+                lookups = [search.FALLBACK_LOOKUPS[field] for field in fields] if fields else all_lookups
+                api_ms, _ = _timed(lambda: _first_page(_icontains(query, api_lookups)), repeat)
+                like_ms, (like_count, _) = _timed(lambda: _first_page(_icontains(query, lookups)), repeat)
+                fts_ms, (fts_count, _) = _timed(
+                    lambda: _first_page(search.filter_queryset(Meeting.objects.using(ALIAS), query, fields)), repeat * 5
+                )
+                ranked_ms, _ = _timed(lambda: search.search(query, fields, limit=10, using=ALIAS), repeat * 5)
+                out.write(
+                    f'  {label:<18} old ?search= (3 fields) {api_ms:8.1f}ms | icontains all fields {like_ms:8.1f}ms '
+                    f'({like_count} hits) | index filter {fts_ms:7.1f}ms ({fts_count} hits) | ranked {ranked_ms:7.1f}ms'
+                )
+        finally:
+            connections[ALIAS].close()
+            del connections.databases[ALIAS]
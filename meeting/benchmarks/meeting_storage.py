@@ -0,0 +1,132 @@
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from . import benchmark, peak_rss_mb, run_isolated
+
+TRANSCRIPT_BYTES = 50 * 1024
+PAGE_SIZE = 10
+
+LIST_COLUMNS = (
+    'id, title, meeting_type, description, transcript_file, recording_file, created_at, '
+    'updated_at, meeting_date, status, processing_error, meeting_link'
+)
+
+# Tables as the migrations create them on SQLite, before and after MeetingContent
+WIDE_SCHEMA = """
+CREATE TABLE meeting (
+    id integer PRIMARY KEY AUTOINCREMENT, title varchar(255) NOT NULL, meeting_type varchar(50) NOT NULL,
+    description text NULL, transcript_file varchar(100) NULL, recording_file varchar(100) NULL,
+    created_at datetime NOT NULL, updated_at datetime NOT NULL, meeting_date datetime NOT NULL,
+    status varchar(20) NOT NULL, processing_error text NULL, meeting_link varchar(200) NULL,
+    transcript text NULL, summary_json text NULL
+);
+CREATE INDEX meeting_created ON meeting (created_at DESC);
+"""
+NARROW_SCHEMA = """
+CREATE TABLE meeting (
+    id integer PRIMARY KEY AUTOINCREMENT, title varchar(255) NOT NULL, meeting_type varchar(50) NOT NULL,
+    description text NULL, transcript_file varchar(100) NULL, recording_file varchar(100) NULL,
+    created_at datetime NOT NULL, updated_at datetime NOT NULL, meeting_date datetime NOT NULL,
+    status varchar(20) NOT NULL, processing_error text NULL, meeting_link varchar(200) NULL
+);
+CREATE INDEX meeting_created ON meeting (created_at DESC);
+CREATE TABLE meeting_content (meeting_id bigint PRIMARY KEY, transcript text NULL, summary_json text NULL);
+"""
+
+# (label, schema, list query) where the list query is what ``GET /api/meetings/`` runs
+LAYOUTS = [
+    ('wide rows, SELECT *', WIDE_SCHEMA, 'SELECT * FROM meeting'),
+    ('wide rows, .only()', WIDE_SCHEMA, f'SELECT {LIST_COLUMNS} FROM meeting'),
+    ('MeetingContent table', NARROW_SCHEMA, 'SELECT * FROM meeting'),
+]
+
+
+def _build(path, schema, meetings):
+    words = 'we agreed to ship the release next week and follow up on the budget review '.split()
+    rng = random.Random(1)
+    transcript = ' '.join(rng.choice(words) for _ in range(TRANSCRIPT_BYTES // 5))[:TRANSCRIPT_BYTES]
+    summary = '{"summary": "%s", "key_points": [], "decisions": [], "action_items": [], "agenda": []}' % ('x' * 2000)
+
+    db = sqlite3.connect(path)
+    db.executescript(schema)
+    wide = schema is WIDE_SCHEMA
+    for start in range(0, meetings, 1000):
+        rows = [
+            (i + 1, f'Meeting {i}', 'team_meeting', 'Weekly sync', '', '', f'2024-01-01 00:00:{i:09d}',
+             '2024-01-01', '2024-01-01', 'completed', None, None)
+            for i in range(start, min(meetings, start + 1000))
+        ]
+        if wide:
+            db.executemany(
+                f'INSERT INTO meeting ({LIST_COLUMNS}, transcript, summary_json) VALUES ({", ".join("?" * 14)})',
+                [row + (transcript, summary) for row in rows]
+            )
+        else:
+            db.executemany(f'INSERT INTO meeting ({LIST_COLUMNS}) VALUES ({", ".join("?" * 12)})', rows)
+            db.executemany(
+                'INSERT INTO meeting_content (meeting_id, transcript, summary_json) VALUES (?, ?, ?)',
+                [(row[0], transcript, summary) for row in rows]
+            )
+        db.commit()
+    db.close()
+
+
+def _list_pages(path, query, meetings, requests):
+    """Paginated list requests at random offsets: ``(mean ms, peak RSS MB)``"""
+    db = sqlite3.connect(path)
+    rng = random.Random(2)
+    started = time.perf_counter()
+    for _ in range(requests):
+        db.execute('SELECT COUNT(*) FROM meeting').fetchone()
+        offset = rng.randrange(max(1, meetings - PAGE_SIZE))
+        db.execute(f'{query} ORDER BY created_at DESC LIMIT {PAGE_SIZE} OFFSET {offset}').fetchall()
+    elapsed = time.perf_counter() - started
+    db.close()
+    return elapsed / requests * 1000, peak_rss_mb()
+
+
+def _search(path, query):
+    """``?search=`` runs LIKE over every row; the result set is materialized like a queryset"""
+    db = sqlite3.connect(path)
+    started = time.perf_counter()
+    rows = db.execute(
+        f"{query} WHERE title LIKE '%Meeting 1%' OR description LIKE '%Meeting 1%' ORDER BY created_at DESC"
+    ).fetchall()
+    elapsed = time.perf_counter() - started
+    db.close()
+    return elapsed * 1000, len(rows), peak_rss_mb()
+
+
+@benchmark('meeting_storage')
+def meeting_storage(out, quick):
+    """Meeting list latency and memory with transcripts on the Meeting row versus in MeetingContent"""
+    meetings = 5_000 if quick else 100_000
+    requests = 200
+    out.write(
+        f'{meetings} meetings with {TRANSCRIPT_BYTES // 1024}KB transcripts on SQLite, '
+        f'{requests} list pages of {PAGE_SIZE}'
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {}
+        for label, schema, _ in LAYOUTS:
+            if schema not in paths:
+                paths[schema] = os.path.join(tmp, f'{len(paths)}.sqlite3')
+                started = time.perf_counter()
+                _build(paths[schema], schema, meetings)
+                out.write(
+                    f'  built {"wide" if schema is WIDE_SCHEMA else "narrow"} table in '
+                    f'{time.perf_counter() - started:.1f}s, '
+                    f'{os.path.getsize(paths[schema]) / 1024 / 1024:.0f} MB on disk'
+                )
+
+        for label, schema, query in LAYOUTS:
+            page_ms, page_rss = run_isolated(_list_pages, paths[schema], query, meetings, requests)
+            search_ms, found, search_rss = run_isolated(_search, paths[schema], query)
+            out.write(
+                f'  {label:<22} list page {page_ms:7.2f}ms (peak RSS {page_rss:6.1f} MB)  '
+                f'search {search_ms:8.1f}ms for {found} rows (peak RSS {search_rss:7.1f} MB)'
+            )
@@ -0,0 +1,197 @@
+import asyncio
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from django.test import override_settings
+
+from meeting.providers import FakeClient, HuggingFaceClient, reset_clients
+from meeting.routing import CircuitBreaker, ProviderRouter
+from . import benchmark
+
+
+# Simulated server-side processing time per request
+STUB_LATENCY_SECONDS = 0.005
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Answers every POST like the HuggingFace inference API, keeping connections alive"""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        time.sleep(STUB_LATENCY_SECONDS)
+        body = json.dumps([{'summary_text': 'stub summary'}]).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    connections = 0
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        super().process_request(request, client_address)
+
+
+def _timed(calls, func):
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    return elapsed, calls / elapsed
+
+
+@benchmark('provider_pooling')
+def provider_pooling(out, quick):
+    """Calls/sec against a local stub API with a new connection per call vs a pooled client"""
+    calls = 200 if quick else 2000
+    concurrency = 8
+
+    server = _StubServer(('127.0.0.1', 0), _StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}/'
+    out.write(f'Stub server at {url}, {STUB_LATENCY_SECONDS * 1000:.0f}ms per request, {calls} calls per scenario')
+
+    def report(label, elapsed, rate, connections):
+        out.write(f'  {label:<28} {elapsed:6.2f}s  {rate:8.1f} calls/s  connections={connections}')
+
+    try:
+        def unpooled():
+            for _ in range(calls):
+                requests.post(url, json={'inputs': 'hello'}, timeout=10).json()
+
+        server.connections = 0
+        report('requests.post (no pool)', *_timed(calls, unpooled), server.connections)
+
+        with override_settings(HUGGINGFACE_API_KEY='stub', LLM_POOL_MAXSIZE=concurrency):
+            client = HuggingFaceClient(api_url=url, timeout=10)
+
+            def pooled():
+                for _ in range(calls):
+                    client.complete('hello')
+
+            server.connections = 0
+            report('pooled client', *_timed(calls, pooled), server.connections)
+
+            async def gather():
+                semaphore = asyncio.Semaphore(concurrency)
+
+                async def one():
+                    async with semaphore:
+                        return await client.acomplete('hello')
+
+                await asyncio.gather(*(one() for _ in range(calls)))
+
+            server.connections = 0
+            report(f'pooled async x{concurrency}', *_timed(calls, lambda: asyncio.run(gather())), server.connections)
+            client.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _percentiles(latencies):
+    latencies = sorted(latencies)
+    return tuple(latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))] for p in (50, 95, 99))
+
+
+@benchmark('provider_hedging')
+@override_settings(LLM_ROUTER_STATS_DIR='')
+def provider_hedging(out, quick):
+    """Tail latency of routed calls with and without hedging, plus failover through an open breaker"""
+    calls = 200 if quick else 1000
+    warmup = 50
+    rng = random.Random(7)
+    # 5% of primary calls stall for a second; the backup is steady but slower than the primary's median
+    clients = {
+        'primary': FakeClient(latency=lambda: 1.0 if rng.random() < 0.05 else rng.uniform(0.01, 0.03)),
+        'backup': FakeClient(latency=lambda: rng.uniform(0.04, 0.06)),
+    }
+    prompt = 'Transcript: Alice will send the notes. Respond with ONLY valid JSON'
+
+    out.write(f'{calls} calls after {warmup} warm-up calls; primary stalls for 1s on 5% of calls')
+    for percentile in (0, 90, 95):
+        router = ProviderRouter(['primary', 'backup'], hedge_percentile=percentile, hedge_min_samples=warmup)
+        for _ in range(warmup):
+            router.call(lambda name: clients[name].complete(prompt))
+
+        latencies = []
+        for _ in range(calls):
+            started = time.perf_counter()
+            router.call(lambda name: clients[name].complete(prompt))
+            latencies.append(time.perf_counter() - started)
+        router.close()
+
+        p50, p95, p99 = _percentiles(latencies)
+        backup = router.stats['backup']
+        label = f'hedge at p{percentile:g}' if percentile else 'no hedging'
+        out.write(
+            f'  {label:<14} p50 {p50 * 1000:6.1f}ms  p95 {p95 * 1000:6.1f}ms  p99 {p99 * 1000:6.1f}ms  '
+            f'hedges {backup.hedges / calls:5.1%}  won {backup.hedge_wins}'
+        )
+
+    clients['primary'] = FakeClient(error_rate=1.0)
+    router = ProviderRouter(
+        ['primary', 'backup'], hedge_percentile=0,
+        breaker_factory=lambda: CircuitBreaker(failure_threshold=5, reset_seconds=3600)
+    )
+    failed_calls = 0
+    for _ in range(20):
+        name, _ = router.call(lambda name: clients[name].complete(prompt))
+        failed_calls += name != 'primary'
+    router.close()
+    primary = router.stats['primary']
+    out.write(
+        f'Primary always failing: {failed_calls}/20 calls served by backup, '
+        f'primary tried {primary.failures} times, breaker {primary.breaker.state}'
+    )
+
+
+@benchmark('summary_streaming')
+@override_settings(
+    LLM_CACHE_BACKEND='none', LLM_ROUTER_STATS_DIR='',
+    FAKE_LLM_LATENCY_SECONDS=0.5, FAKE_LLM_STREAM_CHUNK_SECONDS=0.02,
+)
+def summary_streaming(out, quick):
+    """Time to first summary section when streaming vs waiting for the whole reply"""
+    from meeting.llm_service import LLMService
+
+    reset_clients()
+    sentences = [
+        'Alice: we decided to move the launch to March.',
+        'Bob will update the roadmap by Friday.',
+        'Carol raised the hiring plan for the support team.',
+        'Dan will draft the budget for review.',
+        'We decided to keep the weekly sync.',
+    ]
+    transcript = ' '.join(sentences * (2 if quick else 6))
+    out.write('Fake provider: 500ms to first token, 16 characters every 20ms')
+
+    started = time.perf_counter()
+    LLMService.generate_summary(transcript, service='fake', force=True)
+    blocking = time.perf_counter() - started
+
+    started = time.perf_counter()
+    arrivals = []
+    for event in LLMService.stream_summary(transcript, service='fake', force=True):
+        if event[0] == 'section':
+            arrivals.append((event[1], time.perf_counter() - started))
+    streamed = time.perf_counter() - started
+
+    out.write(f'  blocking generate_summary {blocking * 1000:7.0f}ms until anything is shown')
+    for name, elapsed in arrivals:
+        out.write(f'  streamed {name:<16} {elapsed * 1000:7.0f}ms')
+    out.write(f'  streamed complete         {streamed * 1000:7.0f}ms')
+    reset_clients()
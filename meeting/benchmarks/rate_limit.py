@@ -0,0 +1,180 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from meeting.models import Job, RateLimitBucket
+from meeting.rate_limit import DatabaseBucketStore, LocalBucketStore, RateLimiter
+from . import benchmark, run_isolated
+
+# One simulated "minute" lasts this long so scenarios finish quickly
+PERIOD_SECONDS = 1.0
+RPM = 50
+LATENCY_SECONDS = 0.02
+
+
+class _SimulatedAPI(BaseHTTPRequestHandler):
+    """Provider stub enforcing ``RPM`` per period with its own token bucket; over the limit it answers 429"""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        server = self.server
+        with server.lock:
+            now = time.monotonic()
+            server.tokens = min(RPM, server.tokens + (now - server.updated_at) * RPM / PERIOD_SECONDS)
+            server.updated_at = now
+            allowed = server.tokens >= 1
+            if allowed:
+                server.tokens -= 1
+                server.served += 1
+            else:
+                server.rejected += 1
+
+        time.sleep(LATENCY_SECONDS)
+        self.send_response(200 if allowed else 429)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_api():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _SimulatedAPI)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    # Start from an empty bucket so every scenario sees the steady-state rate
+    server.tokens, server.updated_at = 0, time.monotonic()
+    server.served = server.rejected = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}/'
+
+
+def _reset(server):
+    time.sleep(PERIOD_SECONDS)
+    with server.lock:
+        server.tokens, server.updated_at = 0, time.monotonic()
+        server.served = server.rejected = 0
+
+
+def _call_api(session, url, limiter=None, priority=Job.PRIORITY_NORMAL):
+    """Make one call, returning ``(waited_seconds, status_code)``"""
+    waited = limiter.acquire(priority=priority, timeout=600) if limiter else 0.0
+    return waited, session.post(url, data=b'{}', timeout=30).status_code
+
+
+def _burst(url, calls, threads, limiter=None):
+    session = requests.Session()
+    session.mount('http://', requests.adapters.HTTPAdapter(pool_maxsize=threads))
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(lambda _: _call_api(session, url, limiter), range(calls)))
+    return time.perf_counter() - started, results
+
+
+def _limiter(name, store):
+    # Starts empty like the simulated API; a full bucket would allow a burst the API rejects
+    limiter = RateLimiter(name, rpm=RPM, tpm=0, store=store, period_seconds=PERIOD_SECONDS)
+    store.take([(f'{name}:rpm', RPM, RPM, RPM / PERIOD_SECONDS, 0)])
+    return limiter
+
+
+def _process_burst(url, name, calls, threads, use_database):
+    from django.db import connections
+    connections.close_all()
+    store = DatabaseBucketStore() if use_database else LocalBucketStore()
+    limiter = RateLimiter(name, rpm=RPM, tpm=0, store=store, period_seconds=PERIOD_SECONDS)
+    if not use_database:
+        store.take([(f'{name}:rpm', RPM, RPM, RPM / PERIOD_SECONDS, 0)])
+    _, results = _burst(url, calls, threads, limiter)
+    connections.close_all()
+    return [code for _, code in results]
+
+
+@benchmark('rate_limiter')
+def rate_limiter(out, quick):
+    """429s and throughput when a burst of meetings hits a rate-limited provider at once"""
+    calls = 150 if quick else 600
+    threads = 32
+    server, url = _start_api()
+    out.write(
+        f'Simulated provider allowing {RPM} requests per {PERIOD_SECONDS:g}s "minute", '
+        f'{calls} calls from {threads} threads'
+    )
+
+    def report(label, elapsed, codes):
+        ok = codes.count(200)
+        out.write(
+            f'  {label:<26} {elapsed:6.2f}s  ok {ok:4d}  429s {len(codes) - ok:4d}  '
+            f'{ok / elapsed * PERIOD_SECONDS:6.1f} ok/"minute" (limit {RPM})'
+        )
+
+    try:
+        elapsed, results = _burst(url, calls, threads)
+        report('no limiter', elapsed, [code for _, code in results])
+
+        _reset(server)
+        elapsed, results = _burst(url, calls, threads, _limiter('bench-local', LocalBucketStore()))
+        report('token bucket', elapsed, [code for _, code in results])
+
+        # Interactive calls arriving while a batch backfill saturates the limiter
+        _reset(server)
+        limiter = _limiter('bench-priority', LocalBucketStore())
+        session = requests.Session()
+        session.mount('http://', requests.adapters.HTTPAdapter(pool_maxsize=threads))
+
+        def timed_call(priority):
+            started = time.perf_counter()
+            _call_api(session, url, limiter, priority)
+            return time.perf_counter() - started
+
+        with ThreadPoolExecutor(max_workers=calls + 8) as pool:
+            batch = [pool.submit(timed_call, Job.PRIORITY_BATCH) for _ in range(calls)]
+            time.sleep(PERIOD_SECONDS)
+            interactive = []
+            for _ in range(8):
+                interactive.append(pool.submit(timed_call, Job.PRIORITY_INTERACTIVE))
+                time.sleep(PERIOD_SECONDS / 4)
+            batch_latency = [f.result() for f in batch]
+            interactive_latency = [f.result() for f in interactive]
+        out.write(
+            f'  priority: interactive mean {sum(interactive_latency) / len(interactive_latency) * 1000:6.1f}ms '
+            f'(max {max(interactive_latency) * 1000:.1f}ms), batch mean '
+            f'{sum(batch_latency) / len(batch_latency):.2f}s (max {max(batch_latency):.2f}s)'
+        )
+
+        # Several worker processes sharing one provider budget
+        processes = 4
+        for use_database in (False, True):
+            if use_database and not _bucket_table_exists():
+                out.write('  database store skipped: run "manage.py migrate" first')
+                continue
+            _reset(server)
+            name = f'bench-{os.getpid()}-{int(use_database)}'
+            if use_database:
+                DatabaseBucketStore().take([(f'{name}:rpm', RPM, RPM, RPM / PERIOD_SECONDS, 0)])
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=processes) as pool:
+                codes = sum(pool.map(
+                    lambda _: run_isolated(_process_burst, url, name, calls // processes, 8, use_database),
+                    range(processes)
+                ), [])
+            label = f'{processes} processes, {"database" if use_database else "local"}'
+            report(label, time.perf_counter() - started, codes)
+            if use_database:
+                RateLimitBucket.objects.filter(key__startswith=name).delete()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _bucket_table_exists():
+    from django.db import connection
+    return RateLimitBucket._meta.db_table in connection.introspection.table_names()
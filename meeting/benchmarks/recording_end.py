@@ -0,0 +1,109 @@
+import os
+import random
+import struct
+import tempfile
+import threading
+import time
+
+from meeting.audio_capture import StreamingWavWriter, SyntheticAudioSource, capture_stream
+from meeting.audio_normalize import audioop
+from meeting.recording_control import RecordingController, SilenceDetector
+from . import benchmark
+
+RATE = 44100  # what the Google Meet recorder captures
+CHUNK = 1024
+# Audio is played this many times faster than real time
+SPEED = 600
+
+
+def _talk(minutes):
+    return [(8, 'speech'), (1.5, 'silence')] * int(minutes * 60 / 9.5)
+
+
+SCENARIOS = [
+    # name, pattern, minute the meeting page says the call ended, expected stop reason
+    ('15 min standup, bot left in the call', _talk(15) + [(3600, 'silence')], None, 'silence'),
+    ('2 min break halfway through', _talk(20) + [(120, 'silence')] + _talk(20) + [(3600, 'silence')], None, 'silence'),
+    ('nobody shows up', [(3600, 'silence')], None, 'no_speech'),
+    ('host ends the call at 20 min', _talk(60), 20, 'meeting_ended'),
+    ('talking for the full hour', _talk(60), None, 'duration'),
+]
+
+
+class _NoisySource:
+    """Adds low room noise, well under the silence level, to a synthetic source"""
+
+    def __init__(self, source, level=40):
+        self.source = source
+        rng = random.Random(0)
+        self._noise = struct.pack(
+            f'<{RATE}h', *(int(rng.gauss(0, level)) for _ in range(RATE))
+        ) if audioop is not None else None
+
+    @property
+    def frames_read(self):
+        return self.source.frames_read
+
+    def read(self, num_frames, exception_on_overflow=True):
+        data = self.source.read(num_frames, exception_on_overflow)
+        if self._noise is None or not data:
+            return data
+        offset = (self.source.frames_read * 2) % (len(self._noise) - len(data))
+        return audioop.add(data, self._noise[offset:offset + len(data)], 2)
+
+
+def _record(path, pattern, ended_minute, max_seconds):
+    source = _NoisySource(SyntheticAudioSource(
+        rate=RATE, pattern=pattern, total_seconds=max_seconds, realtime=True, speed=SPEED
+    ))
+    signals = []
+    if ended_minute is not None:
+        signals.append(lambda: 'page says "The meeting has ended"' if source.frames_read >= ended_minute * 60 * RATE else None)
+    # Polled every 5 s of audio
+    controller = RecordingController.from_settings(max_seconds, signals=signals).attach(RATE)
+    controller.signal_interval = 5 / SPEED
+
+    writer = StreamingWavWriter(path, 1, 2, RATE, CHUNK, drop_when_full=False).start()
+    thread = threading.Thread(target=capture_stream, args=(source, writer, CHUNK, controller.running, controller))
+    thread.start()
+    controller.wait()
+    thread.join()
+    writer.close()
+    return controller
+
+
+@benchmark('recording_end')
+def recording_end(out, quick):
+    """When the bot stops recording meetings that end before the requested duration"""
+    max_seconds = 60 * 60
+    scenarios = SCENARIOS[:1] if quick else SCENARIOS
+    controller = RecordingController.from_settings(max_seconds)
+    out.write(
+        f'Requested duration 60 min; ends after {controller.end_silence_seconds:.0f}s of silence, '
+        f'{controller.start_timeout_seconds:.0f}s with nobody speaking or when the page says so. '
+        f'Synthetic 44.1 kHz speech (8s talk / 1.5s pause) with room noise, played {SPEED}x faster than real time'
+    )
+    saved_minutes = 0.0
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, pattern, ended_minute, expected in scenarios:
+            path = os.path.join(tmp, 'recording.wav')
+            controller = _record(path, pattern, ended_minute, max_seconds)
+            minutes = controller.recorded_seconds / 60
+            saved_minutes += 60 - minutes
+            out.write(
+                f'  {name:<38} stopped at {minutes:5.1f} min: {controller.stop_reason:<13} '
+                f'(expected {expected}) | {os.path.getsize(path) / 1e6:6.1f} MB recorded, '
+                f'{60 - minutes:4.1f} min avoided'
+            )
+    out.write(f'  {saved_minutes:.0f} bot minutes avoided in total')
+
+    # What watching the audio adds to the capture loop
+    detector = SilenceDetector(RATE)
+    chunk = SyntheticAudioSource(rate=RATE).read(CHUNK)
+    seconds = 600 if quick else 3600
+    chunks = seconds * RATE // CHUNK
+    started = time.process_time()
+    for _ in range(chunks):
+        detector.feed(chunk)
+    cpu = time.process_time() - started
+    out.write(f'  silence detection: {cpu / seconds * 3600:.2f} CPU seconds per hour of audio')
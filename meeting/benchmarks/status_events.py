@@ -0,0 +1,117 @@
+import asyncio
+import gc
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.asgi import get_asgi_application
+from django.db import connection
+from django.test import override_settings
+
+from meeting import events
+from meeting.event_stream import EventStreamApp
+from meeting.models import Meeting
+from meeting.recorder_supervisor import _read_rss_kb
+from . import benchmark
+
+
+class _Stream:
+    """One browser holding ``/api/meetings/<id>/events/`` open against the ASGI application"""
+
+    def __init__(self, app, meeting_id):
+        self.app = app
+        self.meeting_id = meeting_id
+        self.opened = asyncio.Event()
+        self.received = {}
+        self.waiting = None
+
+    def expect(self, marker):
+        self.waiting = (marker, asyncio.Event())
+        return self.waiting[1]
+
+    async def run(self):
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': f'/api/meetings/{self.meeting_id}/events/', 'raw_path': b'',
+            'query_string': b'', 'root_path': '', 'headers': [(b'host', b'testserver')],
+            'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+        }
+        request_sent = False
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await asyncio.Future()
+
+        async def send(message):
+            if message['type'] != 'http.response.body':
+                return
+            body = message.get('body', b'')
+            if b'event: status' in body:
+                self.opened.set()
+            if self.waiting and self.waiting[0] in body:
+                self.received[self.waiting[0]] = time.perf_counter()
+                self.waiting[1].set()
+
+        await self.app(scope, receive, send)
+
+
+async def _load(app, meeting_id, subscribers):
+    streams = [_Stream(app, meeting_id) for _ in range(subscribers)]
+    gc.collect()
+    rss_before = _read_rss_kb('self')
+    started = time.perf_counter()
+    tasks = [asyncio.create_task(stream.run()) for stream in streams]
+    await asyncio.gather(*(stream.opened.wait() for stream in streams))
+    open_seconds = time.perf_counter() - started
+    gc.collect()
+    rss_per_stream = (_read_rss_kb('self') - rss_before) / subscribers
+    threads = threading.active_count()
+
+    latencies = []
+    for round_number in range(3):
+        marker = f'"progress": {50 + round_number}'.encode()
+        waits = [stream.expect(marker) for stream in streams]
+        published = time.perf_counter()
+        await sync_to_async(events.publish_status)(meeting_id, 'processing', 'summarizing', 50 + round_number)
+        await asyncio.gather(*(wait.wait() for wait in waits))
+        latencies.append(time.perf_counter() - published)
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return open_seconds, rss_per_stream, threads, min(latencies)
+
+
+@benchmark('status_events')
+@override_settings(ALLOWED_HOSTS=['testserver'], DEBUG=False, EVENTS_HEARTBEAT_SECONDS=60,
+                   EVENTS_STREAM_MAX_SECONDS=600, EVENTS_POLL_SECONDS=0.1)
+def status_events(out, quick):
+    """Idle SSE status subscribers held by one ASGI event loop, and publish-to-delivery fan-out latency"""
+    subscribers = 500 if quick else 5_000
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        meeting_id = Meeting.objects.create(title='Meeting', meeting_type='standup', status='processing').pk
+        django_app = get_asgi_application()
+        scenarios = [
+            ('ASGI app, local', EventStreamApp(django_app), 'local'),
+            ('ASGI app, database', EventStreamApp(django_app), 'database'),
+            ('Django view, local', django_app, 'local'),
+        ]
+        # RSS freed by one scenario is reused by the next, so later scenarios under-report it
+        out.write(f'{subscribers} concurrent streams of one meeting on one event loop')
+        for label, app, backend in scenarios:
+            with override_settings(EVENTS_BACKEND=backend):
+                # Warm up imports, the middleware chain and the poller thread first
+                asyncio.run(_load(app, meeting_id, 20))
+                open_seconds, rss_kb, threads, latency = asyncio.run(_load(app, meeting_id, subscribers))
+            out.write(
+                f'  {label:<19} opened in {open_seconds:5.2f}s ({subscribers / open_seconds:5.0f}/s) | '
+                f'{rss_kb:5.1f} KB RSS per stream | {threads} threads | '
+                f'one event to all in {latency * 1000:6.1f} ms'
+            )
+        out.write(f'  polling GET /api/meetings/<id>/ every 2s instead: {subscribers // 2} requests/s')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
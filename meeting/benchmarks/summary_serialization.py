@@ -0,0 +1,153 @@
+import datetime
+import gc
+import random
+import time
+
+from rest_framework import serializers
+
+from meeting.models import Meeting, MeetingContent
+from meeting.serializers import MeetingSummarySerializer
+from . import benchmark
+
+
+def _summary(rng, i):
+    words = ['budget', 'launch', 'hiring', 'roadmap', 'pricing', 'customer', 'release', 'design']
+
+    def sentence(count):
+        return ' '.join(rng.choice(words) for _ in range(count)).capitalize()
+
+    return {
+        'summary': '. '.join(sentence(12) for _ in range(3)),
+        'key_points': [sentence(10) for _ in range(5)],
+        'decisions': [sentence(8) for _ in range(rng.randint(1, 4))],
+        'action_items': [
+            {'task': sentence(7), 'owner': rng.choice(['Ana', 'Bob', None]), 'due_date': '2024-05-01'}
+            for _ in range(rng.randint(1, 6))
+        ],
+        'agenda': [{'topic': sentence(3), 'description': sentence(9)} for _ in range(3)],
+    }
+
+
+def _meetings(summaries):
+    """Unsaved meetings with their content attached, as the detail view sees them after select_related"""
+    created = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    meetings = []
+    for i, summary_json in enumerate(summaries):
+        meeting = Meeting(id=i + 1, title=f'Meeting {i}', meeting_type='team_meeting', status='completed',
+                          created_at=created, meeting_date=created)
+        meeting.content = MeetingContent(meeting=meeting, transcript='...', summary_json=summary_json)
+        meetings.append(meeting)
+    return meetings
+
+
+class _PerFieldSummarySerializer(serializers.ModelSerializer):
+    """The detail serializer before summaries were parsed once: a method field per section"""
+    meeting_type_display = serializers.CharField(source='get_meeting_type_display', read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    transcript = serializers.CharField(read_only=True, allow_null=True)
+    summary = serializers.SerializerMethodField()
+    key_points = serializers.SerializerMethodField()
+    decisions = serializers.SerializerMethodField()
+    action_items = serializers.SerializerMethodField()
+    agenda = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Meeting
+        fields = [
+            'id', 'title', 'meeting_type', 'meeting_type_display',
+            'description', 'transcript', 'created_at', 'meeting_date',
+            'status', 'status_display', 'summary', 'key_points',
+            'decisions', 'action_items', 'agenda', 'meeting_link'
+        ]
+
+    def _section(self, obj, key, default):
+        return obj.summary_json.get(key, default) if obj.summary_json else default
+
+    def get_summary(self, obj):
+        return self._section(obj, 'summary', '')
+
+    def get_key_points(self, obj):
+        return self._section(obj, 'key_points', [])
+
+    def get_decisions(self, obj):
+        return self._section(obj, 'decisions', [])
+
+    def get_action_items(self, obj):
+        return self._section(obj, 'action_items', [])
+
+    def get_agenda(self, obj):
+        return self._section(obj, 'agenda', [])
+
+
+def _concatenated_report(meeting):
+    """The download_summary body before it used the parsed summary: += per line"""
+    summary_json = meeting.summary_json
+    content = f"MEETING SUMMARY REPORT\n\nMeeting Title: {meeting.title}\n\nSUMMARY:\n{summary_json.get('summary', '')}\n"
+    for point in summary_json.get('key_points', []):
+        content += f"• {point}\n"
+    for decision in summary_json.get('decisions', []):
+        content += f"• {decision}\n"
+    for item in summary_json.get('action_items', []):
+        task = item.get('task', '') if isinstance(item, dict) else item
+        owner = item.get('owner', 'N/A') if isinstance(item, dict) else 'N/A'
+        due_date = item.get('due_date', 'N/A') if isinstance(item, dict) else 'N/A'
+        content += f"• Task: {task}\n  Owner: {owner}\n  Due Date: {due_date}\n\n"
+    for topic in summary_json.get('agenda', []):
+        topic_name = topic.get('topic', '') if isinstance(topic, dict) else topic
+        description = topic.get('description', '') if isinstance(topic, dict) else ''
+        content += f"• {topic_name}\n  {description}\n\n"
+    return content
+
+
+def _joined_report(meeting):
+    summary = meeting.summary_data
+    lines = ['MEETING SUMMARY REPORT', '', f'Meeting Title: {meeting.title}', '', 'SUMMARY:', summary.summary]
+    lines.extend(f'• {point}' for point in summary.key_points)
+    lines.extend(f'• {decision}' for decision in summary.decisions)
+    for item in summary.action_items:
+        lines += [f'• Task: {item.task}', f"  Owner: {item.owner or 'N/A'}", f"  Due Date: {item.due_date or 'N/A'}", '']
+    for topic in summary.agenda:
+        lines += [f'• {topic.topic}', f"  {topic.description or ''}", '']
+    return '\n'.join(lines)
+
+
+def _timed(before, after, raw, stored, repeat, warm=False):
+    """Best of ``repeat`` alternating runs over fresh meetings, optionally after one untimed pass"""
+    best = [None, None]
+    for _ in range(repeat):
+        for i, (func, summaries) in enumerate([(before, raw), (after, stored)]):
+            meetings = _meetings(summaries)
+            if warm:
+                func(meetings)
+            gc.collect()
+            started = time.perf_counter()
+            func(meetings)
+            elapsed = time.perf_counter() - started
+            best[i] = elapsed if best[i] is None else min(best[i], elapsed)
+    return best
+
+
+@benchmark('summary_serialization')
+def summary_serialization(out, quick):
+    """Detail serialization and report rendering with per-field summary lookups versus the cached Summary"""
+    count = 2_000 if quick else 10_000
+    repeat = 3 if quick else 5
+    rng = random.Random(1)
+    summaries = [_summary(rng, i) for i in range(count)]
+    stored = [Meeting(summary_json=summary).summary_json for summary in summaries]
+    out.write(f'{count} meetings, best of {repeat}')
+
+    scenarios = [
+        ('serializer, first render', lambda ms: _PerFieldSummarySerializer(ms, many=True).data,
+         lambda ms: MeetingSummarySerializer(ms, many=True).data, False),
+        ('serializer, re-render', lambda ms: _PerFieldSummarySerializer(ms, many=True).data,
+         lambda ms: MeetingSummarySerializer(ms, many=True).data, True),
+        ('download report', lambda ms: [_concatenated_report(m) for m in ms],
+         lambda ms: [_joined_report(m) for m in ms], False),
+    ]
+    for label, before, after, warm in scenarios:
+        before_s, after_s = _timed(before, after, summaries, stored, repeat, warm)
+        out.write(
+            f'  {label:<25} per-field {count / before_s:9.0f}/s | cached Summary {count / after_s:9.0f}/s '
+            f'({before_s / after_s:.2f}x)'
+        )
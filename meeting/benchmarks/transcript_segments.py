@@ -0,0 +1,132 @@
+import json
+import math
+import os
+import random
+import struct
+import tempfile
+import time
+import wave
+from collections import Counter
+
+from meeting.diarization import EnergyDiarizer
+from meeting.transcript_segments import SegmentTable, TranscriptSegment
+from meeting.transcription import FakeTranscriptionProvider, transcribe_file
+from . import benchmark
+
+RATE = 16000
+WORDS = 'we should ship the release next week and review budget numbers with the team before friday'.split()
+
+
+def _voice_block(frequency, amplitude):
+    """One second of a tone with a syllable-rate envelope, standing in for one speaker's voice"""
+    samples = [
+        int(amplitude * (0.6 + 0.4 * math.sin(2 * math.pi * 4 * i / RATE)) * math.sin(2 * math.pi * frequency * i / RATE))
+        for i in range(RATE)
+    ]
+    return struct.pack(f'<{RATE}h', *samples)
+
+
+def write_conversation(path, seconds, voices, seed=1):
+    """
+    A 16 kHz mono recording of ``voices`` (``(frequency, amplitude)`` each)
+    taking turns of 3-12 seconds with 2 second pauses. Returns the turns as
+    ``(start, end, voice index)``.
+    """
+    rng = random.Random(seed)
+    blocks = [_voice_block(*voice) for voice in voices]
+    silence = bytes(2 * 2 * RATE)
+    turns, position, speaker = [], 0, 0
+    with wave.open(path, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(RATE)
+        while position < seconds:
+            length = min(rng.randint(3, 12), seconds - position)
+            wf.writeframes(blocks[speaker] * length)
+            turns.append((position, position + length, speaker))
+            position += length
+            if position < seconds:
+                pause = min(2, seconds - position)
+                wf.writeframes(silence[:pause * 2 * RATE])
+                position += pause
+            speaker = rng.choice([i for i in range(len(voices)) if i != speaker])
+    return turns
+
+
+def _synthetic_table(hours, seed=1):
+    rng = random.Random(seed)
+    segments, position = [], 0.0
+    while position < hours * 3600:
+        length = rng.uniform(2, 8)
+        text = ' '.join(rng.choice(WORDS) for _ in range(int(length * 2.5)))
+        segments.append(TranscriptSegment(position, position + length, text, f'Speaker {rng.randint(1, 5)}'))
+        position += length + rng.uniform(0, 1)
+    return segments
+
+
+def _timed(func, repeat=1):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - started) / repeat
+
+
+@benchmark('transcript_segments')
+def transcript_segments(out, quick):
+    """Size and lookup speed of columnar transcript segments, and the local diarizer's speed and accuracy"""
+    out.write('Segment storage: columnar SegmentTable bytes vs a JSON list of segment objects')
+    for hours in ((1, 3) if quick else (1, 3, 8)):
+        segments = _synthetic_table(hours)
+        table = SegmentTable(segments)
+        as_json = json.dumps(table.to_json())
+        stored, pack = _timed(table.to_bytes, 5)
+        _, unpack = _timed(lambda: SegmentTable.from_bytes(stored), 5)
+        _, json_load = _timed(lambda: json.loads(as_json), 5)
+
+        rng = random.Random(2)
+        windows = [(start, start + 60) for start in (rng.uniform(0, hours * 3600 - 60) for _ in range(1000))]
+        loaded = SegmentTable.from_bytes(stored)
+        objects = json.loads(as_json)
+        _, bisected = _timed(lambda: [loaded.between(start, end) for start, end in windows])
+        _, scanned = _timed(lambda: [
+            [s for s in objects if s['end'] > start and s['start'] < end] for start, end in windows
+        ])
+        out.write(
+            f'  {hours}h, {len(table)} segments: '
+            f'bytes {len(stored) / 1024:7.1f} KB (pack {pack * 1000:5.1f} ms, load {unpack * 1000:5.1f} ms) | '
+            f'JSON {len(as_json) / 1024:7.1f} KB (load {json_load * 1000:5.1f} ms) | '
+            f'1000 one-minute lookups: bisect {bisected * 1000:6.1f} ms, scan {scanned * 1000:8.1f} ms'
+        )
+
+    seconds = 10 * 60 if quick else 60 * 60
+    voices = [(140, 5000), (230, 9000), (330, 3000)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'conversation.wav')
+        truth = write_conversation(path, seconds, voices)
+        provider = FakeTranscriptionProvider()
+        result, elapsed = _timed(lambda: transcribe_file(path, provider, max_workers=4))
+        diarizer = EnergyDiarizer()
+        _, diarized = _timed(lambda: diarizer.assign(path, result.segments))
+
+    # Score each segment against the voice that spoke most of it, mapping each label to its majority voice
+    spoken = []
+    for segment in result.segments:
+        overlaps = Counter()
+        for start, end, voice in truth:
+            overlaps[voice] += max(0.0, min(end, segment.end) - max(start, segment.start))
+        spoken.append((segment.speaker, overlaps.most_common(1)[0][0], segment.end - segment.start))
+    majority = {}
+    for label in {label for label, _, _ in spoken}:
+        votes = Counter()
+        for speaker, voice, length in spoken:
+            if speaker == label:
+                votes[voice] += length
+        majority[label] = votes.most_common(1)[0][0]
+    correct = sum(length for label, voice, length in spoken if majority[label] == voice)
+    total = sum(length for _, _, length in spoken)
+    out.write(
+        f'Energy diarizer, {seconds // 60} min synthetic conversation of {len(voices)} voices, '
+        f'{len(result.segments)} segments: {diarized / (seconds / 3600):5.2f} s per audio hour '
+        f'(transcription {elapsed:5.1f} s), {len(majority)} speakers found, '
+        f'{correct / total:.1%} of speech attributed correctly'
+    )
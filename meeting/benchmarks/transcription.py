@@ -0,0 +1,44 @@
+import os
+import tempfile
+import time
+
+from django.test import override_settings
+
+from meeting.audio_capture import StreamingWavWriter, SyntheticAudioSource, capture_stream
+from meeting.transcription import FakeTranscriptionProvider, transcribe_file
+from . import benchmark
+
+RATE = 16000
+
+
+def write_synthetic_meeting(path, seconds, pattern=None):
+    """Write a synthetic speech/silence recording to ``path``"""
+    source = SyntheticAudioSource(rate=RATE, pattern=pattern or [(8, 'speech'), (1.5, 'silence')], total_seconds=seconds)
+    with StreamingWavWriter(path, 1, 2, RATE, 4096, drop_when_full=False) as writer:
+        capture_stream(source, writer, 4096, lambda: True)
+    return path
+
+
+@benchmark('transcription_scaling')
+def transcription_scaling(out, quick):
+    """Throughput of chunked transcription as the worker pool grows"""
+    seconds = 10 * 60 if quick else 60 * 60
+    # ~0.5s request overhead plus 1s of provider time per minute of audio
+    provider = FakeTranscriptionProvider(latency=0.5, realtime_factor=1 / 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synthetic_meeting(os.path.join(tmp, 'meeting.wav'), seconds)
+        out.write(f'Fake provider, {seconds / 60:.0f} min recording, 120s segments')
+
+        baseline = None
+        with override_settings(TRANSCRIPTION_SEGMENT_SECONDS=120):
+            for workers in (1, 2, 4, 8):
+                started = time.perf_counter()
+                result = transcribe_file(path, provider, max_workers=workers)
+                elapsed = time.perf_counter() - started
+                baseline = baseline or elapsed
+                out.write(
+                    f'  workers={workers:<2} {elapsed:6.2f}s  '
+                    f'{seconds / 3600 / elapsed * 3600:7.1f} audio-h/h  '
+                    f'speedup {baseline / elapsed:4.1f}x  words={len(result.text.split())}'
+                )
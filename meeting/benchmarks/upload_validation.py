@@ -0,0 +1,150 @@
+import os
+import struct
+import tempfile
+import time
+import wave
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection
+from django.test import override_settings
+
+from meeting import audio_probe
+from . import benchmark
+from .uploads import MB, _json, _request, _Slice
+
+
+def write_wav(path, seconds, rate=16000, channels=1):
+    with wave.open(path, 'wb') as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(b'\0' * (rate * channels * 2 * seconds))
+
+
+def write_mp3(path, seconds, xing=False):
+    """Silent MPEG-1 Layer III frames at 128 kbit/s, 44.1 kHz stereo, optionally behind a Xing header"""
+    frames = int(seconds * 44100 / 1152)
+    header = b'\xff\xfb\x90\x00'
+    with open(path, 'wb') as f:
+        f.write(b'ID3\x03\x00\x00\x00\x00\x00\x0a' + b'\0' * 10)
+        if xing:
+            f.write(header + b'\0' * 32 + b'Xing' + struct.pack('>II', 1, frames) + b'\0' * (417 - 48))
+        for _ in range(frames):
+            f.write(header + b'\0' * 413)
+
+
+def _box(box_type, payload):
+    return struct.pack('>I4s', 8 + len(payload), box_type) + payload
+
+
+def write_m4a(path, seconds, rate=48000, channels=2, media_bytes=MB):
+    entry = _box(b'mp4a', b'\0' * 6 + b'\0\x01' + b'\0' * 8 + struct.pack('>HHHHI', channels, 16, 0, 0, rate << 16))
+    stbl = _box(b'stbl', _box(b'stsd', b'\0' * 4 + struct.pack('>I', 1) + entry))
+    mdia = _box(b'mdia', b''.join([
+        _box(b'mdhd', b'\0' * 12 + struct.pack('>II', rate, rate * seconds) + b'\0' * 4),
+        _box(b'hdlr', b'\0' * 8 + b'soun' + b'\0' * 12),
+        _box(b'minf', stbl),
+    ]))
+    with open(path, 'wb') as f:
+        f.write(_box(b'ftyp', b'M4A \0\0\0\0isomM4A '))
+        f.write(struct.pack('>I4s', 8 + media_bytes, b'mdat') + b'\0' * media_bytes)
+        # Recorders that write the index last put moov after the media data
+        f.write(_box(b'moov', _box(b'trak', mdia)))
+
+
+def _element(element_id, payload):
+    id_bytes = element_id.to_bytes((element_id.bit_length() + 7) // 8, 'big')
+    return id_bytes + (1 << 56 | len(payload)).to_bytes(8, 'big') + payload
+
+
+def write_webm(path, seconds, rate=48000, channels=1):
+    audio = _element(0xB5, struct.pack('>d', rate)) + _element(0x9F, bytes([channels]))
+    track = _element(0xAE, _element(0x83, b'\x02') + _element(0x86, b'A_OPUS') + _element(0xE1, audio))
+    info = _element(0x2AD7B1, (1_000_000).to_bytes(3, 'big')) + _element(0x4489, struct.pack('>d', seconds * 1000.0))
+    with open(path, 'wb') as f:
+        f.write(_element(0x1A45DFA3, _element(0x4282, b'webm')))
+        # Unknown-size segment and cluster, as MediaRecorder writes them
+        f.write(b'\x18\x53\x80\x67\x01\xff\xff\xff\xff\xff\xff\xff')
+        f.write(_element(0x1549A966, info) + _element(0x1654AE6B, track))
+        f.write(b'\x1f\x43\xb6\x75\x01\xff\xff\xff\xff\xff\xff\xff' + b'\0' * MB)
+
+
+def _multipart_body(path, filename, tmp):
+    boundary = 'BoUnDaRy'
+    body = open(os.path.join(tmp, 'body'), 'w+b')
+    body.write(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="title"\r\n\r\nCall\r\n'
+        f'--{boundary}\r\nContent-Disposition: form-data; name="recording_file"; filename="{filename}"\r\n'
+        f'Content-Type: application/octet-stream\r\n\r\n'.encode()
+    )
+    with open(path, 'rb') as f:
+        while data := f.read(MB):
+            body.write(data)
+    body.write(f'\r\n--{boundary}--\r\n'.encode())
+    return body, body.tell(), f'multipart/form-data; boundary={boundary}'
+
+
+@benchmark('upload_validation')
+def upload_validation(out, quick):
+    """How soon mislabeled uploads are rejected, and how long probing recordings takes"""
+    size = 20 * MB if quick else 95 * MB
+    with tempfile.TemporaryDirectory() as tmp, override_settings(
+        ALLOWED_HOSTS=['testserver'], DEBUG=False, MEDIA_ROOT=tmp, UPLOAD_TEMP_DIR=os.path.join(tmp, 'uploads'),
+    ):
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            handler = WSGIHandler()
+            junk = os.path.join(tmp, 'junk.mp3')
+            with open(junk, 'wb') as f:
+                for _ in range(size // MB):
+                    f.write(os.urandom(MB))
+            good = os.path.join(tmp, 'good.wav')
+            write_wav(good, size // 32000)
+            out.write(f'{size // MB} MB uploads through the WSGI handler')
+
+            for label, path, filename, expected in [
+                ('random bytes as .mp3', junk, 'junk.mp3', 400),
+                ('WAV data as .mp3', good, 'call.mp3', 400),
+                ('valid .wav, whole body', good, 'call.wav', 202),
+            ]:
+                body, length, content_type = _multipart_body(path, filename, tmp)
+                body.seek(0)
+                started = time.perf_counter()
+                status, content = _request(handler, 'POST', '/api/meetings/', _Slice(body, 0, length), length, content_type)
+                elapsed = time.perf_counter() - started
+                body.close()
+                assert status == expected, content
+                out.write(f'  multipart, {label:<24} {status} after {elapsed * 1000:8.1f} ms')
+
+            status, content = _json(handler, 'POST', '/api/uploads/', {'filename': 'junk.mp3', 'size': size, 'title': 'x'})
+            upload_id = content.decode().split('"id":"')[1].split('"')[0]
+            with open(junk, 'rb') as f:
+                started = time.perf_counter()
+                status, _ = _request(handler, 'PUT', f'/api/uploads/{upload_id}/', _Slice(f, 0, 8 * MB), 8 * MB,
+                                     'application/octet-stream', {'HTTP_UPLOAD_OFFSET': '0'})
+                elapsed = time.perf_counter() - started
+            assert status == 415, status
+            out.write(f'  resumable, {"random bytes as .mp3":<24} {status} after {elapsed * 1000:8.1f} ms (first 8 MB chunk)')
+
+            hour = 3600
+            samples = [
+                ('wav', write_wav),
+                ('mp3 (CBR)', write_mp3),
+                ('mp3 (Xing)', lambda path, seconds: write_mp3(path, seconds, xing=True)),
+                ('m4a', write_m4a),
+                ('webm', write_webm),
+            ]
+            for label, writer in samples:
+                path = os.path.join(tmp, f'probe_{label.split()[0]}')
+                writer(path, hour)
+                repeat = 200
+                started = time.perf_counter()
+                for _ in range(repeat):
+                    info = audio_probe.probe(path)
+                elapsed = (time.perf_counter() - started) / repeat
+                out.write(
+                    f'  probe {label:<11} {os.path.getsize(path) / MB:6.0f} MB  {elapsed * 1000:6.2f} ms  '
+                    f'{info.codec} {info.sample_rate} Hz x{info.channels}, {info.duration:.1f}s'
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
@@ -0,0 +1,148 @@
+import hashlib
+import io
+import json
+import os
+import tempfile
+import time
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection, connections
+from django.test import override_settings
+
+from . import benchmark, peak_rss_mb, run_isolated
+
+MB = 1024 * 1024
+ID3_TAG = b'ID3\x03\x00\x00\x00\x00\x00\x0a' + b'\0' * 10
+# A megabyte of silent MPEG-1 Layer III frames at 128 kbit/s, 44.1 kHz
+MP3_FRAMES = (b'\xff\xfb\x90\x00' + b'\0' * 413) * (MB // 417)
+
+
+class _Slice:
+    """``length`` bytes of ``f`` from ``offset``, read the way a WSGI server hands over a request body"""
+
+    def __init__(self, f, offset, length):
+        f.seek(offset)
+        self.f, self.remaining = f, length
+
+    def read(self, size=-1):
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.f.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def readline(self, size=-1):
+        data = self.f.readline(self.remaining if size is None or size < 0 else min(size, self.remaining))
+        self.remaining -= len(data)
+        return data
+
+
+def _request(handler, method, path, body=None, length=0, content_type='', headers=None):
+    environ = {
+        'REQUEST_METHOD': method, 'PATH_INFO': path, 'SCRIPT_NAME': '', 'QUERY_STRING': '',
+        'SERVER_NAME': 'testserver', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+        'wsgi.url_scheme': 'http', 'wsgi.input': body or io.BytesIO(), 'wsgi.errors': None,
+        'CONTENT_LENGTH': str(length), 'CONTENT_TYPE': content_type,
+    }
+    environ.update(headers or {})
+    status = []
+    response = handler(environ, lambda s, h, exc_info=None: status.append(s))
+    content = b''.join(response)
+    response.close()
+    return int(status[0].split()[0]), content
+
+
+def _json(handler, method, path, data):
+    body = json.dumps(data).encode()
+    f = tempfile.TemporaryFile()
+    f.write(body)
+    return _request(handler, method, path, _Slice(f, 0, len(body)), len(body), 'application/json')
+
+
+def _multipart(source, size):
+    """``POST /api/meetings/`` with the whole file in one multipart request: ``(seconds, peak RSS MB)``"""
+    connections.close_all()
+    handler = WSGIHandler()
+    boundary = 'BoUnDaRy'
+    head = (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="title"\r\n\r\nBig meeting\r\n'
+        f'--{boundary}\r\nContent-Disposition: form-data; name="recording_file"; filename="call.mp3"\r\n'
+        f'Content-Type: audio/mpeg\r\n\r\n'
+    ).encode()
+    tail = f'\r\n--{boundary}--\r\n'.encode()
+    with tempfile.TemporaryFile() as body, open(source, 'rb') as f:
+        body.write(head)
+        while data := f.read(MB):
+            body.write(data)
+        body.write(tail)
+        length = body.tell()
+        baseline = peak_rss_mb()
+        started = time.perf_counter()
+        status, content = _request(handler, 'POST', '/api/meetings/', _Slice(body, 0, length), length,
+                                   f'multipart/form-data; boundary={boundary}')
+    assert status == 202, content
+    return time.perf_counter() - started, peak_rss_mb() - baseline
+
+
+def _resumable(source, size, chunk, checksum):
+    """The same file through ``/api/uploads/`` in ``chunk``-byte PUTs: ``(seconds, peak RSS MB)``"""
+    connections.close_all()
+    handler = WSGIHandler()
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    status, content = _json(handler, 'POST', '/api/uploads/', {'filename': 'call.mp3', 'size': size, 'title': 'Big'})
+    assert status == 201, content
+    upload_id = json.loads(content)['id']
+    with open(source, 'rb') as f:
+        for offset in range(0, size, chunk):
+            length = min(chunk, size - offset)
+            headers = {'HTTP_UPLOAD_OFFSET': str(offset)}
+            if checksum:
+                # Computed by the client; kept out of the timing below
+                hashed_at = time.perf_counter()
+                hasher, piece = hashlib.sha256(), _Slice(f, offset, length)
+                while data := piece.read(MB):
+                    hasher.update(data)
+                headers['HTTP_UPLOAD_CHECKSUM'] = f'sha256 {hasher.hexdigest()}'
+                started += time.perf_counter() - hashed_at
+            status, content = _request(handler, 'PUT', f'/api/uploads/{upload_id}/', _Slice(f, offset, length),
+                                       length, 'application/octet-stream', headers)
+            assert status == 200, content
+    status, content = _request(handler, 'POST', f'/api/uploads/{upload_id}/finalize/')
+    assert status == 202, content
+    return time.perf_counter() - started, peak_rss_mb() - baseline
+
+
+@benchmark('uploads')
+def uploads(out, quick):
+    """Throughput and peak memory of one-shot multipart uploads versus resumable chunked uploads"""
+    size = 128 * MB if quick else 1024 * MB
+    with tempfile.TemporaryDirectory() as tmp, override_settings(
+        ALLOWED_HOSTS=['testserver'], DEBUG=False, MEDIA_ROOT=tmp, UPLOAD_TEMP_DIR=os.path.join(tmp, 'uploads'),
+    ):
+        # A file database, so each scenario can run in a fresh process with its own peak RSS
+        connection.settings_dict['TEST']['NAME'] = os.path.join(tmp, 'db.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            source = os.path.join(tmp, 'source.mp3')
+            with open(source, 'wb') as f:
+                # Silent MP3 frames, so the recording passes the content checks
+                f.write(ID3_TAG)
+                while f.tell() < size:
+                    f.write(MP3_FRAMES)
+                f.truncate(size)
+            out.write(f'{size // MB} MB recording, WSGI handler reading the body from disk')
+
+            multipart_size = min(size, 100 * MB)
+            with open(source, 'rb') as f, open(os.path.join(tmp, 'small.mp3'), 'wb') as small:
+                small.write(f.read(multipart_size))
+            seconds, rss = run_isolated(_multipart, os.path.join(tmp, 'small.mp3'), multipart_size)
+            out.write(
+                f'  {"multipart, one request":<32} {multipart_size // MB:5d} MB '
+                f'{multipart_size / MB / seconds:7.0f} MB/s | peak RSS +{rss:5.1f} MB (the limit; larger files are refused)'
+            )
+            for chunk, checksum in [(8 * MB, False), (8 * MB, True), (32 * MB, True)]:
+                seconds, rss = run_isolated(_resumable, source, size, chunk, checksum)
+                label = f'resumable, {chunk // MB} MB chunks' + (', sha256' if checksum else '')
+                out.write(f'  {label:<32} {size // MB:5d} MB {size / MB / seconds:7.0f} MB/s | peak RSS +{rss:5.1f} MB')
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
@@ -0,0 +1,84 @@
+import os
+import tempfile
+import time
+
+from django.test import override_settings
+
+from meeting import voice_activity
+from meeting.audio_capture import StreamingWavWriter, SyntheticAudioSource, capture_stream
+from meeting.transcription import FakeTranscriptionProvider, transcribe_file
+from . import benchmark
+
+MB = 1024 * 1024
+
+
+def _meeting_pattern(seconds):
+    """
+    Waiting on hold for people to join, discussion with short pauses broken by
+    longer silences (someone sharing their screen, thinking), a break halfway
+    and the bot left in the call at the end
+    """
+    discussion = [(8, 'speech'), (1.5, 'silence')] * 6 + [(6, 'speech'), (20, 'silence')]
+    half = (seconds - 5 * 60 - 10 * 60 - 5 * 60) / 2
+    cycles = int(half / sum(length for length, _ in discussion))
+    return (
+        [(5 * 60, 'silence')] + discussion * cycles + [(10 * 60, 'silence')] + discussion * cycles
+        + [(seconds, 'silence')]
+    )
+
+
+def _write(path, seconds):
+    source = SyntheticAudioSource(rate=16000, pattern=_meeting_pattern(seconds), total_seconds=seconds)
+    with StreamingWavWriter(path, 1, 2, 16000, 4096, drop_when_full=False) as writer:
+        capture_stream(source, writer, 4096, lambda: True)
+    return source
+
+
+def _aligned(segments, source):
+    """Share of segments whose restored start and end fall within a second of speech in the recording"""
+    def near_speech(seconds):
+        return any(
+            source.kind_at(int(max(0.0, seconds + delta) * source.rate)) == 'speech' for delta in (-1.0, 0.0, 1.0)
+        )
+    return sum(1 for s in segments if near_speech(s.start) and near_speech(s.end - 0.01)) / max(1, len(segments))
+
+
+@benchmark('voice_activity')
+def voice_activity_benchmark(out, quick):
+    """Audio sent for transcription with and without cutting out pauses, and the cost of finding them"""
+    seconds = 30 * 60 if quick else 60 * 60
+    hours = seconds / 3600
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'meeting.wav')
+        source = _write(path, seconds)
+        out.write(
+            f'{seconds / 60:.0f} min 16 kHz mono recording: 5 min on hold, discussion with 1.5s and 20s pauses, '
+            f'a 10 min break and the bot left in the call; fake provider with 0.5s overhead and 1s per audio minute '
+            f'per request, 4 workers, WAV'
+        )
+
+        for label, min_silence in (('trim both ends only', 0), ('cut pauses over 2s', 2.0), ('cut pauses over 1s', 1.0)):
+            provider = FakeTranscriptionProvider(latency=0.5, realtime_factor=1 / 60)
+            with override_settings(AUDIO_VAD_MIN_SILENCE_SECONDS=min_silence, AUDIO_NORMALIZE_CODEC='wav',
+                                   TRANSCRIPTION_SEGMENT_SECONDS=120):
+                started = time.perf_counter()
+                result = transcribe_file(path, provider, max_workers=4)
+                elapsed = time.perf_counter() - started
+            out.write(
+                f'  {label:<22} removed {result.removed_fraction:5.1%} | sent {provider.bytes_sent / MB / hours:6.1f} '
+                f'MB/audio-h | {elapsed / hours:5.1f} s/audio-h | {len(result.segments)} segments, '
+                f'{len(result.text.split())} words | {_aligned(result.segments, source):.0%} of segments '
+                f'on speech in the recording'
+            )
+
+        # Finding the speech and writing the shortened copy
+        started = time.process_time()
+        speech = voice_activity.detect(path, min_silence_seconds=2.0)
+        detected = time.process_time()
+        voice_activity.compact(path, speech, os.path.join(tmp, 'speech.wav'))
+        compacted = time.process_time()
+        backend = 'NumPy' if voice_activity.numpy is not None else 'pure Python'
+        out.write(
+            f'  detection ({backend}): {hours / (detected - started):.0f} audio-hours per CPU second; '
+            f'with the shortened copy written: {hours / (compacted - started):.0f} audio-hours per CPU second'
+        )
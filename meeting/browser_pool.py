@@ -0,0 +1,301 @@
+"""
+Browser Pool
+Keeps browsers warm for the Google Meet recorder. Starting Chrome and
+chromedriver for every meeting costs seconds before the bot can join and a
+burst of memory; instead the recorder supervisor keeps
+``RECORDER_BROWSER_POOL_SIZE`` browser sessions open and leases an idle one
+to each recorder process it starts. The recorder attaches to the leased
+session, leaves the call when it is done, and the supervisor takes the
+browser back once the process exits. Browsers are checked before they are
+leased and replaced after ``RECORDER_BROWSER_MAX_MEETINGS`` meetings or
+when they grow past ``RECORDER_BROWSER_MAX_RSS_MB``.
+"""
+
+import itertools
+import json
+import logging
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Wait this long after a browser fails to start before trying again
+LAUNCH_RETRY_SECONDS = 60
+BLANK_PAGE = 'about:blank'
+
+
+@dataclass
+class BrowserLease:
+    """A browser session lent to a recorder process by ``owner_pid``"""
+
+    executor_url: str
+    session_id: str
+    owner_pid: int
+
+    def to_json(self):
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, value):
+        return cls(**json.loads(value))
+
+
+def chrome_options():
+    from selenium import webdriver
+
+    options = webdriver.ChromeOptions()
+    options.add_argument('--use-fake-ui-for-media-stream')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    return options
+
+
+class ChromeBrowser:
+    """Chrome driven by Selenium"""
+
+    name = 'chrome'
+
+    def launch(self):
+        from selenium import webdriver
+
+        return webdriver.Chrome(options=chrome_options())
+
+    def lease(self, driver):
+        executor = driver.command_executor
+        config = getattr(executor, '_client_config', None)
+        url = config.remote_server_addr if config else executor._url
+        return BrowserLease(url, driver.session_id, os.getpid())
+
+    def attach(self, lease):
+        """A driver for the running session of ``lease``, without starting a new one"""
+        from selenium import webdriver
+
+        class AttachedDriver(webdriver.Remote):
+            def start_session(self, capabilities, *args, **kwargs):
+                self.session_id = lease.session_id
+                self.caps = {}
+
+        return AttachedDriver(command_executor=lease.executor_url, options=chrome_options())
+
+    def rss_kb(self, driver):
+        """Memory of chromedriver and every Chrome process under it"""
+        service = getattr(driver, 'service', None)
+        process = getattr(service, 'process', None)
+        return _tree_rss_kb(process.pid) if process else 0
+
+
+def _tree_rss_kb(pid):
+    from .recorder_supervisor import _read_rss_kb
+
+    total, pending = 0, [pid]
+    while pending:
+        pid = pending.pop()
+        total += _read_rss_kb(pid)
+        try:
+            with open(f'/proc/{pid}/task/{pid}/children') as f:
+                pending.extend(int(child) for child in f.read().split())
+        except (OSError, ValueError):
+            pass
+    return total
+
+
+class FakeDriver:
+    """What ``FakeBrowser`` hands out: a page that loads after a delay and grows with every meeting"""
+
+    def __init__(self, browser, session_id):
+        self.browser = browser
+        self.session_id = session_id
+        self.current_url = BLANK_PAGE
+        self.alive = True
+
+    def get(self, url):
+        if not self.alive:
+            raise RuntimeError('Browser session is gone')
+        time.sleep(self.browser.page_load_seconds)
+        self.current_url = url
+        if url != BLANK_PAGE:
+            self.browser.rss_kb_by_session[self.session_id] += self.browser.rss_mb_per_meeting * 1024
+
+    def execute_script(self, script, *args):
+        if not self.alive:
+            raise RuntimeError('Browser session is gone')
+        return 1
+
+    def quit(self):
+        self.alive = False
+        self.browser.rss_kb_by_session.pop(self.session_id, None)
+
+
+class FakeBrowser:
+    """
+    Offline stand-in for Chrome, for tests and benchmarks. ``launch_seconds``
+    simulates the cold start, ``page_load_seconds`` joining a meeting, and
+    each meeting leaves ``rss_mb_per_meeting`` more memory behind.
+    """
+
+    name = 'fake'
+
+    def __init__(self, launch_seconds=2.0, page_load_seconds=0.3, rss_mb=150, rss_mb_per_meeting=40):
+        self.launch_seconds = launch_seconds
+        self.page_load_seconds = page_load_seconds
+        self.rss_mb = rss_mb
+        self.rss_mb_per_meeting = rss_mb_per_meeting
+        self.launches = 0
+        self.rss_kb_by_session = {}
+        self._ids = itertools.count(1)
+
+    def launch(self):
+        time.sleep(self.launch_seconds)
+        self.launches += 1
+        session_id = f'fake-{os.getpid()}-{next(self._ids)}'
+        self.rss_kb_by_session[session_id] = self.rss_mb * 1024
+        return FakeDriver(self, session_id)
+
+    def lease(self, driver):
+        return BrowserLease('fake://', driver.session_id, os.getpid())
+
+    def attach(self, lease):
+        self.rss_kb_by_session.setdefault(lease.session_id, self.rss_mb * 1024)
+        return FakeDriver(self, lease.session_id)
+
+    def rss_kb(self, driver):
+        return self.rss_kb_by_session.get(driver.session_id, 0)
+
+
+BROWSERS = {
+    'chrome': ChromeBrowser,
+    'fake': FakeBrowser,
+}
+
+
+def get_browser(name=None):
+    name = name or getattr(settings, 'RECORDER_BROWSER', 'chrome')
+    try:
+        return BROWSERS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown recorder browser: {name}")
+
+
+@contextmanager
+def open_browser(lease=None, browser=None):
+    """
+    A driver for one meeting: the leased session when ``lease`` is given,
+    otherwise a newly started browser that is closed afterwards. A leased
+    browser leaves the call and goes back to the pool instead; if it no
+    longer responds, or its pool is gone, it is closed.
+    """
+    browser = browser or get_browser()
+    if lease is None:
+        driver = browser.launch()
+        try:
+            yield driver
+        finally:
+            driver.quit()
+        return
+
+    driver = browser.attach(lease)
+    try:
+        yield driver
+    finally:
+        try:
+            if lease.owner_pid not in (os.getppid(), os.getpid()):
+                raise RuntimeError('the supervisor that lent it has exited')
+            driver.get(BLANK_PAGE)
+        except Exception as e:
+            logger.warning(f"Closing leased browser {lease.session_id}: {e}")
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+
+class _Pooled:
+    def __init__(self, driver, lease):
+        self.driver = driver
+        self.lease = lease
+        self.meetings = 0
+
+
+class BrowserPool:
+    """
+    Up to ``size`` browsers, idle or lent out, kept by the recorder
+    supervisor. ``fill()`` starts missing ones, ``lease(key)`` lends an idle
+    one out (None when none is ready, and the recorder starts its own), and
+    ``release(key)`` takes it back once the recorder is done, recycling it
+    when it is worn out or unhealthy.
+    """
+
+    def __init__(self, size=None, max_meetings=None, max_rss_mb=None, browser=None):
+        self.size = size if size is not None else getattr(settings, 'RECORDER_BROWSER_POOL_SIZE', 0)
+        self.max_meetings = max_meetings or getattr(settings, 'RECORDER_BROWSER_MAX_MEETINGS', 20)
+        self.max_rss_mb = max_rss_mb or getattr(settings, 'RECORDER_BROWSER_MAX_RSS_MB', 1024)
+        self.browser = browser or get_browser()
+        self.idle = deque()
+        self.leased = {}
+        self._retry_at = 0.0
+
+    def fill(self, limit=1):
+        """Start up to ``limit`` browsers while the pool has fewer than ``size``; returns how many started"""
+        started = 0
+        while len(self.idle) + len(self.leased) < self.size and started < limit and time.monotonic() >= self._retry_at:
+            try:
+                driver = self.browser.launch()
+            except Exception as e:
+                logger.warning(f"Could not start a browser for the pool: {e}")
+                self._retry_at = time.monotonic() + LAUNCH_RETRY_SECONDS
+                break
+            self.idle.append(_Pooled(driver, self.browser.lease(driver)))
+            started += 1
+        return started
+
+    def lease(self, key):
+        """A ``BrowserLease`` of a healthy idle browser for ``key``, or None"""
+        while self.idle:
+            pooled = self.idle.popleft()
+            if self._healthy(pooled):
+                self.leased[key] = pooled
+                return pooled.lease
+            self._close(pooled, 'not responding')
+        return None
+
+    def release(self, key, reusable=True):
+        """Take back the browser leased to ``key``; ``reusable`` is False when the recorder failed"""
+        pooled = self.leased.pop(key, None)
+        if pooled is None:
+            return
+        pooled.meetings += 1
+        rss_mb = self.browser.rss_kb(pooled.driver) / 1024
+        if not reusable:
+            self._close(pooled, 'its recorder failed')
+        elif pooled.meetings >= self.max_meetings:
+            self._close(pooled, f'used for {pooled.meetings} meetings')
+        elif rss_mb > self.max_rss_mb:
+            self._close(pooled, f'using {rss_mb:.0f} MB')
+        elif not self._healthy(pooled):
+            self._close(pooled, 'not responding')
+        else:
+            self.idle.append(pooled)
+
+    def close(self):
+        """Close the idle browsers; leased ones close themselves when their recorder sees the pool is gone"""
+        while self.idle:
+            self._close(self.idle.popleft(), 'pool closed')
+
+    def _healthy(self, pooled):
+        try:
+            pooled.driver.execute_script('return 1')
+            return True
+        except Exception:
+            return False
+
+    def _close(self, pooled, reason):
+        logger.info(f"Closing pooled browser {pooled.lease.session_id}: {reason}")
+        try:
+            pooled.driver.quit()
+        except Exception:
+            pass
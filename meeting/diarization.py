@@ -0,0 +1,222 @@
+"""
+Speaker Diarization
+Labels transcript segments with who spoke them. ``DIARIZATION_BACKEND``
+picks the diarizer: ``pyannote`` runs pyannote.audio's pretrained pipeline
+when it is installed, ``energy`` (the default) clusters segments locally by
+loudness and pitch, and ``none`` leaves segments unlabelled. Diarizers
+read a mono 16-bit WAV: the one ``audio_normalize`` produced, or the
+recording itself for meetings transcribed live.
+"""
+
+import itertools
+import logging
+import math
+import wave
+from array import array
+
+from django.conf import settings
+
+from .audio_normalize import audioop
+
+logger = logging.getLogger(__name__)
+
+
+def speaker_label(number):
+    return f"Speaker {number}"
+
+
+class Diarizer:
+    """
+    Sets ``speaker`` on each of ``segments``. Segment times are in the
+    original recording; ``offset`` is where ``wav_path`` starts in it.
+    """
+
+    name = None
+
+    def assign(self, wav_path, segments, offset=0.0):
+        raise NotImplementedError
+
+
+class NoDiarizer(Diarizer):
+    name = 'none'
+
+    def assign(self, wav_path, segments, offset=0.0):
+        pass
+
+
+class EnergyDiarizer(Diarizer):
+    """
+    Local fallback needing no model. Each segment is described by its
+    loudness and zero-crossing rate (a rough pitch and timbre measure) over
+    up to ``windows`` short windows of speech. Segments join the nearest
+    speaker whose average is within ``threshold`` standard deviations,
+    otherwise start a new speaker, up to ``max_speakers``. Speakers with
+    less than ``min_share`` of the speech are folded into their nearest
+    neighbour. Good enough to tell voices apart in a small meeting; not
+    a replacement for a trained model.
+    """
+
+    name = 'energy'
+    window_seconds = 0.05
+    windows = 24
+    # Smallest spread each feature is scaled by: about 30% in loudness and 25
+    # crossings a second, so one steady voice is not split over noise
+    min_spread = (0.25, 25.0)
+
+    def __init__(self, max_speakers=None, threshold=1.2, min_share=0.03, silence_level=None):
+        self.max_speakers = max_speakers or getattr(settings, 'DIARIZATION_MAX_SPEAKERS', 6)
+        self.threshold = threshold
+        self.min_share = min_share
+        self.silence_level = silence_level or getattr(settings, 'AUDIO_SILENCE_LEVEL', 100) or 100
+
+    def assign(self, wav_path, segments, offset=0.0):
+        features = self._features(wav_path, segments, offset)
+        voiced = [i for i, feature in enumerate(features) if feature is not None]
+        if not voiced:
+            return
+        scaled = self._standardize([features[i] for i in voiced])
+        weights = [segments[i].end - segments[i].start for i in voiced]
+        labels = self._cluster(scaled, weights)
+
+        # Number speakers in order of first appearance
+        numbers = {}
+        for i, label in zip(voiced, labels):
+            segments[i].speaker = speaker_label(numbers.setdefault(label, len(numbers) + 1))
+        # Segments too quiet to measure belong to whoever spoke before them
+        previous = segments[voiced[0]].speaker
+        for segment in segments:
+            if segment.speaker:
+                previous = segment.speaker
+            else:
+                segment.speaker = previous
+
+    def _features(self, wav_path, segments, offset):
+        features = []
+        with wave.open(wav_path, 'rb') as wf:
+            rate, total = wf.getframerate(), wf.getnframes()
+            window = int(self.window_seconds * rate)
+            for segment in segments:
+                first = max(0, int((segment.start - offset) * rate))
+                last = min(total, int((segment.end - offset) * rate)) - window
+                if last <= first:
+                    features.append(None)
+                    continue
+                count = min(self.windows, (last - first) // window + 1)
+                step = (last - first) / max(1, count - 1)
+                levels, crossings = [], []
+                for n in range(count):
+                    wf.setpos(first + int(n * step))
+                    level, crossing = _measure(wf.readframes(window))
+                    if level > self.silence_level:
+                        levels.append(math.log(level))
+                        crossings.append(crossing * rate / window)
+                features.append(
+                    (sum(levels) / len(levels), sum(crossings) / len(crossings)) if levels else None
+                )
+        return features
+
+    def _standardize(self, features):
+        columns = list(zip(*features))
+        scales = []
+        for column, min_spread in zip(columns, self.min_spread):
+            mean = sum(column) / len(column)
+            spread = math.sqrt(sum((value - mean) ** 2 for value in column) / len(column))
+            scales.append((mean, max(spread, min_spread)))
+        return [tuple((value - mean) / spread for value, (mean, spread) in zip(feature, scales)) for feature in features]
+
+    def _cluster(self, features, weights):
+        centroids, totals, labels = [], [], []
+        for feature, weight in zip(features, weights):
+            nearest, distance = _nearest(feature, centroids)
+            if nearest is None or (distance > self.threshold and len(centroids) < self.max_speakers):
+                centroids.append(list(feature))
+                totals.append(0.0)
+                nearest = len(centroids) - 1
+            # Running weighted mean, so longer segments shape the speaker more
+            totals[nearest] += weight
+            share = weight / totals[nearest] if totals[nearest] else 1.0
+            centroids[nearest] = [c + (f - c) * share for c, f in zip(centroids[nearest], feature)]
+            labels.append(nearest)
+
+        speech = sum(totals) or 1.0
+        kept = [i for i, total in enumerate(totals) if total / speech >= self.min_share] or [totals.index(max(totals))]
+        remap = {}
+        for i in range(len(centroids)):
+            remap[i] = i if i in kept else _nearest(centroids[i], [centroids[k] for k in kept], kept)[0]
+        return [remap[label] for label in labels]
+
+
+def _nearest(feature, centroids, keys=None):
+    best, best_distance = None, None
+    for i, centroid in enumerate(centroids):
+        distance = math.dist(feature, centroid)
+        if best_distance is None or distance < best_distance:
+            best, best_distance = (keys[i] if keys else i), distance
+    return best, best_distance
+
+
+def _measure(frames):
+    """RMS level and zero crossings of a block of 16-bit mono PCM"""
+    if audioop is not None:
+        return audioop.rms(frames, 2), audioop.cross(frames, 2)
+    samples = array('h', frames[:len(frames) - len(frames) % 2])
+    if not samples:
+        return 0, 0
+    level = math.sqrt(sum(s * s for s in samples) / len(samples))
+    crossings = sum(1 for a, b in zip(samples, samples[1:]) if (a < 0) != (b < 0))
+    return level, crossings
+
+
+class PyannoteDiarizer(Diarizer):
+    """pyannote.audio's pretrained pipeline (``DIARIZATION_MODEL``); each segment takes the speaker it overlaps most"""
+
+    name = 'pyannote'
+
+    def __init__(self):
+        from pyannote.audio import Pipeline
+
+        self.pipeline = Pipeline.from_pretrained(
+            getattr(settings, 'DIARIZATION_MODEL', 'pyannote/speaker-diarization-3.1'),
+            use_auth_token=getattr(settings, 'HUGGINGFACE_API_KEY', None) or None,
+        )
+
+    def assign(self, wav_path, segments, offset=0.0):
+        turns = sorted(
+            (turn.start + offset, turn.end + offset, label)
+            for turn, _, label in self.pipeline(wav_path).itertracks(yield_label=True)
+        )
+        numbers = {}
+        first = 0
+        for segment in segments:
+            # Both lists are in time order, so turns that ended earlier are never needed again
+            while first < len(turns) and turns[first][1] <= segment.start:
+                first += 1
+            overlaps = {}
+            for start, end, label in itertools.islice(turns, first, None):
+                if start >= segment.end:
+                    break
+                overlap = min(end, segment.end) - max(start, segment.start)
+                if overlap > 0:
+                    overlaps[label] = overlaps.get(label, 0) + overlap
+            if overlaps:
+                label = max(overlaps, key=overlaps.get)
+                segment.speaker = speaker_label(numbers.setdefault(label, len(numbers) + 1))
+
+
+DIARIZERS = {
+    'none': NoDiarizer,
+    'energy': EnergyDiarizer,
+    'pyannote': PyannoteDiarizer,
+}
+
+
+def get_diarizer(name=None):
+    """The configured diarizer; falls back to ``energy`` when pyannote is not installed"""
+    name = name or getattr(settings, 'DIARIZATION_BACKEND', 'energy')
+    try:
+        return DIARIZERS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown diarization backend: {name}")
+    except ImportError:
+        logger.warning(f"Diarization backend {name!r} is not installed; using 'energy'")
+        return EnergyDiarizer()
@@ -0,0 +1,133 @@
+"""
+Event Stream
+Server-sent status event streams. ``EventStreamApp`` wraps the ASGI
+application in ``meeting_bot/asgi.py`` and answers ``/api/events/`` and
+``/api/meetings/<id>/events/`` itself: an open stream is one coroutine
+waiting on a queue, with no Django request, middleware chain or per-request
+thread held for its lifetime. Other servers reach the same streams through
+``views.meeting_events``.
+"""
+
+import asyncio
+import json
+import re
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from . import events
+
+EVENTS_PATH = re.compile(r'^/api/(?:meetings/(?P<meeting_id>\d+)/)?events/$')
+HEADERS = [
+    (b'content-type', b'text/event-stream'),
+    (b'cache-control', b'no-cache'),
+    (b'x-accel-buffering', b'no'),
+]
+
+
+def format_event(event):
+    chunk = f"event: status\ndata: {json.dumps(event)}\n\n"
+    return f"id: {event['id']}\n{chunk}" if event.get('id') else chunk
+
+
+def _stream_settings():
+    return (
+        getattr(settings, 'EVENTS_HEARTBEAT_SECONDS', 15),
+        getattr(settings, 'EVENTS_STREAM_MAX_SECONDS', 300),
+    )
+
+
+async def async_stream(meeting_id):
+    """The stream of ``meeting_id`` (every meeting when None) for a coroutine on the running loop"""
+    # Subscribe before reading the snapshot so no transition falls between them
+    subscription = events.subscribe(meeting_id)
+    heartbeat, lifetime = _stream_settings()
+    try:
+        yield 'retry: 3000\n\n'
+        snapshot = await sync_to_async(events.snapshot)(meeting_id) if meeting_id is not None else None
+        if snapshot:
+            yield format_event(snapshot)
+        deadline = time.monotonic() + lifetime
+        while (remaining := deadline - time.monotonic()) > 0:
+            event = await subscription.get(min(heartbeat, remaining))
+            if event is None:
+                yield ': keepalive\n\n'
+            elif not events.is_stale(event, snapshot):
+                yield format_event(event)
+    finally:
+        subscription.close()
+
+
+def sync_stream(meeting_id):
+    """The same stream for a WSGI worker thread, which it occupies while open"""
+    subscription = events.subscribe(meeting_id, asynchronous=False)
+    heartbeat, lifetime = _stream_settings()
+    try:
+        yield 'retry: 3000\n\n'
+        snapshot = events.snapshot(meeting_id) if meeting_id is not None else None
+        if snapshot:
+            yield format_event(snapshot)
+        deadline = time.monotonic() + lifetime
+        while (remaining := deadline - time.monotonic()) > 0:
+            event = subscription.get(min(heartbeat, remaining))
+            if event is None:
+                yield ': keepalive\n\n'
+            elif not events.is_stale(event, snapshot):
+                yield format_event(event)
+    finally:
+        subscription.close()
+
+
+def _meeting_exists(meeting_id):
+    from .models import Meeting
+
+    return Meeting.objects.filter(pk=meeting_id).exists()
+
+
+class EventStreamApp:
+    """ASGI middleware serving status event streams and passing everything else to ``app``"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        match = EVENTS_PATH.match(scope.get('path', '')) if scope['type'] == 'http' else None
+        if match is None:
+            return await self.app(scope, receive, send)
+        if scope['method'] != 'GET':
+            return await self._plain(send, 405, b'Method not allowed', [(b'allow', b'GET')])
+
+        meeting_id = match['meeting_id']
+        meeting_id = int(meeting_id) if meeting_id is not None else None
+        if meeting_id is not None and not await sync_to_async(_meeting_exists)(meeting_id):
+            return await self._plain(send, 404, b'Not found')
+
+        # End the stream as soon as the client goes away instead of at its next write
+        stream = asyncio.ensure_future(self._stream(meeting_id, send))
+        disconnected = asyncio.ensure_future(self._wait_for_disconnect(receive))
+        try:
+            await asyncio.wait([stream, disconnected], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in (stream, disconnected):
+                task.cancel()
+            await asyncio.gather(stream, disconnected, return_exceptions=True)
+
+    async def _stream(self, meeting_id, send):
+        await send({'type': 'http.response.start', 'status': 200, 'headers': HEADERS})
+        generator = async_stream(meeting_id)
+        try:
+            async for chunk in generator:
+                await send({'type': 'http.response.body', 'body': chunk.encode(), 'more_body': True})
+        finally:
+            await generator.aclose()
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def _wait_for_disconnect(self, receive):
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    async def _plain(self, send, status, body, headers=()):
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': [(b'content-type', b'text/plain'), *headers]})
+        await send({'type': 'http.response.body', 'body': body})
@@ -0,0 +1,301 @@
+"""
+Status Events
+Pushes meeting status transitions and progress to subscribers, so browsers
+wait on ``/api/meetings/<id>/events/`` instead of re-fetching the meeting.
+Events fan out through an in-process broker. With ``EVENTS_BACKEND``
+'database' (the default) they are written to ``StatusEvent`` rows that every
+process with subscribers polls, so transitions made by job workers and the
+recorder supervisor reach the web processes; 'local' keeps them in-process.
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import StatusEvent
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ('completed', 'failed')
+# Overall progress when each stage starts; recording fills 0-40 as it runs
+STAGE_PROGRESS = {
+    'queued': 0,
+    'recording': 0,
+    'recorded': 40,
+    'transcribing': 45,
+    'summarizing': 70,
+    'completed': 100,
+}
+RECORDING_SHARE = 40
+DEFAULT_STAGES = {'pending': 'queued', 'completed': 'completed', 'failed': 'failed'}
+
+
+class Subscription:
+    """
+    Events for one meeting, or every meeting when ``meeting_id`` is None.
+    Holds at most ``maxsize`` undelivered events; a subscriber that falls
+    further behind loses the oldest, since only the latest status matters.
+    """
+
+    def __init__(self, meeting_id=None, maxsize=100):
+        self.meeting_id = meeting_id
+        self.maxsize = maxsize
+
+    def deliver(self, event):
+        """Queue ``event``; safe to call from any thread"""
+        raise NotImplementedError
+
+    def close(self):
+        broker.unsubscribe(self)
+
+
+class AsyncSubscription(Subscription):
+    """A subscription consumed by a coroutine on the event loop it was created on"""
+
+    def __init__(self, meeting_id=None, maxsize=100):
+        super().__init__(meeting_id, maxsize)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+
+    def deliver(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The loop has closed without unsubscribing
+            self.close()
+
+    def _put(self, event):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout):
+        """The next event, or None after ``timeout`` seconds without one"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class SyncSubscription(Subscription):
+    """A subscription consumed by a blocking thread, for WSGI servers"""
+
+    def __init__(self, meeting_id=None, maxsize=100):
+        super().__init__(meeting_id, maxsize)
+        self.queue = queue.Queue(maxsize)
+        self._lock = threading.Lock()
+
+    def deliver(self, event):
+        with self._lock:
+            if self.queue.full():
+                self.queue.get_nowait()
+            self.queue.put_nowait(event)
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class Broker:
+    """Subscriptions of this process, keyed by meeting id (None for all meetings)"""
+
+    def __init__(self):
+        self._topics = {}
+        self._lock = threading.Lock()
+        self.subscribed = threading.Event()
+
+    def subscribe(self, subscription):
+        with self._lock:
+            self._topics.setdefault(subscription.meeting_id, set()).add(subscription)
+            self.subscribed.set()
+        get_backend().start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            topic = self._topics.get(subscription.meeting_id)
+            if topic is not None:
+                topic.discard(subscription)
+                if not topic:
+                    del self._topics[subscription.meeting_id]
+            if not self._topics:
+                self.subscribed.clear()
+
+    def deliver(self, event):
+        with self._lock:
+            subscriptions = list(self._topics.get(event['meeting'], ())) + list(self._topics.get(None, ()))
+        for subscription in subscriptions:
+            subscription.deliver(event)
+
+    def count(self):
+        with self._lock:
+            return sum(len(topic) for topic in self._topics.values())
+
+
+broker = Broker()
+
+
+class LocalBackend:
+    """Events reach subscribers in the publishing process only"""
+
+    name = 'local'
+
+    def __init__(self):
+        self._ids = itertools.count(1)
+
+    def publish(self, event):
+        broker.deliver({**event, 'id': next(self._ids)})
+
+    def start(self):
+        pass
+
+
+class DatabaseBackend:
+    """
+    Events are ``StatusEvent`` rows. A single thread per process polls for
+    rows newer than the last one it saw while the process has subscribers,
+    and hands them to the broker, so one query serves every subscriber.
+    """
+
+    name = 'database'
+
+    def __init__(self, poll_seconds=None, retention_seconds=None):
+        self.poll_seconds = poll_seconds or getattr(settings, 'EVENTS_POLL_SECONDS', 0.5)
+        self.retention_seconds = retention_seconds or getattr(settings, 'EVENTS_RETENTION_SECONDS', 3600)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._pruned_at = 0.0
+
+    def publish(self, event):
+        StatusEvent.objects.create(meeting_id=event['meeting'], payload=event)
+        self._prune()
+
+    def _prune(self):
+        # Publishers prune too, so rows do not pile up while nobody subscribes
+        if time.monotonic() - self._pruned_at > 60:
+            self._pruned_at = time.monotonic()
+            cutoff = timezone.now() - timedelta(seconds=self.retention_seconds)
+            StatusEvent.objects.filter(created_at__lt=cutoff).delete()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='status-events', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        last_id = None
+        while True:
+            if not broker.subscribed.is_set():
+                broker.subscribed.wait()
+                # New subscribers start from a snapshot, not from what happened while nobody listened
+                last_id = None
+            try:
+                if last_id is None:
+                    last = StatusEvent.objects.order_by('-id').values_list('id', flat=True).first()
+                    last_id = last or 0
+                for row_id, payload in (
+                    StatusEvent.objects.filter(id__gt=last_id).order_by('id').values_list('id', 'payload')[:500]
+                ):
+                    broker.deliver({**payload, 'id': row_id})
+                    last_id = row_id
+                self._prune()
+            except Exception:
+                logger.exception('Polling status events failed')
+                close_old_connections()
+            time.sleep(self.poll_seconds)
+
+
+BACKENDS = {
+    'local': LocalBackend,
+    'database': DatabaseBackend,
+}
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    name = getattr(settings, 'EVENTS_BACKEND', 'database')
+    if _backend is None or _backend.name != name:
+        _backend = BACKENDS[name]()
+    return _backend
+
+
+def _forget_backend_after_fork():
+    # The poller thread and the subscribers' event loops belong to the parent
+    global _backend, broker
+    _backend = None
+    broker = Broker()
+
+
+os.register_at_fork(after_in_child=_forget_backend_after_fork)
+
+
+def status_event(meeting_id, status, stage=None, progress=None, error=None):
+    stage = stage or DEFAULT_STAGES.get(status)
+    if progress is None:
+        progress = STAGE_PROGRESS.get(stage)
+    return {
+        'meeting': meeting_id,
+        'status': status,
+        'stage': stage,
+        'progress': progress,
+        'error': error,
+        'at': timezone.now().isoformat(),
+    }
+
+
+def publish_status(meeting_id, status, stage=None, progress=None, error=None):
+    """
+    Announce a meeting's new status. ``stage`` (queued, recording, recorded,
+    transcribing, summarizing) and ``progress`` (0-100) refine 'processing'.
+    Publishing never fails the transition it reports.
+    """
+    try:
+        get_backend().publish(status_event(meeting_id, status, stage, progress, error))
+    except Exception:
+        logger.exception(f'Could not publish status of meeting {meeting_id}')
+
+
+def snapshot(meeting_id):
+    """The meeting's current status as an event, or None if it does not exist"""
+    from .models import Meeting
+
+    row = Meeting.objects.filter(pk=meeting_id).values('status', 'processing_error', 'updated_at').first()
+    if row is None:
+        return None
+    event = status_event(meeting_id, row['status'], error=row['processing_error'])
+    event['at'] = row['updated_at'].isoformat()
+    return event
+
+
+def is_stale(event, snapshot):
+    """Whether ``event`` was published before the ``snapshot`` a subscriber already has"""
+    if snapshot is None or event['meeting'] != snapshot['meeting']:
+        return False
+    return datetime.fromisoformat(event['at']) < datetime.fromisoformat(snapshot['at'])
+
+
+def recording_progress(started_at, duration_minutes, now=None):
+    """Overall progress of a recording that started at ``started_at``"""
+    elapsed = ((now or timezone.now()) - started_at).total_seconds()
+    share = min(elapsed / max(duration_minutes * 60, 1), 1.0)
+    return int(RECORDING_SHARE * share)
+
+
+def subscribe(meeting_id=None, asynchronous=True):
+    """A new subscription; asynchronous ones must be created on the loop that reads them"""
+    cls = AsyncSubscription if asynchronous else SyncSubscription
+    return broker.subscribe(cls(meeting_id, getattr(settings, 'EVENTS_QUEUE_SIZE', 100)))
@@ -0,0 +1,279 @@
+"""
+Background Job Queue
+Database-backed queue that moves transcription and summarization out of the
+request cycle. Jobs are leased by workers (``manage.py run_workers``),
+kept alive with heartbeats, retried with exponential backoff and recovered
+when the worker holding them dies.
+"""
+
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import F
+from django.utils import timezone
+
+from . import events
+from .models import Job, Meeting
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def enqueue(kind, meeting=None, payload=None, max_attempts=None, delay_seconds=0, priority=Job.PRIORITY_NORMAL):
+    """Add a job to the queue and return it"""
+    return Job.objects.create(
+        kind=kind,
+        meeting=meeting,
+        payload=payload or {},
+        priority=priority,
+        max_attempts=max_attempts or _setting('JOB_MAX_ATTEMPTS', 3),
+        run_after=timezone.now() + timedelta(seconds=delay_seconds),
+    )
+
+
+def enqueue_once(kind, meeting, payload=None, max_attempts=None, priority=Job.PRIORITY_NORMAL):
+    """
+    Enqueue a job unless the meeting already has one of this kind waiting to
+    run, in which case that job is returned with ``payload`` merged into it
+    and its priority raised to ``priority`` if that is more urgent.
+    """
+    existing = Job.objects.filter(kind=kind, meeting=meeting, status='queued').first()
+    if existing:
+        update_fields = []
+        if payload and any(existing.payload.get(k) != v for k, v in payload.items()):
+            existing.payload = {**existing.payload, **payload}
+            update_fields.append('payload')
+        if priority < existing.priority:
+            existing.priority = priority
+            update_fields.append('priority')
+        if update_fields:
+            existing.save(update_fields=update_fields + ['updated_at'])
+        return existing
+    return enqueue(kind, meeting=meeting, payload=payload, max_attempts=max_attempts, priority=priority)
+
+
+def claim_next(worker_id, kinds=None, lease_seconds=None):
+    """
+    Lease the most urgent runnable job for ``worker_id``.
+
+    The claim is a conditional UPDATE on ``status='queued'`` so two workers
+    racing for the same row cannot both win, which keeps this safe on SQLite
+    where ``SELECT ... FOR UPDATE`` is unavailable.
+    """
+    lease_seconds = lease_seconds or _setting('JOB_LEASE_SECONDS', 60)
+    now = timezone.now()
+
+    candidates = Job.objects.filter(status='queued', run_after__lte=now)
+    if kinds:
+        candidates = candidates.filter(kind__in=kinds)
+
+    for job_id in candidates.order_by('priority', 'run_after', 'id').values_list('id', flat=True)[:10]:
+        claimed = Job.objects.filter(pk=job_id, status='queued').update(
+            status='running',
+            locked_by=worker_id,
+            lease_expires_at=now + timedelta(seconds=lease_seconds),
+            heartbeat_at=now,
+            attempts=F('attempts') + 1,
+            updated_at=now,
+        )
+        if claimed:
+            return Job.objects.select_related('meeting').get(pk=job_id)
+    return None
+
+
+def heartbeat(job_id, worker_id, lease_seconds=None):
+    """Extend the lease on a running job. Returns False if the lease was lost."""
+    lease_seconds = lease_seconds or _setting('JOB_LEASE_SECONDS', 60)
+    now = timezone.now()
+    return bool(Job.objects.filter(pk=job_id, status='running', locked_by=worker_id).update(
+        lease_expires_at=now + timedelta(seconds=lease_seconds),
+        heartbeat_at=now,
+        updated_at=now,
+    ))
+
+
+def complete(job, worker_id):
+    """Mark a leased job as succeeded"""
+    now = timezone.now()
+    return bool(Job.objects.filter(pk=job.pk, status='running', locked_by=worker_id).update(
+        status='succeeded',
+        locked_by=None,
+        lease_expires_at=None,
+        last_error=None,
+        finished_at=now,
+        updated_at=now,
+    ))
+
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter for the given attempt number"""
+    base = _setting('JOB_RETRY_BACKOFF_SECONDS', 5)
+    cap = _setting('JOB_RETRY_BACKOFF_MAX_SECONDS', 300)
+    delay = min(cap, base * (2 ** max(attempts - 1, 0)))
+    return delay + random.uniform(0, base)
+
+
+def fail(job, worker_id, error):
+    """
+    Record a failed attempt. The job is requeued with backoff until it runs
+    out of attempts, after which it and its meeting are marked failed.
+    Returns the job's new status.
+    """
+    now = timezone.now()
+    job.refresh_from_db(fields=['attempts', 'max_attempts'])
+
+    if job.attempts >= job.max_attempts:
+        updated = Job.objects.filter(pk=job.pk, status='running', locked_by=worker_id).update(
+            status='failed',
+            locked_by=None,
+            lease_expires_at=None,
+            last_error=error,
+            finished_at=now,
+            updated_at=now,
+        )
+        if updated:
+            _fail_meeting(job.meeting_id, error)
+        return 'failed'
+
+    Job.objects.filter(pk=job.pk, status='running', locked_by=worker_id).update(
+        status='queued',
+        locked_by=None,
+        lease_expires_at=None,
+        last_error=error,
+        run_after=now + timedelta(seconds=retry_delay(job.attempts)),
+        updated_at=now,
+    )
+    return 'queued'
+
+
+def recover_orphans():
+    """
+    Requeue jobs whose lease expired because their worker crashed or was
+    killed. Jobs that already used all their attempts are failed instead.
+    Returns the number of jobs recovered.
+    """
+    now = timezone.now()
+    recovered = 0
+    orphans = Job.objects.filter(status='running', lease_expires_at__lt=now)
+
+    for job in orphans:
+        error = f"Worker {job.locked_by} stopped heartbeating"
+        lease_match = Job.objects.filter(
+            pk=job.pk, status='running', lease_expires_at=job.lease_expires_at
+        )
+        if job.attempts >= job.max_attempts:
+            if lease_match.update(status='failed', locked_by=None, lease_expires_at=None,
+                                  last_error=error, finished_at=now, updated_at=now):
+                _fail_meeting(job.meeting_id, error)
+                recovered += 1
+        elif lease_match.update(status='queued', locked_by=None, lease_expires_at=None,
+                                last_error=error, run_after=now, updated_at=now):
+            recovered += 1
+
+    if recovered:
+        logger.warning(f"Recovered {recovered} orphaned job(s)")
+    return recovered
+
+
+def _fail_meeting(meeting_id, error):
+    if meeting_id:
+        Meeting.objects.filter(pk=meeting_id).update(
+            status='failed', processing_error=error, updated_at=timezone.now()
+        )
+        events.publish_status(meeting_id, 'failed', error=error)
+
+
+class Worker:
+    """
+    Pulls jobs from the queue and runs the matching handler.
+
+    ``handlers`` maps job kinds to callables taking the ``Job``; it defaults
+    to ``meeting.tasks.HANDLERS`` and can be swapped for stubs in tests.
+    """
+
+    def __init__(self, worker_id=None, handlers=None, kinds=None,
+                 poll_interval=None, lease_seconds=None, heartbeat_seconds=None):
+        if handlers is None:
+            from .tasks import HANDLERS
+            handlers = HANDLERS
+
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.handlers = handlers
+        self.kinds = kinds
+        self.poll_interval = poll_interval or _setting('JOB_POLL_INTERVAL_SECONDS', 1.0)
+        self.lease_seconds = lease_seconds or _setting('JOB_LEASE_SECONDS', 60)
+        self.heartbeat_seconds = heartbeat_seconds or _setting('JOB_HEARTBEAT_SECONDS', self.lease_seconds / 3)
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self, max_jobs=None, stop_when_empty=False):
+        """Process jobs until stopped. Returns the number of jobs processed."""
+        processed = 0
+        last_recovery = 0
+
+        while not self._stop.is_set():
+            close_old_connections()
+
+            if time.monotonic() - last_recovery >= self.lease_seconds:
+                recover_orphans()
+                last_recovery = time.monotonic()
+
+            job = claim_next(self.worker_id, kinds=self.kinds, lease_seconds=self.lease_seconds)
+            if job is None:
+                if stop_when_empty:
+                    break
+                self._stop.wait(self.poll_interval)
+                continue
+
+            self.run_job(job)
+            processed += 1
+            if max_jobs and processed >= max_jobs:
+                break
+
+        return processed
+
+    def run_job(self, job):
+        """Run a single leased job, heartbeating for as long as the handler runs"""
+        handler = self.handlers.get(job.kind)
+        if handler is None:
+            fail(job, self.worker_id, f"No handler registered for job kind '{job.kind}'")
+            return
+
+        done = threading.Event()
+        beat = threading.Thread(target=self._heartbeat_loop, args=(job.pk, done), daemon=True)
+        beat.start()
+
+        try:
+            handler(job)
+        except Exception as e:
+            logger.exception(f"Job {job.pk} ({job.kind}) attempt {job.attempts} failed")
+            status = fail(job, self.worker_id, str(e))
+            logger.info(f"Job {job.pk} is now {status}")
+        else:
+            if not complete(job, self.worker_id):
+                logger.warning(f"Job {job.pk} finished after its lease was lost")
+        finally:
+            done.set()
+            beat.join(timeout=self.heartbeat_seconds)
+
+    def _heartbeat_loop(self, job_id, done):
+        try:
+            while not done.wait(self.heartbeat_seconds):
+                if not heartbeat(job_id, self.worker_id, self.lease_seconds):
+                    logger.warning(f"Lost lease on job {job_id}")
+                    return
+        finally:
+            connection.close()
@@ -0,0 +1,290 @@
+"""
+Live Transcription
+Transcribes a meeting while it is still being recorded. ``LiveTranscriber``
+wraps the recorder's ``StreamingWavWriter``: audio still goes to the
+recording and is also cut at quiet points into rolling windows of about
+``LIVE_WINDOW_SECONDS``, transcribed as soon as they close. ``LiveSession``
+appends each window to the meeting's transcript and feeds it to an
+``IncrementalSummarizer``, so when the meeting ends only the last window
+and the final merge are left before the summary is ready.
+"""
+
+import logging
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection
+
+from .diarization import get_diarizer
+from .llm_service import LLMService
+from .summarization import IncrementalSummarizer
+from .tasks import save_summary
+from .transcript_segments import SegmentTable
+from .transcription import _rms, get_provider, quietest_point, trim_overlap
+from . import audio_normalize, events
+
+logger = logging.getLogger(__name__)
+
+# A window is cut at the quietest point in its last few seconds
+SEARCH_SECONDS = 5.0
+SILENCE_WINDOW_SECONDS = 0.1
+
+
+class LiveTranscriber:
+    """
+    Takes the place of ``writer`` in the capture loop. ``write()`` hands audio
+    to the writer as before and queues it for a background thread, which
+    converts it to 16 kHz mono, cuts windows and transcribes them with
+    ``provider`` on a pool of ``max_workers``. Each window after the first
+    starts ``overlap_seconds`` before the previous cut; the repeated words
+    are dropped when windows are stitched. ``on_segments`` is called from
+    that thread with the new segments of each window, in recording order.
+    Silent windows are not sent. If a window fails, ``error`` is set and
+    nothing more is transcribed; the recording itself carries on.
+    """
+
+    def __init__(self, writer, provider, on_segments, window_seconds=None, overlap_seconds=None, max_workers=None):
+        self.writer = writer
+        self.provider = provider
+        self.on_segments = on_segments
+        window_seconds = window_seconds or getattr(settings, 'LIVE_WINDOW_SECONDS', 30)
+        self.window_seconds = min(window_seconds, provider.max_segment_seconds)
+        if overlap_seconds is None:
+            overlap_seconds = getattr(settings, 'TRANSCRIPTION_OVERLAP_SECONDS', 2.0)
+        self.overlap_seconds = overlap_seconds
+        self.max_workers = max_workers or getattr(settings, 'TRANSCRIPTION_MAX_WORKERS', 4)
+        self.silence_level = getattr(settings, 'AUDIO_SILENCE_LEVEL', 100)
+        self.windows_sent = 0
+        self.error = None
+
+        try:
+            self._converter = audio_normalize.PcmConverter(writer.rate, writer.sample_width, writer.channels)
+            self.rate, self.sample_width, self.channels = audio_normalize.SAMPLE_RATE, 2, 1
+        except (RuntimeError, ValueError):
+            # No audioop: windows are sent as captured
+            self._converter = None
+            self.rate, self.sample_width, self.channels = writer.rate, writer.sample_width, writer.channels
+        self._frame_bytes = self.sample_width * self.channels
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._pool = None
+        self._tmp = None
+        self._cut = None
+        self._last_text = ''
+
+    @property
+    def path(self):
+        return self.writer.path
+
+    def start(self):
+        self._tmp = tempfile.mkdtemp(prefix='live_')
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='live-transcribe')
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def write(self, data):
+        self.writer.write(data)
+        if self.error is None:
+            self._queue.put(data)
+
+    def close(self):
+        """Finish the recording, then wait for the windows still being transcribed"""
+        self.writer.close()
+        self._queue.put(None)
+        if self._thread:
+            self._thread.join()
+        if self._pool:
+            self._pool.shutdown(cancel_futures=True)
+        if self._tmp:
+            shutil.rmtree(self._tmp, ignore_errors=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _run(self):
+        pcm = bytearray()
+        start = 0.0     # recording time of pcm[0]
+        carried = 0     # bytes at the front of pcm already sent with the previous window
+        pending = []    # (future or None when silent, window end) in recording order
+        window_bytes = self._bytes(self.window_seconds)
+        try:
+            while (data := self._queue.get()) is not None:
+                pcm += self._converter.convert(data) if self._converter else data
+                while len(pcm) >= window_bytes:
+                    end = self._cut_point(pcm, window_bytes)
+                    pending.append(self._submit(pcm[:end], start))
+                    keep_from = max(0, end - self._bytes(self.overlap_seconds))
+                    del pcm[:keep_from]
+                    start += keep_from / self._frame_bytes / self.rate
+                    carried = end - keep_from
+                self._apply(pending, wait=False)
+
+            if len(pcm) > carried:
+                pending.append(self._submit(bytes(pcm), start))
+            self._apply(pending, wait=True)
+        except Exception as e:
+            logger.exception(f"Live transcription of {self.path} failed")
+            self.error = str(e) or e.__class__.__name__
+        finally:
+            connection.close()
+
+    def _bytes(self, seconds):
+        return int(seconds * self.rate) * self._frame_bytes
+
+    def _cut_point(self, pcm, window_bytes):
+        """Byte offset to end the next window at: the quietest place in its last few seconds"""
+        search_from = window_bytes - self._bytes(min(SEARCH_SECONDS, self.window_seconds / 3))
+        quietest = quietest_point(pcm[search_from:window_bytes], self.rate, self.sample_width, self.channels)
+        if quietest is None:
+            return window_bytes
+        return search_from + self._bytes(quietest)
+
+    def _silent(self, pcm):
+        if not self.silence_level:
+            return False
+        step = self._bytes(SILENCE_WINDOW_SECONDS)
+        return all(
+            _rms(pcm[i:i + step], self.sample_width, self.channels) <= self.silence_level
+            for i in range(0, len(pcm), step)
+        )
+
+    def _submit(self, pcm, start):
+        end = start + len(pcm) / self._frame_bytes / self.rate
+        if self._silent(pcm):
+            return None, end
+        path = os.path.join(self._tmp, f'window_{self.windows_sent:05d}.wav')
+        with wave.open(path, 'wb') as wf:
+            wf.setnchannels(self.channels)
+            wf.setsampwidth(self.sample_width)
+            wf.setframerate(self.rate)
+            wf.writeframes(pcm)
+        self.windows_sent += 1
+        return self._pool.submit(self._transcribe, path, start), end
+
+    def _transcribe(self, path, start):
+        encoded = audio_normalize.encode(path, audio_normalize.target_codec(self.provider.formats))
+        try:
+            return self.provider.transcribe_segments(encoded, offset=start)
+        finally:
+            for name in {path, encoded}:
+                os.remove(name)
+
+    def _apply(self, pending, wait):
+        """Stitch finished windows onto the transcript, stopping at the first one still running"""
+        while pending and (wait or pending[0][0] is None or pending[0][0].done()):
+            future, end = pending.pop(0)
+            segments = trim_overlap(future.result() if future else [], self._cut, self._last_text)
+            self._cut = end
+            if segments:
+                self._last_text = segments[-1].text
+                self.on_segments(segments)
+
+
+class LiveSession:
+    """
+    Live transcript and summary of one meeting. The recorder wraps its writer
+    with ``wrap``; ``finish()`` runs once the recording is saved. The
+    transcript and segments are saved after every window, and every
+    ``LIVE_SUMMARY_INTERVAL_SECONDS`` the partial summaries so far are merged
+    into a provisional ``summary_json``. Live summaries are built from the
+    unlabelled text as it arrives; speakers are assigned when the meeting ends.
+    """
+
+    def __init__(self, meeting, provider=None, llm=None, diarizer=None):
+        self.meeting = meeting
+        self.provider = provider or get_provider(LLMService.transcription_service())
+        self.summarizer = IncrementalSummarizer(llm or LLMService.summary_completion())
+        self.diarizer = diarizer
+        self.summary_interval = getattr(settings, 'LIVE_SUMMARY_INTERVAL_SECONDS', 300)
+        self.transcriber = None
+        self.segments = []
+        self._table = SegmentTable()
+        self._summarized_at = time.monotonic()
+        self._provisional = None
+
+    def wrap(self, writer):
+        """The writer for the capture loop to use instead of ``writer``"""
+        self.transcriber = LiveTranscriber(writer, self.provider, self._add).start()
+        return self.transcriber
+
+    def finish(self):
+        """
+        Complete the meeting from what was transcribed live. Returns False when
+        the job queue has to take over: the whole recording is transcribed
+        again if a window failed, and summarized if only the summary did.
+        """
+        transcriber = self.transcriber
+        if transcriber is None or transcriber.error or not self.summarizer.text:
+            if transcriber is not None and transcriber.error:
+                logger.warning(f"Live transcription of meeting {self.meeting.pk} failed: {transcriber.error}")
+            self._discard()
+            return False
+
+        events.publish_status(self.meeting.pk, 'processing', stage='summarizing')
+        try:
+            (self.diarizer or get_diarizer()).assign(transcriber.path, self.segments)
+            self.meeting.segments = SegmentTable(self.segments)
+            self.meeting.save(update_fields=['segments', 'updated_at'])
+        except Exception as e:
+            logger.warning(f"Could not label speakers of meeting {self.meeting.pk}: {e}")
+
+        try:
+            summary = self.summarizer.summary()
+        except Exception as e:
+            logger.warning(f"Live summary of meeting {self.meeting.pk} failed: {e}")
+            return False
+        save_summary(self.meeting, summary)
+        return True
+
+    def _add(self, segments):
+        self.segments.extend(segments)
+        for segment in segments:
+            self._table.append(segment.start, segment.end, segment.text, segment.speaker)
+        self.summarizer.add(' '.join(segment.text for segment in segments if segment.text))
+
+        self.meeting.transcript = self.summarizer.text
+        self.meeting.segments = self._table
+        update_fields = ['transcript', 'segments', 'updated_at']
+        if time.monotonic() - self._summarized_at >= self.summary_interval:
+            self._summarized_at = time.monotonic()
+            provisional = self.summarizer.snapshot()
+            if provisional and provisional != self._provisional:
+                self._provisional = provisional
+                self.meeting.summary_json = provisional
+                update_fields.append('summary_json')
+        self.meeting.save(update_fields=update_fields)
+
+    def _discard(self):
+        """Drop a partial live transcript so the recording is processed from scratch"""
+        self.summarizer.close()
+        if not self.segments:
+            return
+        self.meeting.transcript = None
+        self.meeting.segments = None
+        update_fields = ['transcript', 'segments', 'updated_at']
+        if self._provisional:
+            self.meeting.summary_json = None
+            update_fields.append('summary_json')
+        self.meeting.save(update_fields=update_fields)
+
+
+def live_session(meeting):
+    """A ``LiveSession`` for ``meeting`` when ``LIVE_TRANSCRIPTION`` is on and the providers are configured"""
+    if not getattr(settings, 'LIVE_TRANSCRIPTION', False):
+        return None
+    try:
+        return LiveSession(meeting)
+    except ValueError as e:
+        logger.warning(f"Not transcribing meeting {meeting.pk} live: {e}")
+        return None
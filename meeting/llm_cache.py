@@ -0,0 +1,207 @@
+"""
+LLM Result Cache
+Content-addressed cache for transcripts and summaries. Keys hash the input
+(audio bytes or transcript text) together with the provider, model and a
+version derived from the prompts, so a changed prompt or model never serves
+a stale result.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+
+def hash_text(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def hash_file(path, block_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def make_key(kind, content_hash, service, model, version=''):
+    raw = json.dumps([kind, content_hash, service, model, version])
+    return f"{kind}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
+
+class DiskCacheBackend:
+    """
+    Stores each entry as a JSON file. Reads refresh the file's mtime, so
+    evicting the oldest mtimes when over ``max_entries`` is LRU, and entries
+    older than ``ttl`` seconds are treated as misses. Hit/miss counters are
+    append-only files so they add up across worker processes.
+    """
+
+    name = 'disk'
+
+    def __init__(self, directory=None, max_entries=None, ttl=None):
+        self.directory = str(directory or getattr(settings, 'LLM_CACHE_DIR', settings.BASE_DIR / 'cache'))
+        self.max_entries = max_entries or getattr(settings, 'LLM_CACHE_MAX_ENTRIES', 1000)
+        self.ttl = ttl or getattr(settings, 'LLM_CACHE_TTL_SECONDS', 30 * 24 * 3600)
+        os.makedirs(os.path.join(self.directory, 'entries'), exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, 'entries', f"{key.replace(':', '_')}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                return None
+            with open(path) as f:
+                value = json.load(f)
+            os.utime(path)
+            return value
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key, value):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(value, f)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _entries(self):
+        entries_dir = os.path.join(self.directory, 'entries')
+        entries = []
+        for name in os.listdir(entries_dir):
+            if name.endswith('.json'):
+                try:
+                    entries.append((os.path.getmtime(os.path.join(entries_dir, name)), name))
+                except OSError:
+                    pass
+        return entries
+
+    def _evict(self):
+        entries = self._entries()
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort()
+        for _, name in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(os.path.join(self.directory, 'entries', name))
+            except OSError:
+                pass
+
+    def count(self):
+        return len(self._entries())
+
+    def incr_stat(self, name):
+        with open(os.path.join(self.directory, f'{name}.count'), 'ab') as f:
+            f.write(b'.')
+
+    def get_stat(self, name):
+        try:
+            return os.path.getsize(os.path.join(self.directory, f'{name}.count'))
+        except OSError:
+            return 0
+
+
+class DjangoCacheBackend:
+    """Stores entries in a Django cache (``LLM_CACHE_ALIAS``), which handles TTL and eviction"""
+
+    name = 'django'
+
+    def __init__(self, alias=None, ttl=None):
+        self.cache = caches[alias or getattr(settings, 'LLM_CACHE_ALIAS', 'default')]
+        self.ttl = ttl or getattr(settings, 'LLM_CACHE_TTL_SECONDS', 30 * 24 * 3600)
+
+    def get(self, key):
+        return self.cache.get(f'llm_cache:{key}')
+
+    def set(self, key, value):
+        self.cache.set(f'llm_cache:{key}', value, self.ttl)
+
+    def count(self):
+        return None
+
+    def incr_stat(self, name):
+        stat_key = f'llm_cache_stats:{name}'
+        try:
+            self.cache.incr(stat_key)
+        except ValueError:
+            self.cache.add(stat_key, 0, None)
+            self.cache.incr(stat_key)
+
+    def get_stat(self, name):
+        return self.cache.get(f'llm_cache_stats:{name}', 0)
+
+
+BACKENDS = {
+    'disk': DiskCacheBackend,
+    'django': DjangoCacheBackend,
+}
+
+_backend = None
+
+
+def get_backend():
+    """The configured cache backend, or None when ``LLM_CACHE_BACKEND`` is 'none'"""
+    global _backend
+    name = getattr(settings, 'LLM_CACHE_BACKEND', 'disk')
+    if name in ('', 'none'):
+        return None
+    if _backend is None or _backend.name != name:
+        _backend = BACKENDS[name]()
+    return _backend
+
+
+def lookup(key):
+    """The cached value for ``key``, or None on a miss"""
+    backend = get_backend()
+    if backend is None:
+        return None
+    value = backend.get(key)
+    backend.incr_stat('hits' if value is not None else 'misses')
+    return value
+
+
+def store(key, value):
+    backend = get_backend()
+    if backend is None:
+        return
+    try:
+        backend.set(key, value)
+    except Exception as e:
+        logger.warning(f"Could not store {key} in the LLM cache: {e}")
+
+
+def cached(key, compute, force=False):
+    """
+    Return the cached value for ``key``, computing and storing it on a miss.
+    ``force`` skips the lookup but still stores the fresh result.
+    """
+    if not force:
+        value = lookup(key)
+        if value is not None:
+            return value
+
+    value = compute()
+    store(key, value)
+    return value
+
+
+def stats():
+    backend = get_backend()
+    if backend is None:
+        return {'backend': 'none', 'hits': 0, 'misses': 0, 'entries': 0}
+    return {
+        'backend': backend.name,
+        'hits': backend.get_stat('hits'),
+        'misses': backend.get_stat('misses'),
+        'entries': backend.count(),
+    }
@@ -1,6 +1,15 @@
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from django.conf import settings
+from .summarization import (
+    SummaryEngine, SectionParser, MAP_PROMPT, REDUCE_PROMPT, SUMMARY_FIELDS,
+    chunk_transcript, count_tokens, normalize_summary, parse_json_response
+)
+from .models import Job
+from .providers import CLIENT_CLASSES, get_client
+from .rate_limit import get_limiter
+from . import llm_cache, routing
 
 try:
     import openai
@@ -29,110 +38,207 @@ Analyze the following meeting transcript and provide a structured JSON response
 4. action_items: A list of objects with 'task', 'owner' (if mentioned), and 'due_date' (if mentioned)
 5. agenda: A list of topics discussed with brief descriptions
 
+Lines starting with a speaker label (such as "Speaker 2:") were said by that speaker; when someone takes on a task and is not named, use their label as its owner.
+
 Transcript:
 {transcript}
 
 Respond with ONLY valid JSON, no additional text.
 """
 
+    # bart-large-cnn accepts 1024 tokens; leave headroom for tokenizer differences
+    HUGGINGFACE_CHUNK_TOKENS = 700
+
+    @staticmethod
+    def available_services():
+        """Providers with an API key and client library present, in default priority order"""
+        services = []
+        if getattr(settings, 'OPENAI_API_KEY', None) and openai:
+            services.append('openai')
+        if getattr(settings, 'GOOGLE_API_KEY', None) and genai:
+            services.append('google')
+        if getattr(settings, 'HUGGINGFACE_API_KEY', None) and requests:
+            services.append('huggingface')
+        return services
+    
+    @staticmethod
+    def generate_summary(transcript, service=None, force=False, priority=Job.PRIORITY_NORMAL):
+        """
+        Generate meeting summary using LLM, reusing a cached result unless ``force``.
+        Without an explicit ``service`` (or ``SUMMARY_SERVICE``) the request is
+        routed across the configured providers with failover. ``priority``
+        orders the request in the providers' rate limiters.
+        """
+        service, services = LLMService._summary_services(service)
+        
+        def compute():
+            if service:
+                return LLMService._generate_summary(transcript, service, priority)
+            # Each map and reduce call is routed on its own, so a failure only retries that call
+            return SummaryEngine(LLMService.summary_completion(None, priority)).summarize(transcript)
+        
+        return llm_cache.cached(LLMService._summary_cache_key(transcript, services), compute, force=force)
+    
     @staticmethod
-    def generate_summary(transcript, service=None):
-        """Generate meeting summary using LLM"""
-        # If no specific service requested, pick the first available configured provider.
-        if not service:
-            # prefer OpenAI if key present
-            if getattr(settings, 'OPENAI_API_KEY', None) and openai:
-                service = 'openai'
-            elif getattr(settings, 'GOOGLE_API_KEY', None) and genai:
-                service = 'google'
-            elif getattr(settings, 'HUGGINGFACE_API_KEY', None) and requests:
-                service = 'huggingface'
+    def stream_summary(transcript, service=None, force=False, priority=Job.PRIORITY_INTERACTIVE):
+        """
+        Generate a summary as a stream of events: ``('section', key, value)``
+        as each section of the model's JSON reply completes, then
+        ``('done', summary)``. Cached summaries are replayed at once.
+        Transcripts too long for one prompt are summarized chunk by chunk as
+        usual and their sections sent when the merge finishes.
+        """
+        service, services = LLMService._summary_services(service)
+        key = LLMService._summary_cache_key(transcript, services)
+        
+        sent = {}
+        summary = None if force else llm_cache.lookup(key)
+        if summary is None:
+            prompt = SummaryEngine(None).single_prompt(transcript)
+            if prompt is None:
+                summary = LLMService.generate_summary(transcript, service, force=True, priority=priority)
             else:
-                raise ValueError("No LLM provider configured. Set OPENAI_API_KEY, GOOGLE_API_KEY, or HUGGINGFACE_API_KEY in your environment.")
-
-        if service == 'openai':
-            return LLMService._openai_summary(transcript)
-        elif service == 'google':
-            return LLMService._google_summary(transcript)
-        elif service == 'huggingface':
-            return LLMService._huggingface_summary(transcript)
-        else:
-            raise ValueError(f"Unknown transcription service: {service}")
-    
-    @staticmethod
-    def _openai_summary(transcript):
-        """Generate summary using OpenAI"""
-        if not openai or not settings.OPENAI_API_KEY:
-            raise ValueError("OpenAI API key not configured")
+                if service:
+                    chunks = LLMService._stream_reply(service, transcript, prompt, priority)
+                else:
+                    _, chunks = routing.get_router().stream(
+                        lambda name: LLMService._stream_reply(name, transcript, prompt, priority)
+                    )
+                
+                parser = SectionParser()
+                for chunk in chunks:
+                    for name, value in parser.feed(chunk):
+                        if name in SUMMARY_FIELDS:
+                            sent[name] = normalize_summary({name: value})[name]
+                            yield ('section', name, sent[name])
+                summary = normalize_summary(parse_json_response(parser.text))
+                llm_cache.store(key, summary)
         
-        openai.api_key = settings.OPENAI_API_KEY
+        # Send any section not streamed as-is, e.g. when the reply only parsed once complete
+        for name in SUMMARY_FIELDS:
+            if name not in sent or sent[name] != summary.get(name):
+                yield ('section', name, summary.get(name))
+        yield ('done', summary)
+    
+    @staticmethod
+    def _stream_reply(service, transcript, prompt, priority):
+        """Iterator over the pieces of ``service``'s JSON reply to the summary ``prompt``"""
+        if service == 'huggingface':
+            # Not a chat model, so its summary arrives in one piece
+            return iter([json.dumps(LLMService._huggingface_summary(transcript, priority))])
+        get_limiter(service).acquire(
+            tokens=count_tokens(prompt) + getattr(settings, 'LLM_RATE_LIMIT_OUTPUT_TOKENS', 500),
+            priority=priority
+        )
+        return get_client(service).stream(prompt)
+    
+    @staticmethod
+    def _summary_services(service):
+        """``(pinned service or None, services the summary may come from)``"""
+        service = service or getattr(settings, 'SUMMARY_SERVICE', None)
+        if service and service not in CLIENT_CLASSES:
+            raise ValueError(f"Unknown LLM service: {service}")
         
-        try:
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a meeting summarization expert. Analyze meeting transcripts and provide structured summaries."
-                    },
-                    {
-                        "role": "user",
-                        "content": LLMService.SUMMARY_PROMPT.format(transcript=transcript)
-                    }
-                ],
-                temperature=0.7,
-                max_tokens=1500
-            )
-            
-            content = response.choices[0].message.content
-            summary_json = json.loads(content)
-            return summary_json
-        except Exception as e:
-            raise Exception(f"OpenAI API error: {str(e)}")
+        if service:
+            return service, [service]
+        services = routing.provider_order()
+        if not services:
+            raise ValueError("No LLM provider configured. Set OPENAI_API_KEY, GOOGLE_API_KEY, or HUGGINGFACE_API_KEY in your environment.")
+        if len(services) == 1:
+            # Nothing to fail over to
+            return services[0], services
+        return None, services
+    
+    @staticmethod
+    def _summary_cache_key(transcript, services):
+        return llm_cache.make_key(
+            'summary',
+            llm_cache.hash_text(transcript),
+            ','.join(services),
+            ','.join(CLIENT_CLASSES[name].summary_model for name in services),
+            LLMService.summary_prompt_version()
+        )
     
     @staticmethod
-    def _google_summary(transcript):
-        """Generate summary using Google Generative AI"""
-        if not genai or not settings.GOOGLE_API_KEY:
-            raise ValueError("Google API key not configured")
+    def summary_prompt_version():
+        """Fingerprint of everything besides the transcript that shapes a summary"""
+        return llm_cache.hash_text(json.dumps([
+            LLMService.SUMMARY_PROMPT,
+            MAP_PROMPT,
+            REDUCE_PROMPT,
+            getattr(settings, 'SUMMARY_TOKEN_BUDGET', None),
+            getattr(settings, 'SUMMARY_CHUNK_TOKENS', None),
+        ]))
+    
+    @staticmethod
+    def _generate_summary(transcript, service, priority=Job.PRIORITY_NORMAL):
+        if service == 'huggingface':
+            return LLMService._huggingface_summary(transcript, priority)
         
-        genai.configure(api_key=settings.GOOGLE_API_KEY)
+        # Long transcripts are summarized chunk by chunk and merged
+        return SummaryEngine(LLMService.get_completion_function(service, priority)).summarize(transcript)
+    
+    @staticmethod
+    def summary_completion(service=None, priority=Job.PRIORITY_NORMAL):
+        """
+        Callable sending a summary prompt to ``service`` (or ``SUMMARY_SERVICE``),
+        or across the configured providers with failover when neither is set
+        """
+        service, _ = LLMService._summary_services(service)
+        if service:
+            return LLMService.get_completion_function(service, priority)
         
-        try:
-            model = genai.GenerativeModel('gemini-pro')
-            response = model.generate_content(
-                LLMService.SUMMARY_PROMPT.format(transcript=transcript)
-            )
-            
-            content = response.text
-            summary_json = json.loads(content)
-            return summary_json
-        except Exception as e:
-            raise Exception(f"Google API error: {str(e)}")
+        router = routing.get_router()
+        
+        def ask(name, prompt):
+            reply = LLMService.get_completion_function(name, priority)(prompt)
+            # Summary prompts ask for JSON; anything else (such as bart's plain summary) fails over
+            parse_json_response(reply)
+            return reply
+        
+        def complete(prompt):
+            _, reply = router.call(lambda name: ask(name, prompt))
+            return reply
+        
+        return complete
     
     @staticmethod
-    def _huggingface_summary(transcript):
+    def get_completion_function(service, priority=Job.PRIORITY_NORMAL):
+        """
+        Return a callable sending a prompt to ``service`` and returning the reply
+        text, after waiting for room under the provider's rate limits
+        """
+        client = get_client(service)
+        limiter = get_limiter(service)
+        output_tokens = getattr(settings, 'LLM_RATE_LIMIT_OUTPUT_TOKENS', 500)
+        
+        def complete(prompt):
+            limiter.acquire(tokens=count_tokens(prompt) + output_tokens, priority=priority)
+            return client.complete(prompt)
+        
+        return complete
+    
+    @staticmethod
+    def _huggingface_summary(transcript, priority=Job.PRIORITY_NORMAL):
         """Generate summary using HuggingFace API"""
         if not settings.HUGGINGFACE_API_KEY:
             raise ValueError("HuggingFace API key not configured")
         
         try:
-            headers = {"Authorization": f"Bearer {settings.HUGGINGFACE_API_KEY}"}
-            api_url = "https://api-inference.huggingface.co/models/facebook/bart-large-cnn"
-            
-            payload = {"inputs": transcript[:512]}  # Truncate to model limits
-            
-            response = requests.post(api_url, headers=headers, json=payload)
-            result = response.json()
-            
-            if isinstance(result, list) and len(result) > 0:
-                summary = result[0].get('summary_text', '')
-            else:
-                summary = str(result)
+            # bart-large-cnn only reads ~1024 tokens, so summarize chunks and then
+            # the joined chunk summaries until everything fits in one request
+            text = transcript
+            while True:
+                chunks = chunk_transcript(text, LLMService.HUGGINGFACE_CHUNK_TOKENS)
+                with ThreadPoolExecutor(max_workers=getattr(settings, 'SUMMARY_MAX_WORKERS', 4)) as pool:
+                    summaries = list(pool.map(LLMService.get_completion_function('huggingface', priority), chunks))
+                text = ' '.join(summaries)
+                if len(chunks) == 1 or count_tokens(text) >= count_tokens(' '.join(chunks)):
+                    break
             
             # Return a structured response
             return {
-                "summary": summary,
+                "summary": text,
                 "key_points": [],
                 "decisions": [],
                 "action_items": [],
@@ -142,74 +248,72 @@ Respond with ONLY valid JSON, no additional text.
             raise Exception(f"HuggingFace API error: {str(e)}")
     
     @staticmethod
-    def extract_transcript_from_audio(audio_file_path, service=None):
+    def extract_transcript_from_audio(audio_file_path, service=None, force=False):
         """Extract transcript from audio file"""
-        # If no explicit service provided, pick one that is configured and available.
-        if not service:
-            if getattr(settings, 'OPENAI_API_KEY', None) and openai:
-                service = 'openai'
-            elif getattr(settings, 'GOOGLE_API_KEY', None) and genai:
-                service = 'google'
-            else:
-                raise ValueError("No transcription provider configured. Set OPENAI_API_KEY or GOOGLE_API_KEY in your .env and restart the app.")
-
-        if service == 'openai':
-            return LLMService._openai_transcribe(audio_file_path)
-        elif service == 'google':
-            return LLMService._google_transcribe(audio_file_path)
-        else:
-            raise ValueError(f"Transcription not supported for service: {service}")
+        return LLMService.transcribe_audio(audio_file_path, service, force=force).text
     
     @staticmethod
-    def _openai_transcribe(audio_file_path):
-        """Transcribe audio using OpenAI Whisper"""
-        if not openai or not settings.OPENAI_API_KEY:
-            raise ValueError("OpenAI API key not configured")
+    def transcribe_audio(audio_file_path, service=None, force=False):
+        """
+        Transcribe audio file in parallel segments, returning a TranscriptionResult.
+        Results are cached by the audio content unless ``force``.
+        """
+        from .diarization import get_diarizer
+        from .transcription import TranscriptionResult, get_provider, transcribe_file
         
-        openai.api_key = settings.OPENAI_API_KEY
+        service = LLMService.transcription_service(service)
+        diarization = getattr(settings, 'DIARIZATION_BACKEND', 'energy')
+        data = llm_cache.cached(
+            LLMService._transcript_cache_key(audio_file_path, service, diarization),
+            lambda: transcribe_file(audio_file_path, get_provider(service), diarizer=get_diarizer(diarization)).to_dict(),
+            force=force
+        )
+        return TranscriptionResult.from_dict(data)
+    
+    @staticmethod
+    def _transcript_cache_key(audio_file_path, service, diarization):
+        return llm_cache.make_key(
+            'transcript',
+            llm_cache.hash_file(audio_file_path),
+            service,
+            CLIENT_CLASSES[service].transcription_model,
+            json.dumps([
+                getattr(settings, 'TRANSCRIPTION_SEGMENT_SECONDS', None),
+                getattr(settings, 'TRANSCRIPTION_OVERLAP_SECONDS', None),
+                getattr(settings, 'AUDIO_NORMALIZE_CODEC', None),
+                getattr(settings, 'AUDIO_SILENCE_LEVEL', None),
+                getattr(settings, 'AUDIO_VAD_MIN_SILENCE_SECONDS', None),
+                diarization,
+            ])
+        )
+    
+    @staticmethod
+    def transcription_service(service=None):
+        """``service`` if supported, else TRANSCRIPTION_SERVICE, else any configured provider"""
+        if service:
+            if service not in CLIENT_CLASSES:
+                raise ValueError(f"Transcription not supported for service: {service}")
+            return service
         
-        try:
-            with open(audio_file_path, 'rb') as audio_file:
-                transcript_response = openai.Audio.transcribe(
-                    model="whisper-1",
-                    file=audio_file
-                )
-            
-            return transcript_response['text']
-        except Exception as e:
-            raise Exception(f"OpenAI transcription error: {str(e)}")
+        available = [name for name in LLMService.available_services() if name != 'huggingface']
+        preferred = getattr(settings, 'TRANSCRIPTION_SERVICE', None)
+        if preferred == 'fake' or preferred in available:
+            return preferred
+        if available:
+            return available[0]
+        raise ValueError("No transcription provider configured. Set OPENAI_API_KEY or GOOGLE_API_KEY in your .env and restart the app.")
     
     @staticmethod
-    def _google_transcribe(audio_file_path):
+    def _openai_transcribe(audio_file_path, timestamps=False):
+        """Transcribe audio using OpenAI Whisper"""
+        get_limiter('openai').acquire()
+        return get_client('openai').transcribe(audio_file_path, timestamps=timestamps)
+    
+    @staticmethod
+    def _google_transcribe(audio_file_path, timestamps=False):
         """Transcribe audio using Google Cloud Speech-to-Text"""
-        if not settings.GOOGLE_API_KEY:
-            raise ValueError("Google API key not configured")
-        
-        try:
-            from google.cloud import speech
-            from google.oauth2 import service_account
-            
-            client = speech.SpeechClient()
-            
-            with open(audio_file_path, 'rb') as audio_file:
-                content = audio_file.read()
-            
-            audio = speech.RecognitionAudio(content=content)
-            config = speech.RecognitionConfig(
-                encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-                sample_rate_hertz=16000,
-                language_code="en-US",
-            )
-            
-            response = client.recognize(config=config, audio=audio)
-            
-            transcript = ""
-            for result in response.results:
-                transcript += result.alternatives[0].transcript + " "
-            
-            return transcript.strip()
-        except Exception as e:
-            raise Exception(f"Google transcription error: {str(e)}")
+        get_limiter('google').acquire()
+        return get_client('google').transcribe(audio_file_path, timestamps=timestamps)
 
 
 def ensure_json_format(func):
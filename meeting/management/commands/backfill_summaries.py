@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from meeting import jobs
+from meeting.models import Job, Meeting
+
+
+class Command(BaseCommand):
+    help = 'Queue batch-priority summarize jobs for meetings that have a transcript'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Re-summarize meetings that already have a summary, bypassing the cache'
+        )
+        parser.add_argument(
+            '--limit', type=int, default=None,
+            help='Queue at most this many meetings'
+        )
+
+    def handle(self, *args, **options):
+        meetings = Meeting.objects.exclude(content__transcript__isnull=True).exclude(content__transcript='')
+        if not options['all']:
+            meetings = meetings.filter(content__summary_json__isnull=True)
+
+        ids = meetings.order_by('id').values_list('id', flat=True)
+        if options['limit']:
+            ids = ids[:options['limit']]
+
+        queued = 0
+        for meeting in Meeting.objects.filter(id__in=list(ids)).only('id'):
+            jobs.enqueue_once(
+                'summarize', meeting,
+                payload={'force': True} if options['all'] else None,
+                priority=Job.PRIORITY_BATCH
+            )
+            queued += 1
+
+        self.stdout.write(f"Queued {queued} meeting(s) for summarization at batch priority")
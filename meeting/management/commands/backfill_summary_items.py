@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from meeting import summary_items
+
+
+class Command(BaseCommand):
+    help = 'Copy action items, decisions and agenda topics out of every stored summary'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Meetings synced per transaction')
+        parser.add_argument('--database', default='default', help='Database alias to backfill')
+
+    def handle(self, *args, **options):
+        totals = [0, 0, 0, 0]
+        for counts in summary_items.backfill(options['batch_size'], using=options['database']):
+            totals = [total + count for total, count in zip(totals, counts)]
+            self.stdout.write(f"Synced {totals[0]} meeting(s)")
+        self.stdout.write(
+            f"Done: {totals[1]} action item(s), {totals[2]} decision(s), "
+            f"{totals[3]} agenda topic(s) from {totals[0]} meeting(s)"
+        )
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from meeting.benchmarks import load_all
+
+
+class Command(BaseCommand):
+    help = 'Run performance benchmarks (see meeting/benchmarks/)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help='Benchmarks to run (default: all)')
+        parser.add_argument('--list', action='store_true', help='List available benchmarks')
+        parser.add_argument('--quick', action='store_true', help='Use small inputs for a fast smoke run')
+
+    def handle(self, *args, **options):
+        benchmarks = load_all()
+
+        if options['list']:
+            for name in sorted(benchmarks):
+                self.stdout.write(name)
+            return
+
+        names = options['names'] or sorted(benchmarks)
+        unknown = [name for name in names if name not in benchmarks]
+        if unknown:
+            raise CommandError(f"Unknown benchmark(s): {', '.join(unknown)}. Use --list to see them.")
+
+        for name in names:
+            self.stdout.write(self.style.MIGRATE_HEADING(f'== {name}'))
+            started = time.perf_counter()
+            benchmarks[name](self.stdout, options['quick'])
+            self.stdout.write(f'({time.perf_counter() - started:.1f}s)\n')
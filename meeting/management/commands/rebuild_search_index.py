@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from meeting import search
+
+
+class Command(BaseCommand):
+    help = 'Recreate the full-text search index from every meeting'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Database alias to rebuild')
+
+    def handle(self, *args, **options):
+        indexed = search.rebuild(using=options['database'])
+        self.stdout.write(f"Indexed {indexed} meeting(s)")
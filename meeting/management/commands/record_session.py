@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from meeting.browser_pool import BrowserLease
+from meeting.models import RecordingSession
+from meeting.recorder_supervisor import run_session
+
+
+class Command(BaseCommand):
+    help = 'Record a single queued meeting session (started by run_recorder_supervisor)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('session_id', type=int)
+        parser.add_argument(
+            '--browser', type=BrowserLease.from_json,
+            help='Browser session lent by the supervisor, as JSON'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            session = RecordingSession.objects.select_related('meeting').get(pk=options['session_id'])
+        except RecordingSession.DoesNotExist:
+            raise CommandError(f"Recording session {options['session_id']} does not exist")
+
+        result = run_session(session, browser=options['browser'])
+        if not result.get('success'):
+            self.stderr.write(result.get('error', 'Recording failed'))
@@ -0,0 +1,32 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from meeting.recorder_supervisor import RecorderSupervisor
+
+
+class Command(BaseCommand):
+    help = 'Admit queued meeting recordings up to a concurrency cap and supervise the recorder processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-concurrent', type=int, default=getattr(settings, 'RECORDER_MAX_CONCURRENT', 2),
+            help='Maximum number of meetings recorded at the same time'
+        )
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Exit once no sessions are queued or recording'
+        )
+
+    def handle(self, *args, **options):
+        supervisor = RecorderSupervisor(max_concurrent=options['max_concurrent'])
+
+        # Recorder processes run in their own session and are adopted on restart,
+        # so stopping the supervisor does not interrupt recordings in progress
+        signal.signal(signal.SIGTERM, lambda *args: supervisor.stop())
+        signal.signal(signal.SIGINT, lambda *args: supervisor.stop())
+
+        self.stdout.write(f"Recorder supervisor running with {supervisor.max_concurrent} slot(s)")
+        supervisor.run(stop_when_idle=options['burst'])
+        self.stdout.write('Recorder supervisor stopped')
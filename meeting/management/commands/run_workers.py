@@ -0,0 +1,86 @@
+import logging
+import multiprocessing
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from meeting.jobs import Worker
+
+logger = logging.getLogger(__name__)
+
+
+def _worker_main(kinds, burst):
+    worker = Worker(kinds=kinds)
+    signal.signal(signal.SIGTERM, lambda *args: worker.stop())
+    signal.signal(signal.SIGINT, lambda *args: worker.stop())
+    worker.run(stop_when_empty=burst)
+
+
+class Command(BaseCommand):
+    help = 'Run background workers that process queued transcription, summarization and recording jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=getattr(settings, 'JOB_WORKERS', 2),
+            help='Number of worker processes to run'
+        )
+        parser.add_argument(
+            '--kind', action='append', dest='kinds',
+            help='Only process jobs of this kind (can be repeated)'
+        )
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Exit once the queue is empty instead of waiting for new jobs'
+        )
+
+    def handle(self, *args, **options):
+        num_workers = max(1, options['workers'])
+        kinds = options['kinds']
+        burst = options['burst']
+
+        if num_workers == 1:
+            self.stdout.write('Starting 1 worker')
+            _worker_main(kinds, burst)
+            return
+
+        # Children must not inherit the parent's open database connections
+        connections.close_all()
+
+        self.stdout.write(f'Starting {num_workers} workers')
+        processes = [self._spawn(kinds, burst) for _ in range(num_workers)]
+        stopping = False
+
+        def shutdown(signum, frame):
+            nonlocal stopping
+            stopping = True
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+
+        while processes:
+            for process in list(processes):
+                process.join(timeout=1)
+                if process.is_alive():
+                    continue
+
+                if stopping or (burst and process.exitcode == 0):
+                    processes.remove(process)
+                    continue
+
+                # Jobs leased by a crashed worker are recovered once their lease expires
+                logger.error(f'Worker pid {process.pid} exited with code {process.exitcode}, restarting')
+                processes[processes.index(process)] = self._spawn(kinds, burst)
+                time.sleep(1)
+
+        self.stdout.write('All workers stopped')
+
+    def _spawn(self, kinds, burst):
+        process = multiprocessing.Process(target=_worker_main, args=(kinds, burst), daemon=False)
+        process.start()
+        return process
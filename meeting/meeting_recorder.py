@@ -54,7 +54,7 @@ class MeetingRecorder:
         return None
     
     @staticmethod
-    def join_and_record_meeting(meeting_link, duration_minutes=60, output_file=None):
+    def join_and_record_meeting(meeting_link, duration_minutes=60, output_file=None, live=None, browser=None):
         """
         Join a meeting and record audio
         
@@ -62,6 +62,8 @@ class MeetingRecorder:
             meeting_link: URL of the meeting
             duration_minutes: How long to record
             output_file: Where to save the recording
+            live: Optional callable wrapping the recording's writer, e.g. LiveSession.wrap
+            browser: Optional BrowserLease of a warm browser from the supervisor's pool
             
         Returns:
             dict with recording status and file path
@@ -90,7 +92,7 @@ class MeetingRecorder:
         
         try:
             if platform == 'google_meet':
-                return MeetingRecorder._record_google_meet(meeting_info, duration_minutes, output_file)
+                return MeetingRecorder._record_google_meet(meeting_info, duration_minutes, output_file, live, browser)
             elif platform == 'zoom':
                 return MeetingRecorder._record_zoom(meeting_info, duration_minutes, output_file)
             elif platform == 'teams':
@@ -104,85 +106,73 @@ class MeetingRecorder:
             }
     
     @staticmethod
-    def _record_google_meet(meeting_info, duration_minutes, output_file):
+    def _record_google_meet(meeting_info, duration_minutes, output_file, live=None, browser=None):
         """
         Record Google Meet meeting using Selenium and PyAudio
         Requires: selenium, google-chrome, pyaudio
         """
         try:
-            from selenium import webdriver
-            from selenium.webdriver.common.by import By
-            from selenium.webdriver.support.ui import WebDriverWait
-            from selenium.webdriver.support import expected_conditions as EC
             import pyaudio
-            import wave
             import threading
-            
-            # Setup Chrome options
-            options = webdriver.ChromeOptions()
-            options.add_argument('--use-fake-ui-for-media-stream')
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
+            from .audio_capture import StreamingWavWriter, capture_stream
+            from .browser_pool import open_browser
+            from .recording_control import RecordingController
             
             # Initialize recording
             CHUNK = 1024
-            FORMAT = pyaudio.paFloat32
+            FORMAT = pyaudio.paInt16
             CHANNELS = 1
             RATE = 44100
             
             p = pyaudio.PyAudio()
-            stream = p.open(format=FORMAT, channels=CHANNELS, rate=RATE, 
-                          input=True, frames_per_buffer=CHUNK)
-            
-            frames = []
-            recording = True
-            
-            def record_audio():
-                """Record audio in background thread"""
-                while recording:
-                    try:
-                        data = stream.read(CHUNK, exception_on_overflow=False)
-                        frames.append(data)
-                    except Exception as e:
-                        logger.error(f"Audio recording error: {e}")
-            
-            # Start browser
-            driver = webdriver.Chrome(options=options)
-            driver.get(meeting_info['link'])
-            
-            # Start recording in background
-            record_thread = threading.Thread(target=record_audio)
-            record_thread.daemon = True
-            record_thread.start()
-            
-            # Wait for meeting to load and recording duration
-            import time
-            time.sleep(duration_minutes * 60)
-            
-            # Stop recording
-            recording = False
-            record_thread.join(timeout=5)
-            
-            # Save audio file
-            stream.stop_stream()
-            stream.close()
-            p.terminate()
-            
-            wf = wave.open(output_file, 'wb')
-            wf.setnchannels(CHANNELS)
-            wf.setsampwidth(p.get_sample_size(FORMAT))
-            wf.setframerate(RATE)
-            wf.writeframes(b''.join(frames))
-            wf.close()
-            
-            # Close browser
-            driver.quit()
+            stream = writer = None
+            try:
+                stream = p.open(format=FORMAT, channels=CHANNELS, rate=RATE, 
+                              input=True, frames_per_buffer=CHUNK)
+                
+                # Audio is streamed to disk as it arrives instead of being held in memory
+                writer = StreamingWavWriter(output_file, CHANNELS, p.get_sample_size(FORMAT), RATE, CHUNK)
+                writer.start()
+                if live:
+                    # Also transcribed in windows while the meeting goes on
+                    writer = live(writer)
+                
+                # Join in the warm browser leased from the pool, or start one
+                with open_browser(browser) as driver:
+                    driver.get(meeting_info['link'])
+                    
+                    # Record until the meeting ends, at most duration_minutes
+                    controller = RecordingController.from_settings(
+                        duration_minutes * 60, signals=[lambda: google_meet_end_signal(driver, controller.heard_speech)]
+                    ).attach(RATE, CHANNELS, p.get_sample_size(FORMAT))
+                    
+                    # Start recording in background
+                    record_thread = threading.Thread(
+                        target=capture_stream, args=(stream, writer, CHUNK, controller.running, controller)
+                    )
+                    record_thread.daemon = True
+                    record_thread.start()
+                    
+                    stop_reason = controller.wait()
+                    
+                    # Stop recording
+                    record_thread.join(timeout=5)
+            finally:
+                # Also when launching, joining or opening the stream fails, so
+                # the audio device and the output file are always released
+                if stream is not None:
+                    stream.stop_stream()
+                    stream.close()
+                p.terminate()
+                if writer is not None:
+                    writer.close()
             
             return {
                 'success': True,
                 'platform': 'google_meet',
                 'output_file': output_file,
-                'message': f'Successfully recorded Google Meet for {duration_minutes} minutes'
+                'stop_reason': stop_reason,
+                'message': f'Successfully recorded Google Meet for {controller.recorded_seconds / 60:.1f} minutes ({stop_reason})'
             }
         
         except ImportError as e:
@@ -225,14 +215,56 @@ class MeetingRecorder:
         }
 
 
+# Shown by Google Meet once the bot is no longer in a call
+GOOGLE_MEET_END_PHRASES = (
+    'The meeting has ended',
+    'You left the meeting',
+    "You've been removed from the meeting",
+    'Everyone has left the call',
+)
+# Also shown when the bot joins before anyone else, so only the end once someone has spoken
+GOOGLE_MEET_ALONE_PHRASES = (
+    "You're the only one here",
+)
+
+
+def google_meet_end_phrase(text, heard_speech=False):
+    """The end-of-meeting phrase on a Google Meet page with ``text``, or None"""
+    phrases = GOOGLE_MEET_END_PHRASES + (GOOGLE_MEET_ALONE_PHRASES if heard_speech else ())
+    for phrase in phrases:
+        if phrase in text:
+            return phrase
+    return None
+
+
+def google_meet_end_signal(driver, heard_speech=False):
+    """
+    Why the Google Meet page shows the call is over, or None while it is going
+    on. Being alone in the call only counts once ``heard_speech``.
+    """
+    from selenium.common.exceptions import InvalidSessionIdException, NoSuchWindowException, WebDriverException
+    from selenium.webdriver.common.by import By
+    
+    try:
+        text = driver.find_element(By.TAG_NAME, 'body').text
+    except (InvalidSessionIdException, NoSuchWindowException):
+        return 'browser window closed'
+    except WebDriverException:
+        # The page may be mid-navigation; check again next time
+        return None
+    phrase = google_meet_end_phrase(text, heard_speech)
+    return f'page says "{phrase}"' if phrase else None
+
+
 class AudioExtractor:
     """Extract audio from various media formats"""
     
     @staticmethod
-    def extract_audio_from_video(video_file, output_audio_file=None):
+    def extract_audio_from_video(video_file, output_audio_file=None, sample_rate=16000, channels=1):
         """
         Extract audio from video file using ffmpeg
         Supports: MP4, WebM, MKV, AVI, MOV, etc.
+        Writes 16 kHz mono PCM by default, which is all speech recognition uses
         """
         if output_audio_file is None:
             base = os.path.splitext(video_file)[0]
@@ -249,9 +281,8 @@ class AudioExtractor:
                 '-i', video_file,
                 '-vn',  # No video
                 '-acodec', 'pcm_s16le',  # Audio codec
-                '-ar', '44100',  # Sample rate
-                '-ac', '2',  # Channels
-                '-q:a', '9',  # Quality
+                '-ar', str(sample_rate),  # Sample rate
+                '-ac', str(channels),  # Channels
                 output_audio_file,
                 '-y'  # Overwrite output
             ]
@@ -287,9 +318,11 @@ class MeetingBotRecorder:
     Complete meeting bot that joins meetings and creates recordings
     """
     
-    def __init__(self, meeting_link, duration_minutes=60):
+    def __init__(self, meeting_link, duration_minutes=60, live=None, browser=None):
         self.meeting_link = meeting_link
         self.duration_minutes = duration_minutes
+        self.live = live
+        self.browser = browser
         self.recording_file = None
         self.audio_file = None
         self.transcript = None
@@ -298,7 +331,9 @@ class MeetingBotRecorder:
         """Start recording the meeting"""
         result = MeetingRecorder.join_and_record_meeting(
             self.meeting_link,
-            self.duration_minutes
+            self.duration_minutes,
+            live=self.live,
+            browser=self.browser
         )
         
         if result['success']:
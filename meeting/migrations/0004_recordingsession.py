@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-18 00:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meeting', '0003_job'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='job',
+            name='kind',
+            field=models.CharField(choices=[('process_meeting', 'Process Meeting'), ('summarize', 'Summarize')], max_length=50),
+        ),
+        migrations.CreateModel(
+            name='RecordingSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('duration_minutes', models.PositiveIntegerField(default=60)),
+                ('state', models.CharField(choices=[('queued', 'Queued'), ('recording', 'Recording'), ('completed', 'Completed'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('output_file', models.CharField(blank=True, max_length=500, null=True)),
+                ('host', models.CharField(blank=True, max_length=255, null=True)),
+                ('pid', models.PositiveIntegerField(blank=True, null=True)),
+                ('rss_kb', models.PositiveIntegerField(default=0)),
+                ('peak_rss_kb', models.PositiveIntegerField(default=0)),
+                ('cpu_seconds', models.FloatField(default=0)),
+                ('queued_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True)),
+                ('meeting', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recording_sessions', to='meeting.meeting')),
+            ],
+            options={
+                'ordering': ['queued_at', 'id'],
+                'indexes': [models.Index(fields=['state', 'queued_at'], name='meeting_rec_state_b435ad_idx')],
+            },
+        ),
+    ]
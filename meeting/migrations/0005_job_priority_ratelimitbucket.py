@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-18 00:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meeting', '0004_recordingsession'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RateLimitBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=100, unique=True)),
+                ('tokens', models.FloatField()),
+                ('updated_at', models.FloatField()),
+            ],
+        ),
+        migrations.AlterModelOptions(
+            name='job',
+            options={'ordering': ['priority', 'run_after', 'id']},
+        ),
+        migrations.RemoveIndex(
+            model_name='job',
+            name='meeting_job_status_214c42_idx',
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='priority',
+            field=models.SmallIntegerField(choices=[(0, 'Interactive'), (5, 'Normal'), (10, 'Batch')], default=5),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'priority', 'run_after'], name='meeting_job_status_37aee5_idx'),
+        ),
+    ]
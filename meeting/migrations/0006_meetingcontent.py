@@ -0,0 +1,61 @@
+# Generated by Django 4.2.7 on 2026-10-18 00:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+BATCH_SIZE = 500
+
+
+def copy_content(apps, schema_editor):
+    Meeting = apps.get_model('meeting', 'Meeting')
+    MeetingContent = apps.get_model('meeting', 'MeetingContent')
+    db = schema_editor.connection.alias
+    rows = (
+        Meeting.objects.using(db).exclude(transcript__isnull=True, summary_json__isnull=True)
+        .values_list('id', 'transcript', 'summary_json')
+        .iterator(chunk_size=BATCH_SIZE)
+    )
+    batch = []
+    for meeting_id, transcript, summary_json in rows:
+        batch.append(MeetingContent(meeting_id=meeting_id, transcript=transcript, summary_json=summary_json))
+        if len(batch) >= BATCH_SIZE:
+            MeetingContent.objects.using(db).bulk_create(batch)
+            batch = []
+    MeetingContent.objects.using(db).bulk_create(batch)
+
+
+def restore_content(apps, schema_editor):
+    Meeting = apps.get_model('meeting', 'Meeting')
+    MeetingContent = apps.get_model('meeting', 'MeetingContent')
+    db = schema_editor.connection.alias
+    for content in MeetingContent.objects.using(db).iterator(chunk_size=BATCH_SIZE):
+        Meeting.objects.using(db).filter(id=content.meeting_id).update(
+            transcript=content.transcript, summary_json=content.summary_json
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meeting', '0005_job_priority_ratelimitbucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MeetingContent',
+            fields=[
+                ('meeting', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='content', serialize=False, to='meeting.meeting')),
+                ('transcript', models.TextField(blank=True, null=True)),
+                ('summary_json', models.JSONField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RunPython(copy_content, restore_content),
+        migrations.RemoveField(
+            model_name='meeting',
+            name='summary_json',
+        ),
+        migrations.RemoveField(
+            model_name='meeting',
+            name='transcript',
+        ),
+    ]
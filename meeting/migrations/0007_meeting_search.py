@@ -0,0 +1,128 @@
+import logging
+
+from django.db import migrations, transaction
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+# Frozen copies of meeting.search as of this migration; later changes to the
+# index belong in new migrations (or rebuild_search_index), not here.
+TABLE = 'meeting_search'
+
+FIELDS = ['title', 'meeting_type', 'description', 'summary', 'action_items', 'decisions', 'transcript']
+
+SQLITE_WEIGHTS = [10.0, 2.0, 3.0, 4.0, 4.0, 4.0, 1.0]
+POSTGRES_WEIGHTS = ['A', 'C', 'C', 'B', 'B', 'B', 'D']
+
+MEETING_TYPES = {
+    'team_meeting': 'Team Meeting',
+    'interview': 'Interview',
+    'client_call': 'Client Call',
+    'standup': 'Standup',
+    'other': 'Other',
+}
+
+SQLITE_CREATE = [
+    (f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+     f"{', '.join(FIELDS)}, tokenize='porter unicode61')", None),
+    (f"INSERT INTO {TABLE} ({TABLE}, rank) VALUES ('rank', %s)",
+     [f"bm25({', '.join(str(weight) for weight in SQLITE_WEIGHTS)})"]),
+]
+SQLITE_INSERT = f"INSERT INTO {TABLE} (rowid, {', '.join(FIELDS)}) VALUES (%s{', %s' * len(FIELDS)})"
+
+POSTGRES_CREATE = [
+    (f"CREATE TABLE IF NOT EXISTS {TABLE} ("
+     f"meeting_id bigint PRIMARY KEY REFERENCES meeting_meeting (id) ON DELETE CASCADE, "
+     f"{', '.join(f'{field} text' for field in FIELDS)}, document tsvector NOT NULL)", None),
+    (f"CREATE INDEX IF NOT EXISTS {TABLE}_document ON {TABLE} USING GIN (document)", None),
+]
+POSTGRES_INSERT = (
+    f"INSERT INTO {TABLE} (meeting_id, {', '.join(FIELDS)}, document) "
+    f"SELECT v.meeting_id, {', '.join(f'v.{field}' for field in FIELDS)}, "
+    + ' || '.join(
+        f"setweight(to_tsvector(%s::regconfig, coalesce(v.{field}, '')), '{weight}')"
+        for field, weight in zip(FIELDS, POSTGRES_WEIGHTS)
+    )
+    + f" FROM (VALUES (%s::bigint{', %s::text' * len(FIELDS)})) AS v (meeting_id, {', '.join(FIELDS)}) WHERE true "
+    f"ON CONFLICT (meeting_id) DO NOTHING"
+)
+
+
+def _texts(items):
+    texts = []
+    for item in items or []:
+        if isinstance(item, dict):
+            texts.append(' '.join(str(value) for value in item.values() if value))
+        elif item:
+            texts.append(str(item))
+    return texts
+
+
+def _document(meeting):
+    # Missing content raises an AttributeError subclass
+    content = getattr(meeting, 'content', None)
+    summary = content.summary_json if content and isinstance(content.summary_json, dict) else {}
+    return [
+        meeting.title or '',
+        f"{meeting.meeting_type} {MEETING_TYPES.get(meeting.meeting_type, '')}".strip(),
+        meeting.description or '',
+        '\n'.join(
+            [summary.get('summary') or ''] + _texts(summary.get('key_points')) + _texts(summary.get('agenda'))
+        ).strip(),
+        '\n'.join(_texts(summary.get('action_items'))),
+        '\n'.join(_texts(summary.get('decisions'))),
+        (content.transcript if content else None) or '',
+    ]
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        statements, insert, prefix = SQLITE_CREATE, SQLITE_INSERT, []
+    elif connection.vendor == 'postgresql':
+        from django.conf import settings
+
+        statements, insert = POSTGRES_CREATE, POSTGRES_INSERT
+        prefix = [getattr(settings, 'SEARCH_CONFIG', 'english')] * len(FIELDS)
+    else:
+        return
+
+    try:
+        # Savepoint, so a failed CREATE leaves the migration's transaction usable
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            for sql, sql_params in statements:
+                cursor.execute(sql, sql_params)
+    except Exception as e:
+        # e.g. SQLite compiled without FTS5
+        logger.warning(f"Full-text search unavailable, falling back to icontains: {e}")
+        return
+
+    Meeting = apps.get_model('meeting', 'Meeting')
+    meetings = Meeting.objects.using(connection.alias).select_related('content').iterator(chunk_size=BATCH_SIZE)
+    batch = []
+    with connection.cursor() as cursor:
+        for meeting in meetings:
+            batch.append(prefix + [meeting.pk] + _document(meeting))
+            if len(batch) >= BATCH_SIZE:
+                cursor.executemany(insert, batch)
+                batch = []
+        if batch:
+            cursor.executemany(insert, batch)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meeting', '0006_meetingcontent'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
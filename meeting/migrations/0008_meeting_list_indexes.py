@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meeting', '0007_meeting_search'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='meeting',
+            name='meeting_mee_created_45d315_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='meeting',
+            name='meeting_mee_meeting_d4fdca_idx',
+        ),
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['-created_at', '-id'], name='meeting_mee_created_22ec79_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['meeting_type', '-created_at', '-id'], name='meeting_mee_meeting_8cd006_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='meeting_mee_status_b9a1dc_idx'),
+        ),
+    ]
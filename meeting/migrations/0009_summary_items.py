@@ -0,0 +1,63 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meeting', '0008_meeting_list_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Decision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('text', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('meeting', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='meeting.meeting')),
+            ],
+            options={
+                'ordering': ['meeting', 'position'],
+                'indexes': [models.Index(fields=['meeting', 'position'], name='meeting_dec_meeting_1efa46_idx'), models.Index(fields=['-created_at'], name='meeting_dec_created_65a08c_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AgendaTopic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('topic', models.CharField(max_length=500)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('meeting', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='meeting.meeting')),
+            ],
+            options={
+                'ordering': ['meeting', 'position'],
+                'indexes': [models.Index(fields=['meeting', 'position'], name='meeting_age_meeting_976949_idx'), models.Index(fields=['-created_at'], name='meeting_age_created_25dd95_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ActionItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('task', models.TextField()),
+                ('owner', models.CharField(blank=True, max_length=255, null=True)),
+                ('due_date', models.DateField(blank=True, null=True)),
+                ('due_text', models.CharField(blank=True, max_length=100, null=True)),
+                ('status', models.CharField(choices=[('open', 'Open'), ('done', 'Done')], default='open', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('meeting', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='meeting.meeting')),
+            ],
+            options={
+                'ordering': ['meeting', 'position'],
+                'indexes': [models.Index(fields=['meeting', 'position'], name='meeting_act_meeting_2e5ce0_idx'), models.Index(django.db.models.functions.text.Lower('owner'), models.F('status'), name='meeting_actionitem_owner_idx'), models.Index(fields=['status', 'due_date'], name='meeting_act_status_5402e9_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meeting', '0011_uploads'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meeting',
+            name='audio_channels',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='meeting',
+            name='audio_codec',
+            field=models.CharField(blank=True, default='', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='meeting',
+            name='audio_duration',
+            field=models.FloatField(blank=True, help_text='Seconds', null=True),
+        ),
+        migrations.AddField(
+            model_name='meeting',
+            name='audio_format',
+            field=models.CharField(blank=True, default='', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='meeting',
+            name='audio_sample_rate',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
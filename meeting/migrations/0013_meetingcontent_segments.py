@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meeting', '0012_meeting_audio_info'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meetingcontent',
+            name='segments',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
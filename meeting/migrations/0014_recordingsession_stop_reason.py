@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meeting', '0013_meetingcontent_segments'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recordingsession',
+            name='stop_reason',
+            field=models.CharField(blank=True, choices=[('duration', 'Duration reached'), ('silence', 'Silence'), ('no_speech', 'Nobody spoke'), ('meeting_ended', 'Meeting ended'), ('stream_ended', 'Audio stream ended')], default='', max_length=20),
+        ),
+    ]
@@ -1,6 +1,11 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils import timezone
 import json
+import uuid
+
+from .summary_schema import EMPTY as EMPTY_SUMMARY, Summary
+from .transcript_segments import SegmentTable
 
 
 class Meeting(models.Model):
@@ -19,19 +24,22 @@ class Meeting(models.Model):
     # Meeting link for online meetings (Google Meet, Zoom, Teams, etc.)
     meeting_link = models.URLField(blank=True, null=True, help_text="Google Meet, Zoom, or Teams link")
     
-    # Transcript and file handling
-    transcript = models.TextField(blank=True, null=True)
+    # File handling; the transcript itself lives in MeetingContent
     transcript_file = models.FileField(upload_to='transcripts/', blank=True, null=True)
     recording_file = models.FileField(upload_to='recordings/', blank=True, null=True)
     
+    # Probed from the recording's headers when it arrives (see audio_probe)
+    audio_format = models.CharField(max_length=10, blank=True, default='')
+    audio_codec = models.CharField(max_length=20, blank=True, default='')
+    audio_duration = models.FloatField(blank=True, null=True, help_text="Seconds")
+    audio_sample_rate = models.PositiveIntegerField(blank=True, null=True)
+    audio_channels = models.PositiveSmallIntegerField(blank=True, null=True)
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     meeting_date = models.DateTimeField(default=timezone.now)
     
-    # AI Summary (stored as JSON)
-    summary_json = models.JSONField(null=True, blank=True)
-    
     # Processing status
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -45,44 +53,389 @@ class Meeting(models.Model):
     class Meta:
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['-created_at']),
-            models.Index(fields=['meeting_type']),
+            # Match the list's (created_at, id) keyset order, optionally filtered by type or status
+            models.Index(fields=['-created_at', '-id']),
+            models.Index(fields=['meeting_type', '-created_at', '-id']),
+            models.Index(fields=['status', '-created_at', '-id']),
         ]
     
+    # Stored on MeetingContent but read, assigned and saved as if they were columns here
+    CONTENT_FIELDS = ('transcript', 'summary_json', 'segments')
+    
     def __str__(self):
         return f"{self.title} - {self.get_meeting_type_display()}"
     
+    def _get_content(self, create=False):
+        try:
+            return self.content
+        except MeetingContent.DoesNotExist:
+            if not create:
+                return None
+            self.content = MeetingContent(meeting=self)
+            return self.content
+    
+    @property
+    def transcript(self):
+        content = self._get_content()
+        return content.transcript if content else None
+    
+    @transcript.setter
+    def transcript(self, value):
+        content = self._get_content(create=True)
+        if content.segments and value != content.transcript:
+            # Segments describe the old text
+            content.segments = None
+        content.transcript = value
+    
+    @property
+    def segments(self):
+        """
+        Timestamped, speaker-labelled transcript as a ``SegmentTable``, parsed
+        once per stored value; empty when the transcript was not transcribed
+        here or cannot be read.
+        """
+        content = self._get_content()
+        raw = content.segments if content else None
+        cached = self.__dict__.get('_segments')
+        if cached is None or cached[0] is not raw:
+            try:
+                table = SegmentTable.from_bytes(raw) if raw else SegmentTable()
+            except ValueError:
+                table = SegmentTable()
+            cached = self.__dict__['_segments'] = (raw, table)
+        return cached[1]
+    
+    @segments.setter
+    def segments(self, table):
+        content = self._get_content(create=True)
+        content.segments = table.to_bytes() if table else None
+        self.__dict__['_segments'] = (content.segments, table or SegmentTable())
+    
+    @property
+    def summary_input(self):
+        """What summaries are generated from: the transcript, with times and speakers when they are known"""
+        segments = self.segments
+        return segments.as_text() if segments.has_speakers else self.transcript
+    
+    @property
+    def summary_json(self):
+        """AI summary (stored as JSON)"""
+        content = self._get_content()
+        return content.summary_json if content else None
+    
+    @summary_json.setter
+    def summary_json(self, value):
+        """Validated and stored in the current schema; raises ValueError for malformed summaries"""
+        self._get_content(create=True).summary_json = Summary.normalize(value)
+    
+    @property
+    def summary_data(self):
+        """
+        ``summary_json`` parsed into a ``Summary``, cached until a different
+        summary is assigned or loaded. Unreadable stored summaries are empty.
+        """
+        raw = self.summary_json
+        cached = self.__dict__.get('_summary_data')
+        if cached is None or cached[0] is not raw:
+            try:
+                parsed = Summary.from_json(raw)
+            except ValueError:
+                parsed = EMPTY_SUMMARY
+            cached = self.__dict__['_summary_data'] = (raw, parsed)
+        return cached[1]
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        save_content = update_fields is None or any(f in self.CONTENT_FIELDS for f in update_fields)
+        if update_fields is not None:
+            kwargs['update_fields'] = [f for f in update_fields if f not in self.CONTENT_FIELDS]
+            # updated_at versions the content too (ETags, response cache)
+            if save_content and 'updated_at' not in kwargs['update_fields']:
+                kwargs['update_fields'].append('updated_at')
+        
+        super().save(*args, **kwargs)
+        
+        # Only content that was loaded or assigned can have changed
+        if save_content and Meeting.content.is_cached(self):
+            content = self._get_content()
+            if content is not None:
+                content.meeting = self
+                content.save()
+    
     @property
     def summary(self):
-        """Extract summary from JSON"""
-        if self.summary_json:
-            return self.summary_json.get('summary', '')
-        return ''
+        return self.summary_data.summary
     
     @property
     def key_points(self):
-        """Extract key points from JSON"""
-        if self.summary_json:
-            return self.summary_json.get('key_points', [])
-        return []
+        return self.summary_data.key_points
     
     @property
     def decisions(self):
-        """Extract decisions from JSON"""
-        if self.summary_json:
-            return self.summary_json.get('decisions', [])
-        return []
+        return self.summary_data.decisions
     
     @property
     def action_items(self):
-        """Extract action items from JSON"""
-        if self.summary_json:
-            return self.summary_json.get('action_items', [])
-        return []
+        return self.summary_data.action_items
     
     @property
     def agenda(self):
-        """Extract agenda from JSON"""
-        if self.summary_json:
-            return self.summary_json.get('agenda', [])
-        return []
+        return self.summary_data.agenda
+
+
+class MeetingContent(models.Model):
+    """
+    Transcript and summary of a meeting. Kept off the ``Meeting`` row so
+    list queries and the admin changelist only read narrow rows.
+    """
+
+    meeting = models.OneToOneField(Meeting, on_delete=models.CASCADE, primary_key=True, related_name='content')
+    transcript = models.TextField(blank=True, null=True)
+    summary_json = models.JSONField(null=True, blank=True)
+    # transcript_segments.SegmentTable.to_bytes()
+    segments = models.BinaryField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Content of {self.meeting_id}"
+
+
+class ActionItem(models.Model):
+    """An action item from a meeting's summary, queryable across meetings"""
+
+    STATUS_CHOICES = [
+        ('open', 'Open'),
+        ('done', 'Done'),
+    ]
+
+    meeting = models.ForeignKey(Meeting, on_delete=models.CASCADE)
+    # Order within the summary
+    position = models.PositiveIntegerField(default=0)
+    task = models.TextField()
+    owner = models.CharField(max_length=255, blank=True, null=True)
+    due_date = models.DateField(blank=True, null=True)
+    # Due date as the summary gave it, e.g. "next Friday"
+    due_text = models.CharField(max_length=100, blank=True, null=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='open')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['meeting', 'position']
+        indexes = [
+            models.Index(fields=['meeting', 'position']),
+            # Owner lookups are case-insensitive
+            models.Index(Lower('owner'), 'status', name='meeting_actionitem_owner_idx'),
+            models.Index(fields=['status', 'due_date']),
+        ]
+
+    def __str__(self):
+        return self.task[:80]
+
+
+class Decision(models.Model):
+    """A decision from a meeting's summary"""
+
+    meeting = models.ForeignKey(Meeting, on_delete=models.CASCADE)
+    position = models.PositiveIntegerField(default=0)
+    text = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['meeting', 'position']
+        indexes = [
+            models.Index(fields=['meeting', 'position']),
+            models.Index(fields=['-created_at']),
+        ]
+
+    def __str__(self):
+        return self.text[:80]
+
+
+class AgendaTopic(models.Model):
+    """An agenda topic from a meeting's summary"""
+
+    meeting = models.ForeignKey(Meeting, on_delete=models.CASCADE)
+    position = models.PositiveIntegerField(default=0)
+    topic = models.CharField(max_length=500)
+    description = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['meeting', 'position']
+        indexes = [
+            models.Index(fields=['meeting', 'position']),
+            models.Index(fields=['-created_at']),
+        ]
+
+    def __str__(self):
+        return self.topic[:80]
+
+
+class Job(models.Model):
+    """Background work item processed by ``manage.py run_workers``"""
+
+    KIND_CHOICES = [
+        ('process_meeting', 'Process Meeting'),
+        ('summarize', 'Summarize'),
+    ]
+
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    # Lower values run first and are served first by the provider rate limiter
+    PRIORITY_INTERACTIVE = 0
+    PRIORITY_NORMAL = 5
+    PRIORITY_BATCH = 10
+    PRIORITY_CHOICES = [
+        (PRIORITY_INTERACTIVE, 'Interactive'),
+        (PRIORITY_NORMAL, 'Normal'),
+        (PRIORITY_BATCH, 'Batch'),
+    ]
+
+    kind = models.CharField(max_length=50, choices=KIND_CHOICES)
+    meeting = models.ForeignKey(Meeting, on_delete=models.CASCADE, related_name='jobs', null=True, blank=True)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    priority = models.SmallIntegerField(choices=PRIORITY_CHOICES, default=PRIORITY_NORMAL)
+
+    # Retry bookkeeping
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, null=True)
+
+    # Lease held by the worker currently running the job
+    locked_by = models.CharField(max_length=255, blank=True, null=True)
+    lease_expires_at = models.DateTimeField(blank=True, null=True)
+    heartbeat_at = models.DateTimeField(blank=True, null=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['priority', 'run_after', 'id']
+        indexes = [
+            models.Index(fields=['status', 'priority', 'run_after']),
+            models.Index(fields=['status', 'lease_expires_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.pk} ({self.status})"
+
+
+class RecordingSession(models.Model):
+    """A bot recording of an online meeting, run by ``manage.py run_recorder_supervisor``"""
+
+    STATE_CHOICES = [
+        ('queued', 'Queued'),
+        ('recording', 'Recording'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    # Why the recording stopped; see recording_control
+    STOP_REASON_CHOICES = [
+        ('duration', 'Duration reached'),
+        ('silence', 'Silence'),
+        ('no_speech', 'Nobody spoke'),
+        ('meeting_ended', 'Meeting ended'),
+        ('stream_ended', 'Audio stream ended'),
+    ]
+
+    meeting = models.ForeignKey(Meeting, on_delete=models.CASCADE, related_name='recording_sessions')
+    duration_minutes = models.PositiveIntegerField(default=60)
+    state = models.CharField(max_length=20, choices=STATE_CHOICES, default='queued')
+    error = models.TextField(blank=True, null=True)
+    output_file = models.CharField(max_length=500, blank=True, null=True)
+    stop_reason = models.CharField(max_length=20, choices=STOP_REASON_CHOICES, blank=True, default='')
+
+    # Recorder process running the session
+    host = models.CharField(max_length=255, blank=True, null=True)
+    pid = models.PositiveIntegerField(blank=True, null=True)
+
+    # Resource accounting
+    rss_kb = models.PositiveIntegerField(default=0)
+    peak_rss_kb = models.PositiveIntegerField(default=0)
+    cpu_seconds = models.FloatField(default=0)
+
+    queued_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    heartbeat_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['queued_at', 'id']
+        indexes = [
+            models.Index(fields=['state', 'queued_at']),
+        ]
+
+    def __str__(self):
+        return f"Recording #{self.pk} of {self.meeting_id} ({self.state})"
+
+
+class RateLimitBucket(models.Model):
+    """Token bucket shared by all processes when ``LLM_RATE_LIMIT_BACKEND`` is 'database'"""
+
+    key = models.CharField(max_length=100, unique=True)
+    tokens = models.FloatField()
+    # Unix time of the last refill; also the version checked by conditional updates
+    updated_at = models.FloatField()
+
+    def __str__(self):
+        return f"{self.key}: {self.tokens:.1f}"
+
+
+class StatusEvent(models.Model):
+    """
+    A published meeting status change, read by every process's event poller
+    when ``EVENTS_BACKEND`` is 'database'. Rows are pruned after
+    ``EVENTS_RETENTION_SECONDS``.
+    """
+
+    meeting_id = models.BigIntegerField()
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.meeting_id}: {self.payload.get('status')}"
+
+
+class Upload(models.Model):
+    """
+    A recording uploaded in chunks through ``/api/uploads/``. Chunks are
+    appended to a part file; finalizing it creates the meeting.
+    """
+
+    STATE_CHOICES = [
+        ('uploading', 'Uploading'),
+        ('completed', 'Completed'),
+        ('aborted', 'Aborted'),
+    ]
+
+    # Random, so knowing an upload's URL is what allows writing to it
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    # Bytes received and verified so far; the offset the next chunk must start at
+    offset = models.BigIntegerField(default=0)
+    state = models.CharField(max_length=20, choices=STATE_CHOICES, default='uploading')
+    # Title, meeting_type, description and meeting_date of the meeting to create
+    meeting_fields = models.JSONField(default=dict)
+    meeting = models.ForeignKey(Meeting, on_delete=models.SET_NULL, related_name='uploads', null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['state', 'updated_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size}, {self.state})"
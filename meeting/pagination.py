@@ -0,0 +1,47 @@
+"""
+Pagination
+Cursor (keyset) pagination for meeting lists. Each page continues from the
+last row's ``created_at`` instead of skipping ``OFFSET`` rows, so deep pages
+cost the same as the first. ``id`` breaks ties between equal timestamps.
+"""
+
+from collections import OrderedDict
+
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+
+class MeetingCursorPagination(CursorPagination):
+    """
+    Newest first by ``(created_at, id)``. Responses include an exact ``count``
+    unless the client passes ``?count=false``, which skips the ``COUNT(*)``.
+    """
+
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    count_query_param = 'count'
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            ordering += ('-id' if ordering[0].startswith('-') else 'id',)
+        return ordering
+
+    def include_count(self, request):
+        return request.query_params.get(self.count_query_param, '').lower() not in ('0', 'false', 'no')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = queryset.count() if self.include_count(request) else None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        fields = [('next', self.get_next_link()), ('previous', self.get_previous_link()), ('results', data)]
+        if self.count is not None:
+            fields.insert(0, ('count', self.count))
+        return Response(OrderedDict(fields))
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count'] = {'type': 'integer', 'example': 123}
+        return response_schema
@@ -0,0 +1,412 @@
+"""
+LLM Provider Clients
+One long-lived client per provider and process. Clients keep pooled HTTP
+connections between calls, enforce a per-provider timeout and offer both a
+blocking ``complete()`` and an asyncio ``acomplete()``.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+
+try:
+    import openai
+except ImportError:
+    openai = None
+
+try:
+    import google.generativeai as genai
+except ImportError:
+    genai = None
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
+
+from . import audio_probe
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = "You are a meeting summarization expert. Analyze meeting transcripts and provide structured summaries."
+
+
+class ProviderError(Exception):
+    """A provider call failed or timed out"""
+
+
+class ProviderClient:
+    """Base class for provider clients"""
+
+    name = None
+    summary_model = None
+    transcription_model = None
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout or getattr(settings, f'{self.name.upper()}_TIMEOUT_SECONDS', 60)
+
+    def complete(self, prompt):
+        raise NotImplementedError
+
+    async def acomplete(self, prompt):
+        """Default async implementation: run ``complete`` in the default executor"""
+        loop = asyncio.get_running_loop()
+        return await asyncio.wait_for(loop.run_in_executor(None, self.complete, prompt), self.timeout)
+
+    def stream(self, prompt):
+        """Yield the reply text in pieces as the provider produces it (whole reply by default)"""
+        yield self.complete(prompt)
+
+    def transcribe(self, audio_file_path, timestamps=False):
+        """The file's transcript, or with ``timestamps`` a list of ``(start, end, text)`` in seconds"""
+        raise ProviderError(f"Transcription not supported for service: {self.name}")
+
+    def close(self):
+        pass
+
+
+class OpenAIClient(ProviderClient):
+    name = 'openai'
+    summary_model = 'gpt-3.5-turbo'
+    transcription_model = 'whisper-1'
+
+    def __init__(self, timeout=None):
+        super().__init__(timeout)
+        if not openai or not settings.OPENAI_API_KEY:
+            raise ValueError("OpenAI API key not configured")
+
+        # Both clients keep their own httpx connection pool for the life of the process
+        options = {
+            'api_key': settings.OPENAI_API_KEY,
+            'timeout': self.timeout,
+            'max_retries': getattr(settings, 'OPENAI_MAX_RETRIES', 2),
+        }
+        self.client = openai.OpenAI(**options)
+        self.async_client = openai.AsyncOpenAI(**options)
+
+    def _messages(self, prompt):
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ]
+
+    def complete(self, prompt):
+        try:
+            response = self.client.chat.completions.create(
+                model=self.summary_model,
+                messages=self._messages(prompt),
+                temperature=0.7,
+                max_tokens=1500
+            )
+            return response.choices[0].message.content
+        except Exception as e:
+            raise ProviderError(f"OpenAI API error: {str(e)}")
+
+    async def acomplete(self, prompt):
+        try:
+            response = await self.async_client.chat.completions.create(
+                model=self.summary_model,
+                messages=self._messages(prompt),
+                temperature=0.7,
+                max_tokens=1500
+            )
+            return response.choices[0].message.content
+        except Exception as e:
+            raise ProviderError(f"OpenAI API error: {str(e)}")
+
+    def stream(self, prompt):
+        try:
+            response = self.client.chat.completions.create(
+                model=self.summary_model,
+                messages=self._messages(prompt),
+                temperature=0.7,
+                max_tokens=1500,
+                stream=True
+            )
+            for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            raise ProviderError(f"OpenAI API error: {str(e)}")
+
+    def transcribe(self, audio_file_path, timestamps=False):
+        try:
+            # verbose_json carries segment timestamps; the pinned openai returns them as plain dicts
+            options = {'response_format': 'verbose_json'} if timestamps else {}
+            with open(audio_file_path, 'rb') as audio_file:
+                response = self.client.audio.transcriptions.create(
+                    model=self.transcription_model,
+                    file=audio_file,
+                    **options
+                )
+            if timestamps:
+                return [
+                    (_field(segment, 'start'), _field(segment, 'end'), _field(segment, 'text'))
+                    for segment in getattr(response, 'segments', None) or []
+                ]
+            return response.text
+        except Exception as e:
+            raise ProviderError(f"OpenAI transcription error: {str(e)}")
+
+    def close(self):
+        self.client.close()
+
+
+def _field(item, name):
+    return item[name] if isinstance(item, dict) else getattr(item, name)
+
+
+# Speech-to-Text encodings by (container, codec) from audio_probe
+GOOGLE_ENCODINGS = {
+    ('wav', 'pcm_s16le'): 'LINEAR16',
+    ('wav', 'pcm_mulaw'): 'MULAW',
+    ('flac', 'flac'): 'FLAC',
+    ('ogg', 'opus'): 'OGG_OPUS',
+    ('webm', 'opus'): 'WEBM_OPUS',
+}
+
+
+class GoogleClient(ProviderClient):
+    name = 'google'
+    summary_model = 'gemini-pro'
+    transcription_model = 'default'
+
+    def __init__(self, timeout=None):
+        super().__init__(timeout)
+        if not genai or not settings.GOOGLE_API_KEY:
+            raise ValueError("Google API key not configured")
+
+        # genai keeps one gRPC channel per process once configured
+        genai.configure(api_key=settings.GOOGLE_API_KEY)
+        self.model = genai.GenerativeModel(self.summary_model)
+        self._speech_client = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'LLM_POOL_MAXSIZE', 10),
+            thread_name_prefix='google-client'
+        )
+
+    def complete(self, prompt):
+        # The SDK has no per-call timeout, so run the call where we can stop waiting on it
+        future = self._executor.submit(self.model.generate_content, prompt)
+        try:
+            return future.result(timeout=self.timeout).text
+        except FutureTimeoutError:
+            raise ProviderError(f"Google API error: timed out after {self.timeout}s")
+        except Exception as e:
+            raise ProviderError(f"Google API error: {str(e)}")
+
+    async def acomplete(self, prompt):
+        try:
+            response = await asyncio.wait_for(self.model.generate_content_async(prompt), self.timeout)
+            return response.text
+        except asyncio.TimeoutError:
+            raise ProviderError(f"Google API error: timed out after {self.timeout}s")
+        except Exception as e:
+            raise ProviderError(f"Google API error: {str(e)}")
+
+    def stream(self, prompt):
+        try:
+            for chunk in self.model.generate_content(prompt, stream=True, request_options={'timeout': self.timeout}):
+                if chunk.text:
+                    yield chunk.text
+        except Exception as e:
+            raise ProviderError(f"Google API error: {str(e)}")
+
+    def transcribe(self, audio_file_path, timestamps=False):
+        try:
+            from google.cloud import speech
+
+            if self._speech_client is None:
+                self._speech_client = speech.SpeechClient()
+
+            # Declare what the file really is rather than assuming 16 kHz LINEAR16
+            info = audio_probe.probe(audio_file_path)
+            encoding = GOOGLE_ENCODINGS.get((info.format, info.codec), 'ENCODING_UNSPECIFIED')
+
+            with open(audio_file_path, 'rb') as audio_file:
+                content = audio_file.read()
+
+            audio = speech.RecognitionAudio(content=content)
+            config = speech.RecognitionConfig(
+                encoding=getattr(speech.RecognitionConfig.AudioEncoding, encoding),
+                sample_rate_hertz=info.sample_rate,
+                audio_channel_count=info.channels,
+                language_code="en-US",
+                enable_word_time_offsets=timestamps,
+            )
+
+            response = self._speech_client.recognize(config=config, audio=audio, timeout=self.timeout)
+
+            if timestamps:
+                # One segment per result, timed by its first and last words
+                segments, previous_end = [], 0.0
+                for result in response.results:
+                    alternative = result.alternatives[0]
+                    end = result.result_end_time.total_seconds()
+                    start = alternative.words[0].start_time.total_seconds() if alternative.words else previous_end
+                    if alternative.words:
+                        end = alternative.words[-1].end_time.total_seconds()
+                    segments.append((start, end, alternative.transcript))
+                    previous_end = end
+                return segments
+
+            transcript = ""
+            for result in response.results:
+                transcript += result.alternatives[0].transcript + " "
+
+            return transcript.strip()
+        except Exception as e:
+            raise ProviderError(f"Google transcription error: {str(e)}")
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+class HuggingFaceClient(ProviderClient):
+    name = 'huggingface'
+    summary_model = 'facebook/bart-large-cnn'
+
+    def __init__(self, timeout=None, api_url=None):
+        super().__init__(timeout)
+        if not requests or not settings.HUGGINGFACE_API_KEY:
+            raise ValueError("HuggingFace API key not configured")
+
+        self.api_url = (
+            api_url
+            or getattr(settings, 'HUGGINGFACE_API_URL', '')
+            or f"https://api-inference.huggingface.co/models/{self.summary_model}"
+        )
+        pool_size = getattr(settings, 'LLM_POOL_MAXSIZE', 10)
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.session.headers['Authorization'] = f"Bearer {settings.HUGGINGFACE_API_KEY}"
+
+    def complete(self, prompt):
+        try:
+            response = self.session.post(self.api_url, json={"inputs": prompt}, timeout=self.timeout)
+            result = response.json()
+        except Exception as e:
+            raise ProviderError(f"HuggingFace API error: {str(e)}")
+
+        if isinstance(result, list) and len(result) > 0:
+            return result[0].get('summary_text', '')
+        return str(result)
+
+    def close(self):
+        self.session.close()
+
+
+class FakeClient(ProviderClient):
+    """
+    Local deterministic provider backed by ``FakeLLM``. ``latency`` (seconds,
+    or a callable returning seconds) and ``error_rate`` inject delays and
+    failures for testing failover and hedging. ``stream()`` sends the reply
+    ``stream_chunk_chars`` at a time, ``stream_chunk_seconds`` apart.
+    """
+
+    name = 'fake'
+    summary_model = 'fake'
+    transcription_model = 'fake'
+
+    def __init__(self, timeout=None, latency=None, error_rate=None, seed=None,
+                 stream_chunk_chars=16, stream_chunk_seconds=None):
+        from .summarization import FakeLLM
+        super().__init__(timeout or 60)
+        self.llm = FakeLLM()
+        self.latency = getattr(settings, 'FAKE_LLM_LATENCY_SECONDS', 0) if latency is None else latency
+        self.error_rate = getattr(settings, 'FAKE_LLM_ERROR_RATE', 0) if error_rate is None else error_rate
+        self._random = random.Random(seed)
+        self.stream_chunk_chars = stream_chunk_chars
+        if stream_chunk_seconds is None:
+            stream_chunk_seconds = getattr(settings, 'FAKE_LLM_STREAM_CHUNK_SECONDS', 0)
+        self.stream_chunk_seconds = stream_chunk_seconds
+
+    def _first_token(self):
+        delay = self.latency() if callable(self.latency) else self.latency
+        if delay:
+            time.sleep(delay)
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise ProviderError("Fake provider error")
+
+    def _generation_seconds(self, reply):
+        return math.ceil(len(reply) / self.stream_chunk_chars) * self.stream_chunk_seconds
+
+    def complete(self, prompt):
+        self._first_token()
+        reply = self.llm(prompt)
+        # A blocking call returns once the whole reply has been generated
+        time.sleep(self._generation_seconds(reply))
+        return reply
+
+    async def acomplete(self, prompt):
+        await self._afirst_token()
+        reply = self.llm(prompt)
+        await asyncio.sleep(self._generation_seconds(reply))
+        return reply
+
+    async def _afirst_token(self):
+        delay = self.latency() if callable(self.latency) else self.latency
+        if delay:
+            await asyncio.sleep(delay)
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise ProviderError("Fake provider error")
+
+    def stream(self, prompt):
+        self._first_token()
+        reply = self.llm(prompt)
+        for i in range(0, len(reply), self.stream_chunk_chars):
+            if self.stream_chunk_seconds:
+                time.sleep(self.stream_chunk_seconds)
+            yield reply[i:i + self.stream_chunk_chars]
+
+
+CLIENT_CLASSES = {
+    'openai': OpenAIClient,
+    'google': GoogleClient,
+    'huggingface': HuggingFaceClient,
+    'fake': FakeClient,
+}
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(name):
+    """Return this process's client for provider ``name``, creating it on first use"""
+    client = _clients.get(name)
+    if client is None:
+        if name not in CLIENT_CLASSES:
+            raise ValueError(f"Unknown LLM provider: {name}")
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                client = _clients[name] = CLIENT_CLASSES[name]()
+    return client
+
+
+def reset_clients():
+    """Close and forget all clients (e.g. after settings change in tests)"""
+    with _clients_lock:
+        for client in _clients.values():
+            try:
+                client.close()
+            except Exception:
+                pass
+        _clients.clear()
+
+
+def _forget_clients_after_fork():
+    # Pooled connections must not be shared with a forked worker process
+    _clients.clear()
+
+
+os.register_at_fork(after_in_child=_forget_clients_after_fork)
@@ -0,0 +1,223 @@
+"""
+Provider Rate Limiting
+Token buckets for requests/minute and tokens/minute per LLM provider. Callers
+wait in a priority queue, so interactive requests are served before batch
+work; batch requests also leave part of each bucket untouched for requests
+from other processes. Buckets live in memory or, to share one budget between
+worker processes, in the database.
+"""
+
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import F
+
+from .models import Job, RateLimitBucket
+from .providers import ProviderError
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitTimeout(ProviderError):
+    """Waited longer than allowed for provider capacity"""
+
+
+class LocalBucketStore:
+    """Buckets for this process only"""
+
+    name = 'local'
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, requests):
+        """
+        Atomically take ``amount`` from every bucket in ``requests`` (a list of
+        ``(key, amount, capacity, per_second, reserve)``) if each would keep at
+        least ``reserve`` tokens. Returns 0 on success, otherwise the seconds
+        until that becomes possible.
+        """
+        with self._lock:
+            now = self.clock()
+            levels = {}
+            for key, _, capacity, per_second, _ in requests:
+                tokens, updated_at = self._buckets.get(key, (capacity, now))
+                levels[key] = min(capacity, tokens + (now - updated_at) * per_second)
+
+            wait = _wait_seconds(requests, levels)
+            if wait:
+                return wait
+            for key, amount, *_ in requests:
+                self._buckets[key] = (levels[key] - amount, now)
+            return 0
+
+
+class DatabaseBucketStore:
+    """
+    Buckets in ``RateLimitBucket`` rows, shared by every process using the
+    database. Each row is updated conditionally on the ``updated_at`` it was
+    read with, so concurrent takers cannot both spend the same tokens. No
+    transaction is held across the read, which SQLite cannot upgrade to a
+    write lock under contention.
+    """
+
+    name = 'database'
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+
+    def take(self, requests):
+        for _ in range(20):
+            now = self.clock()
+            rows = {}
+            for key, _, capacity, _, _ in requests:
+                rows[key], _ = RateLimitBucket.objects.get_or_create(
+                    key=key, defaults={'tokens': capacity, 'updated_at': now}
+                )
+
+            levels = {
+                key: min(capacity, rows[key].tokens + max(0.0, now - rows[key].updated_at) * per_second)
+                for key, _, capacity, per_second, _ in requests
+            }
+            wait = _wait_seconds(requests, levels)
+            if wait:
+                return wait
+
+            taken = []
+            for key, amount, *_ in requests:
+                if not RateLimitBucket.objects.filter(key=key, updated_at=rows[key].updated_at).update(
+                    tokens=levels[key] - amount, updated_at=now
+                ):
+                    break
+                taken.append((key, amount))
+            if len(taken) == len(requests):
+                return 0
+
+            # Another process got there first; give back what this attempt took and retry
+            for key, amount in taken:
+                RateLimitBucket.objects.filter(key=key).update(tokens=F('tokens') + amount)
+        return 0.05
+
+
+def _wait_seconds(requests, levels):
+    wait = 0.0
+    for key, amount, _, per_second, reserve in requests:
+        missing = amount + reserve - levels[key]
+        if missing > 0:
+            wait = max(wait, missing / per_second)
+    return wait
+
+
+STORES = {
+    'local': LocalBucketStore,
+    'database': DatabaseBucketStore,
+}
+
+
+class RateLimiter:
+    """
+    Requests/minute and tokens/minute limits for one provider. A limit of 0
+    disables that bucket. ``acquire`` blocks until the caller is at the head
+    of the priority queue and both buckets have room. ``period_seconds``
+    shortens the minute for simulations.
+    """
+
+    def __init__(self, name, rpm=None, tpm=None, store=None, batch_reserve=None, period_seconds=60):
+        self.name = name
+        self.rpm = getattr(settings, f'{name.upper()}_RPM', 0) if rpm is None else rpm
+        self.tpm = getattr(settings, f'{name.upper()}_TPM', 0) if tpm is None else tpm
+        self.store = store or STORES[getattr(settings, 'LLM_RATE_LIMIT_BACKEND', 'local')]()
+        if batch_reserve is None:
+            batch_reserve = getattr(settings, 'LLM_RATE_LIMIT_BATCH_RESERVE', 0.2)
+        self.batch_reserve = batch_reserve
+        self.period_seconds = period_seconds
+
+        self._waiters = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+
+    @property
+    def enabled(self):
+        return bool(self.rpm or self.tpm)
+
+    def _bucket_requests(self, tokens, priority):
+        # Batch work may not drain a bucket below the reserve kept for everyone else
+        reserve = self.batch_reserve if priority >= Job.PRIORITY_BATCH else 0
+        requests = []
+        for suffix, limit, amount in (('rpm', self.rpm, 1), ('tpm', self.tpm, tokens)):
+            if limit:
+                requests.append((
+                    f'{self.name}:{suffix}', min(amount, limit), limit, limit / self.period_seconds, limit * reserve
+                ))
+        return requests
+
+    def acquire(self, tokens=0, priority=Job.PRIORITY_NORMAL, timeout=None):
+        """Wait for capacity for one request of ``tokens`` tokens. Returns the seconds waited."""
+        if not self.enabled:
+            return 0.0
+
+        timeout = getattr(settings, 'LLM_RATE_LIMIT_TIMEOUT_SECONDS', 300) if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        ticket = (priority, next(self._counter))
+        requests = self._bucket_requests(tokens, priority)
+
+        with self._condition:
+            heapq.heappush(self._waiters, ticket)
+            self._condition.notify_all()
+            try:
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise RateLimitTimeout(f"{self.name} rate limit: no capacity within {timeout}s")
+
+                    if self._waiters[0] != ticket:
+                        self._condition.wait(remaining)
+                        continue
+
+                    wait = self.store.take(requests)
+                    if not wait:
+                        return time.monotonic() - started
+                    # Woken early if a more urgent caller arrives and takes over the head
+                    self._condition.wait(min(wait, remaining))
+            finally:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+
+    def queue_length(self):
+        with self._condition:
+            return len(self._waiters)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(name):
+    """This process's limiter for provider ``name``"""
+    limiter = _limiters.get(name)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.setdefault(name, RateLimiter(name))
+    return limiter
+
+
+def reset_limiters():
+    with _limiters_lock:
+        _limiters.clear()
+
+
+def _forget_limiters_after_fork():
+    # Waiter queues and conditions belong to the parent's threads
+    _limiters.clear()
+
+
+os.register_at_fork(after_in_child=_forget_limiters_after_fork)
@@ -0,0 +1,365 @@
+"""
+Recorder Supervisor
+Runs meeting bot recordings outside the web workers. Sessions are admitted
+from a FIFO queue up to a concurrency cap, each one runs in its own process
+(``manage.py record_session``) and its state and resource usage are persisted
+on ``RecordingSession`` so restarting the web server does not affect them.
+"""
+
+import logging
+import os
+import socket
+import sys
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Q
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .audio_capture import StreamingWavWriter, SyntheticAudioSource, capture_stream
+from .live_transcription import live_session
+from .browser_pool import BrowserPool
+from .meeting_recorder import MeetingBotRecorder
+from .recording_control import STREAM_ENDED, RecordingController
+from .models import RecordingSession, Meeting
+from . import audio_probe, events, jobs
+
+logger = logging.getLogger(__name__)
+
+
+class MeetingBotBackend:
+    """
+    Records with ``MeetingBotRecorder`` (Selenium + PyAudio) until the meeting
+    ends or the session's duration runs out, in the browser leased from the
+    supervisor's pool if there is one. With ``LIVE_TRANSCRIPTION`` on, the
+    result carries the ``LiveSession`` that transcribed the meeting as it was
+    recorded.
+    """
+
+    uses_browser = True
+
+    def record(self, session, browser=None):
+        live = live_session(session.meeting)
+        recorder = MeetingBotRecorder(
+            session.meeting.meeting_link, session.duration_minutes, live=live.wrap if live else None, browser=browser
+        )
+        result = recorder.record_meeting()
+        if not result['success']:
+            return result
+
+        audio_result = recorder.extract_audio()
+        output_file = recorder.audio_file or recorder.recording_file
+        stop_reason = result.get('stop_reason')
+        if audio_result and not audio_result['success']:
+            # Continue with recording file anyway
+            return {
+                'success': True,
+                'output_file': output_file,
+                'warning': f"Audio extraction failed: {audio_result.get('error', 'Unknown error')}",
+                'live': live,
+                'stop_reason': stop_reason,
+            }
+
+        return {'success': True, 'output_file': output_file, 'live': live, 'stop_reason': stop_reason}
+
+
+class FakeRecorderBackend:
+    """
+    Captures synthetic speech in real time instead of joining a meeting. Used
+    to exercise admission, queueing, end-of-meeting detection and live
+    transcription without Chrome or an audio device.
+    """
+
+    chunk_frames = 1024
+    uses_browser = False
+
+    def __init__(self, seconds=None, sample_rate=16000):
+        self.seconds = seconds if seconds is not None else getattr(settings, 'RECORDER_FAKE_SECONDS', 1)
+        self.sample_rate = sample_rate
+
+    def record(self, session, browser=None):
+        output_file = os.path.join(
+            settings.MEDIA_ROOT,
+            'recordings',
+            f"fake_{session.pk}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.wav"
+        )
+        live = live_session(session.meeting)
+
+        source = SyntheticAudioSource(
+            rate=self.sample_rate, pattern=[(8, 'speech'), (1.5, 'silence')], total_seconds=self.seconds, realtime=True
+        )
+        controller = RecordingController.from_settings(session.duration_minutes * 60).attach(self.sample_rate)
+        writer = StreamingWavWriter(output_file, 1, 2, self.sample_rate, self.chunk_frames).start()
+        if live:
+            writer = live.wrap(writer)
+        try:
+            capture_stream(source, writer, self.chunk_frames, controller.running, controller)
+        finally:
+            writer.close()
+        # The synthetic meeting ran out before anything stopped it
+        controller.stop(STREAM_ENDED)
+        return {'success': True, 'output_file': output_file, 'live': live, 'stop_reason': controller.stop_reason}
+
+
+def get_backend_class():
+    return import_string(getattr(settings, 'RECORDER_BACKEND', 'meeting.recorder_supervisor.MeetingBotBackend'))
+
+
+def get_backend():
+    return get_backend_class()()
+
+
+def submit(meeting, duration_minutes):
+    """Queue a recording session for the supervisor"""
+    return RecordingSession.objects.create(meeting=meeting, duration_minutes=duration_minutes)
+
+
+def queue_position(session):
+    """1-based position of a queued session in the admission queue"""
+    if session.state != 'queued':
+        return None
+    ahead = Q(queued_at__lt=session.queued_at) | Q(queued_at=session.queued_at, id__lte=session.id)
+    return RecordingSession.objects.filter(ahead, state='queued').count()
+
+
+def run_session(session, browser=None):
+    """
+    Record a session and hand the result to the job queue. Runs in the
+    recorder process; ``browser`` is the ``BrowserLease`` the supervisor lent it.
+    """
+    try:
+        result = get_backend().record(session, browser=browser)
+    except Exception as e:
+        logger.exception(f"Recording session {session.pk} crashed")
+        result = {'success': False, 'error': str(e)}
+    finish_session(session, result)
+    return result
+
+
+def finish_session(session, result):
+    now = timezone.now()
+    meeting = session.meeting
+
+    if not result.get('success'):
+        error = f"Recording failed: {result.get('error', 'Unknown error')}"
+        RecordingSession.objects.filter(pk=session.pk, state='recording').update(
+            state='failed', error=error, finished_at=now
+        )
+        Meeting.objects.filter(pk=meeting.pk).update(status='failed', processing_error=error, updated_at=now)
+        events.publish_status(meeting.pk, 'failed', error=error)
+        return
+
+    output_file = result['output_file']
+    meeting.recording_file.name = os.path.relpath(output_file, settings.MEDIA_ROOT)
+    meeting.processing_error = result.get('warning')
+    update_fields = ['recording_file', 'processing_error', 'updated_at']
+    try:
+        for field, value in audio_probe.probe(output_file).as_meeting_fields().items():
+            setattr(meeting, field, value)
+            update_fields.append(field)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not probe recording {output_file}: {e}")
+    meeting.save(update_fields=update_fields)
+
+    RecordingSession.objects.filter(pk=session.pk, state='recording').update(
+        state='completed', output_file=output_file, stop_reason=result.get('stop_reason') or '', finished_at=now
+    )
+    live = result.get('live')
+    if live is not None and live.finish():
+        return
+    jobs.enqueue('process_meeting', meeting=meeting)
+    events.publish_status(meeting.pk, 'processing', stage='recorded')
+
+
+def status_snapshot():
+    """Admission state of the recorder supervisor, for the API"""
+    active = list(RecordingSession.objects.filter(state='recording').order_by('started_at'))
+    queued = list(RecordingSession.objects.filter(state='queued').order_by('queued_at', 'id'))
+    return {
+        'max_concurrent': getattr(settings, 'RECORDER_MAX_CONCURRENT', 2),
+        'active_count': len(active),
+        'queued_count': len(queued),
+        'active': active,
+        'queued': queued,
+    }
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read_rss_kb(pid):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+class RecorderSupervisor:
+    """
+    Admits queued recording sessions up to ``max_concurrent`` and tracks the
+    processes running them. Recorder processes run in their own session so
+    they keep going if the supervisor restarts; on startup the supervisor
+    adopts the ones that are still alive and fails the ones that are not.
+    When the backend records in a browser, ``browsers`` keeps warm ones to
+    lend to the recorder processes (see ``browser_pool``).
+    """
+
+    def __init__(self, max_concurrent=None, poll_interval=None, browsers=None):
+        self.max_concurrent = max_concurrent or getattr(settings, 'RECORDER_MAX_CONCURRENT', 2)
+        self.poll_interval = poll_interval or getattr(settings, 'RECORDER_POLL_INTERVAL_SECONDS', 2.0)
+        self.host = socket.gethostname()
+        self.children = {}   # pid -> session id, processes we spawned and must reap
+        self.adopted = {}    # pid -> session id, processes left by a previous supervisor
+        # session id -> [meeting id, started_at, duration_minutes, last progress published]
+        self.progress = {}
+        if browsers is None and getattr(get_backend_class(), 'uses_browser', False) \
+                and getattr(settings, 'RECORDER_BROWSER_POOL_SIZE', 0) > 0:
+            browsers = BrowserPool()
+        self.browsers = browsers
+        self._running = True
+
+    def stop(self):
+        self._running = False
+
+    def run(self, stop_when_idle=False):
+        self.recover()
+        try:
+            while self._running:
+                close_old_connections()
+                self.tick()
+                if stop_when_idle and not self.children and not self.adopted \
+                        and not RecordingSession.objects.filter(state='queued').exists():
+                    break
+                time.sleep(self.poll_interval)
+        finally:
+            if self.browsers:
+                self.browsers.close()
+
+    def tick(self):
+        self.reap()
+        self.account()
+        self.admit()
+        if self.browsers:
+            # One browser per tick, so starting them never holds up admissions for long
+            self.browsers.fill()
+
+    def recover(self):
+        """Adopt or fail sessions left in 'recording' on this host by a previous supervisor"""
+        for session in RecordingSession.objects.filter(state='recording', host=self.host):
+            if session.pid and _process_alive(session.pid):
+                logger.info(f"Adopting recording session {session.pk} (pid {session.pid})")
+                self.adopted[session.pid] = session.pk
+                self.progress[session.pk] = [session.meeting_id, session.started_at, session.duration_minutes, None]
+            else:
+                self._lost(session.pk, 'Recorder process exited while the supervisor was down')
+
+    def admit(self):
+        """Start queued sessions in FIFO order while below the concurrency cap"""
+        while RecordingSession.objects.filter(state='recording').count() < self.max_concurrent:
+            session = RecordingSession.objects.filter(state='queued').order_by('queued_at', 'id').first()
+            if session is None:
+                return
+
+            now = timezone.now()
+            claimed = RecordingSession.objects.filter(pk=session.pk, state='queued').update(
+                state='recording', host=self.host, started_at=now, heartbeat_at=now
+            )
+            if not claimed:
+                continue
+
+            browser = self.browsers.lease(session.pk) if self.browsers else None
+            pid = self.spawn(session.pk, browser)
+            RecordingSession.objects.filter(pk=session.pk).update(pid=pid)
+            self.children[pid] = session.pk
+            self.progress[session.pk] = [session.meeting_id, now, session.duration_minutes, None]
+            events.publish_status(session.meeting_id, 'processing', stage='recording')
+            logger.info(f"Admitted recording session {session.pk} (pid {pid})")
+
+    def spawn(self, session_id, browser=None):
+        """Start ``manage.py record_session`` in a new process session, lending it ``browser``"""
+        env = dict(os.environ)
+        env['DJANGO_SETTINGS_MODULE'] = os.environ.get('DJANGO_SETTINGS_MODULE', 'meeting_bot.settings')
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(settings.BASE_DIR), env.get('PYTHONPATH')]))
+        args = [sys.executable, '-m', 'django', 'record_session', str(session_id)]
+        if browser is not None:
+            args += ['--browser', browser.to_json()]
+        return os.posix_spawn(sys.executable, args, env, setsid=True)
+
+    def reap(self):
+        """Collect exited recorder processes and record their resource usage"""
+        for pid, session_id in list(self.children.items()):
+            try:
+                wpid, status, rusage = os.wait4(pid, os.WNOHANG)
+            except ChildProcessError:
+                wpid, status, rusage = pid, 0, None
+            if wpid == 0:
+                continue
+
+            del self.children[pid]
+            self.progress.pop(session_id, None)
+            if rusage is not None:
+                RecordingSession.objects.filter(pk=session_id).update(
+                    peak_rss_kb=Greatest('peak_rss_kb', rusage.ru_maxrss),
+                    cpu_seconds=rusage.ru_utime + rusage.ru_stime,
+                    rss_kb=0,
+                )
+            exit_code = os.waitstatus_to_exitcode(status)
+            if self.browsers:
+                self.browsers.release(session_id, reusable=exit_code == 0)
+            if exit_code != 0:
+                self._lost(session_id, f'Recorder process exited with code {exit_code}')
+
+        for pid, session_id in list(self.adopted.items()):
+            if not _process_alive(pid):
+                del self.adopted[pid]
+                self.progress.pop(session_id, None)
+                self._lost(session_id, 'Recorder process exited unexpectedly')
+
+    def account(self):
+        """Sample memory of running recorders and refresh their heartbeat"""
+        now = timezone.now()
+        for pid, session_id in list(self.children.items()) + list(self.adopted.items()):
+            rss_kb = _read_rss_kb(pid)
+            RecordingSession.objects.filter(pk=session_id).update(
+                rss_kb=rss_kb,
+                peak_rss_kb=Greatest('peak_rss_kb', rss_kb),
+                heartbeat_at=now,
+            )
+            tracked = self.progress.get(session_id)
+            if tracked is None or tracked[1] is None:
+                continue
+            # Progress is in whole points, so most ticks leave it unchanged and publish nothing
+            meeting_id, started_at, duration_minutes, published = tracked
+            progress = events.recording_progress(started_at, duration_minutes, now)
+            if progress != published:
+                tracked[3] = progress
+                events.publish_status(meeting_id, 'processing', stage='recording', progress=progress)
+
+    def _lost(self, session_id, error):
+        """Fail a session whose process ended without recording an outcome"""
+        now = timezone.now()
+        session = RecordingSession.objects.filter(pk=session_id, state='recording').first()
+        if session is None:
+            return
+        RecordingSession.objects.filter(pk=session_id, state='recording').update(
+            state='failed', error=error, finished_at=now, rss_kb=0
+        )
+        Meeting.objects.filter(pk=session.meeting_id).update(
+            status='failed', processing_error=error, updated_at=now
+        )
+        events.publish_status(session.meeting_id, 'failed', error=error)
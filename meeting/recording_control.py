@@ -0,0 +1,185 @@
+"""
+Recording Control
+Decides when a bot recording stops. Meetings often end long before the
+requested duration, so ``RecordingController`` watches the captured audio
+for prolonged silence and polls end-of-meeting signals (such as the
+meeting page saying the call is over) and stops capture as soon as the
+meeting is done. The requested duration remains the hard limit.
+"""
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+from .audio_normalize import audioop
+from .transcription import _rms
+
+logger = logging.getLogger(__name__)
+
+# RecordingSession.stop_reason values
+DURATION = 'duration'
+SILENCE = 'silence'
+NO_SPEECH = 'no_speech'
+MEETING_ENDED = 'meeting_ended'
+STREAM_ENDED = 'stream_ended'
+
+
+class SilenceDetector:
+    """
+    Energy-based voice activity detection on 16-bit PCM. Time is counted in
+    audio rather than on the wall clock, so it can be driven faster than real
+    time. Audio is judged ``block_seconds`` at a time: a block is speech when
+    at least ``min_voiced`` of it is louder than ``level``, so a lone click
+    or cough does not count as someone talking.
+    """
+
+    def __init__(self, rate, channels=1, sample_width=2, level=None, block_seconds=1.0, min_voiced=0.25):
+        self.rate = rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.level = level or getattr(settings, 'RECORDER_SILENCE_LEVEL', 100)
+        self.block_frames = int(block_seconds * rate)
+        self.min_voiced_frames = int(min_voiced * self.block_frames)
+        self.frames = 0
+        self.last_speech = None  # audio seconds at the end of the last block of speech
+        self._block_end = self.block_frames
+        self._voiced = 0
+
+    @property
+    def seconds(self):
+        return self.frames / self.rate
+
+    @property
+    def silent_for(self):
+        """Seconds of audio since the last speech, or since the start if nobody has spoken"""
+        return self.seconds - (self.last_speech or 0.0)
+
+    def feed(self, data):
+        frames = len(data) // (self.sample_width * self.channels)
+        if audioop is not None:
+            level = audioop.rms(data, self.sample_width)
+        else:
+            level = _rms(data, self.sample_width, self.channels)
+        if level > self.level:
+            self._voiced += frames
+        self.frames += frames
+        while self.frames >= self._block_end:
+            if self._voiced >= self.min_voiced_frames:
+                self.last_speech = self._block_end / self.rate
+            self._voiced = 0
+            self._block_end += self.block_frames
+
+
+class RecordingController:
+    """
+    Stops a recording at the first of:
+
+    - ``max_seconds`` of recording, on the wall clock or in captured audio;
+    - ``end_silence_seconds`` of silence after someone has spoken;
+    - ``start_timeout_seconds`` without anyone speaking at all;
+    - an end-of-meeting signal. Each of ``signals`` is a callable, polled
+      every ``signal_interval`` seconds by ``wait()``, that returns a reason
+      once the meeting is over and None until then.
+
+    The capture loop passes every chunk to ``observe()`` and keeps going while
+    ``running()``; the thread that owns the meeting blocks in ``wait()``.
+    ``attach()`` tells the controller the audio format once the stream is open.
+    """
+
+    def __init__(self, max_seconds, end_silence_seconds=None, start_timeout_seconds=None,
+                 signals=(), signal_interval=None, silence_level=None, clock=time.monotonic):
+        self.max_seconds = max_seconds
+        self.end_silence_seconds = end_silence_seconds
+        self.start_timeout_seconds = start_timeout_seconds
+        self.signals = list(signals)
+        self.signal_interval = signal_interval or getattr(settings, 'RECORDER_SIGNAL_POLL_SECONDS', 5.0)
+        self.silence_level = silence_level
+        self.detector = None
+        self.stop_reason = None
+        self.stop_detail = None
+        self._clock = clock
+        self._started = clock()
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, max_seconds, signals=()):
+        """A controller for ``max_seconds`` using the ``RECORDER_*`` thresholds; duration only when end detection is off"""
+        if not getattr(settings, 'RECORDER_END_DETECTION', True):
+            return cls(max_seconds)
+        return cls(
+            max_seconds,
+            end_silence_seconds=getattr(settings, 'RECORDER_END_SILENCE_SECONDS', 180),
+            start_timeout_seconds=getattr(settings, 'RECORDER_START_TIMEOUT_SECONDS', 600),
+            signals=signals,
+        )
+
+    @property
+    def elapsed(self):
+        return self._clock() - self._started
+
+    @property
+    def recorded_seconds(self):
+        """Seconds of audio captured, or of wall time when no audio was observed"""
+        return self.detector.seconds if self.detector else self.elapsed
+
+    @property
+    def heard_speech(self):
+        """Whether anyone has spoken in the captured audio yet"""
+        return self.detector is not None and self.detector.last_speech is not None
+
+    def attach(self, rate, channels=1, sample_width=2):
+        self.detector = SilenceDetector(rate, channels, sample_width, self.silence_level)
+        return self
+
+    def observe(self, data):
+        detector = self.detector
+        if detector is None or self._stopped.is_set():
+            return
+        detector.feed(data)
+        if detector.seconds >= self.max_seconds:
+            self.stop(DURATION)
+        elif detector.last_speech is None:
+            if self.start_timeout_seconds and detector.seconds >= self.start_timeout_seconds:
+                self.stop(NO_SPEECH, f'nobody spoke in the first {detector.seconds:.0f}s')
+        elif self.end_silence_seconds and detector.silent_for >= self.end_silence_seconds:
+            self.stop(SILENCE, f'silent since {detector.last_speech:.0f}s')
+
+    def running(self):
+        if not self._stopped.is_set() and self.elapsed >= self.max_seconds:
+            self.stop(DURATION)
+        return not self._stopped.is_set()
+
+    def stop(self, reason, detail=None):
+        """Stop with ``reason``; later calls keep the first reason"""
+        with self._lock:
+            if self._stopped.is_set():
+                return
+            self.stop_reason, self.stop_detail = reason, detail
+            self._stopped.set()
+        logger.info(f"Stopping recording after {self.recorded_seconds:.0f}s: {reason}{f' ({detail})' if detail else ''}")
+
+    def wait(self):
+        """Block until the recording should stop, polling the signals; returns the reason"""
+        next_poll = self._started
+        while self.running():
+            now = self._clock()
+            if self.signals and now >= next_poll:
+                self._poll_signals()
+                next_poll = now + self.signal_interval
+            timeout = min(self.signal_interval, max(0.0, self._started + self.max_seconds - now))
+            self._stopped.wait(timeout)
+        return self.stop_reason
+
+    def _poll_signals(self):
+        for signal in self.signals:
+            try:
+                reason = signal()
+            except Exception as e:
+                logger.warning(f"End-of-meeting check failed: {e}")
+                continue
+            if reason:
+                self.stop(MEETING_ENDED, reason)
+                return
@@ -0,0 +1,103 @@
+"""
+Response Cache
+Conditional GET and serialized-response caching for the meeting API.
+Meeting detail responses carry an ETag and Last-Modified derived from
+``updated_at`` and are cached per meeting until the meeting is saved or
+deleted. List pages carry an ETag over the rows they contain.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+# Bump when the serialized form of a meeting changes, so old ETags and cache entries stop matching
+RESPONSE_VERSION = 2
+
+
+def get_cache():
+    """The cache holding serialized responses, or None when ``RESPONSE_CACHE_ALIAS`` is empty"""
+    alias = getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')
+    return caches[alias] if alias else None
+
+
+def detail_key(meeting_id):
+    return f'meeting_detail:{meeting_id}'
+
+
+def detail_etag(meeting_id, updated_at):
+    return f'"m{meeting_id}-{updated_at.timestamp():.6f}-v{RESPONSE_VERSION}"'
+
+
+def list_etag(rows, count=None):
+    """ETag of a list page: the ids and ``updated_at`` of its rows plus the total"""
+    digest = hashlib.sha1(f'v{RESPONSE_VERSION}:{count}'.encode())
+    for row in rows:
+        digest.update(f';{row.pk}:{row.updated_at.timestamp():.6f}'.encode())
+    return f'W/"l{digest.hexdigest()}"'
+
+
+def not_modified(request, etag, updated_at=None):
+    """A 304 (or 412) response if the client's copy is current, else None"""
+    last_modified = int(updated_at.timestamp()) if updated_at else None
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        _validators(response, etag, updated_at)
+    return response
+
+
+def add_validators(response, etag, updated_at=None):
+    """Send the validators with a full response so the client can revalidate next time"""
+    if response.status_code == 200:
+        _validators(response, etag, updated_at)
+    return response
+
+
+def _validators(response, etag, updated_at):
+    response['ETag'] = etag
+    if updated_at:
+        response['Last-Modified'] = http_date(updated_at.timestamp())
+    # Clients may keep the body but must revalidate before each use
+    patch_cache_control(response, private=True, no_cache=True)
+
+
+def get_detail(meeting_id, etag):
+    """The cached serialized meeting, if it was cached for this exact version"""
+    cache = get_cache()
+    if cache is None:
+        return None
+    cached = cache.get(detail_key(meeting_id))
+    if cached and cached[0] == etag:
+        return cached[1]
+    return None
+
+
+def set_detail(meeting_id, etag, data):
+    cache = get_cache()
+    if cache is not None:
+        cache.set(detail_key(meeting_id), (etag, data), getattr(settings, 'RESPONSE_CACHE_TTL_SECONDS', 300))
+
+
+def invalidate(meeting_id):
+    cache = get_cache()
+    if cache is not None:
+        cache.delete(detail_key(meeting_id))
+
+
+def _meeting_changed(sender, instance, raw=False, **kwargs):
+    invalidate(instance.pk)
+
+
+def _content_changed(sender, instance, raw=False, **kwargs):
+    invalidate(instance.meeting_id)
+
+
+def connect_signals():
+    from .models import Meeting, MeetingContent
+
+    post_save.connect(_meeting_changed, sender=Meeting, dispatch_uid='response_cache_meeting_saved')
+    post_delete.connect(_meeting_changed, sender=Meeting, dispatch_uid='response_cache_meeting_deleted')
+    post_save.connect(_content_changed, sender=MeetingContent, dispatch_uid='response_cache_content_saved')
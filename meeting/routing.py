@@ -0,0 +1,419 @@
+"""
+Provider Routing
+Sends summary requests to LLM providers in priority order. Each provider has
+a circuit breaker that skips it after repeated failures, a latency histogram,
+and optionally a hedged second request to the next provider when the first
+is slower than a chosen percentile of its recent latencies.
+"""
+
+import bisect
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+
+from .providers import ProviderError
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; percentiles interpolate within a bucket"""
+
+    # Upper bounds in seconds; the last bucket is open-ended
+    BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 3, 5, 8, 13, 20, 30, 45, 60, 90, 120, 180, 300)
+
+    def __init__(self, counts=None):
+        self.counts = list(counts) if counts else [0] * (len(self.BUCKETS) + 1)
+        self._lock = threading.Lock()
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def observe(self, seconds):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.BUCKETS, seconds)] += 1
+
+    def percentile(self, p):
+        """Approximate ``p``-th percentile (0-100) in seconds, or None with no samples"""
+        counts = list(self.counts)
+        total = sum(counts)
+        if not total:
+            return None
+
+        rank = total * p / 100
+        seen = 0
+        for i, count in enumerate(counts):
+            if count and seen + count >= rank:
+                lower = self.BUCKETS[i - 1] if i else 0.0
+                upper = self.BUCKETS[i] if i < len(self.BUCKETS) else self.BUCKETS[-1] * 2
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.BUCKETS[-1]
+
+    def merge(self, other):
+        return LatencyHistogram([a + b for a, b in zip(self.counts, other.counts)])
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'buckets': dict(zip([str(b) for b in self.BUCKETS] + ['inf'], self.counts)),
+        }
+
+
+class CircuitBreaker:
+    """
+    Opens after ``failure_threshold`` consecutive failures. Once open it
+    rejects calls for ``reset_seconds``, then lets a single trial call through
+    (half-open): success closes it again, failure reopens it.
+    """
+
+    def __init__(self, failure_threshold=None, reset_seconds=None, clock=time.monotonic):
+        self.failure_threshold = failure_threshold or getattr(settings, 'LLM_BREAKER_FAILURE_THRESHOLD', 5)
+        self.reset_seconds = reset_seconds or getattr(settings, 'LLM_BREAKER_RESET_SECONDS', 60)
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if self.clock() - self.opened_at >= self.reset_seconds:
+            return 'half_open'
+        return 'open'
+
+    def allow(self):
+        """Whether a call may go to this provider now"""
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+            self._trial_running = False
+
+    def snapshot(self):
+        return {'state': self.state, 'consecutive_failures': self.failures}
+
+
+class ProviderStats:
+    """Latency, outcome counts and breaker for one provider in this process"""
+
+    def __init__(self, breaker=None):
+        self.latency = LatencyHistogram()
+        self.breaker = breaker or CircuitBreaker()
+        self.successes = 0
+        self.failures = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def snapshot(self):
+        return {
+            'latency': self.latency.snapshot(),
+            'successes': self.successes,
+            'failures': self.failures,
+            'hedges': self.hedges,
+            'hedge_wins': self.hedge_wins,
+            'breaker': self.breaker.snapshot(),
+        }
+
+
+class ProviderRouter:
+    """
+    Runs ``func(provider_name)`` against ``providers`` in priority order.
+
+    Providers whose breaker is open are skipped and a failed call falls
+    through to the next provider. With ``hedge_percentile`` set, once the
+    current provider has ``hedge_min_samples`` latencies recorded, a call
+    still running past that percentile gets a hedged duplicate on the next
+    provider and whichever succeeds first wins.
+    """
+
+    def __init__(self, providers, hedge_percentile=None, hedge_min_samples=None,
+                 max_workers=None, breaker_factory=CircuitBreaker):
+        if not providers:
+            raise ValueError("ProviderRouter needs at least one provider")
+        self.providers = list(providers)
+        if hedge_percentile is None:
+            hedge_percentile = getattr(settings, 'LLM_HEDGE_PERCENTILE', 0)
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples or getattr(settings, 'LLM_HEDGE_MIN_SAMPLES', 20)
+        self.stats = {name: ProviderStats(breaker_factory()) for name in self.providers}
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or getattr(settings, 'LLM_ROUTER_MAX_WORKERS', 8),
+            thread_name_prefix='provider-router'
+        )
+        self._stats_lock = threading.Lock()
+        self._last_published = 0.0
+
+    def hedge_delay(self, name):
+        """Seconds to wait on ``name`` before hedging, or None when hedging is off"""
+        histogram = self.stats[name].latency
+        if not self.hedge_percentile or histogram.count < self.hedge_min_samples:
+            return None
+        return histogram.percentile(self.hedge_percentile)
+
+    def _run(self, name, func):
+        started = time.perf_counter()
+        try:
+            result = func(name)
+        except Exception:
+            self._record(name, None)
+            raise
+        self._record(name, time.perf_counter() - started)
+        return result
+
+    def _next_provider(self, remaining):
+        while remaining:
+            name = remaining.pop(0)
+            if self.stats[name].breaker.allow():
+                return name
+            logger.info(f"Skipping provider {name}: circuit open")
+        return None
+
+    def call(self, func):
+        """Return ``(provider_name, result)`` from the first provider to succeed"""
+        remaining = list(self.providers)
+        pending = {}
+        errors = []
+        hedged = False
+
+        name = self._next_provider(remaining)
+        if name is None:
+            raise ProviderError("No LLM provider available: all circuit breakers are open")
+        pending[self._executor.submit(self._run, name, func)] = (name, False)
+
+        while pending:
+            timeout = None
+            if not hedged and remaining:
+                primary = next(n for n, is_hedge in pending.values() if not is_hedge)
+                timeout = self.hedge_delay(primary)
+
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # The primary is slower than usual; race it against the next provider
+                hedged = True
+                hedge = self._next_provider(remaining)
+                if hedge:
+                    logger.info(f"Hedging slow {primary} request with {hedge}")
+                    with self._stats_lock:
+                        self.stats[hedge].hedges += 1
+                    pending[self._executor.submit(self._run, hedge, func)] = (hedge, True)
+                continue
+
+            for future in done:
+                name, is_hedge = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.warning(f"Provider {name} failed: {e}")
+                    errors.append(f"{name}: {e}")
+                    continue
+                if is_hedge:
+                    with self._stats_lock:
+                        self.stats[name].hedge_wins += 1
+                return name, result
+
+            if not pending:
+                name = self._next_provider(remaining)
+                if name:
+                    pending[self._executor.submit(self._run, name, func)] = (name, False)
+
+        raise ProviderError(f"All LLM providers failed: {'; '.join(errors) or 'circuit breakers open'}")
+
+    def stream(self, func):
+        """
+        Streaming counterpart of ``call``: ``func(provider_name)`` returns an
+        iterator. Providers are tried in order until one produces its first
+        item; after that the stream is committed to that provider. Returns
+        ``(provider_name, iterator)``. Streams are never hedged.
+        """
+        errors = []
+        remaining = list(self.providers)
+        while True:
+            name = self._next_provider(remaining)
+            if name is None:
+                raise ProviderError(f"All LLM providers failed: {'; '.join(errors) or 'circuit breakers open'}")
+
+            started = time.perf_counter()
+            try:
+                iterator = iter(func(name))
+                first = next(iterator, None)
+            except Exception as e:
+                logger.warning(f"Provider {name} failed: {e}")
+                errors.append(f"{name}: {e}")
+                self._record(name, None)
+                continue
+            return name, self._relay(name, started, first, iterator)
+
+    def _relay(self, name, started, first, iterator):
+        try:
+            if first is not None:
+                yield first
+            yield from iterator
+        except Exception:
+            self._record(name, None)
+            raise
+        self._record(name, time.perf_counter() - started)
+
+    def _record(self, name, elapsed):
+        """Record a success taking ``elapsed`` seconds, or a failure when it is None"""
+        stats = self.stats[name]
+        if elapsed is None:
+            with self._stats_lock:
+                stats.failures += 1
+            stats.breaker.record_failure()
+        else:
+            stats.latency.observe(elapsed)
+            with self._stats_lock:
+                stats.successes += 1
+            stats.breaker.record_success()
+        self.publish()
+
+    def snapshot(self):
+        return {name: stats.snapshot() for name, stats in self.stats.items()}
+
+    def publish(self, force=False):
+        """Write this process's stats where ``provider_stats()`` can read them, at most once a second"""
+        directory = _stats_dir()
+        if not directory or (not force and time.monotonic() - self._last_published < 1):
+            return
+        self._last_published = time.monotonic()
+        try:
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"{_process_id()}.json")
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({
+                    'updated_at': time.time(),
+                    'providers': self.snapshot(),
+                }, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.debug(f"Could not publish provider stats: {e}")
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+def _process_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _stats_dir():
+    return getattr(settings, 'LLM_ROUTER_STATS_DIR', None)
+
+
+def provider_order():
+    """Providers to try, from ``LLM_PROVIDER_ORDER`` or else every configured one"""
+    from .llm_service import LLMService
+
+    configured = LLMService.available_services()
+    order = getattr(settings, 'LLM_PROVIDER_ORDER', None) or configured
+    return [name for name in order if name in configured or name == 'fake']
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_router():
+    """This process's router for the current provider order"""
+    global _router
+    order = provider_order()
+    if not order:
+        raise ValueError("No LLM provider configured. Set OPENAI_API_KEY, GOOGLE_API_KEY, or HUGGINGFACE_API_KEY in your environment.")
+    with _router_lock:
+        if _router is None or _router.providers != order:
+            if _router is not None:
+                _router.close()
+            _router = ProviderRouter(order)
+    return _router
+
+
+def _forget_router_after_fork():
+    # The executor's threads do not exist in a forked child
+    global _router
+    _router = None
+
+
+os.register_at_fork(after_in_child=_forget_router_after_fork)
+
+
+def provider_stats(max_age_seconds=24 * 3600):
+    """
+    Latency histograms and breaker states published by every process, with
+    histograms and counters summed per provider.
+    """
+    if _router is not None:
+        _router.publish(force=True)
+
+    directory = _stats_dir()
+    processes = {}
+    if directory and os.path.isdir(directory):
+        for filename in os.listdir(directory):
+            if not filename.endswith('.json'):
+                continue
+            path = os.path.join(directory, filename)
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if time.time() - data.get('updated_at', 0) > max_age_seconds:
+                continue
+            processes[filename[:-len('.json')]] = data['providers']
+
+    providers = {}
+    for process, snapshot in processes.items():
+        for name, stats in snapshot.items():
+            merged = providers.setdefault(name, {
+                'histogram': LatencyHistogram(),
+                'successes': 0, 'failures': 0, 'hedges': 0, 'hedge_wins': 0,
+                'breakers': {},
+            })
+            merged['histogram'] = merged['histogram'].merge(
+                LatencyHistogram(stats['latency']['buckets'].values())
+            )
+            for key in ('successes', 'failures', 'hedges', 'hedge_wins'):
+                merged[key] += stats[key]
+            merged['breakers'][process] = stats['breaker']
+
+    return {
+        'order': provider_order(),
+        'hedge_percentile': getattr(settings, 'LLM_HEDGE_PERCENTILE', 0),
+        'providers': {
+            name: {
+                'latency': merged.pop('histogram').snapshot(),
+                **merged,
+            }
+            for name, merged in providers.items()
+        },
+    }
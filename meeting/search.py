@@ -0,0 +1,373 @@
+"""
+Full-Text Search
+Index over meeting titles, descriptions, transcripts, summaries, action items
+and decisions. SQLite uses an FTS5 virtual table and PostgreSQL a weighted
+tsvector with a GIN index; other databases fall back to ``icontains``
+filters. Index rows are kept in sync by model signals; bulk writes that skip
+signals need ``manage.py rebuild_search_index``.
+"""
+
+import html
+import logging
+import re
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save
+
+logger = logging.getLogger(__name__)
+
+TABLE = 'meeting_search'
+
+FIELDS = ['title', 'meeting_type', 'description', 'summary', 'action_items', 'decisions', 'transcript']
+
+# Matches in short, curated fields count for more than matches in the transcript
+SQLITE_WEIGHTS = {
+    'title': 10.0, 'meeting_type': 2.0, 'description': 3.0, 'summary': 4.0,
+    'action_items': 4.0, 'decisions': 4.0, 'transcript': 1.0,
+}
+POSTGRES_WEIGHTS = {
+    'title': 'A', 'meeting_type': 'C', 'description': 'C', 'summary': 'B',
+    'action_items': 'B', 'decisions': 'B', 'transcript': 'D',
+}
+
+# Fallback lookups for databases without a full-text index
+FALLBACK_LOOKUPS = {
+    'title': 'title__icontains',
+    'meeting_type': 'meeting_type__icontains',
+    'description': 'description__icontains',
+    'summary': 'content__summary_json__icontains',
+    'action_items': 'content__summary_json__icontains',
+    'decisions': 'content__summary_json__icontains',
+    'transcript': 'content__transcript__icontains',
+}
+
+# Private-use characters mark matches in snippets until the text is escaped
+START, STOP = '\ue000', '\ue001'
+
+SearchHit = namedtuple('SearchHit', 'meeting_id score snippet')
+
+
+def terms(query):
+    return re.findall(r'\w+', query.lower())
+
+
+def _texts(items):
+    texts = []
+    for item in items or []:
+        if isinstance(item, dict):
+            texts.append(' '.join(str(value) for value in item.values() if value))
+        elif item:
+            texts.append(str(item))
+    return texts
+
+
+def build_document(title, meeting_type, description, transcript, summary_json):
+    """Indexed text for one meeting, keyed by ``FIELDS``"""
+    from .models import Meeting
+
+    summary = summary_json if isinstance(summary_json, dict) else {}
+    return {
+        'title': title or '',
+        'meeting_type': f"{meeting_type} {dict(Meeting.MEETING_TYPES).get(meeting_type, '')}".strip(),
+        'description': description or '',
+        'summary': '\n'.join(
+            [summary.get('summary') or ''] + _texts(summary.get('key_points')) + _texts(summary.get('agenda'))
+        ).strip(),
+        'action_items': '\n'.join(_texts(summary.get('action_items'))),
+        'decisions': '\n'.join(_texts(summary.get('decisions'))),
+        'transcript': transcript or '',
+    }
+
+
+def document(meeting):
+    return build_document(
+        meeting.title, meeting.meeting_type, meeting.description, meeting.transcript, meeting.summary_json
+    )
+
+
+class SQLiteBackend:
+    """FTS5 table keyed by meeting id, ranked with per-column bm25 weights"""
+
+    def create(self, connection):
+        weights = ', '.join(str(SQLITE_WEIGHTS[field]) for field in FIELDS)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+                f"{', '.join(FIELDS)}, tokenize='porter unicode61')"
+            )
+            # Stored in the table's config, so ORDER BY rank uses the weights
+            cursor.execute(f"INSERT INTO {TABLE} ({TABLE}, rank) VALUES ('rank', %s)", [f'bm25({weights})'])
+
+    def drop(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+    def index(self, connection, documents):
+        # One transaction per batch; in autocommit mode every row would be its own commit
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            self._delete(cursor, list(documents))
+            cursor.executemany(
+                f"INSERT INTO {TABLE} (rowid, {', '.join(FIELDS)}) VALUES (%s{', %s' * len(FIELDS)})",
+                [[meeting_id] + [doc[field] for field in FIELDS] for meeting_id, doc in documents.items()]
+            )
+
+    def delete(self, connection, meeting_ids):
+        with connection.cursor() as cursor:
+            self._delete(cursor, meeting_ids)
+
+    def _delete(self, cursor, meeting_ids):
+        cursor.executemany(f"DELETE FROM {TABLE} WHERE rowid = %s", [[meeting_id] for meeting_id in meeting_ids])
+
+    def _match(self, words, fields):
+        expression = ' '.join(f'"{word}"' for word in words) + '*'
+        if fields:
+            expression = f"{{{' '.join(fields)}}} : ({expression})"
+        return expression
+
+    def match_sql(self, words, fields):
+        return f"SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s", [self._match(words, fields)]
+
+    def search(self, connection, words, fields, limit, offset):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, -rank, snippet({TABLE}, -1, %s, %s, '…', 16) FROM {TABLE} "
+                f"WHERE {TABLE} MATCH %s ORDER BY rank LIMIT %s OFFSET %s",
+                [START, STOP, self._match(words, fields), limit, offset]
+            )
+            return cursor.fetchall()
+
+
+class PostgresBackend:
+    """Table of indexed text plus a weighted tsvector with a GIN index"""
+
+    @property
+    def config(self):
+        return getattr(settings, 'SEARCH_CONFIG', 'english')
+
+    def create(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {TABLE} ("
+                f"meeting_id bigint PRIMARY KEY REFERENCES meeting_meeting (id) ON DELETE CASCADE, "
+                f"{', '.join(f'{field} text' for field in FIELDS)}, document tsvector NOT NULL)"
+            )
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {TABLE}_document ON {TABLE} USING GIN (document)")
+
+    def drop(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+    def index(self, connection, documents):
+        vector = ' || '.join(
+            f"setweight(to_tsvector(%s::regconfig, coalesce(v.{field}, '')), '{POSTGRES_WEIGHTS[field]}')"
+            for field in FIELDS
+        )
+        columns = ', '.join(FIELDS)
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            # WHERE true stops ON CONFLICT being parsed as a join condition
+            cursor.executemany(
+                f"INSERT INTO {TABLE} (meeting_id, {columns}, document) "
+                f"SELECT v.meeting_id, {', '.join(f'v.{field}' for field in FIELDS)}, {vector} "
+                f"FROM (VALUES (%s::bigint{', %s::text' * len(FIELDS)})) AS v (meeting_id, {columns}) WHERE true "
+                f"ON CONFLICT (meeting_id) DO UPDATE SET "
+                f"{', '.join(f'{field} = EXCLUDED.{field}' for field in FIELDS)}, document = EXCLUDED.document",
+                [
+                    [self.config] * len(FIELDS) + [meeting_id] + [doc[field] for field in FIELDS]
+                    for meeting_id, doc in documents.items()
+                ]
+            )
+
+    def delete(self, connection, meeting_ids):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {TABLE} WHERE meeting_id = ANY(%s)", [list(meeting_ids)])
+
+    def _where(self, words, fields):
+        query = ' & '.join(words) + ':*'
+        where, params = "document @@ to_tsquery(%s::regconfig, %s)", [self.config, query]
+        if fields:
+            # The GIN index narrows by document; matching rows are then checked per column
+            where += ' AND (' + ' OR '.join(
+                f"to_tsvector(%s::regconfig, coalesce({field}, '')) @@ to_tsquery(%s::regconfig, %s)"
+                for field in fields
+            ) + ')'
+            params += [self.config, self.config, query] * len(fields)
+        return where, params
+
+    def match_sql(self, words, fields):
+        where, params = self._where(words, fields)
+        return f"SELECT meeting_id FROM {TABLE} WHERE {where}", params
+
+    def search(self, connection, words, fields, limit, offset):
+        where, params = self._where(words, fields)
+        query = "to_tsquery(%s::regconfig, %s)"
+        text = "concat_ws(' … ', " + ', '.join(fields or FIELDS) + ')'
+        options = f'StartSel={START}, StopSel={STOP}, MaxWords=24, MinWords=8'
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT meeting_id, ts_rank(document, {query}) AS score, "
+                f"ts_headline(%s::regconfig, {text}, {query}, %s) "
+                f"FROM {TABLE} WHERE {where} ORDER BY score DESC, meeting_id DESC LIMIT %s OFFSET %s",
+                params[:2] + [self.config] + params[:2] + [options] + params + [limit, offset]
+            )
+            return cursor.fetchall()
+
+
+BACKENDS = {
+    'sqlite': SQLiteBackend,
+    'postgresql': PostgresBackend,
+}
+
+_ready = set()
+
+
+def get_backend(using='default'):
+    """The index backend for database ``using``, or None when it has no search table"""
+    connection = connections[using]
+    backend_class = BACKENDS.get(connection.vendor)
+    if backend_class is None:
+        return None
+    if using not in _ready:
+        if TABLE not in connection.introspection.table_names():
+            return None
+        _ready.add(using)
+    return backend_class()
+
+
+def create_index(connection):
+    """Create the search table; returns False where this database cannot have one"""
+    backend_class = BACKENDS.get(connection.vendor)
+    if backend_class is None:
+        return False
+    try:
+        backend_class().create(connection)
+    except Exception as e:
+        # e.g. SQLite compiled without FTS5
+        logger.warning(f"Full-text search unavailable, falling back to icontains: {e}")
+        return False
+    return True
+
+
+def index_meetings(meetings, using='default'):
+    backend = get_backend(using)
+    if backend and meetings:
+        backend.index(connections[using], {meeting.pk: document(meeting) for meeting in meetings})
+
+
+def remove_meetings(meeting_ids, using='default'):
+    backend = get_backend(using)
+    if backend and meeting_ids:
+        backend.delete(connections[using], meeting_ids)
+
+
+def rebuild(using='default', batch_size=500):
+    """Recreate the index from every meeting. Returns the number indexed."""
+    from .models import Meeting
+
+    connection = connections[using]
+    backend_class = BACKENDS.get(connection.vendor)
+    if backend_class is None:
+        return 0
+    backend = backend_class()
+    backend.drop(connection)
+    if not create_index(connection):
+        return 0
+    _ready.discard(using)
+
+    indexed = 0
+    batch = {}
+    for meeting in Meeting.objects.using(using).select_related('content').iterator(chunk_size=batch_size):
+        batch[meeting.pk] = document(meeting)
+        if len(batch) >= batch_size:
+            backend.index(connection, batch)
+            indexed += len(batch)
+            batch = {}
+    if batch:
+        backend.index(connection, batch)
+        indexed += len(batch)
+    return indexed
+
+
+def _validate_fields(fields):
+    unknown = [field for field in fields or [] if field not in FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown search field(s): {', '.join(unknown)}. Choose from: {', '.join(FIELDS)}")
+    return list(fields or [])
+
+
+def filter_queryset(queryset, query, fields=None):
+    """Restrict a Meeting queryset to meetings matching ``query``"""
+    fields = _validate_fields(fields)
+    words = terms(query)
+    if not words:
+        return queryset.none()
+
+    backend = get_backend(queryset.db)
+    if backend is None:
+        for word in words:
+            condition = Q()
+            for field in fields or FIELDS:
+                condition |= Q(**{FALLBACK_LOOKUPS[field]: word})
+            queryset = queryset.filter(condition)
+        return queryset
+
+    sql, params = backend.match_sql(words, fields)
+    return queryset.filter(id__in=RawSQL(sql, params))
+
+
+def _highlight(text):
+    return html.escape(text or '').replace(START, '<mark>').replace(STOP, '</mark>')
+
+
+def search(query, fields=None, limit=20, offset=0, using='default'):
+    """
+    Ranked matches for ``query`` as ``SearchHit(meeting_id, score, snippet)``,
+    best first. Snippets are HTML-escaped with matches wrapped in ``<mark>``.
+    Without a full-text index, matches come newest first with score 0.
+    """
+    from .models import Meeting
+
+    fields = _validate_fields(fields)
+    words = terms(query)
+    if not words:
+        return []
+
+    backend = get_backend(using)
+    if backend is None:
+        meetings = filter_queryset(Meeting.objects.using(using), query, fields)
+        ids = meetings.order_by('-created_at').values_list('id', flat=True)[offset:offset + limit]
+        return [SearchHit(meeting_id, 0.0, '') for meeting_id in ids]
+
+    rows = backend.search(connections[using], words, fields, limit, offset)
+    return [SearchHit(meeting_id, score, _highlight(snippet)) for meeting_id, score, snippet in rows]
+
+
+def _meeting_saved(sender, instance, raw, using, update_fields, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not set(update_fields) & {'title', 'meeting_type', 'description'}:
+        return
+    # A full save writes loaded content next, and that save reindexes
+    if update_fields is None and sender.content.is_cached(instance) and instance._get_content() is not None:
+        return
+    index_meetings([instance], using)
+
+
+def _content_saved(sender, instance, raw, using, **kwargs):
+    if not raw:
+        index_meetings([instance.meeting], using)
+
+
+def _meeting_deleted(sender, instance, using, **kwargs):
+    remove_meetings([instance.pk], using)
+
+
+def connect_signals():
+    from .models import Meeting, MeetingContent
+
+    post_save.connect(_meeting_saved, sender=Meeting, dispatch_uid='search_meeting_saved')
+    post_save.connect(_content_saved, sender=MeetingContent, dispatch_uid='search_content_saved')
+    post_delete.connect(_meeting_deleted, sender=Meeting, dispatch_uid='search_meeting_deleted')
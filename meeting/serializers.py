@@ -1,11 +1,36 @@
+from django.conf import settings
 from rest_framework import serializers
-from .models import Meeting
+from . import audio_probe
+from .models import Meeting, Job, RecordingSession, ActionItem, Decision, AgendaTopic, Upload
+
+
+def validate_extension(filename):
+    allowed_extensions = settings.ALLOWED_UPLOAD_EXTENSIONS
+    ext = filename.split('.')[-1].lower()
+    if ext not in allowed_extensions:
+        raise serializers.ValidationError(
+            f"File type not allowed. Allowed: {', '.join(allowed_extensions)}"
+        )
+
+
+class ChoiceDisplayField(serializers.ReadOnlyField):
+    """
+    Display name of a choice, like ``get_FOO_display()`` but without DRF
+    inspecting that method's signature on every object
+    """
+    
+    def __init__(self, choices, **kwargs):
+        self.display_names = {value: str(name) for value, name in choices}
+        super().__init__(**kwargs)
+    
+    def to_representation(self, value):
+        return self.display_names.get(value, value)
 
 
 class MeetingListSerializer(serializers.ModelSerializer):
     """Serializer for listing meetings"""
-    meeting_type_display = serializers.CharField(source='get_meeting_type_display', read_only=True)
-    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    meeting_type_display = ChoiceDisplayField(Meeting.MEETING_TYPES, source='meeting_type')
+    status_display = ChoiceDisplayField(Meeting.STATUS_CHOICES, source='status')
     
     class Meta:
         model = Meeting
@@ -18,41 +43,30 @@ class MeetingListSerializer(serializers.ModelSerializer):
 
 class MeetingSummarySerializer(serializers.ModelSerializer):
     """Serializer for meeting summary details"""
-    meeting_type_display = serializers.CharField(source='get_meeting_type_display', read_only=True)
-    status_display = serializers.CharField(source='get_status_display', read_only=True)
-    summary = serializers.SerializerMethodField()
-    key_points = serializers.SerializerMethodField()
-    decisions = serializers.SerializerMethodField()
-    action_items = serializers.SerializerMethodField()
-    agenda = serializers.SerializerMethodField()
+    meeting_type_display = ChoiceDisplayField(Meeting.MEETING_TYPES, source='meeting_type')
+    status_display = ChoiceDisplayField(Meeting.STATUS_CHOICES, source='status')
+    transcript = serializers.CharField(read_only=True, allow_null=True)
     
     class Meta:
         model = Meeting
         fields = [
             'id', 'title', 'meeting_type', 'meeting_type_display',
             'description', 'transcript', 'created_at', 'meeting_date',
-            'status', 'status_display', 'summary', 'key_points',
-            'decisions', 'action_items', 'agenda', 'meeting_link'
+            'status', 'status_display', 'meeting_link', 'audio_format', 'audio_codec',
+            'audio_duration', 'audio_sample_rate', 'audio_channels'
         ]
     
-    def get_summary(self, obj):
-        return obj.summary
-    
-    def get_key_points(self, obj):
-        return obj.key_points
-    
-    def get_decisions(self, obj):
-        return obj.decisions
-    
-    def get_action_items(self, obj):
-        return obj.action_items
-    
-    def get_agenda(self, obj):
-        return obj.agenda
+    def to_representation(self, instance):
+        # summary, key_points, decisions, action_items and agenda, rendered once per parsed summary
+        data = super().to_representation(instance)
+        data.update(instance.summary_data.sections())
+        return data
 
 
 class MeetingCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating meetings"""
+    # Stored on MeetingContent; Meeting exposes it as a property
+    transcript = serializers.CharField(required=False, allow_blank=True, allow_null=True)
     
     class Meta:
         model = Meeting
@@ -61,17 +75,24 @@ class MeetingCreateSerializer(serializers.ModelSerializer):
     def validate_recording_file(self, value):
         """Validate uploaded file"""
         if value:
-            # Check file size
-            if value.size > 100 * 1024 * 1024:  # 100MB
-                raise serializers.ValidationError("File size too large. Maximum 100MB allowed.")
-            
-            # Check file extension
-            allowed_extensions = ['mp3', 'wav', 'mp4', 'webm', 'm4a']
-            ext = value.name.split('.')[-1].lower()
-            if ext not in allowed_extensions:
+            # Check file size; larger recordings go through the resumable upload API
+            max_size = settings.MAX_UPLOAD_SIZE
+            if value.size > max_size:
                 raise serializers.ValidationError(
-                    f"File type not allowed. Allowed: {', '.join(allowed_extensions)}"
+                    f"File size too large. Maximum {max_size // (1024 * 1024)}MB allowed; "
+                    f"use /api/uploads/ for larger recordings."
                 )
+            validate_extension(value.name)
+            
+            # The upload handler already matched the first bytes; read the headers for duration and codec
+            try:
+                audio_probe.check_header(value.name, value.read(audio_probe.SNIFF_BYTES))
+                path = getattr(value, 'temporary_file_path', None)
+                value.audio_info = audio_probe.probe(path()) if path else audio_probe.probe_file(value.file)
+            except ValueError as e:
+                raise serializers.ValidationError(str(e))
+            finally:
+                value.seek(0)
         
         return value
     
@@ -92,4 +113,118 @@ class MeetingCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 "Either a transcript, a recording file, or a meeting link must be provided."
             )
+        if data.get('recording_file'):
+            data.update(data['recording_file'].audio_info.as_meeting_fields())
         return data
+
+
+class UploadCreateSerializer(serializers.Serializer):
+    """Starts a resumable upload: the file's name and size, and the meeting to create from it"""
+    filename = serializers.CharField(max_length=255)
+    size = serializers.IntegerField(min_value=1)
+    title = serializers.CharField(max_length=255)
+    meeting_type = serializers.ChoiceField(choices=Meeting.MEETING_TYPES, default='team_meeting')
+    description = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    meeting_date = serializers.DateTimeField(required=False)
+    
+    def validate_filename(self, value):
+        validate_extension(value)
+        return value
+    
+    def validate_size(self, value):
+        from .uploads import max_size
+        if value > max_size():
+            raise serializers.ValidationError(f"File size too large. Maximum {max_size() // (1024 * 1024)}MB allowed.")
+        return value
+    
+    def meeting_fields(self):
+        fields = {k: v for k, v in self.validated_data.items() if k not in ('filename', 'size')}
+        if 'meeting_date' in fields:
+            fields['meeting_date'] = fields['meeting_date'].isoformat()
+        return fields
+
+
+class UploadSerializer(serializers.ModelSerializer):
+    """Serializer for resumable uploads"""
+    state_display = ChoiceDisplayField(Upload.STATE_CHOICES, source='state')
+    chunk_size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Upload
+        fields = [
+            'id', 'filename', 'size', 'offset', 'chunk_size', 'state', 'state_display',
+            'meeting', 'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+    def get_chunk_size(self, obj):
+        from .uploads import chunk_size
+        return chunk_size()
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """Serializer for background jobs"""
+    kind_display = serializers.CharField(source='get_kind_display', read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'kind', 'kind_display', 'meeting', 'status', 'status_display',
+            'priority', 'attempts', 'max_attempts', 'run_after', 'last_error',
+            'created_at', 'updated_at', 'finished_at'
+        ]
+        read_only_fields = fields
+
+
+class RecordingSessionSerializer(serializers.ModelSerializer):
+    """Serializer for meeting bot recording sessions"""
+    state_display = serializers.CharField(source='get_state_display', read_only=True)
+    queue_position = serializers.SerializerMethodField()
+
+    class Meta:
+        model = RecordingSession
+        fields = [
+            'id', 'meeting', 'duration_minutes', 'state', 'state_display', 'queue_position',
+            'stop_reason', 'error', 'host', 'pid', 'rss_kb', 'peak_rss_kb', 'cpu_seconds',
+            'queued_at', 'started_at', 'finished_at', 'heartbeat_at'
+        ]
+        read_only_fields = fields
+
+    def get_queue_position(self, obj):
+        from .recorder_supervisor import queue_position
+        return queue_position(obj)
+
+
+class ActionItemSerializer(serializers.ModelSerializer):
+    """Serializer for action items; only the status can be changed"""
+    meeting_title = serializers.CharField(source='meeting.title', read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+
+    class Meta:
+        model = ActionItem
+        fields = [
+            'id', 'meeting', 'meeting_title', 'position', 'task', 'owner', 'due_date', 'due_text',
+            'status', 'status_display', 'created_at', 'updated_at'
+        ]
+        read_only_fields = [field for field in fields if field != 'status']
+
+
+class DecisionSerializer(serializers.ModelSerializer):
+    """Serializer for decisions"""
+    meeting_title = serializers.CharField(source='meeting.title', read_only=True)
+
+    class Meta:
+        model = Decision
+        fields = ['id', 'meeting', 'meeting_title', 'position', 'text', 'created_at']
+        read_only_fields = fields
+
+
+class AgendaTopicSerializer(serializers.ModelSerializer):
+    """Serializer for agenda topics"""
+    meeting_title = serializers.CharField(source='meeting.title', read_only=True)
+
+    class Meta:
+        model = AgendaTopic
+        fields = ['id', 'meeting', 'meeting_title', 'position', 'topic', 'description', 'created_at']
+        read_only_fields = fields
@@ -1,7 +1,22 @@
 // Meeting History Page JavaScript
-let currentPage = 1;
+// Cursor link of the page being shown; null for the newest meetings
+let currentPageUrl = null;
 let currentSearch = '';
 let currentFilter = '';
+// Status stream for meetings on the page that are still pending or processing
+let statusSource = null;
+const STATUS_BADGE_CLASSES = {
+    'completed': 'badge-success',
+    'processing': 'badge-warning',
+    'pending': 'badge-info',
+    'failed': 'badge-danger'
+};
+const STATUS_LABELS = {
+    'completed': 'Completed',
+    'processing': 'Processing',
+    'pending': 'Pending',
+    'failed': 'Failed'
+};
 
 document.addEventListener('DOMContentLoaded', function() {
     const searchBtn = document.getElementById('searchBtn');
@@ -14,7 +29,7 @@ document.addEventListener('DOMContentLoaded', function() {
     // Search functionality
     searchBtn.addEventListener('click', () => {
         currentSearch = searchInput.value.trim();
-        currentPage = 1;
+        currentPageUrl = null;
         loadMeetings();
     });
 
@@ -27,7 +42,7 @@ document.addEventListener('DOMContentLoaded', function() {
     // Filter functionality
     filterType.addEventListener('change', () => {
         currentFilter = filterType.value;
-        currentPage = 1;
+        currentPageUrl = null;
         loadMeetings();
     });
 
@@ -45,14 +60,17 @@ document.addEventListener('DOMContentLoaded', function() {
         errorContainer.style.display = 'none';
 
         try {
-            let url = `/api/meetings/?page=${currentPage}`;
+            let url = currentPageUrl;
 
-            if (currentSearch) {
-                url += `&search=${encodeURIComponent(currentSearch)}`;
-            }
-
-            if (currentFilter) {
-                url += `&meeting_type=${encodeURIComponent(currentFilter)}`;
+            if (!url) {
+                const params = new URLSearchParams();
+                if (currentSearch) {
+                    params.set('search', currentSearch);
+                }
+                if (currentFilter) {
+                    params.set('meeting_type', currentFilter);
+                }
+                url = `/api/meetings/?${params}`;
             }
 
             const response = await fetch(url);
@@ -92,12 +110,7 @@ document.addEventListener('DOMContentLoaded', function() {
         meetingsTable.innerHTML = '';
         data.results.forEach(meeting => {
             const row = document.createElement('tr');
-            const statusBadgeClass = {
-                'completed': 'badge-success',
-                'processing': 'badge-warning',
-                'pending': 'badge-info',
-                'failed': 'badge-danger'
-            }[meeting.status] || 'badge-info';
+            const statusBadgeClass = STATUS_BADGE_CLASSES[meeting.status] || 'badge-info';
 
             row.innerHTML = `
                 <td>
@@ -108,7 +121,7 @@ document.addEventListener('DOMContentLoaded', function() {
                 <td>${escapeHtml(meeting.meeting_type_display)}</td>
                 <td>${formatDate(meeting.meeting_date)}</td>
                 <td>
-                    <span class="badge ${statusBadgeClass}">
+                    <span class="badge ${statusBadgeClass}" data-status-meeting="${meeting.id}">
                         ${escapeHtml(meeting.status_display)}
                     </span>
                 </td>
@@ -127,32 +140,62 @@ document.addEventListener('DOMContentLoaded', function() {
             meetingsTable.appendChild(row);
         });
 
-        // Setup pagination
+        watchStatuses(data.results);
+
+        // Setup pagination; pages are cursor links, so only previous/next are available
         pagination.innerHTML = '';
-        if (data.previous) {
-            const prevBtn = document.createElement('li');
-            prevBtn.className = 'page-item';
-            prevBtn.innerHTML = `<a class="page-link" href="#" onclick="goToPage(${currentPage - 1}); return false;">Previous</a>`;
-            pagination.appendChild(prevBtn);
-        }
+        pagination.appendChild(pageLink('Previous', data.previous));
 
-        // Add page numbers
-        const totalPages = Math.ceil(data.count / 10);
-        for (let i = Math.max(1, currentPage - 1); i <= Math.min(totalPages, currentPage + 1); i++) {
-            const pageBtn = document.createElement('li');
-            pageBtn.className = `page-item ${i === currentPage ? 'active' : ''}`;
-            pageBtn.innerHTML = `<a class="page-link" href="#" onclick="goToPage(${i}); return false;">${i}</a>`;
-            pagination.appendChild(pageBtn);
-        }
+        const countItem = document.createElement('li');
+        countItem.className = 'page-item disabled';
+        countItem.innerHTML = `<span class="page-link">${data.count} meeting${data.count === 1 ? '' : 's'}</span>`;
+        pagination.appendChild(countItem);
+
+        pagination.appendChild(pageLink('Next', data.next));
+
+        paginationContainer.style.display = (data.previous || data.next) ? 'block' : 'none';
+    }
 
-        if (data.next) {
-            const nextBtn = document.createElement('li');
-            nextBtn.className = 'page-item';
-            nextBtn.innerHTML = `<a class="page-link" href="#" onclick="goToPage(${currentPage + 1}); return false;">Next</a>`;
-            pagination.appendChild(nextBtn);
+    function watchStatuses(meetings) {
+        if (statusSource) {
+            statusSource.close();
+            statusSource = null;
+        }
+        const unfinished = meetings.some(meeting => ['pending', 'processing'].includes(meeting.status));
+        if (!unfinished || !window.EventSource) {
+            return;
         }
 
-        paginationContainer.style.display = totalPages > 1 ? 'block' : 'none';
+        statusSource = new EventSource('/api/events/');
+        statusSource.addEventListener('status', event => {
+            const status = JSON.parse(event.data);
+            const badge = document.querySelector(`[data-status-meeting="${status.meeting}"]`);
+            if (!badge) {
+                return;
+            }
+            badge.className = `badge ${STATUS_BADGE_CLASSES[status.status] || 'badge-info'}`;
+            badge.textContent = STATUS_LABELS[status.status] || status.status;
+            if (status.status === 'processing' && status.progress != null) {
+                badge.textContent += ` ${status.progress}%`;
+            }
+        });
+    }
+
+    function pageLink(label, url) {
+        const item = document.createElement('li');
+        item.className = `page-item ${url ? '' : 'disabled'}`;
+        const link = document.createElement('a');
+        link.className = 'page-link';
+        link.href = '#';
+        link.textContent = label;
+        link.addEventListener('click', (e) => {
+            e.preventDefault();
+            if (url) {
+                goToPage(url);
+            }
+        });
+        item.appendChild(link);
+        return item;
     }
 
     function escapeHtml(text) {
@@ -168,8 +211,8 @@ document.addEventListener('DOMContentLoaded', function() {
 });
 
 // Global functions for pagination
-function goToPage(page) {
-    currentPage = page;
+function goToPage(url) {
+    currentPageUrl = url;
     loadMeetings();
     window.scrollTo(0, 0);
 }
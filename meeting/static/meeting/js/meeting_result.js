@@ -6,6 +6,14 @@ document.addEventListener('DOMContentLoaded', function() {
     const downloadTxtBtn = document.getElementById('downloadTxtBtn');
     const downloadPdfBtn = document.getElementById('downloadPdfBtn');
     const deleteBtn = document.getElementById('deleteBtn');
+    const STAGE_LABELS = {
+        queued: 'Waiting for a recorder',
+        recording: 'Recording',
+        recorded: 'Recording finished',
+        transcribing: 'Transcribing',
+        summarizing: 'Summarizing'
+    };
+    let handlersBound = false;
 
     // Load meeting data
     loadMeeting();
@@ -37,47 +45,119 @@ document.addEventListener('DOMContentLoaded', function() {
         document.getElementById('meetingType').textContent = meeting.meeting_type_display;
         document.getElementById('meetingDate').textContent = formatDate(meeting.meeting_date);
 
-        // Update summary tab
-        document.getElementById('summaryText').textContent = meeting.summary || 'No summary available';
+        // Update transcript
+        document.getElementById('transcriptText').textContent = meeting.transcript || 'No transcript available';
 
-        // Update key points
-        const keypointsList = document.getElementById('keypointsList');
-        keypointsList.innerHTML = '';
-        (meeting.key_points || []).forEach(point => {
-            const li = document.createElement('li');
-            li.className = 'list-group-item';
-            li.textContent = typeof point === 'string' ? point : JSON.stringify(point);
-            keypointsList.appendChild(li);
+        // Set up button handlers
+        if (!handlersBound) {
+            setupButtonHandlers(meeting);
+            handlersBound = true;
+        }
+
+        // Still recording or transcribing: follow the status until there is something to show
+        if (!meeting.transcript && ['pending', 'processing'].includes(meeting.status) && window.EventSource) {
+            watchStatus(meeting);
+            return;
+        }
+
+        // A transcript without a summary yet: stream the sections in as they are generated
+        if (!meeting.summary && meeting.transcript && meeting.status !== 'failed' && window.EventSource) {
+            streamSummary(meeting);
+            return;
+        }
+
+        ['summary', 'key_points', 'decisions', 'action_items', 'agenda'].forEach(key => {
+            renderSection(key, meeting[key]);
         });
+    }
 
-        if ((meeting.key_points || []).length === 0) {
-            const li = document.createElement('li');
-            li.className = 'list-group-item text-muted';
-            li.textContent = 'No key points available';
-            keypointsList.appendChild(li);
+    function streamSummary(meeting) {
+        document.getElementById('summaryText').textContent = 'Generating summary...';
+        ['keypointsList', 'decisionsList'].forEach(id => {
+            document.getElementById(id).innerHTML = '<li class="list-group-item text-muted">Generating...</li>';
+        });
+        document.getElementById('actionItemsTable').innerHTML =
+            '<tr><td colspan="3" class="text-muted text-center">Generating...</td></tr>';
+        document.getElementById('agendaContent').innerHTML = '<div class="text-muted">Generating...</div>';
+
+        const source = new EventSource(`/api/meetings/${meeting.id}/summary/stream/`);
+        source.addEventListener('section', event => {
+            const section = JSON.parse(event.data);
+            renderSection(section.key, section.value);
+        });
+        source.addEventListener('done', () => source.close());
+        source.addEventListener('error', event => {
+            source.close();
+            const message = event.data ? JSON.parse(event.data).error : null;
+            if (message) {
+                showToast(message, 'error');
+            }
+        });
+    }
+
+    function watchStatus(meeting) {
+        const summaryText = document.getElementById('summaryText');
+        summaryText.textContent = 'Processing...';
+
+        const source = new EventSource(`/api/meetings/${meeting.id}/events/`);
+        source.addEventListener('status', event => {
+            const status = JSON.parse(event.data);
+            if (status.status === 'completed') {
+                source.close();
+                loadMeeting();
+            } else if (status.status === 'failed') {
+                source.close();
+                summaryText.textContent = 'Processing failed';
+                showToast(status.error || 'Processing failed', 'error');
+            } else {
+                const label = STAGE_LABELS[status.stage] || 'Processing';
+                summaryText.textContent = status.progress != null ? `${label}... ${status.progress}%` : `${label}...`;
+            }
+        });
+    }
+
+    function renderSection(key, value) {
+        switch (key) {
+            case 'summary':
+                document.getElementById('summaryText').textContent = value || 'No summary available';
+                break;
+            case 'key_points':
+                renderList('keypointsList', value, 'No key points available');
+                break;
+            case 'decisions':
+                renderList('decisionsList', value, 'No decisions available');
+                break;
+            case 'action_items':
+                renderActionItems(value);
+                break;
+            case 'agenda':
+                renderAgenda(value);
+                break;
         }
+    }
 
-        // Update decisions
-        const decisionsList = document.getElementById('decisionsList');
-        decisionsList.innerHTML = '';
-        (meeting.decisions || []).forEach(decision => {
+    function renderList(listId, items, emptyText) {
+        const list = document.getElementById(listId);
+        list.innerHTML = '';
+        (items || []).forEach(item => {
             const li = document.createElement('li');
             li.className = 'list-group-item';
-            li.textContent = typeof decision === 'string' ? decision : JSON.stringify(decision);
-            decisionsList.appendChild(li);
+            li.textContent = typeof item === 'string' ? item : JSON.stringify(item);
+            list.appendChild(li);
         });
 
-        if ((meeting.decisions || []).length === 0) {
+        if ((items || []).length === 0) {
             const li = document.createElement('li');
             li.className = 'list-group-item text-muted';
-            li.textContent = 'No decisions available';
-            decisionsList.appendChild(li);
+            li.textContent = emptyText;
+            list.appendChild(li);
         }
+    }
 
-        // Update action items
+    function renderActionItems(items) {
         const actionItemsTable = document.getElementById('actionItemsTable');
         actionItemsTable.innerHTML = '';
-        (meeting.action_items || []).forEach(item => {
+        (items || []).forEach(item => {
             const row = document.createElement('tr');
             const task = typeof item === 'string' ? item : item.task || '';
             const owner = (typeof item === 'object' ? item.owner : '') || 'N/A';
@@ -91,17 +171,18 @@ document.addEventListener('DOMContentLoaded', function() {
             actionItemsTable.appendChild(row);
         });
 
-        if ((meeting.action_items || []).length === 0) {
+        if ((items || []).length === 0) {
             const row = document.createElement('tr');
             row.innerHTML = '<td colspan="3" class="text-muted text-center">No action items available</td>';
             actionItemsTable.appendChild(row);
         }
+    }
 
-        // Update agenda
+    function renderAgenda(items) {
         const agendaContent = document.getElementById('agendaContent');
         agendaContent.innerHTML = '';
-        if (meeting.agenda && (meeting.agenda || []).length > 0) {
-            (meeting.agenda || []).forEach(item => {
+        if (items && items.length > 0) {
+            items.forEach(item => {
                 const topic = typeof item === 'string' ? item : item.topic || '';
                 const description = (typeof item === 'object' ? item.description : '') || '';
 
@@ -119,12 +200,6 @@ document.addEventListener('DOMContentLoaded', function() {
             div.textContent = 'No agenda items available';
             agendaContent.appendChild(div);
         }
-
-        // Update transcript
-        document.getElementById('transcriptText').textContent = meeting.transcript || 'No transcript available';
-
-        // Set up button handlers
-        setupButtonHandlers(meeting);
     }
 
     function setupButtonHandlers(meeting) {
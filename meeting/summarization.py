@@ -0,0 +1,442 @@
+"""
+Map-Reduce Summarization
+Summarizes transcripts that do not fit in the model context by extracting
+key points, decisions, action items and agenda topics from each chunk in
+parallel, then merging the partial results into the ``summary_json`` schema.
+"""
+
+import json
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_FIELDS = ('summary', 'key_points', 'decisions', 'action_items', 'agenda')
+
+MAP_PROMPT = """
+The following is part {part} of {parts} of a meeting transcript. Extract what is discussed in this part only and provide a structured JSON response with the following fields:
+1. summary: One or two sentences describing this part
+2. key_points: A list of the main discussion points
+3. decisions: A list of decisions made
+4. action_items: A list of objects with 'task', 'owner' (if mentioned), and 'due_date' (if mentioned)
+5. agenda: A list of objects with 'topic' and 'description' for topics discussed
+
+Lines starting with a speaker label (such as "Speaker 2:") were said by that speaker; when someone takes on a task and is not named, use their label as its owner.
+
+Transcript part:
+{transcript}
+
+Respond with ONLY valid JSON, no additional text.
+"""
+
+REDUCE_PROMPT = """
+The following JSON objects summarize consecutive parts of one meeting. Combine them into a single structured JSON response for the whole meeting with the following fields:
+1. summary: A concise 2-3 sentence summary of the meeting
+2. key_points: A list of 3-5 main discussion points
+3. decisions: All decisions made, merging duplicates
+4. action_items: All action items as objects with 'task', 'owner' and 'due_date', merging duplicates
+5. agenda: A list of topics discussed with brief descriptions, merging duplicates
+
+Partial summaries:
+{partials}
+
+Respond with ONLY valid JSON, no additional text.
+"""
+
+
+def _get_encoding():
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding('cl100k_base')
+    except Exception:
+        return None
+
+
+_encoding = _get_encoding()
+
+
+def count_tokens(text):
+    """Token count with tiktoken when installed, otherwise a ~4 characters per token estimate"""
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+|\n+')
+
+
+def chunk_transcript(transcript, chunk_tokens):
+    """
+    Split a transcript into chunks of at most ``chunk_tokens`` tokens,
+    breaking between sentences (or lines) wherever possible.
+    """
+    chunks = []
+    current, current_tokens = [], 0
+
+    for sentence in _SENTENCE_RE.split(transcript):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        tokens = count_tokens(sentence) + 1
+
+        # A single sentence longer than a chunk is split on words
+        if tokens > chunk_tokens:
+            if current:
+                chunks.append(' '.join(current))
+                current, current_tokens = [], 0
+            for word in sentence.split():
+                word_tokens = count_tokens(word) + 1
+                if current and current_tokens + word_tokens > chunk_tokens:
+                    chunks.append(' '.join(current))
+                    current, current_tokens = [], 0
+                current.append(word)
+                current_tokens += word_tokens
+            chunks.append(' '.join(current))
+            current, current_tokens = [], 0
+            continue
+
+        if current_tokens + tokens > chunk_tokens:
+            chunks.append(' '.join(current))
+            current, current_tokens = [], 0
+        current.append(sentence)
+        current_tokens += tokens
+
+    if current:
+        chunks.append(' '.join(current))
+    return chunks
+
+
+def parse_json_response(content):
+    """Parse a model's JSON reply, tolerating surrounding markdown code fences"""
+    content = content.strip()
+    fenced = re.match(r'^```(?:json)?\s*(.*?)\s*```$', content, re.DOTALL)
+    if fenced:
+        content = fenced.group(1)
+    return json.loads(content)
+
+
+class SectionParser:
+    """
+    Incrementally parses a JSON object as it streams in. ``feed()`` returns
+    the top-level ``(key, value)`` pairs whose values completed in the new
+    text, so each summary section can be shown as soon as it is whole. Text
+    before the opening brace, such as a markdown code fence, is skipped.
+    """
+
+    def __init__(self):
+        self.text = ''
+        self.done = False
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._state = None  # 'key', 'colon' or 'value' while inside the top-level object
+        self._key = None
+        self._start = None
+
+    def feed(self, chunk):
+        self.text += chunk
+        sections = []
+        text = self.text
+
+        while self._pos < len(text) and not self.done:
+            i, c = self._pos, text[self._pos]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif c == '\\':
+                    self._escaped = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._state == 'key':
+                        self._key = self._load(text[self._start:i + 1])
+                        self._state = 'colon'
+                continue
+
+            if self._depth == 0:
+                if c == '{':
+                    self._depth, self._state = 1, 'key'
+                continue
+
+            if self._depth == 1:
+                if self._state == 'key' and c == '"':
+                    self._start = i
+                elif self._state == 'colon' and c == ':':
+                    self._state, self._start = 'value', None
+                    continue
+                elif self._state == 'value' and c in ',}':
+                    value = self._load(text[self._start:i]) if self._start is not None else None
+                    if self._key is not None and value is not None:
+                        sections.append((self._key, value))
+                    self._state, self._key = 'key', None
+                    if c == '}':
+                        self._depth, self.done = 0, True
+                    continue
+                elif self._state == 'value' and self._start is None and not c.isspace():
+                    self._start = i
+
+            if c == '"':
+                self._in_string = True
+            elif c in '{[':
+                self._depth += 1
+            elif c in '}]':
+                self._depth -= 1
+
+        return sections
+
+    @staticmethod
+    def _load(fragment):
+        try:
+            return json.loads(fragment)
+        except ValueError:
+            return None
+
+
+def normalize_summary(data):
+    """Coerce a model response into the ``summary_json`` schema"""
+    data = data if isinstance(data, dict) else {}
+    result = {'summary': str(data.get('summary') or '').strip()}
+    for key in SUMMARY_FIELDS[1:]:
+        value = data.get(key) or []
+        result[key] = value if isinstance(value, list) else [value]
+    return result
+
+
+def _item_key(item):
+    if isinstance(item, dict):
+        item = item.get('task') or item.get('topic') or json.dumps(item, sort_keys=True)
+    return re.sub(r'\W+', ' ', str(item).lower()).strip()
+
+
+def dedupe(items):
+    """Drop items whose text (or task/topic) repeats an earlier one, keeping order"""
+    seen = set()
+    result = []
+    for item in items:
+        key = _item_key(item)
+        if key and key not in seen:
+            seen.add(key)
+            result.append(item)
+    return result
+
+
+def merge_partials(partials):
+    """Deterministically merge partial summaries; used for list fields and as a fallback"""
+    merged = {
+        'summary': ' '.join(p['summary'] for p in partials if p['summary']),
+    }
+    for key in SUMMARY_FIELDS[1:]:
+        merged[key] = dedupe(item for p in partials for item in p[key])
+    return merged
+
+
+class SummaryEngine:
+    """
+    Summarizes a transcript with ``llm``, a callable taking a prompt string
+    and returning the model's text reply.
+
+    Transcripts whose prompt fits in ``token_budget`` are summarized in one
+    call. Longer ones are split into ``chunk_tokens`` chunks that are
+    summarized concurrently (at most ``max_workers`` calls in flight), and the
+    partial summaries are reduced in groups that fit the budget until one
+    summary remains.
+    """
+
+    def __init__(self, llm, chunk_tokens=None, token_budget=None, max_workers=None):
+        self.llm = llm
+        self.chunk_tokens = chunk_tokens or getattr(settings, 'SUMMARY_CHUNK_TOKENS', 2000)
+        self.token_budget = token_budget or getattr(settings, 'SUMMARY_TOKEN_BUDGET', 2500)
+        self.max_workers = max_workers or getattr(settings, 'SUMMARY_MAX_WORKERS', 4)
+
+    def single_prompt(self, transcript):
+        """The one-call summary prompt for ``transcript``, or None if it exceeds the budget"""
+        from .llm_service import LLMService
+
+        prompt = LLMService.SUMMARY_PROMPT.format(transcript=transcript)
+        return prompt if count_tokens(prompt) <= self.token_budget else None
+
+    def summarize(self, transcript):
+        single_prompt = self.single_prompt(transcript)
+        if single_prompt:
+            return normalize_summary(parse_json_response(self.llm(single_prompt)))
+
+        chunks = chunk_transcript(transcript, self.chunk_tokens)
+        logger.info(f"Summarizing transcript in {len(chunks)} chunks")
+
+        prompts = [
+            MAP_PROMPT.format(part=i + 1, parts=len(chunks), transcript=chunk)
+            for i, chunk in enumerate(chunks)
+        ]
+        partials = self._map(prompts)
+        return self._reduce(partials)
+
+    def _map(self, prompts):
+        def call(prompt):
+            return normalize_summary(parse_json_response(self.llm(prompt)))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(call, prompts))
+
+    def _reduce(self, partials):
+        while len(partials) > 1:
+            groups = self._group(partials)
+            to_reduce = [group for group in groups if len(group) > 1]
+            reduced = iter(self._map([
+                REDUCE_PROMPT.format(partials=json.dumps(group, indent=1))
+                for group in to_reduce
+            ]))
+
+            partials = []
+            for group in groups:
+                if len(group) == 1:
+                    partials.append(group[0])
+                    continue
+
+                # Keep everything the partials found even if the model drops some of it
+                result = next(reduced)
+                merged = merge_partials(group)
+                for key in ('decisions', 'action_items', 'agenda'):
+                    result[key] = dedupe(result[key] + merged[key])
+                result['summary'] = result['summary'] or merged['summary']
+                partials.append(result)
+
+        return partials[0]
+
+    def _group(self, partials):
+        """Pack partial summaries into groups whose reduce prompt fits the token budget"""
+        overhead = count_tokens(REDUCE_PROMPT)
+        groups, current, current_tokens = [], [], overhead
+        for partial in partials:
+            tokens = count_tokens(json.dumps(partial, indent=1))
+            if current and current_tokens + tokens > self.token_budget:
+                groups.append(current)
+                current, current_tokens = [], overhead
+            current.append(partial)
+            current_tokens += tokens
+        groups.append(current)
+
+        # Always make progress even if two partials alone exceed the budget
+        if len(groups) == len(partials) and len(partials) > 1:
+            groups = [partials[i:i + 2] for i in range(0, len(partials), 2)]
+        return groups
+
+
+class IncrementalSummarizer:
+    """
+    Summarizes a transcript that grows while the meeting is still going on.
+
+    Text arrives through ``add()``. Every time ``chunk_tokens`` of it have
+    built up, that chunk is summarized in the background (the map step of
+    ``SummaryEngine``), so ``summary()`` at the end of the meeting only has
+    the last chunk and the reduce left to do. ``snapshot()`` merges the
+    partial summaries finished so far without calling the model.
+    """
+
+    def __init__(self, llm, chunk_tokens=None, token_budget=None, max_workers=None):
+        self.engine = SummaryEngine(llm, chunk_tokens, token_budget, max_workers)
+        self._text = []
+        self._pending = ''
+        self._partials = []
+        self._pool = ThreadPoolExecutor(max_workers=self.engine.max_workers, thread_name_prefix='live-summary')
+
+    @property
+    def text(self):
+        return ' '.join(self._text)
+
+    def add(self, text):
+        text = text.strip()
+        if not text:
+            return
+        self._text.append(text)
+        self._pending = f'{self._pending} {text}'.strip()
+        if count_tokens(self._pending) < self.engine.chunk_tokens:
+            return
+        chunks = chunk_transcript(self._pending, self.engine.chunk_tokens)
+        # The last chunk may still be short; keep it until more text arrives
+        self._pending = chunks.pop() if len(chunks) > 1 else ''
+        for chunk in chunks:
+            self._map(chunk)
+
+    def snapshot(self):
+        """Deterministic merge of the partial summaries finished so far, or None before the first one"""
+        done = []
+        for future in self._partials:
+            if not future.done() or future.exception():
+                break
+            done.append(future.result())
+        return merge_partials(done) if done else None
+
+    def summary(self):
+        """Summary of everything added; the same single call ``SummaryEngine`` makes when it fits one prompt"""
+        try:
+            single_prompt = self.engine.single_prompt(self.text)
+            if single_prompt:
+                return normalize_summary(parse_json_response(self.engine.llm(single_prompt)))
+            if self._pending:
+                self._map(self._pending)
+                self._pending = ''
+            partials = [future.result() for future in self._partials]
+        finally:
+            self.close()
+        return self.engine._reduce(partials)
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _map(self, chunk):
+        # How many parts there will be is not known until the meeting ends
+        prompt = MAP_PROMPT.format(part=len(self._partials) + 1, parts='several', transcript=chunk)
+        self._partials.append(self._pool.submit(
+            lambda: normalize_summary(parse_json_response(self.engine.llm(prompt)))
+        ))
+
+
+class FakeLLM:
+    """
+    Deterministic stand-in for a chat model, for tests and benchmarks.
+    Answers summary and map prompts from the transcript text itself (sentences
+    mentioning "decide" become decisions, "will" become action items owned by
+    the first word) and reduce prompts by merging the partials it is given.
+    """
+
+    def __init__(self, max_prompt_tokens=None):
+        self.max_prompt_tokens = max_prompt_tokens
+        self.calls = 0
+
+    def __call__(self, prompt):
+        self.calls += 1
+        if self.max_prompt_tokens and count_tokens(prompt) > self.max_prompt_tokens:
+            raise ValueError('Prompt exceeds the model context length')
+
+        if 'Partial summaries:' in prompt:
+            body = prompt.split('Partial summaries:', 1)[1].rsplit('Respond with ONLY', 1)[0]
+            merged = merge_partials(json.loads(body))
+            merged['summary'] = '. '.join(merged['summary'].split('. ')[:3])
+            merged['key_points'] = merged['key_points'][:5]
+            return json.dumps(merged)
+
+        marker = 'Transcript part:' if 'Transcript part:' in prompt else 'Transcript:'
+        text = prompt.split(marker, 1)[1].rsplit('Respond with ONLY', 1)[0].strip()
+        sentences = [s.strip() for s in _SENTENCE_RE.split(text) if s.strip()]
+
+        return json.dumps({
+            'summary': ' '.join(sentences[:1]),
+            'key_points': sentences[:3],
+            'decisions': [s for s in sentences if 'decide' in s.lower()],
+            'action_items': [
+                {'task': s, 'owner': s.split()[0], 'due_date': None}
+                for s in sentences if ' will ' in f' {s.lower()} '
+            ],
+            'agenda': [],
+        })
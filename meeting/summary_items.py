@@ -0,0 +1,137 @@
+"""
+Summary Items
+Copies action items, decisions and agenda topics out of ``summary_json`` into
+their own tables, so they can be filtered and indexed across meetings.
+"""
+
+import datetime
+import re
+
+from django.db import transaction
+from django.utils.dateparse import parse_date
+
+from .models import ActionItem, AgendaTopic, Decision, MeetingContent
+from .summary_schema import EMPTY, Summary
+
+DATE_FORMATS = ['%m/%d/%Y', '%B %d, %Y', '%b %d, %Y', '%d %B %Y', '%d %b %Y', '%B %d %Y']
+
+
+def _due_date(text):
+    """A date from an ISO or common written form, or None for relative dates like "next week" """
+    date = None
+    try:
+        date = parse_date(text)
+    except ValueError:
+        pass
+    if date is None:
+        for date_format in DATE_FORMATS:
+            try:
+                return datetime.datetime.strptime(text, date_format).date()
+            except ValueError:
+                continue
+    return date
+
+
+def _clean(value, max_length=None):
+    text = re.sub(r'\s+', ' ', str(value or '')).strip()
+    return text[:max_length] if max_length else text
+
+
+def _task_key(task, owner):
+    return re.sub(r'\W+', ' ', f'{task} {owner or ""}'.lower()).strip()
+
+
+def build_items(meeting_id, summary_json):
+    """Unsaved ``(action_items, decisions, agenda_topics)`` for one meeting's summary"""
+    try:
+        summary = Summary.from_json(summary_json)
+    except ValueError:
+        summary = EMPTY
+
+    action_items = []
+    for position, item in enumerate(summary.action_items):
+        due_text = _clean(item.due_date, 100) or None
+        action_items.append(ActionItem(
+            meeting_id=meeting_id,
+            position=position,
+            task=_clean(item.task),
+            owner=_clean(item.owner, 255) or None,
+            due_date=_due_date(due_text) if due_text else None,
+            due_text=due_text,
+        ))
+
+    decisions = [
+        Decision(meeting_id=meeting_id, position=position, text=_clean(text))
+        for position, text in enumerate(summary.decisions)
+    ]
+
+    agenda_topics = [
+        AgendaTopic(
+            meeting_id=meeting_id,
+            position=position,
+            topic=_clean(topic.topic, 500),
+            description=_clean(topic.description) or None,
+        )
+        for position, topic in enumerate(summary.agenda)
+    ]
+
+    return action_items, decisions, agenda_topics
+
+
+def sync_many(summaries, using='default'):
+    """
+    Replace the items of every meeting in ``summaries`` (meeting id -> summary
+    JSON) in one transaction. Action items that reappear with the same task and
+    owner keep the status a user gave them.
+    """
+    meeting_ids = list(summaries)
+    with transaction.atomic(using=using):
+        statuses = {
+            (meeting_id, _task_key(task, owner)): status
+            for meeting_id, task, owner, status in ActionItem.objects.using(using)
+            .filter(meeting_id__in=meeting_ids)
+            .exclude(status='open')
+            .values_list('meeting_id', 'task', 'owner', 'status')
+        }
+        for model in (ActionItem, Decision, AgendaTopic):
+            model.objects.using(using).filter(meeting_id__in=meeting_ids).delete()
+
+        action_items, decisions, agenda_topics = [], [], []
+        for meeting_id, summary_json in summaries.items():
+            items = build_items(meeting_id, summary_json)
+            for item in items[0]:
+                item.status = statuses.get((meeting_id, _task_key(item.task, item.owner)), item.status)
+            action_items += items[0]
+            decisions += items[1]
+            agenda_topics += items[2]
+
+        ActionItem.objects.using(using).bulk_create(action_items)
+        Decision.objects.using(using).bulk_create(decisions)
+        AgendaTopic.objects.using(using).bulk_create(agenda_topics)
+    return len(action_items), len(decisions), len(agenda_topics)
+
+
+def sync(meeting, using='default'):
+    """Refresh a meeting's items from its current summary"""
+    return sync_many({meeting.pk: meeting.summary_json}, using)
+
+
+def backfill(batch_size=500, using='default'):
+    """
+    Sync every meeting that has a summary, ``batch_size`` meetings at a time.
+    Batches are fetched by meeting id rather than held open in a cursor, so
+    memory stays bounded by one batch. Yields ``(meetings, action_items,
+    decisions, agenda_topics)`` per batch.
+    """
+    last_id = 0
+    while True:
+        batch = list(
+            MeetingContent.objects.using(using)
+            .filter(meeting_id__gt=last_id, summary_json__isnull=False)
+            .order_by('meeting_id')
+            .values_list('meeting_id', 'summary_json')[:batch_size]
+        )
+        if not batch:
+            return
+        last_id = batch[-1][0]
+        yield (len(batch),) + sync_many(dict(batch), using)
@@ -0,0 +1,182 @@
+"""
+Summary Schema
+Typed view of a meeting's ``summary_json``. Summaries are validated and
+normalized once when assigned, stored with ``schema_version``, and parsed
+into slotted objects that ``Meeting`` caches per instance.
+"""
+
+SCHEMA_VERSION = 1
+STORED_KEYS = ('schema_version', 'summary', 'key_points', 'decisions', 'action_items', 'agenda')
+
+
+def _text(value):
+    if value is None:
+        return ''
+    return value.strip() if isinstance(value, str) else str(value).strip()
+
+
+def _optional_text(value):
+    return _text(value) or None
+
+
+def _list(data, key):
+    value = data.get(key)
+    if value is None:
+        return ()
+    if not isinstance(value, (list, tuple)):
+        raise ValueError(f'Summary field {key!r} must be a list')
+    return value
+
+
+class SummaryActionItem:
+    __slots__ = ('task', 'owner', 'due_date')
+
+    def __init__(self, task, owner=None, due_date=None):
+        self.task = task
+        self.owner = owner
+        self.due_date = due_date
+
+    @classmethod
+    def from_json(cls, value):
+        if isinstance(value, dict):
+            return cls(_text(value.get('task')), _optional_text(value.get('owner')), _optional_text(value.get('due_date')))
+        return cls(_text(value))
+
+    def to_json(self):
+        return {'task': self.task, 'owner': self.owner, 'due_date': self.due_date}
+
+
+class SummaryAgendaTopic:
+    __slots__ = ('topic', 'description')
+
+    def __init__(self, topic, description=None):
+        self.topic = topic
+        self.description = description
+
+    @classmethod
+    def from_json(cls, value):
+        if isinstance(value, dict):
+            return cls(_text(value.get('topic')), _optional_text(value.get('description')))
+        return cls(_text(value))
+
+    def to_json(self):
+        return {'topic': self.topic, 'description': self.description}
+
+
+class Summary:
+    """
+    An immutable, parsed summary. ``sections()`` is the JSON-ready form the
+    API renders and is built once per object.
+    """
+
+    __slots__ = ('version', 'summary', 'key_points', 'decisions', '_action_items', '_agenda', '_sections')
+
+    def __init__(self, summary='', key_points=(), decisions=(), action_items=(), agenda=(), version=SCHEMA_VERSION):
+        self.version = version
+        self.summary = summary
+        self.key_points = tuple(key_points)
+        self.decisions = tuple(decisions)
+        self._action_items = tuple(action_items)
+        self._agenda = tuple(agenda)
+        self._sections = None
+
+    @property
+    def action_items(self):
+        if self._action_items is None:
+            self._action_items = tuple(
+                SummaryActionItem(item['task'], item['owner'], item['due_date'])
+                for item in self._sections['action_items']
+            )
+        return self._action_items
+
+    @property
+    def agenda(self):
+        if self._agenda is None:
+            self._agenda = tuple(
+                SummaryAgendaTopic(topic['topic'], topic['description']) for topic in self._sections['agenda']
+            )
+        return self._agenda
+
+    @classmethod
+    def from_json(cls, data):
+        """
+        Parse stored or freshly generated summary JSON. ``None`` is an empty
+        summary; anything else that is not an object with list sections
+        raises ``ValueError``. Blank entries are dropped and plain-string
+        action items and agenda topics become objects. Summaries stored
+        before versioning (no ``schema_version``) are version 0.
+        """
+        if data is None:
+            return EMPTY
+        if not isinstance(data, dict):
+            raise ValueError('Summary must be a JSON object')
+
+        version = data.get('schema_version', 0)
+        if version == SCHEMA_VERSION and len(data) == len(STORED_KEYS):
+            try:
+                return cls._from_stored(data)
+            except (KeyError, TypeError):
+                pass
+        if not isinstance(version, int) or version > SCHEMA_VERSION:
+            raise ValueError(f'Unsupported summary schema version: {version!r}')
+
+        return cls(
+            summary=_text(data.get('summary')),
+            key_points=[text for text in map(_text, _list(data, 'key_points')) if text],
+            decisions=[text for text in map(_text, _list(data, 'decisions')) if text],
+            action_items=[
+                item for item in map(SummaryActionItem.from_json, _list(data, 'action_items')) if item.task
+            ],
+            agenda=[
+                topic for topic in map(SummaryAgendaTopic.from_json, _list(data, 'agenda')) if topic.topic
+            ],
+            version=version,
+        )
+
+    @classmethod
+    def _from_stored(cls, data):
+        """
+        Trust JSON this module wrote: it was validated on assignment, so the
+        stored sections double as the rendered form, and action items and
+        agenda topics only become objects when they are read
+        """
+        if not isinstance(data['summary'], str):
+            raise TypeError('summary must be a string')
+        summary = cls.__new__(cls)
+        summary.version = SCHEMA_VERSION
+        summary.summary = data['summary']
+        summary.key_points = tuple(data['key_points'])
+        summary.decisions = tuple(data['decisions'])
+        summary._action_items = summary._agenda = None
+        summary._sections = {key: data[key] for key in STORED_KEYS[1:]}
+        return summary
+
+    @classmethod
+    def normalize(cls, data):
+        """Validated summary JSON in the current schema, as stored on ``MeetingContent``"""
+        if data is None or data == {}:
+            return data
+        return cls.from_json(data).to_json()
+
+    def sections(self):
+        """The five sections as JSON values; shared by every caller, so treat it as read-only"""
+        if self._sections is None:
+            self._sections = self.to_json()
+            del self._sections['schema_version']
+        return self._sections
+
+    def to_json(self):
+        return {
+            'schema_version': SCHEMA_VERSION,
+            'summary': self.summary,
+            'key_points': list(self.key_points),
+            'decisions': list(self.decisions),
+            'action_items': [item.to_json() for item in self.action_items],
+            'agenda': [topic.to_json() for topic in self.agenda],
+        }
+
+    def __bool__(self):
+        return bool(self.summary or self.key_points or self.decisions or self.action_items or self.agenda)
+
+
+EMPTY = Summary()
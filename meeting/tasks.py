@@ -0,0 +1,70 @@
+"""
+Job Handlers
+Work executed by the background workers for each ``Job.kind``
+"""
+
+import logging
+
+from .llm_service import LLMService
+from .models import Job
+from . import events, summary_items
+
+logger = logging.getLogger(__name__)
+
+
+def process_meeting(job):
+    """Transcribe the meeting's recording if needed, then summarize it"""
+    meeting = job.meeting
+    meeting.status = 'processing'
+    meeting.save(update_fields=['status', 'updated_at'])
+
+    if not meeting.transcript and meeting.recording_file:
+        events.publish_status(meeting.id, 'processing', stage='transcribing')
+        try:
+            result = LLMService.transcribe_audio(meeting.recording_file.path)
+        except Exception as e:
+            raise Exception(f"Transcription failed: {str(e)}")
+        meeting.transcript = result.text
+        meeting.segments = result.to_table()
+        meeting.save(update_fields=['transcript', 'segments', 'updated_at'])
+
+    if not meeting.transcript:
+        raise ValueError('No transcript available for this meeting')
+
+    events.publish_status(meeting.id, 'processing', stage='summarizing')
+    _summarize(meeting, priority=job.priority)
+
+
+def summarize(job):
+    """Regenerate the summary for a meeting that already has a transcript"""
+    meeting = job.meeting
+    if not meeting.transcript:
+        raise ValueError('No transcript available for this meeting')
+
+    meeting.status = 'processing'
+    meeting.save(update_fields=['status', 'updated_at'])
+    events.publish_status(meeting.id, 'processing', stage='summarizing')
+    _summarize(meeting, force=job.payload.get('force', False), priority=job.priority)
+
+
+def _summarize(meeting, force=False, priority=Job.PRIORITY_NORMAL):
+    summary_json = LLMService.generate_summary(meeting.summary_input, force=force, priority=priority)
+    if not summary_json:
+        raise ValueError('Failed to generate summary')
+    save_summary(meeting, summary_json)
+
+
+def save_summary(meeting, summary_json):
+    """Store a finished summary and mark the meeting completed"""
+    meeting.summary_json = summary_json
+    meeting.status = 'completed'
+    meeting.processing_error = None
+    meeting.save(update_fields=['summary_json', 'status', 'processing_error', 'updated_at'])
+    summary_items.sync(meeting)
+    events.publish_status(meeting.id, 'completed')
+
+
+HANDLERS = {
+    'process_meeting': process_meeting,
+    'summarize': summarize,
+}
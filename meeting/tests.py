@@ -1,3 +1,1615 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+import wave
+from array import array
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock, skipIf
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.core.cache import caches
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+
+from . import (
+    audio_normalize, diarization, events, jobs, llm_cache, providers, response_cache, recorder_supervisor, routing, search, summary_items, uploads,
+    voice_activity,
+)
+from .diarization import NoDiarizer
+from .live_transcription import LiveSession, LiveTranscriber
+from .llm_service import LLMService
+from .audio_capture import StreamingWavWriter, SyntheticAudioSource, capture_stream
+from .browser_pool import BLANK_PAGE, BrowserPool, FakeBrowser, open_browser
+from .meeting_recorder import MeetingRecorder, google_meet_end_phrase
+from .models import ActionItem, AgendaTopic, Decision, Job, MeetingContent, Meeting, RateLimitBucket, RecordingSession, Upload
+from .transcript_segments import SegmentTable, TranscriptSegment
+from .summarization import SUMMARY_FIELDS, FakeLLM, SectionParser, SummaryEngine, chunk_transcript, count_tokens
+from .rate_limit import DatabaseBucketStore, LocalBucketStore, RateLimiter, RateLimitTimeout
+from .recording_control import DURATION, MEETING_ENDED, NO_SPEECH, SILENCE, RecordingController
+from .transcription import FakeTranscriptionProvider, OpenAIWhisperProvider, merge_overlap, plan_segments, transcribe_file
+
+
+class _StubTranscriptions:
+    """``client.audio.transcriptions`` of openai 1.3.0: no ``timestamp_granularities``, segments as dicts"""
+
+    def __init__(self):
+        self.calls = []
+
+    def create(self, *, file, model, language=None, prompt=None, response_format=None, temperature=None):
+        self.calls.append({'model': model, 'response_format': response_format})
+        if response_format != 'verbose_json':
+            return SimpleNamespace(text='hello there. general kenobi')
+        return SimpleNamespace(
+            text='hello there. general kenobi',
+            segments=[
+                {'id': 0, 'start': 0.0, 'end': 1.5, 'text': ' hello there.'},
+                {'id': 1, 'start': 1.5, 'end': 3.0, 'text': ' general kenobi'},
+            ],
+        )
+
+
+class _StubOpenAI:
+    def __init__(self, **options):
+        self.audio = SimpleNamespace(transcriptions=_StubTranscriptions())
+
+    def close(self):
+        pass
+
+
+_stub_openai = SimpleNamespace(OpenAI=_StubOpenAI, AsyncOpenAI=_StubOpenAI)
+
+
+@override_settings(OPENAI_API_KEY='test-key')
+class WhisperTranscriptionTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(providers, 'openai', _stub_openai)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = providers.OpenAIClient()
+        handle, self.path = tempfile.mkstemp(suffix='.wav')
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+
+    def test_plain_transcript(self):
+        self.assertEqual(self.client.transcribe(self.path), 'hello there. general kenobi')
+
+    def test_segments_from_verbose_json(self):
+        self.assertEqual(
+            self.client.transcribe(self.path, timestamps=True),
+            [(0.0, 1.5, ' hello there.'), (1.5, 3.0, ' general kenobi')],
+        )
+        self.assertEqual(self.client.client.audio.transcriptions.calls[-1]['response_format'], 'verbose_json')
+
+    def test_provider_segments_are_offset(self):
+        with mock.patch('meeting.llm_service.get_client', return_value=self.client):
+            segments = OpenAIWhisperProvider().transcribe_segments(self.path, offset=60.0)
+        self.assertEqual(
+            [(s.start, s.end, s.text) for s in segments],
+            [(60.0, 61.5, 'hello there.'), (61.5, 63.0, 'general kenobi')],
+        )
+
+
+def _sse_events(response):
+    """``(event, data)`` of each server-sent event in a streaming response"""
+    body = b''.join(response.streaming_content).decode()
+    events = []
+    for block in body.split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.splitlines() if not line.startswith(':'))
+        if fields:
+            events.append((fields['event'], json.loads(fields['data'])))
+    return events
+
+
+SUMMARY = {
+    'summary': 'Agreed to ship on Friday.',
+    'key_points': ['Release is ready'],
+    'decisions': ['Ship on Friday'],
+    'action_items': [{'task': 'Tag the release', 'owner': 'Sam', 'due_date': None}],
+    'agenda': [],
+}
+
+
+class StreamSummaryTests(TestCase):
+    def setUp(self):
+        self.meeting = Meeting.objects.create(title='Release', transcript='We ship on Friday.')
+        self.url = f'/api/meetings/{self.meeting.pk}/summary/stream/'
+
+    def test_sections_then_done(self):
+        def stream(transcript, force=False):
+            yield ('section', 'summary', SUMMARY['summary'])
+            yield ('section', 'decisions', SUMMARY['decisions'])
+            yield ('done', SUMMARY)
+
+        with mock.patch('meeting.views.LLMService.stream_summary', side_effect=stream), \
+                mock.patch('meeting.views.events.publish_status') as publish:
+            events = _sse_events(self.client.get(self.url))
+
+        self.assertEqual([name for name, _ in events], ['section', 'section', 'done'])
+        self.assertEqual(events[0][1], {'key': 'summary', 'value': SUMMARY['summary']})
+        publish.assert_called_once_with(self.meeting.pk, 'completed')
+        self.meeting.refresh_from_db()
+        self.assertEqual(self.meeting.status, 'completed')
+        self.assertEqual(self.meeting.summary_json['decisions'], SUMMARY['decisions'])
+        # Stored like a summary from the job queue, items included
+        self.assertEqual(list(ActionItem.objects.filter(meeting=self.meeting).values_list('task', flat=True)),
+                         ['Tag the release'])
+
+    def test_saved_summary_is_replayed(self):
+        self.meeting.summary_json = SUMMARY
+        self.meeting.save()
+        with mock.patch('meeting.views.LLMService.stream_summary') as stream:
+            events = _sse_events(self.client.get(self.url))
+        stream.assert_not_called()
+        # Stored with schema_version, replayed like a fresh stream
+        self.assertIn('schema_version', self.meeting.summary_json)
+        self.assertEqual(
+            [(name, data['key']) for name, data in events[:-1]],
+            [('section', key) for key in SUMMARY_FIELDS],
+        )
+        self.assertEqual(events[-1], ('done', SUMMARY))
+
+    def test_failure_is_an_error_event(self):
+        with mock.patch('meeting.views.LLMService.stream_summary', side_effect=RuntimeError('provider down')):
+            events = _sse_events(self.client.get(self.url))
+        self.assertEqual(events, [('error', {'error': 'Summary generation failed: provider down'})])
+
+
+class _Discard:
+    def write(self, data):
+        pass
+
+
+def _talk(seconds):
+    return [(8, 'speech'), (1.5, 'silence')] * int(seconds / 9.5)
+
+
+class RecordingControllerTests(TestCase):
+    rate = 8000
+
+    def _record(self, pattern, total_seconds, **options):
+        """Play ``pattern`` through a controller as fast as it goes; the wall clock stands still"""
+        options.setdefault('end_silence_seconds', 60)
+        options.setdefault('start_timeout_seconds', 120)
+        controller = RecordingController(options.pop('max_seconds', 3600), clock=lambda: 0.0, **options)
+        controller.attach(self.rate)
+        source = SyntheticAudioSource(rate=self.rate, pattern=pattern, total_seconds=total_seconds)
+        capture_stream(source, _Discard(), 800, controller.running, controller)
+        return controller
+
+    def test_stops_after_silence(self):
+        controller = self._record(_talk(300) + [(3600, 'silence')], 1800)
+        self.assertEqual(controller.stop_reason, SILENCE)
+        self.assertAlmostEqual(controller.recorded_seconds, controller.detector.last_speech + 60, delta=1)
+        self.assertLess(controller.recorded_seconds, 400)
+
+    def test_pauses_do_not_stop(self):
+        controller = self._record(_talk(120) + [(45, 'silence')], 900)
+        self.assertIsNone(controller.stop_reason)
+        self.assertEqual(controller.recorded_seconds, 900)
+
+    def test_nobody_speaks(self):
+        controller = self._record([(3600, 'silence')], 1800)
+        self.assertEqual(controller.stop_reason, NO_SPEECH)
+        self.assertAlmostEqual(controller.recorded_seconds, 120, delta=1)
+        self.assertFalse(controller.heard_speech)
+
+    def test_duration_is_the_limit(self):
+        controller = self._record(_talk(3600), 3600, max_seconds=300)
+        self.assertEqual(controller.stop_reason, DURATION)
+        self.assertAlmostEqual(controller.recorded_seconds, 300, delta=1)
+
+    def test_signal_ends_the_meeting(self):
+        polls = []
+
+        def signal():
+            polls.append(1)
+            return 'page says "The meeting has ended"' if len(polls) >= 3 else None
+
+        controller = RecordingController(60, signals=[signal], signal_interval=0.01)
+        self.assertEqual(controller.wait(), MEETING_ENDED)
+        self.assertEqual(controller.stop_detail, 'page says "The meeting has ended"')
+        self.assertEqual(len(polls), 3)
+
+    def test_alone_before_anyone_speaks_is_not_the_end(self):
+        # The bot joins first: Meet says it is alone until the others arrive 20s in
+        controller = RecordingController(60, signal_interval=0.01, end_silence_seconds=60, start_timeout_seconds=120)
+        controller.signals = [lambda: google_meet_end_phrase("You're the only one here", controller.heard_speech)]
+        controller.attach(self.rate)
+        source = SyntheticAudioSource(
+            rate=self.rate, pattern=[(20, 'silence'), (60, 'speech')], total_seconds=40, realtime=True, speed=200
+        )
+        thread = threading.Thread(
+            target=capture_stream, args=(source, _Discard(), 800, controller.running, controller)
+        )
+        thread.start()
+        reason = controller.wait()
+        thread.join()
+        self.assertEqual(reason, MEETING_ENDED)
+        self.assertGreater(controller.recorded_seconds, 20)
+
+    def test_end_phrases(self):
+        self.assertIsNone(google_meet_end_phrase("You're the only one here"))
+        self.assertEqual(google_meet_end_phrase("You're the only one here", heard_speech=True), "You're the only one here")
+        self.assertEqual(google_meet_end_phrase('The meeting has ended'), 'The meeting has ended')
+        self.assertIsNone(google_meet_end_phrase('Presenting now'))
+
+
+class VoiceActivityTests(TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.wav')
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+        pattern = [(2, 'silence'), (3, 'speech'), (5, 'silence'), (3, 'speech'), (2, 'silence')]
+        source = SyntheticAudioSource(rate=16000, pattern=pattern, total_seconds=15)
+        with StreamingWavWriter(self.path, 1, 2, 16000, 1600, drop_when_full=False) as writer:
+            capture_stream(source, writer, 1600, lambda: True)
+
+    def test_speech_regions(self):
+        speech = voice_activity.detect(self.path, level=100, min_silence_seconds=2.0)
+        self.assertEqual(len(speech.regions), 2)
+        self.assertAlmostEqual(speech.regions[0][0], 1.5, delta=0.05)
+        self.assertAlmostEqual(speech.regions[1][1], 13.5, delta=0.05)
+        self.assertAlmostEqual(speech.to_original(5.0), 10.5, delta=0.1)
+
+    def test_levels_match_the_rms_of_each_frame(self):
+        with wave.open(self.path, 'rb') as wf:
+            samples = array('h', wf.readframes(wf.getnframes()))
+        frame = int(voice_activity.FRAME_SECONDS * 16000)
+        expected = [
+            int(math.sqrt(sum(s * s for s in samples[i:i + frame]) / len(samples[i:i + frame])))
+            for i in range(0, len(samples), frame)
+        ]
+
+        levels, duration = voice_activity.frame_levels(self.path)
+        with mock.patch.object(voice_activity, 'numpy', None):
+            fallback, _ = voice_activity.frame_levels(self.path)
+        self.assertEqual(duration, 15)
+        self.assertEqual(len(levels), len(expected))
+        for level, estimate, exact in zip(levels, fallback, expected):
+            self.assertLessEqual(abs(level - exact), 1)
+            self.assertLessEqual(abs(estimate - exact), 1)
+
+
+@override_settings(JOB_RETRY_BACKOFF_SECONDS=5, JOB_RETRY_BACKOFF_MAX_SECONDS=60)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        self.meeting = Meeting.objects.create(title='Standup')
+        patcher = mock.patch('meeting.jobs.events.publish_status')
+        self.publish = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.ran = []
+
+    def _worker(self, handler=None, worker_id='worker-1'):
+        handler = handler or (lambda job: self.ran.append(job.pk))
+        return jobs.Worker(worker_id=worker_id, handlers={'summarize': handler}, poll_interval=0.01,
+                           lease_seconds=60, heartbeat_seconds=0.01)
+
+    def _fail(self, job):
+        raise RuntimeError('provider down')
+
+    def test_jobs_run_and_succeed(self):
+        job = jobs.enqueue('summarize', meeting=self.meeting)
+        self.assertEqual(self._worker().run(stop_when_empty=True), 1)
+        job.refresh_from_db()
+        self.assertEqual(self.ran, [job.pk])
+        self.assertEqual((job.status, job.attempts, job.locked_by), ('succeeded', 1, None))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_priority_order(self):
+        batch = jobs.enqueue('summarize', priority=Job.PRIORITY_BATCH)
+        normal = jobs.enqueue('summarize')
+        interactive = jobs.enqueue('summarize', priority=Job.PRIORITY_INTERACTIVE)
+        later = jobs.enqueue('summarize', priority=Job.PRIORITY_INTERACTIVE, delay_seconds=60)
+        self._worker().run(stop_when_empty=True)
+        self.assertEqual(self.ran, [interactive.pk, normal.pk, batch.pk])
+        later.refresh_from_db()
+        self.assertEqual(later.status, 'queued')
+
+    def test_lease_is_held_by_one_worker(self):
+        job = jobs.enqueue('summarize')
+        claimed = jobs.claim_next('worker-1')
+        self.assertEqual((claimed.pk, claimed.status, claimed.locked_by, claimed.attempts),
+                         (job.pk, 'running', 'worker-1', 1))
+        self.assertIsNone(jobs.claim_next('worker-2'))
+
+        self.assertFalse(jobs.heartbeat(job.pk, 'worker-2'))
+        Job.objects.filter(pk=job.pk).update(lease_expires_at=timezone.now() + timedelta(seconds=1))
+        self.assertTrue(jobs.heartbeat(job.pk, 'worker-1', lease_seconds=300))
+        job.refresh_from_db()
+        self.assertGreater(job.lease_expires_at, timezone.now() + timedelta(seconds=250))
+
+    def test_expired_lease_is_recovered(self):
+        job = jobs.enqueue('summarize', meeting=self.meeting)
+        jobs.claim_next('crashed-worker')
+        self.assertEqual(jobs.recover_orphans(), 0)
+
+        Job.objects.filter(pk=job.pk).update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(jobs.recover_orphans(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by), ('queued', None))
+        self.assertIn('crashed-worker stopped heartbeating', job.last_error)
+
+        self._worker().run(stop_when_empty=True)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('succeeded', 2))
+
+    def test_expired_lease_on_last_attempt_fails(self):
+        job = jobs.enqueue('summarize', meeting=self.meeting, max_attempts=1)
+        jobs.claim_next('crashed-worker')
+        Job.objects.filter(pk=job.pk).update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(jobs.recover_orphans(), 1)
+        job.refresh_from_db()
+        self.meeting.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(self.meeting.status, 'failed')
+        self.publish.assert_called_once_with(self.meeting.pk, 'failed', error=job.last_error)
+
+    def test_failure_is_retried_with_backoff(self):
+        job = jobs.enqueue('summarize', meeting=self.meeting)
+        started = timezone.now()
+        with self.assertLogs('meeting.jobs', 'ERROR'):
+            self._worker(self._fail).run(stop_when_empty=True)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.last_error), ('queued', 1, 'provider down'))
+        self.assertGreaterEqual(job.run_after, started + timedelta(seconds=5))
+        self.assertLessEqual(job.run_after, timezone.now() + timedelta(seconds=10))
+        # Not runnable again until the backoff has passed
+        self.assertIsNone(jobs.claim_next('worker-2'))
+
+    def test_backoff_grows_up_to_the_cap(self):
+        for attempts, low in ((1, 5), (2, 10), (3, 20), (10, 60)):
+            delay = jobs.retry_delay(attempts)
+            self.assertTrue(low <= delay <= low + 5, (attempts, delay))
+
+    def test_fails_after_max_attempts(self):
+        job = jobs.enqueue('summarize', meeting=self.meeting, max_attempts=2)
+        worker = self._worker(self._fail)
+        for expected in ('queued', 'failed'):
+            Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+            with self.assertLogs('meeting.jobs', 'ERROR'):
+                worker.run(stop_when_empty=True)
+            job.refresh_from_db()
+            self.assertEqual(job.status, expected)
+        self.assertEqual(job.attempts, 2)
+        self.assertIsNone(jobs.claim_next('worker-2'))
+        self.meeting.refresh_from_db()
+        self.assertEqual((self.meeting.status, self.meeting.processing_error), ('failed', 'provider down'))
+
+    def test_unknown_kind_fails(self):
+        job = jobs.enqueue('process_meeting', max_attempts=1)
+        self._worker().run(stop_when_empty=True)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertIn("No handler registered for job kind 'process_meeting'", job.last_error)
+
+
+@override_settings(RECORDER_BACKEND='meeting.recorder_supervisor.FakeRecorderBackend', RECORDER_FAKE_SECONDS=0.2,
+                   RECORDER_MAX_CONCURRENT=2)
+class RecorderSupervisorTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        media = override_settings(MEDIA_ROOT=self.media.name)
+        media.enable()
+        self.addCleanup(media.disable)
+        patcher = mock.patch('meeting.recorder_supervisor.events.publish_status')
+        self.publish = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.sessions = [
+            recorder_supervisor.submit(Meeting.objects.create(title=f'Meeting {i}'), duration_minutes=1)
+            for i in range(3)
+        ]
+        self.supervisor = recorder_supervisor.RecorderSupervisor()
+        # Recorder processes are run in this process by the tests instead
+        self.spawned = []
+        self.supervisor.spawn = self._spawn
+
+    def _spawn(self, session_id, browser=None):
+        self.spawned.append(session_id)
+        return 100000 + session_id
+
+    def _state(self, session):
+        session.refresh_from_db()
+        return session.state
+
+    def test_queue_position_is_fifo(self):
+        self.assertEqual([recorder_supervisor.queue_position(s) for s in self.sessions], [1, 2, 3])
+
+    def test_admission_is_capped(self):
+        self.supervisor.admit()
+        self.assertEqual(self.spawned, [self.sessions[0].pk, self.sessions[1].pk])
+        self.assertEqual([self._state(s) for s in self.sessions], ['recording', 'recording', 'queued'])
+        self.assertEqual(recorder_supervisor.queue_position(self.sessions[2]), 1)
+        self.assertIsNone(recorder_supervisor.queue_position(self.sessions[0]))
+
+        self.supervisor.admit()
+        self.assertEqual(len(self.spawned), 2)
+
+        first = RecordingSession.objects.select_related('meeting').get(pk=self.sessions[0].pk)
+        result = recorder_supervisor.run_session(first)
+        self.assertEqual(result['stop_reason'], 'stream_ended')
+        self.assertEqual(self._state(first), 'completed')
+        self.assertTrue(Job.objects.filter(kind='process_meeting', meeting=first.meeting).exists())
+
+        self.supervisor.admit()
+        self.assertEqual(self.spawned[-1], self.sessions[2].pk)
+        self.assertEqual(self._state(self.sessions[2]), 'recording')
+
+    def test_failed_recorder_process(self):
+        self.supervisor.admit()
+        self.supervisor._lost(self.sessions[0].pk, 'Recorder process exited with code 1')
+        self.assertEqual(self._state(self.sessions[0]), 'failed')
+        self.assertEqual(Meeting.objects.get(pk=self.sessions[0].meeting_id).status, 'failed')
+
+    def test_progress_is_published_only_when_it_changes(self):
+        started = timezone.now()
+        with mock.patch('meeting.recorder_supervisor.timezone.now', return_value=started):
+            self.supervisor.admit()
+        self.publish.reset_mock()
+
+        with mock.patch('meeting.recorder_supervisor._read_rss_kb', return_value=2048), \
+                mock.patch('meeting.recorder_supervisor.timezone.now') as now:
+            now.return_value = started
+            # Only the heartbeat updates; the session's start is not fetched again
+            with self.assertNumQueries(2):
+                self.supervisor.account()
+            self.assertEqual(self.publish.call_count, 2)
+            self.assertEqual(self.publish.call_args.kwargs['progress'], 0)
+
+            now.return_value = started + timedelta(seconds=1)
+            self.supervisor.account()
+            self.assertEqual(self.publish.call_count, 2)
+
+            now.return_value = started + timedelta(seconds=30)
+            self.supervisor.account()
+            self.assertEqual(self.publish.call_count, 4)
+            self.assertEqual(self.publish.call_args.kwargs['progress'], events.RECORDING_SHARE // 2)
+
+        self.assertEqual(RecordingSession.objects.get(pk=self.sessions[0].pk).peak_rss_kb, 2048)
+
+    def test_status_endpoint(self):
+        self.supervisor.admit()
+        response = self.client.get('/api/meetings/recorder_status/')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data['max_concurrent'], data['active_count'], data['queued_count']), (2, 2, 1))
+        self.assertEqual([s['id'] for s in data['active']], [self.sessions[0].pk, self.sessions[1].pk])
+        self.assertEqual([s['id'] for s in data['queued']], [self.sessions[2].pk])
+
+
+def _transcript(minutes):
+    """A long meeting that keeps coming back to the same decision and action item"""
+    lines = []
+    for i in range(minutes):
+        lines.append(f'Alex opened topic {i} about the rollout plan for region {i}.')
+        lines.append(f'Sam said the numbers for region {i} look fine so far.')
+        if i % 10 == 0:
+            lines.append('We decide to ship on Friday.')
+            lines.append('Priya will update the release notes.')
+    return '\n'.join(lines)
+
+
+class SummarizationTests(TestCase):
+    def test_chunks_fit_and_keep_every_sentence_once(self):
+        transcript = _transcript(60)
+        chunks = chunk_transcript(transcript, 200)
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(count_tokens(chunk), 200)
+        # Chunks do not overlap or drop anything
+        self.assertEqual(' '.join(chunks).split(), transcript.split())
+
+    def test_long_sentence_is_split_on_words(self):
+        sentence = ' '.join(f'word{i}' for i in range(400)) + '.'
+        chunks = chunk_transcript('Short one. ' + sentence, 100)
+        self.assertEqual(chunks[0], 'Short one.')
+        self.assertTrue(all(count_tokens(chunk) <= 100 for chunk in chunks))
+        self.assertEqual(' '.join(chunks[1:]).split(), sentence.split())
+
+    def test_section_parser_on_split_input(self):
+        reply = '```json\n' + json.dumps({
+            'summary': 'Said "ship it", then {left}.',
+            'key_points': ['a, b', 'c]'],
+            'action_items': [{'task': 'Tag', 'owner': None}],
+        }) + '\n```'
+        for size in (1, 3, 7, len(reply)):
+            parser = SectionParser()
+            sections = []
+            for i in range(0, len(reply), size):
+                sections.extend(parser.feed(reply[i:i + size]))
+            self.assertEqual(dict(sections), json.loads(reply[len('```json\n'):-len('\n```')]), size)
+            self.assertEqual([key for key, _ in sections], ['summary', 'key_points', 'action_items'])
+            self.assertTrue(parser.done)
+
+    def test_section_parser_on_partial_input(self):
+        parser = SectionParser()
+        self.assertEqual(parser.feed('{"summary": "Done.", "key_points": ["one", "tw'), [('summary', 'Done.')])
+        self.assertFalse(parser.done)
+        self.assertEqual(parser.feed('o"], "decisions": [], "bad": tru'), [('key_points', ['one', 'two']), ('decisions', [])])
+        self.assertEqual(parser.feed('e}'), [('bad', True)])
+        self.assertTrue(parser.done)
+
+    def test_reduce_dedupes_across_chunks(self):
+        llm = FakeLLM(max_prompt_tokens=800)
+        engine = SummaryEngine(llm, chunk_tokens=300, token_budget=800, max_workers=2)
+        summary = engine.summarize(_transcript(120))
+        self.assertGreater(llm.calls, 3)
+        self.assertEqual(summary['decisions'], ['We decide to ship on Friday.'])
+        self.assertEqual(
+            summary['action_items'], [{'task': 'Priya will update the release notes.', 'owner': 'Priya', 'due_date': None}]
+        )
+
+    def test_reduce_keeps_items_the_model_drops(self):
+        llm = FakeLLM()
+
+        def forgetful(prompt):
+            reply = json.loads(llm(prompt))
+            if 'Partial summaries:' in prompt:
+                reply['decisions'] = []
+            return json.dumps(reply)
+
+        summary = SummaryEngine(forgetful, chunk_tokens=300, token_budget=800).summarize(_transcript(120))
+        self.assertEqual(summary['decisions'], ['We decide to ship on Friday.'])
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@override_settings(LLM_ROUTER_STATS_DIR='', LLM_CACHE_BACKEND='none', LLM_PROVIDER_ORDER=['openai', 'fake'],
+                   SUMMARY_SERVICE=None, SUMMARY_CHUNK_TOKENS=300, SUMMARY_TOKEN_BUDGET=800)
+class ProviderRoutingTests(TestCase):
+    def setUp(self):
+        self.clock = _Clock()
+        self.calls = []
+        self.failing = set()
+        self.slow = {}
+
+    def _router(self, **options):
+        options.setdefault('breaker_factory', lambda: routing.CircuitBreaker(2, 60, clock=self.clock))
+        router = routing.ProviderRouter(['primary', 'backup'], **options)
+        self.addCleanup(router.close)
+        return router
+
+    def _provider(self, name):
+        self.calls.append(name)
+        time.sleep(self.slow.get(name, 0))
+        if name in self.failing:
+            raise providers.ProviderError(f'{name} is down')
+        return f'reply from {name}'
+
+    def test_failover(self):
+        router = self._router()
+        self.failing.add('primary')
+        with self.assertLogs('meeting.routing', 'WARNING'):
+            self.assertEqual(router.call(self._provider), ('backup', 'reply from backup'))
+        self.assertEqual(self.calls, ['primary', 'backup'])
+        self.assertEqual((router.stats['primary'].failures, router.stats['backup'].successes), (1, 1))
+
+    def test_all_failing(self):
+        router = self._router()
+        self.failing.update(['primary', 'backup'])
+        with self.assertRaisesRegex(providers.ProviderError, 'primary is down; backup: backup is down'), \
+                self.assertLogs('meeting.routing', 'WARNING'):
+            router.call(self._provider)
+
+    def test_breaker_opens_and_recovers(self):
+        router = self._router()
+        self.failing.add('primary')
+        with self.assertLogs('meeting.routing', 'WARNING'):
+            for _ in range(2):
+                router.call(self._provider)
+        self.assertEqual(router.stats['primary'].breaker.state, 'open')
+
+        self.calls.clear()
+        self.assertEqual(router.call(self._provider)[0], 'backup')
+        self.assertEqual(self.calls, ['backup'])
+
+        # One trial call once the reset time has passed; its success closes the breaker
+        self.clock.now = 61
+        self.failing.clear()
+        self.assertEqual(router.call(self._provider)[0], 'primary')
+        self.assertEqual(router.stats['primary'].breaker.state, 'closed')
+
+    def test_slow_call_is_hedged(self):
+        router = self._router(hedge_percentile=90, hedge_min_samples=3)
+        for _ in range(3):
+            router.call(self._provider)
+        self.assertIsNotNone(router.hedge_delay('primary'))
+
+        self.calls.clear()
+        self.slow['primary'] = 0.5
+        self.assertEqual(router.call(self._provider), ('backup', 'reply from backup'))
+        self.assertEqual(self.calls, ['primary', 'backup'])
+        self.assertEqual((router.stats['backup'].hedges, router.stats['backup'].hedge_wins), (1, 1))
+
+    def test_no_hedging_without_enough_samples(self):
+        router = self._router(hedge_percentile=90, hedge_min_samples=3)
+        self.slow['primary'] = 0.2
+        self.assertEqual(router.call(self._provider)[0], 'primary')
+        self.assertEqual(self.calls, ['primary'])
+
+    def _route_summaries(self, openai_reply):
+        """Route summaries across a stubbed 'openai', answering with ``openai_reply(prompt)``, and 'fake'"""
+        llm = FakeLLM()
+        calls = []
+
+        def completion(name, priority=None):
+            def complete(prompt):
+                calls.append(name)
+                return openai_reply(prompt) if name == 'openai' else llm(prompt)
+            return complete
+
+        patches = [
+            mock.patch.object(routing, '_router', None),
+            mock.patch.object(LLMService, 'available_services', return_value=['openai']),
+            mock.patch.object(LLMService, 'get_completion_function', side_effect=completion),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(lambda: routing._router and routing._router.close())
+        return llm, calls
+
+    def test_summary_routes_each_call(self):
+        llm = FakeLLM()
+
+        def openai_reply(prompt):
+            if 'part 2 of' in prompt:
+                raise providers.ProviderError('openai timed out')
+            return llm(prompt)
+
+        _, calls = self._route_summaries(openai_reply)
+
+        with self.assertLogs('meeting.routing', 'WARNING'):
+            summary = LLMService.generate_summary(_transcript(60), force=True)
+        self.assertEqual(summary['decisions'], ['We decide to ship on Friday.'])
+        # Only the call that failed went to the next provider
+        self.assertGreater(llm.calls, 3)
+        self.assertEqual(calls.count('fake'), 1)
+        self.assertEqual(calls.count('openai'), llm.calls + 1)
+
+    def test_reply_that_is_not_json_fails_over(self):
+        fake, calls = self._route_summaries(lambda prompt: 'The team met and agreed to ship.')
+        with self.assertLogs('meeting.routing', 'WARNING'):
+            summary = LLMService.generate_summary(_transcript(60), force=True)
+        self.assertEqual(summary['decisions'], ['We decide to ship on Friday.'])
+        self.assertEqual(calls.count('fake'), fake.calls)
+
+
+class ChunkedUploadTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        media = override_settings(MEDIA_ROOT=self.media.name, UPLOAD_TEMP_DIR=None)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def _start(self, filename, size):
+        response = self.client.post('/api/uploads/', {'filename': filename, 'size': size, 'title': 'Upload'})
+        self.assertEqual(response.status_code, 201)
+        return Upload.objects.get(pk=response.json()['id'])
+
+    def _put(self, upload, offset, data):
+        return self.client.put(
+            f'/api/uploads/{upload.pk}/', data, content_type='application/octet-stream', HTTP_UPLOAD_OFFSET=str(offset)
+        )
+
+    def _send(self, filename, content, sizes):
+        """Upload ``content`` in chunks of ``sizes``; the last response"""
+        upload = self._start(filename, len(content))
+        offset = 0
+        for size in sizes:
+            response = self._put(upload, offset, content[offset:offset + size])
+            if response.status_code != 200:
+                break
+            offset += size
+        upload.refresh_from_db()
+        return upload, response
+
+    def test_header_split_across_chunks_is_accepted(self):
+        content = b'RIFF' + bytes(4) + b'WAVE' + bytes(100)
+        upload, response = self._send('meeting.wav', content, [4, 5, 103])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((upload.state, upload.offset), ('uploading', len(content)))
+
+    def test_mismatched_content_is_rejected(self):
+        content = b'ID3\x04' + bytes(200)
+        upload, response = self._send('meeting.wav', content, [len(content)])
+        self.assertEqual(response.status_code, 415)
+        self.assertIn('does not match .wav: MP3 data', response.json()['error'])
+        self.assertEqual(upload.state, 'aborted')
+        self.assertFalse(uploads.part_path(upload).exists())
+
+    def test_small_first_chunk_does_not_skip_the_check(self):
+        content = b'ID3\x04' + bytes(200)
+        upload, response = self._send('meeting.wav', content, [2, 100, 102])
+        self.assertEqual(response.status_code, 415)
+        self.assertEqual((upload.state, upload.offset), ('aborted', 2))
+
+    def test_file_shorter_than_a_header_is_checked(self):
+        upload, response = self._send('meeting.wav', b'hello', [3, 2])
+        self.assertEqual(response.status_code, 415)
+        self.assertEqual(upload.state, 'aborted')
+
+    def _wav(self, seconds=1):
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(16000)
+            w.writeframes(bytes(32000 * seconds))
+        return buffer.getvalue()
+
+    def _finalize(self, upload):
+        return self.client.post(f'/api/uploads/{upload.pk}/finalize/')
+
+    def test_out_of_order_chunk_reports_the_expected_offset(self):
+        content = self._wav()
+        upload, _ = self._send('meeting.wav', content, [1000])
+
+        response = self._put(upload, 2000, content[2000:3000])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 1000)
+        self.assertEqual(response['Upload-Offset'], '1000')
+
+    def test_checksum_mismatch_discards_the_chunk(self):
+        content = self._wav()
+        upload, _ = self._send('meeting.wav', content, [1000])
+
+        response = self.client.put(
+            f'/api/uploads/{upload.pk}/', content[1000:2000], content_type='application/octet-stream',
+            HTTP_UPLOAD_OFFSET='1000', HTTP_UPLOAD_CHECKSUM='sha256 ' + '0' * 64,
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['offset'], 1000)
+        upload.refresh_from_db()
+        self.assertEqual(upload.offset, 1000)
+        self.assertEqual(uploads.part_path(upload).stat().st_size, 1000)
+        self.assertEqual(self._put(upload, 1000, content[1000:]).status_code, 200)
+
+    def test_incomplete_upload_cannot_be_finalized(self):
+        content = self._wav()
+        upload, _ = self._send('meeting.wav', content, [1000])
+
+        response = self._finalize(upload)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 1000)
+        self.assertFalse(Meeting.objects.exists())
+
+    def test_finalizing_twice_returns_the_same_meeting(self):
+        content = self._wav()
+        upload, _ = self._send('meeting.wav', content, [20000, len(content) - 20000])
+
+        first = self._finalize(upload)
+        second = self._finalize(upload)
+        self.assertEqual((first.status_code, second.status_code), (202, 202))
+        self.assertEqual(first.json()['id'], second.json()['id'])
+        self.assertEqual(Meeting.objects.count(), 1)
+        self.assertEqual(Job.objects.filter(kind='process_meeting').count(), 1)
+
+        meeting = Meeting.objects.get()
+        self.assertEqual(meeting.title, 'Upload')
+        with meeting.recording_file.open('rb') as f:
+            self.assertEqual(f.read(), content)
+        self.assertFalse(uploads.part_path(upload).exists())
+
+    def test_failed_finalize_keeps_the_part_file(self):
+        content = self._wav()
+        upload, _ = self._send('meeting.wav', content, [len(content)])
+
+        with mock.patch.object(Meeting, 'save', side_effect=RuntimeError('database went away')):
+            with self.assertRaises(RuntimeError):
+                uploads.finalize(upload)
+        upload.refresh_from_db()
+        self.assertEqual(upload.state, 'uploading')
+        self.assertEqual(uploads.part_path(upload).read_bytes(), content)
+        self.assertEqual(os.listdir(os.path.join(self.media.name, 'recordings')), [])
+
+        self.assertEqual(self._finalize(upload).status_code, 202)
+        self.assertEqual(Meeting.objects.count(), 1)
+
+
+class LLMCacheTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        cache = override_settings(LLM_CACHE_BACKEND='disk', LLM_CACHE_DIR=self.directory.name)
+        cache.enable()
+        self.addCleanup(cache.disable)
+        patcher = mock.patch.object(llm_cache, '_backend', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.computed = []
+
+    def _compute(self, value):
+        def compute():
+            self.computed.append(value)
+            return value
+        return compute
+
+    def test_hit_skips_compute(self):
+        key = llm_cache.make_key('summary', llm_cache.hash_text('transcript'), 'fake', 'fake')
+        self.assertEqual(llm_cache.cached(key, self._compute({'summary': 'first'})), {'summary': 'first'})
+        self.assertEqual(llm_cache.cached(key, self._compute({'summary': 'second'})), {'summary': 'first'})
+        self.assertEqual(self.computed, [{'summary': 'first'}])
+
+    def test_force_recomputes_and_overwrites(self):
+        key = llm_cache.make_key('summary', llm_cache.hash_text('transcript'), 'fake', 'fake')
+        llm_cache.cached(key, self._compute('first'))
+        self.assertEqual(llm_cache.cached(key, self._compute('second'), force=True), 'second')
+        self.assertEqual(llm_cache.cached(key, self._compute('third')), 'second')
+        self.assertEqual(self.computed, ['first', 'second'])
+
+    def test_hits_and_misses_are_counted(self):
+        key = llm_cache.make_key('summary', llm_cache.hash_text('transcript'), 'fake', 'fake')
+        for _ in range(3):
+            llm_cache.cached(key, self._compute('value'))
+        llm_cache.lookup(llm_cache.make_key('summary', llm_cache.hash_text('other'), 'fake', 'fake'))
+
+        response = self.client.get('/api/meetings/cache_stats/')
+        self.assertEqual(response.json(), {'backend': 'disk', 'hits': 2, 'misses': 2, 'entries': 1})
+
+    def test_transcript_key_follows_audio_and_settings(self):
+        def key(path, **options):
+            with override_settings(**options):
+                return LLMService._transcript_cache_key(path, 'fake', 'energy')
+
+        paths = []
+        for content in (b'RIFF one', b'RIFF one', b'RIFF two'):
+            handle, path = tempfile.mkstemp(dir=self.directory.name)
+            with os.fdopen(handle, 'wb') as f:
+                f.write(content)
+            paths.append(path)
+
+        self.assertEqual(key(paths[0]), key(paths[1]))
+        self.assertNotEqual(key(paths[0]), key(paths[2]))
+        self.assertNotEqual(key(paths[0], TRANSCRIPTION_SEGMENT_SECONDS=60),
+                            key(paths[0], TRANSCRIPTION_SEGMENT_SECONDS=120))
+        self.assertNotEqual(key(paths[0], TRANSCRIPTION_OVERLAP_SECONDS=1),
+                            key(paths[0], TRANSCRIPTION_OVERLAP_SECONDS=2))
+        self.assertNotEqual(LLMService._transcript_cache_key(paths[0], 'fake', 'energy'),
+                            LLMService._transcript_cache_key(paths[0], 'fake', 'none'))
+
+
+class RateLimiterTests(TestCase):
+    def setUp(self):
+        self.clock = _Clock()
+
+    def _limiter(self, rpm, **options):
+        return RateLimiter('test', rpm=rpm, tpm=0, store=LocalBucketStore(clock=self.clock), **options)
+
+    def _wait_for_queue(self, limiter, length):
+        for _ in range(200):
+            if limiter.queue_length() == length:
+                return
+            time.sleep(0.01)
+        self.fail(f'{limiter.queue_length()} callers waiting, expected {length}')
+
+    def test_interactive_is_served_before_earlier_batch(self):
+        # Two requests per 0.2s; the stubbed clock only moves when the test says so
+        limiter = self._limiter(2, period_seconds=0.2, batch_reserve=0)
+        limiter.acquire()
+        limiter.acquire()
+
+        served = []
+
+        def acquire(priority):
+            limiter.acquire(priority=priority, timeout=5)
+            served.append(priority)
+
+        threads = [threading.Thread(target=acquire, args=(Job.PRIORITY_BATCH,))]
+        threads[0].start()
+        self._wait_for_queue(limiter, 1)
+        threads.append(threading.Thread(target=acquire, args=(Job.PRIORITY_INTERACTIVE,)))
+        threads[1].start()
+        self._wait_for_queue(limiter, 2)
+
+        # Room for one request at a time
+        self.clock.now += 0.1
+        self._wait_for_queue(limiter, 1)
+        self.clock.now += 0.1
+        for thread in threads:
+            thread.join()
+        self.assertEqual(served, [Job.PRIORITY_INTERACTIVE, Job.PRIORITY_BATCH])
+
+    def test_batch_keeps_the_reserve(self):
+        limiter = self._limiter(10, batch_reserve=0.2)
+        for _ in range(8):
+            limiter.acquire(priority=Job.PRIORITY_BATCH, timeout=1)
+        with self.assertRaises(RateLimitTimeout):
+            limiter.acquire(priority=Job.PRIORITY_BATCH, timeout=0.05)
+        # What is left is still there for everyone else
+        limiter.acquire(timeout=1)
+        limiter.acquire(timeout=1)
+        with self.assertRaises(RateLimitTimeout):
+            limiter.acquire(timeout=0.05)
+
+    def test_timeout_at_the_deadline(self):
+        limiter = self._limiter(1)
+        limiter.acquire()
+        started = time.monotonic()
+        with self.assertRaisesRegex(RateLimitTimeout, 'no capacity within 0.2s'):
+            limiter.acquire(timeout=0.2)
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(limiter.queue_length(), 0)
+
+    def test_database_store_refunds_a_lost_race(self):
+        store = DatabaseBucketStore(clock=self.clock)
+        self.clock.now = 1000.0
+        requests = [('test:rpm', 1, 10, 0.1, 0), ('test:tpm', 300, 1000, 10, 0)]
+        get_or_create = RateLimitBucket.objects.get_or_create
+        raced = []
+
+        def racing_get_or_create(**kwargs):
+            row = get_or_create(**kwargs)
+            if kwargs['key'] == 'test:tpm' and not raced:
+                # Another process spends 100 tokens between this read and the update
+                raced.append(True)
+                RateLimitBucket.objects.filter(key='test:tpm').update(tokens=F('tokens') - 100, updated_at=1000.0001)
+            return row
+
+        with mock.patch.object(RateLimitBucket.objects, 'get_or_create', side_effect=racing_get_or_create):
+            self.assertEqual(store.take(requests), 0)
+
+        buckets = dict(RateLimitBucket.objects.values_list('key', 'tokens'))
+        self.assertAlmostEqual(buckets['test:rpm'], 9)
+        self.assertAlmostEqual(buckets['test:tpm'], 600)
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.meeting = Meeting.objects.create(title='Planning', transcript='We plan.')
+        self.url = f'/api/meetings/{self.meeting.pk}/'
+
+    def test_current_etag_is_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    def test_cached_detail_skips_loading_the_meeting(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.json()['transcript'], 'We plan.')
+
+    def test_saving_changes_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.meeting.title = 'Planning, again'
+        self.meeting.save()
+
+        self.assertIsNone(response_cache.get_detail(self.meeting.pk, etag))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['title'], 'Planning, again')
+
+    def test_saving_content_changes_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        meeting = Meeting.objects.get(pk=self.meeting.pk)
+        meeting.transcript = 'We changed the plan.'
+        meeting.save(update_fields=['transcript'])
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['transcript'], 'We changed the plan.')
+
+    def test_list_etag_follows_rows_on_the_page(self):
+        other = Meeting.objects.create(title='Retro')
+        etag = self.client.get('/api/meetings/')['ETag']
+        self.assertEqual(self.client.get('/api/meetings/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        other.status = 'completed'
+        other.save()
+        response = self.client.get('/api/meetings/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        etag = response['ETag']
+        Meeting.objects.create(title='Standup')
+        self.assertEqual(self.client.get('/api/meetings/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class SearchTests(TestCase):
+    def test_title_match_outranks_transcript_match(self):
+        spoken = Meeting.objects.create(title='Weekly sync', transcript='We went over the budget again.')
+        titled = Meeting.objects.create(title='Budget review', transcript='We went over the numbers.')
+
+        hits = search.search('budget')
+        self.assertEqual([hit.meeting_id for hit in hits], [titled.pk, spoken.pk])
+        self.assertGreater(hits[0].score, hits[1].score)
+
+        response = self.client.get('/api/meetings/search/', {'q': 'budget'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 2)
+        self.assertEqual([r['meeting']['id'] for r in response.json()['results']], [titled.pk, spoken.pk])
+        self.assertIn('<mark>', response.json()['results'][0]['snippet'])
+
+    def test_index_follows_save_and_delete(self):
+        meeting = Meeting.objects.create(title='Planning')
+        self.assertEqual(search.search('roadmap'), [])
+
+        meeting.transcript = 'The roadmap slips a week.'
+        meeting.save(update_fields=['transcript'])
+        self.assertEqual([hit.meeting_id for hit in search.search('roadmap')], [meeting.pk])
+
+        meeting.title = 'Hiring'
+        meeting.save()
+        self.assertEqual([hit.meeting_id for hit in search.search('hiring')], [meeting.pk])
+        self.assertEqual(search.search('planning'), [])
+
+        meeting.delete()
+        self.assertEqual(search.search('roadmap'), [])
+
+    def test_backend_follows_database_vendor(self):
+        self.assertIsInstance(search.get_backend(), search.SQLiteBackend)
+
+        with mock.patch.object(connection, 'vendor', 'postgresql'), mock.patch.object(search, '_ready', {'default'}):
+            self.assertIsInstance(search.get_backend(), search.PostgresBackend)
+
+    def test_other_databases_fall_back_to_icontains(self):
+        meeting = Meeting.objects.create(title='Budget review')
+        Meeting.objects.create(title='Retro')
+
+        with mock.patch.object(connection, 'vendor', 'mysql'):
+            self.assertIsNone(search.get_backend())
+            self.assertEqual(search.search('budget'), [search.SearchHit(meeting.pk, 0.0, '')])
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        meeting_date = timezone.now()
+        self.meetings = [Meeting.objects.create(title=f'Standup {i}', meeting_date=meeting_date) for i in range(5)]
+
+    def test_pages_are_stable_when_sort_values_tie(self):
+        url = '/api/meetings/?ordering=meeting_date&page_size=2'
+        seen = []
+        while url:
+            page = self.client.get(url).json()
+            seen += [meeting['id'] for meeting in page['results']]
+            url = page['next']
+        self.assertEqual(seen, [meeting.pk for meeting in self.meetings])
+
+    def test_next_cursor_continues_after_the_last_row(self):
+        first = self.client.get('/api/meetings/', {'page_size': 3}).json()
+        self.assertEqual(first['count'], 5)
+        self.assertIsNone(first['previous'])
+
+        second = self.client.get(first['next']).json()
+        newest_first = [meeting.pk for meeting in reversed(self.meetings)]
+        self.assertEqual([meeting['id'] for meeting in first['results']], newest_first[:3])
+        self.assertEqual([meeting['id'] for meeting in second['results']], newest_first[3:])
+        self.assertIsNone(second['next'])
+
+        previous = self.client.get(second['previous']).json()
+        self.assertEqual(previous['results'], first['results'])
+
+    def test_count_false_skips_the_count_query(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/meetings/', {'page_size': 2})
+        self.assertEqual(response.json()['count'], 5)
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/meetings/', {'page_size': 2, 'count': 'false'})
+        self.assertNotIn('count', response.json())
+        self.assertEqual(len(response.json()['results']), 2)
+
+
+class SummaryItemsTests(TestCase):
+    def test_resync_keeps_edited_status_and_drops_removed_items(self):
+        meeting = Meeting.objects.create(title='Release', summary_json={
+            **SUMMARY,
+            'action_items': [
+                {'task': 'Tag the release', 'owner': 'Sam', 'due_date': '2024-05-03'},
+                {'task': 'Email the customers', 'owner': 'Priya', 'due_date': None},
+            ],
+            'agenda': [{'topic': 'Release', 'description': 'Friday ship date'}],
+        })
+        self.assertEqual(summary_items.sync(meeting), (2, 1, 1))
+        ActionItem.objects.filter(meeting=meeting, task='Tag the release').update(status='done')
+
+        meeting.summary_json = {
+            **SUMMARY,
+            'decisions': [],
+            'action_items': [
+                {'task': 'Write the changelog', 'owner': 'Lee', 'due_date': 'next week'},
+                {'task': 'Tag  the release.', 'owner': 'Sam', 'due_date': None},
+            ],
+        }
+        self.assertEqual(summary_items.sync(meeting), (2, 0, 0))
+
+        items = list(ActionItem.objects.filter(meeting=meeting).values_list('position', 'task', 'status', 'due_text'))
+        self.assertEqual(items, [
+            (0, 'Write the changelog', 'open', 'next week'),
+            (1, 'Tag the release.', 'done', None),
+        ])
+        self.assertFalse(Decision.objects.filter(meeting=meeting).exists())
+        self.assertFalse(AgendaTopic.objects.filter(meeting=meeting).exists())
+
+    def test_backfill_runs_in_batches_and_is_idempotent(self):
+        meetings = [Meeting.objects.create(title=f'Release {i}', summary_json=SUMMARY) for i in range(5)]
+        Meeting.objects.create(title='Not summarized yet')
+
+        self.assertEqual(list(summary_items.backfill(batch_size=2)), [
+            (2, 2, 2, 0), (2, 2, 2, 0), (1, 1, 1, 0),
+        ])
+        ActionItem.objects.filter(meeting=meetings[0]).update(status='done')
+
+        out = io.StringIO()
+        call_command('backfill_summary_items', batch_size=2, stdout=out)
+        self.assertEqual(out.getvalue().splitlines(), [
+            'Synced 2 meeting(s)', 'Synced 4 meeting(s)', 'Synced 5 meeting(s)',
+            'Done: 5 action item(s), 5 decision(s), 0 agenda topic(s) from 5 meeting(s)',
+        ])
+        self.assertEqual(ActionItem.objects.count(), 5)
+        self.assertEqual(Decision.objects.count(), 5)
+        self.assertEqual(list(ActionItem.objects.filter(status='done').values_list('meeting_id', flat=True)),
+                         [meetings[0].pk])
+
+
+class MeetingRecorderTests(TestCase):
+    def test_failed_join_releases_everything(self):
+        handle, path = tempfile.mkstemp(suffix='.wav')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        pyaudio = mock.MagicMock(paInt16=8)
+        audio = pyaudio.PyAudio.return_value
+        audio.get_sample_size.return_value = 2
+        browser = FakeBrowser(launch_seconds=0, page_load_seconds=0)
+
+        with mock.patch.dict(sys.modules, {'pyaudio': pyaudio}), \
+                mock.patch('meeting.browser_pool.get_browser', return_value=browser), \
+                mock.patch('meeting.browser_pool.FakeDriver.get', side_effect=RuntimeError('Meeting not found')):
+            result = MeetingRecorder._record_google_meet({'link': 'https://meet.google.com/abc-defg-hij'}, 1, path)
+
+        self.assertEqual(result, {
+            'success': False, 'platform': 'google_meet', 'error': 'Recording failed: Meeting not found',
+        })
+        audio.open.return_value.stop_stream.assert_called_once_with()
+        audio.open.return_value.close.assert_called_once_with()
+        audio.terminate.assert_called_once_with()
+        # The writer closed the file with a valid, empty WAV header
+        with wave.open(path, 'rb') as wf:
+            self.assertEqual(wf.getnframes(), 0)
+        self.assertEqual(browser.launches, 1)
+        self.assertEqual(browser.rss_kb_by_session, {})
+
+
+class MeetingContentTests(TestCase):
+    def test_content_fields_round_trip_through_their_own_table(self):
+        meeting = Meeting.objects.create(title='Release', transcript='We ship on Friday.', summary_json=SUMMARY)
+        self.assertEqual(MeetingContent.objects.get(pk=meeting.pk).transcript, 'We ship on Friday.')
+
+        meeting = Meeting.objects.get(pk=meeting.pk)
+        self.assertEqual(meeting.summary_json['decisions'], SUMMARY['decisions'])
+        meeting.transcript = 'We ship on Monday.'
+        meeting.save(update_fields=['transcript'])
+        self.assertEqual(MeetingContent.objects.get(pk=meeting.pk).transcript, 'We ship on Monday.')
+        self.assertEqual(Meeting.objects.create(title='Empty').transcript, None)
+        self.assertFalse(MeetingContent.objects.filter(meeting__title='Empty').exists())
+
+    def test_list_reads_only_the_narrow_rows(self):
+        caches['default'].clear()
+        for i in range(3):
+            Meeting.objects.create(title=f'Meeting {i}', transcript='word ' * 10000, summary_json=SUMMARY)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/meetings/')
+        self.assertEqual(len(response.json()['results']), 3)
+        self.assertEqual(len(queries), 2)
+        for query in queries:
+            self.assertNotIn('meetingcontent', query['sql'])
+
+
+class AudioNormalizeTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        patcher = mock.patch('meeting.audio_normalize.shutil.which', return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _recording(self, rate=44100):
+        """1s of silence, 2s of a 440 Hz tone and 1s of silence as stereo 16-bit WAV"""
+        path = os.path.join(self.directory.name, 'recording.wav')
+        tone = [int(3000 * math.sin(2 * math.pi * 440 * i / rate)) for i in range(2 * rate)]
+        samples = array('h', [0] * rate + tone + [0] * rate)
+        stereo = array('h', [sample for sample in samples for _ in range(2)])
+        with wave.open(path, 'wb') as wf:
+            wf.setnchannels(2)
+            wf.setsampwidth(2)
+            wf.setframerate(rate)
+            wf.writeframes(stereo.tobytes())
+        return path
+
+    @skipIf(audio_normalize.audioop is None, 'converting WAV without ffmpeg needs audioop')
+    def test_output_is_16khz_mono_with_the_silence_cut(self):
+        audio = audio_normalize.normalize(self._recording(), self.directory.name)
+
+        with wave.open(audio.path, 'rb') as wf:
+            self.assertEqual((wf.getframerate(), wf.getnchannels(), wf.getsampwidth()), (16000, 1, 2))
+            seconds = wf.getnframes() / wf.getframerate()
+        self.assertAlmostEqual(audio.speech.duration, 4.0, delta=0.01)
+        # The tone plus half a second of padding on each side
+        self.assertAlmostEqual(seconds, 3.0, delta=0.05)
+        self.assertAlmostEqual(audio.duration, seconds, delta=0.01)
+        self.assertAlmostEqual(audio.speech.to_original(0.5), 1.0, delta=0.05)
+
+    def test_codec_falls_back_to_wav(self):
+        with override_settings(AUDIO_NORMALIZE_CODEC='flac'):
+            self.assertEqual(audio_normalize.target_codec(['flac', 'wav']), 'wav')
+            with mock.patch('meeting.audio_normalize.shutil.which', return_value='/usr/bin/ffmpeg'):
+                self.assertEqual(audio_normalize.target_codec(['flac', 'wav']), 'flac')
+                self.assertEqual(audio_normalize.target_codec(['mp3', 'wav']), 'wav')
+        with override_settings(AUDIO_NORMALIZE_CODEC='aac'), self.assertRaises(ValueError):
+            audio_normalize.target_codec(['wav'])
+
+
+class DiarizationTests(TestCase):
+    rate = 16000
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.wav')
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+
+    def _voices(self, turns):
+        """A WAV of ``(seconds, amplitude, frequency)`` turns; amplitude 0 is silence"""
+        samples = array('h')
+        for seconds, amplitude, frequency in turns:
+            samples.extend(
+                int(amplitude * math.sin(2 * math.pi * frequency * i / self.rate)) for i in range(seconds * self.rate)
+            )
+        with wave.open(self.path, 'wb') as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(self.rate)
+            wf.writeframes(samples.tobytes())
+
+    def test_energy_diarizer_labels_each_voice(self):
+        low, high = (2, 8000, 150), (2, 1500, 1200)
+        self._voices([low, high, low, (1, 0, 0), high])
+        # The silent second is its own segment and goes to whoever spoke before it
+        segments = [TranscriptSegment(start, end, 'words') for start, end in [(0, 2), (2, 4), (4, 6), (6, 7), (7, 9)]]
+
+        diarization.EnergyDiarizer().assign(self.path, segments)
+        self.assertEqual([segment.speaker for segment in segments], [
+            'Speaker 1', 'Speaker 2', 'Speaker 1', 'Speaker 1', 'Speaker 2',
+        ])
+
+    def test_offset_maps_segments_onto_the_file(self):
+        self._voices([(2, 8000, 150), (2, 1500, 1200)])
+        segments = [TranscriptSegment(60, 62, 'first'), TranscriptSegment(62, 64, 'second')]
+
+        diarization.EnergyDiarizer().assign(self.path, segments, offset=60)
+        self.assertEqual([segment.speaker for segment in segments], ['Speaker 1', 'Speaker 2'])
+
+    def test_labelled_segments_feed_the_summary(self):
+        table = SegmentTable([
+            TranscriptSegment(0, 2.5, 'We ship Friday.', 'Speaker 1'),
+            TranscriptSegment(3, 65, 'I will tag it.', 'Speaker 2'),
+        ])
+        meeting = Meeting.objects.create(title='Release', transcript='We ship Friday. I will tag it.')
+        meeting.segments = table
+        meeting.save()
+
+        meeting = Meeting.objects.get(pk=meeting.pk)
+        self.assertEqual([segment.speaker for segment in meeting.segments], ['Speaker 1', 'Speaker 2'])
+        self.assertEqual(meeting.segments.at(30).text, 'I will tag it.')
+        self.assertEqual(
+            meeting.summary_input, '[00:00:00] Speaker 1: We ship Friday.\n[00:00:03] Speaker 2: I will tag it.'
+        )
+        self.assertIsInstance(diarization.get_diarizer('none'), diarization.NoDiarizer)
+
+
+class LiveTranscriptionTests(TransactionTestCase):
+    rate = 16000
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.wav')
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+        patcher = mock.patch('meeting.live_transcription.events.publish_status')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _record(self, writer, seconds=60):
+        pattern = [(3, 'silence')] + _talk(seconds)
+        source = SyntheticAudioSource(rate=self.rate, pattern=pattern, total_seconds=seconds)
+        capture_stream(source, writer, 1600, lambda: True)
+        writer.close()
+
+    def _writer(self):
+        return StreamingWavWriter(self.path, 1, 2, self.rate, 1600, drop_when_full=False).start()
+
+    def test_windows_hand_off_without_gaps_or_repeats(self):
+        provider = FakeTranscriptionProvider()
+        received = []
+        transcriber = LiveTranscriber(
+            self._writer(), provider, received.append, window_seconds=10, overlap_seconds=2, max_workers=2
+        ).start()
+        self._record(transcriber)
+
+        self.assertIsNone(transcriber.error)
+        self.assertGreaterEqual(transcriber.windows_sent, 5)
+        words = [word for batch in received for segment in batch for word in segment.text.split()]
+        whole = FakeTranscriptionProvider().transcribe(self.path).split()
+        self.assertEqual(words, whole)
+        starts = [segment.start for batch in received for segment in batch]
+        self.assertEqual(starts, sorted(starts))
+
+    def test_session_saves_transcript_and_summary_when_the_recording_ends(self):
+        meeting = Meeting.objects.create(title='Live', status='processing')
+        llm = providers.FakeClient(latency=0)
+        session = LiveSession(meeting, FakeTranscriptionProvider(), llm.complete, NoDiarizer())
+        with override_settings(LIVE_WINDOW_SECONDS=10):
+            self._record(session.wrap(self._writer()))
+        # Saved window by window while recording, before finish()
+        self.assertEqual(Meeting.objects.get(pk=meeting.pk).transcript, session.summarizer.text)
+
+        self.assertTrue(session.finish())
+        meeting = Meeting.objects.get(pk=meeting.pk)
+        self.assertEqual(meeting.status, 'completed')
+        self.assertEqual(meeting.transcript.split(), FakeTranscriptionProvider().transcribe(self.path).split())
+        self.assertEqual(len(meeting.segments), len(session.segments))
+        self.assertTrue(meeting.summary)
+
+    def test_failed_window_hands_the_meeting_to_the_job_queue(self):
+        meeting = Meeting.objects.create(title='Live', status='processing')
+        provider = FakeTranscriptionProvider()
+        calls = []
+
+        def transcribe_segments(path, offset=0.0):
+            calls.append(offset)
+            if len(calls) == 3:
+                raise RuntimeError('provider is down')
+            return FakeTranscriptionProvider.transcribe_segments(provider, path, offset)
+
+        provider.transcribe_segments = transcribe_segments
+        session = LiveSession(meeting, provider, providers.FakeClient(latency=0).complete, NoDiarizer())
+        with override_settings(LIVE_WINDOW_SECONDS=10), self.assertLogs('meeting.live_transcription', 'WARNING'):
+            self._record(session.wrap(self._writer()))
+            self.assertFalse(session.finish())
+
+        self.assertEqual(session.transcriber.error, 'provider is down')
+        meeting = Meeting.objects.get(pk=meeting.pk)
+        self.assertIsNone(meeting.transcript)
+        self.assertEqual(meeting.status, 'processing')
+
+
+class _CountingProvider(FakeTranscriptionProvider):
+    """Records how many requests were sent and the most that ran at once"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.requests = self.running = self.most_running = 0
+
+    def transcribe_segments(self, path, offset=0.0):
+        with self._lock:
+            self.requests += 1
+            self.running += 1
+            self.most_running = max(self.most_running, self.running)
+        try:
+            time.sleep(0.02)
+            return super().transcribe_segments(path, offset)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+@override_settings(AUDIO_NORMALIZE_CODEC='wav', AUDIO_VAD_MIN_SILENCE_SECONDS=2.0, TRANSCRIPTION_SEGMENT_SECONDS=120)
+class ChunkedTranscriptionTests(TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.wav')
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+        source = SyntheticAudioSource(rate=16000, pattern=[(5, 'silence')] + _talk(600), total_seconds=600)
+        with StreamingWavWriter(self.path, 1, 2, 16000, 1600, drop_when_full=False) as writer:
+            capture_stream(source, writer, 1600, lambda: True)
+
+    def test_spans_overlap_and_cover_the_file(self):
+        spans = plan_segments(self.path, 60, overlap_seconds=2.0)
+        self.assertEqual(spans[0][0], 0.0)
+        self.assertAlmostEqual(spans[-1][1], 600, delta=0.01)
+        for (_, end), (start, _) in zip(spans, spans[1:]):
+            self.assertAlmostEqual(end - start, 2.0, delta=0.001)
+        self.assertTrue(all(end - start <= 60 for start, end in spans))
+
+    def test_parallel_spans_stitch_into_the_single_request_transcript(self):
+        whole = transcribe_file(self.path, _CountingProvider(max_segment_seconds=600), max_workers=1)
+
+        provider = _CountingProvider(max_segment_seconds=45)
+        chunked = transcribe_file(self.path, provider, max_workers=4)
+        self.assertGreater(provider.requests, 5)
+        self.assertGreater(provider.most_running, 1)
+        self.assertLessEqual(provider.most_running, 4)
+
+        self.assertEqual(chunked.text, whole.text)
+        # Segments may be split at the cuts, and stay in order
+        starts = [segment.start for segment in chunked.segments]
+        self.assertEqual(starts, sorted(starts))
+        self.assertEqual(chunked.segments[-1].end, whole.segments[-1].end)
+        # Times are back on the recording's timeline: speech starts after 5 seconds (less the padding)
+        self.assertGreater(chunked.segments[0].start, 4)
+        self.assertGreater(chunked.removed_fraction, 0)
+
+    def test_overlap_words_are_dropped_once(self):
+        self.assertEqual(merge_overlap('we will ship on Friday.', 'on friday, and then tag it'), 'and then tag it')
+        self.assertEqual(merge_overlap('we will ship', 'nothing in common'), 'nothing in common')
+
+
+class ProviderClientTests(TestCase):
+    def setUp(self):
+        providers.reset_clients()
+        self.addCleanup(providers.reset_clients)
+
+    def test_one_client_per_provider_and_process(self):
+        clients = []
+        threads = [threading.Thread(target=lambda: clients.append(providers.get_client('fake'))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len({id(client) for client in clients}), 1)
+        self.assertIs(providers.get_client('fake'), clients[0])
+
+        providers.reset_clients()
+        self.assertIsNot(providers.get_client('fake'), clients[0])
+        with self.assertRaises(ValueError):
+            providers.get_client('nope')
+
+    @override_settings(HUGGINGFACE_API_KEY='hf-test', HUGGINGFACE_TIMEOUT_SECONDS=7, LLM_POOL_MAXSIZE=3)
+    def test_requests_share_one_pooled_session(self):
+        client = providers.get_client('huggingface')
+        adapter = client.session.get_adapter('https://api-inference.huggingface.co/')
+        self.assertEqual(adapter._pool_maxsize, 3)
+        self.assertEqual(client.session.headers['Authorization'], 'Bearer hf-test')
+
+        reply = mock.Mock(**{'json.return_value': [{'summary_text': 'Ship on Friday.'}]})
+        with mock.patch.object(client.session, 'post', return_value=reply) as post:
+            self.assertEqual(providers.get_client('huggingface').complete('transcript'), 'Ship on Friday.')
+            self.assertEqual(providers.get_client('huggingface').complete('transcript'), 'Ship on Friday.')
+        self.assertEqual(post.call_count, 2)
+        self.assertEqual(post.call_args.kwargs['timeout'], 7)
+
+        with mock.patch.object(client.session, 'post', side_effect=OSError('connection reset')):
+            with self.assertRaises(providers.ProviderError):
+                client.complete('transcript')
+
+    def test_async_calls_run_concurrently_within_the_timeout(self):
+        client = providers.FakeClient(latency=0.1)
+        prompt = 'Transcript: We decide to ship on Friday.'
+
+        async def ask(count):
+            return await asyncio.gather(*(client.acomplete(prompt) for _ in range(count)))
+
+        started = time.monotonic()
+        replies = asyncio.run(ask(10))
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(len(replies), 10)
+        self.assertEqual(replies[0], client.complete(prompt))
+
+        class Slow(providers.FakeClient):
+            acomplete = providers.ProviderClient.acomplete
+
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(Slow(timeout=0.05, latency=0.5).acomplete(prompt))
+
+
+class BrowserPoolTests(TestCase):
+    def setUp(self):
+        self.browser = FakeBrowser(launch_seconds=0, page_load_seconds=0, rss_mb=150, rss_mb_per_meeting=40)
+
+    def _pool(self, **options):
+        options.setdefault('size', 2)
+        options.setdefault('max_meetings', 20)
+        options.setdefault('max_rss_mb', 1024)
+        pool = BrowserPool(browser=self.browser, **options)
+        while pool.fill():
+            pass
+        return pool
+
+    def _meeting(self, lease):
+        """What a recorder process does with its lease"""
+        with open_browser(lease, self.browser) as driver:
+            driver.get('https://meet.google.com/abc-defg-hij')
+            url = driver.current_url
+        return url
+
+    def test_browsers_are_reused_between_meetings(self):
+        pool = self._pool()
+        self.assertEqual(self.browser.launches, 2)
+
+        sessions = set()
+        for key in 'abcde':
+            lease = pool.lease(key)
+            self.assertEqual(self._meeting(lease), 'https://meet.google.com/abc-defg-hij')
+            sessions.add(lease.session_id)
+            pool.release(key)
+        self.assertEqual(len(sessions), 2)
+
+        self.assertIsNotNone(pool.lease('f'))
+        self.assertIsNotNone(pool.lease('g'))
+        # Both browsers are lent out; the next recorder starts its own
+        self.assertIsNone(pool.lease('h'))
+        self.assertEqual(self.browser.launches, 2)
+
+    def test_worn_out_and_failed_browsers_are_replaced(self):
+        pool = self._pool(size=1, max_meetings=3, max_rss_mb=1024)
+        for n in range(3):
+            lease = pool.lease(n)
+            self._meeting(lease)
+            pool.release(n)
+        self.assertEqual(len(pool.idle), 0)
+        self.assertNotIn(lease.session_id, self.browser.rss_kb_by_session)
+
+        pool.fill()
+        lease = pool.lease('failed')
+        pool.release('failed', reusable=False)
+        self.assertNotIn(lease.session_id, self.browser.rss_kb_by_session)
+        self.assertEqual(self.browser.launches, 2)
+
+    def test_browsers_growing_past_the_memory_limit_are_replaced(self):
+        pool = self._pool(size=1, max_rss_mb=200)
+        lease = pool.lease('a')
+        self._meeting(lease)
+        pool.release('a')
+        self.assertEqual(pool.lease('b').session_id, lease.session_id)
+        self._meeting(lease)
+        pool.release('b')
+        # 150 MB plus 40 MB per meeting
+        self.assertEqual(len(pool.idle), 0)
+
+    def test_unresponsive_browsers_are_skipped_and_launch_failures_back_off(self):
+        pool = self._pool()
+        pool.idle[0].driver.quit()
+        lease = pool.lease('a')
+        self.assertEqual(lease.session_id, pool.leased['a'].lease.session_id)
+        self.assertEqual(len(pool.idle), 0)
+
+        with mock.patch.object(self.browser, 'launch', side_effect=RuntimeError('chromedriver missing')) as launch, \
+                self.assertLogs('meeting.browser_pool', 'WARNING'):
+            self.assertEqual(pool.fill(), 0)
+            self.assertEqual(pool.fill(), 0)
+        self.assertEqual(launch.call_count, 1)
+
+    def test_lease_from_an_exited_supervisor_closes_the_browser(self):
+        pool = self._pool(size=1)
+        lease = pool.lease('a')
+        with open_browser(lease, self.browser) as driver:
+            driver.get('https://meet.google.com/abc-defg-hij')
+            self.assertEqual(driver.current_url, 'https://meet.google.com/abc-defg-hij')
+        # Back on a blank page, still running for the next meeting
+        self.assertEqual(driver.current_url, BLANK_PAGE)
+        self.assertIn(lease.session_id, self.browser.rss_kb_by_session)
+
+        lease.owner_pid = -1
+        with self.assertLogs('meeting.browser_pool', 'WARNING'):
+            with open_browser(lease, self.browser) as driver:
+                pass
+        self.assertNotIn(lease.session_id, self.browser.rss_kb_by_session)
+        self.assertFalse(driver.alive)
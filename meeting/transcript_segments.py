@@ -0,0 +1,180 @@
+"""
+Transcript Segments
+Timestamped, speaker-attributed pieces of a transcript, kept in columnar
+form: start and end milliseconds and speaker numbers in typed arrays, and
+the text in one UTF-8 buffer with offsets. A multi-hour meeting's segments
+pack into a small binary value on ``MeetingContent``, and time-range
+lookups bisect the sorted time columns instead of scanning every segment.
+"""
+
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+
+FORMAT_VERSION = 1
+# version, segments, speaker names bytes, compressed text bytes
+HEADER = struct.Struct('<BIII')
+
+
+@dataclass
+class TranscriptSegment:
+    start: float
+    end: float
+    text: str
+    speaker: str = ''
+
+
+def format_time(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def _ms(seconds):
+    return min(max(round(seconds * 1000), 0), 0xFFFFFFFF) if seconds < float('inf') else 0xFFFFFFFF
+
+
+def _little_endian(column):
+    if sys.byteorder == 'big':
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+class SegmentTable:
+    """
+    Segments in time order. Each one starts no earlier than the previous one
+    ends; overlapping segments are clipped when appended.
+    """
+
+    __slots__ = ('starts', 'ends', 'speaker_ids', 'speakers', '_text', '_offsets')
+
+    def __init__(self, segments=()):
+        self.starts = array('I')
+        self.ends = array('I')
+        self.speaker_ids = array('H')
+        self.speakers = []
+        self._text = bytearray()
+        self._offsets = array('I', [0])
+        for segment in segments:
+            self.append(segment.start, segment.end, segment.text, segment.speaker)
+
+    def append(self, start, end, text, speaker=''):
+        start_ms, end_ms = _ms(start), _ms(end)
+        if self.ends:
+            start_ms = max(start_ms, self.ends[-1])
+        self.starts.append(start_ms)
+        self.ends.append(max(start_ms, end_ms))
+        try:
+            speaker_id = self.speakers.index(speaker)
+        except ValueError:
+            speaker_id = len(self.speakers)
+            self.speakers.append(speaker)
+        self.speaker_ids.append(speaker_id)
+        self._text += text.encode()
+        self._offsets.append(len(self._text))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __bool__(self):
+        return bool(self.starts)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        return TranscriptSegment(
+            self.starts[index] / 1000,
+            self.ends[index] / 1000,
+            self._text[self._offsets[index]:self._offsets[index + 1]].decode(),
+            self.speakers[self.speaker_ids[index]],
+        )
+
+    @property
+    def has_speakers(self):
+        return any(self.speakers)
+
+    def index_range(self, start, end):
+        """``range`` of the indexes of segments overlapping ``start``..``end`` seconds"""
+        first = bisect_right(self.ends, _ms(start))
+        last = bisect_left(self.starts, _ms(end))
+        return range(first, max(first, last))
+
+    def between(self, start, end):
+        return [self[i] for i in self.index_range(start, end)]
+
+    def at(self, seconds):
+        """The segment playing at ``seconds``, or None"""
+        segments = self.between(seconds, seconds + 0.001)
+        return segments[0] if segments else None
+
+    def as_text(self, timestamps=True):
+        """One line per segment, with its start time and speaker, as given to the summarizer"""
+        lines = []
+        for segment in self:
+            if not segment.text:
+                continue
+            prefix = f"[{format_time(segment.start)}] " if timestamps else ''
+            if segment.speaker:
+                prefix += f"{segment.speaker}: "
+            lines.append(prefix + segment.text)
+        return '\n'.join(lines)
+
+    def to_json(self, indexes=None):
+        indexes = range(len(self)) if indexes is None else indexes
+        return [
+            {'start': s.start, 'end': s.end, 'speaker': s.speaker, 'text': s.text}
+            for s in map(self.__getitem__, indexes)
+        ]
+
+    def to_bytes(self):
+        speakers = '\n'.join(self.speakers).encode()
+        text = zlib.compress(bytes(self._text), 6)
+        return b''.join([
+            HEADER.pack(FORMAT_VERSION, len(self), len(speakers), len(text)),
+            _little_endian(self.starts),
+            _little_endian(self.ends),
+            _little_endian(self.speaker_ids),
+            _little_endian(self._offsets),
+            speakers,
+            text,
+        ])
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Load ``to_bytes`` output; raises ValueError for anything else"""
+        data = memoryview(data)
+        try:
+            version, count, speakers_size, text_size = HEADER.unpack_from(data)
+        except struct.error:
+            raise ValueError('Transcript segments are truncated')
+        if version != FORMAT_VERSION:
+            raise ValueError(f'Unsupported transcript segments version: {version}')
+
+        table = cls.__new__(cls)
+        position = HEADER.size
+        columns = []
+        for typecode, length in (('I', count), ('I', count), ('H', count), ('I', count + 1)):
+            column = array(typecode)
+            size = column.itemsize * length
+            column.frombytes(data[position:position + size])
+            if sys.byteorder == 'big':
+                column.byteswap()
+            columns.append(column)
+            position += size
+        table.starts, table.ends, table.speaker_ids, table._offsets = columns
+        speakers = bytes(data[position:position + speakers_size]).decode()
+        table.speakers = speakers.split('\n') if count else []
+        position += speakers_size
+        try:
+            table._text = bytearray(zlib.decompress(data[position:position + text_size]))
+        except zlib.error:
+            raise ValueError('Transcript segments are corrupt')
+        if len(table._offsets) != count + 1 or table._offsets[-1] != len(table._text):
+            raise ValueError('Transcript segments are corrupt')
+        return table
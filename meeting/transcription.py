@@ -0,0 +1,370 @@
+"""
+Chunked Transcription
+Normalizes recordings to 16 kHz mono without their silence (see
+``audio_normalize``), splits long ones at quiet points into overlapping spans, transcribes
+them concurrently through a bounded pool and stitches the timestamped
+segments the provider returns back into one transcript, labelled with
+speakers by a diarizer.
+"""
+
+import logging
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+import wave
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from django.conf import settings
+
+from . import audio_normalize, audio_probe
+from .meeting_recorder import AudioExtractor
+from .transcript_segments import SegmentTable, TranscriptSegment
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptionProvider:
+    """
+    Transcribes one audio file. ``offset`` is where the file starts in the
+    original recording; real providers ignore it.
+    """
+
+    # Limits of a single request to the provider
+    max_segment_seconds = 600
+    max_segment_bytes = None
+    # Codecs from audio_normalize.CODECS the provider accepts
+    formats = ('wav',)
+
+    def transcribe(self, path, offset=0.0):
+        raise NotImplementedError
+
+    def transcribe_segments(self, path, offset=0.0):
+        """
+        ``TranscriptSegment``s of the file, timed in the original recording.
+        Providers without timestamps return the whole file as one segment.
+        """
+        text = self.transcribe(path, offset).strip()
+        return [TranscriptSegment(offset, offset + _duration(path), text)]
+
+
+def _timed(offset, pieces):
+    return [TranscriptSegment(offset + start, offset + end, text.strip()) for start, end, text in pieces]
+
+
+class OpenAIWhisperProvider(TranscriptionProvider):
+    max_segment_seconds = 600
+    max_segment_bytes = 24 * 1024 * 1024  # Whisper rejects files over 25MB
+    formats = ('wav', 'flac', 'opus')
+
+    def transcribe(self, path, offset=0.0):
+        from .llm_service import LLMService
+        return LLMService._openai_transcribe(path)
+
+    def transcribe_segments(self, path, offset=0.0):
+        from .llm_service import LLMService
+        return _timed(offset, LLMService._openai_transcribe(path, timestamps=True))
+
+
+class GoogleSpeechProvider(TranscriptionProvider):
+    max_segment_seconds = 55  # synchronous recognize() accepts up to one minute
+    max_segment_bytes = 10 * 1024 * 1024
+    formats = ('wav', 'flac', 'opus')
+
+    def transcribe(self, path, offset=0.0):
+        from .llm_service import LLMService
+        return LLMService._google_transcribe(path)
+
+    def transcribe_segments(self, path, offset=0.0):
+        from .llm_service import LLMService
+        return _timed(offset, LLMService._google_transcribe(path, timestamps=True))
+
+
+class FakeTranscriptionProvider(TranscriptionProvider):
+    """
+    Offline provider for tests and benchmarks. Emits one word per second of
+    non-silent audio, named after the absolute second (``w12``), so overlapping
+    segments produce identical text. ``latency`` and ``realtime_factor``
+    simulate request overhead and processing time per second of audio, and
+    ``upload_bytes_per_second`` the time to send the file. ``bytes_sent``
+    counts what was sent. Formats other than WAV are decoded with ffmpeg.
+    """
+
+    def __init__(self, latency=0.0, realtime_factor=0.0, max_segment_seconds=120, upload_bytes_per_second=None,
+                 formats=('wav',)):
+        self.latency = latency
+        self.realtime_factor = realtime_factor
+        self.max_segment_seconds = max_segment_seconds
+        self.upload_bytes_per_second = upload_bytes_per_second
+        self.formats = formats
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+
+    def transcribe_words(self, path, offset=0.0):
+        """``(second, word)`` for each spoken second"""
+        size = os.path.getsize(path)
+        with self._lock:
+            self.bytes_sent += size
+        if self.upload_bytes_per_second:
+            time.sleep(size / self.upload_bytes_per_second)
+        if not path.endswith('.wav'):
+            with tempfile.TemporaryDirectory(prefix='fake_provider_') as tmp:
+                decoded = os.path.join(tmp, 'decoded.wav')
+                if not AudioExtractor.extract_audio_from_video(path, decoded)['success']:
+                    raise ValueError(f"Fake provider could not decode {path}")
+                return self._transcribe(decoded, offset)
+        return self._transcribe(path, offset)
+
+    def transcribe(self, path, offset=0.0):
+        return ' '.join(word for _, word in self.transcribe_words(path, offset))
+
+    def transcribe_segments(self, path, offset=0.0):
+        """One segment per run of consecutive spoken seconds"""
+        segments = []
+        for second, word in self.transcribe_words(path, offset):
+            if segments and segments[-1].end == second:
+                segments[-1].end = second + 1
+                segments[-1].text += f' {word}'
+            else:
+                segments.append(TranscriptSegment(second, second + 1, word))
+        return segments
+
+    def _transcribe(self, path, offset):
+        with wave.open(path, 'rb') as wf:
+            rate = wf.getframerate()
+            sample_width = wf.getsampwidth()
+            channels = wf.getnchannels()
+            duration = wf.getnframes() / rate
+
+            words = []
+            # Walk whole seconds of the original recording covered by this file
+            second = math.ceil(offset)
+            while second < offset + duration:
+                start = int((second - offset) * rate)
+                wf.setpos(start)
+                window = wf.readframes(min(rate, wf.getnframes() - start))
+                if _rms(window, sample_width, channels) > 100:
+                    words.append((second, f"w{second}"))
+                second += 1
+
+        time.sleep(self.latency + duration * self.realtime_factor)
+        return words
+
+
+PROVIDERS = {
+    'openai': OpenAIWhisperProvider,
+    'google': GoogleSpeechProvider,
+    'fake': FakeTranscriptionProvider,
+}
+
+
+def get_provider(service):
+    try:
+        return PROVIDERS[service]()
+    except KeyError:
+        raise ValueError(f"Transcription not supported for service: {service}")
+
+
+@dataclass
+class TranscriptionResult:
+    segments: list = field(default_factory=list)
+    # Share of the recording cut out as silence before transcription
+    removed_fraction: float = 0.0
+
+    @property
+    def text(self):
+        return ' '.join(segment.text for segment in self.segments if segment.text).strip()
+
+    def to_dict(self):
+        return {
+            'segments': [[s.start, s.end, s.text, s.speaker] for s in self.segments],
+            'removed_fraction': self.removed_fraction,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        # Results cached before diarization have no speaker
+        return cls([TranscriptSegment(*segment) for segment in data['segments']], data.get('removed_fraction', 0.0))
+
+    def to_table(self):
+        return SegmentTable(self.segments)
+
+    def with_timestamps(self):
+        return self.to_table().as_text()
+
+
+def _duration(path):
+    try:
+        return audio_probe.probe(path).duration or 0.0
+    except (OSError, ValueError):
+        return 0.0
+
+
+def _rms(data, sample_width, channels=1):
+    """Root-mean-square level of a PCM block (16-bit samples; other widths use the top byte)"""
+    if sample_width == 2:
+        samples = array('h', data[:len(data) - len(data) % 2])
+    else:
+        samples = array('b', data[sample_width - 1::sample_width])
+    if not samples:
+        return 0
+    # Every 4th sample is plenty to find quiet regions and keeps this cheap
+    decimated = samples[::4]
+    return math.sqrt(sum(s * s for s in decimated) / len(decimated))
+
+
+def plan_segments(wav_path, target_seconds, overlap_seconds=2.0, search_seconds=10.0, window_seconds=0.1):
+    """
+    Choose ``(start, end)`` boundaries in seconds for transcription segments.
+
+    Each cut is placed at the quietest ``window_seconds`` within the last
+    ``search_seconds`` before the target length, so cuts fall between words
+    where possible. Every segment after the first starts ``overlap_seconds``
+    before the previous cut so words straddling it are not lost.
+    """
+    with wave.open(wav_path, 'rb') as wf:
+        rate = wf.getframerate()
+        sample_width = wf.getsampwidth()
+        channels = wf.getnchannels()
+        duration = wf.getnframes() / rate
+
+        cuts = []
+        position = 0.0
+        while duration - position > target_seconds:
+            search_start = max(position + target_seconds - search_seconds, position + overlap_seconds + window_seconds)
+            search_end = position + target_seconds
+
+            wf.setpos(int(search_start * rate))
+            block = wf.readframes(int((search_end - search_start) * rate))
+            quietest = quietest_point(block, rate, sample_width, channels, window_seconds)
+            best_cut = search_end if quietest is None else search_start + quietest
+            cuts.append(best_cut)
+            position = best_cut
+
+    boundaries = [0.0] + cuts + [duration]
+    return [
+        (max(0.0, boundaries[i] - overlap_seconds) if i else 0.0, boundaries[i + 1])
+        for i in range(len(boundaries) - 1)
+    ]
+
+
+def quietest_point(pcm, rate, sample_width=2, channels=1, window_seconds=0.1):
+    """Seconds into the PCM block ``pcm`` of the middle of its quietest ``window_seconds``, or None if it is shorter"""
+    frame_bytes = sample_width * channels
+    window = int(window_seconds * rate) * frame_bytes
+    best, best_level = None, None
+    for start in range(0, len(pcm) - window + 1, window):
+        level = _rms(pcm[start:start + window], sample_width, channels)
+        if best_level is None or level < best_level:
+            best, best_level = (start + window / 2) / frame_bytes / rate, level
+    return best
+
+
+_WORD_RE = re.compile(r"[^\w']+")
+
+
+def _normalize(word):
+    return _WORD_RE.sub('', word.lower())
+
+
+def merge_overlap(previous_text, next_text, max_words=60):
+    """Drop the words at the start of ``next_text`` that repeat the end of ``previous_text``"""
+    prev_words = previous_text.split()
+    next_words = next_text.split()
+    prev_norm = [_normalize(w) for w in prev_words[-max_words:]]
+    next_norm = [_normalize(w) for w in next_words[:max_words]]
+
+    for size in range(min(len(prev_norm), len(next_norm)), 0, -1):
+        if prev_norm[-size:] == next_norm[:size]:
+            return ' '.join(next_words[size:])
+    return next_text
+
+
+def _segment_seconds(provider, wav_path):
+    target = min(provider.max_segment_seconds, getattr(settings, 'TRANSCRIPTION_SEGMENT_SECONDS', 120))
+    if provider.max_segment_bytes:
+        with wave.open(wav_path, 'rb') as wf:
+            bytes_per_second = wf.getframerate() * wf.getsampwidth() * wf.getnchannels()
+        target = min(target, provider.max_segment_bytes / bytes_per_second)
+    return target
+
+
+def transcribe_file(audio_path, provider, max_workers=None, overlap_seconds=None, diarizer=None):
+    """
+    Transcribe ``audio_path`` with ``provider``, splitting it into concurrent
+    spans when it is longer than one provider request allows, and label the
+    segments with ``diarizer`` if given. Returns a ``TranscriptionResult``.
+
+    Only the speech is sent; segments are transcribed and diarized on the
+    shortened audio, then moved back onto the recording's timeline. A
+    segment running across a removed pause spans the pause.
+    """
+    max_workers = max_workers or getattr(settings, 'TRANSCRIPTION_MAX_WORKERS', 4)
+    if overlap_seconds is None:
+        overlap_seconds = getattr(settings, 'TRANSCRIPTION_OVERLAP_SECONDS', 2.0)
+
+    with tempfile.TemporaryDirectory(prefix='transcribe_') as tmp:
+        audio = audio_normalize.normalize(audio_path, tmp)
+        if audio is None:
+            # Not decodable here (no ffmpeg); send the file as-is
+            return TranscriptionResult([TranscriptSegment(0.0, 0.0, provider.transcribe(audio_path).strip())])
+
+        codec = audio_normalize.target_codec(provider.formats)
+        spans = plan_segments(audio.path, _segment_seconds(provider, audio.path), overlap_seconds)
+        if len(spans) == 1:
+            segments = provider.transcribe_segments(audio_normalize.encode(audio.path, codec))
+        else:
+            paths = []
+            for i, (start, end) in enumerate(spans):
+                path = os.path.join(tmp, f'segment_{i:04d}.wav')
+                audio_normalize.copy_span(audio.path, start, end, path)
+                paths.append(path)
+
+            logger.info(f"Transcribing {audio_path} as {len(spans)} {codec} segments with {max_workers} workers")
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                # Segments are encoded in the pool too, next to the requests that send them
+                pieces = list(pool.map(
+                    lambda item: provider.transcribe_segments(
+                        audio_normalize.encode(item[0], codec), offset=item[1][0]
+                    ),
+                    zip(paths, spans)
+                ))
+            segments = stitch(spans, pieces)
+
+        if diarizer is not None and segments:
+            diarizer.assign(audio.path, segments)
+    return TranscriptionResult(audio.speech.restore(segments), audio.speech.removed_fraction)
+
+
+def stitch(spans, pieces):
+    """
+    Join the segments transcribed for each of the overlapping ``spans``,
+    dropping what each span repeats of the one before (see ``trim_overlap``).
+    """
+    segments, cut = [], None
+    for (_, span_end), piece in zip(spans, pieces):
+        segments.extend(trim_overlap(piece, cut, segments[-1].text if segments else ''))
+        cut = span_end
+    return segments
+
+
+def trim_overlap(piece, cut, previous_text=''):
+    """
+    The segments of ``piece`` that are new after ``cut``, where the previous
+    span ended with ``previous_text``. Segments ending before the cut repeat
+    what that span already has and are dropped; one straddling the cut loses
+    the words the previous segment ended with.
+    """
+    kept = []
+    for segment in piece:
+        if cut is not None and segment.start < cut:
+            if segment.end <= cut:
+                continue
+            segment.text = merge_overlap(kept[-1].text if kept else previous_text, segment.text)
+            segment.start = cut
+        kept.append(segment)
+    return kept
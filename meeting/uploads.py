@@ -0,0 +1,306 @@
+"""
+Resumable Uploads
+Chunked upload protocol for large recordings: an upload is created with
+the file's name and size, chunks are PUT at the offset the server reports,
+each optionally with a checksum, and finalizing it creates the meeting.
+Chunks are streamed straight into a part file, so no request holds more
+than a small buffer in memory and a dropped connection only loses the
+chunk in flight. Both this and ``RecordingUploadHandler``, used for
+multipart uploads, reject a file whose first bytes do not match its
+extension before the rest of it is received.
+"""
+
+import fcntl
+import hashlib
+import logging
+import os
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.text import get_valid_filename
+
+from . import audio_probe
+from .models import Meeting, Upload
+
+logger = logging.getLogger(__name__)
+
+CHECKSUM_ALGORITHMS = ('md5', 'sha1', 'sha256')
+READ_SIZE = 64 * 1024
+
+_pruned_at = 0.0
+
+
+class UploadError(Exception):
+    """A request the upload cannot accept; ``offset`` tells the client where to resume"""
+
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+class RecordingUploadHandler(FileUploadHandler):
+    """
+    Watches ``recording_file`` while a multipart request streams in and stops
+    reading it as soon as the request is too large or the file's first bytes
+    do not match its extension. The reason is left in ``error``.
+    """
+
+    field_name = 'recording_file'
+
+    def __init__(self, request=None, max_size=None):
+        super().__init__(request)
+        self.max_size = max_size
+        self.error = None
+        self.request_length = None
+        self._head = None
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        self.request_length = content_length
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self._head = b'' if field_name == self.field_name else None
+        # The other form fields are small, so the request length bounds the file
+        if self._head is not None and self.max_size and (self.request_length or 0) > self.max_size + 1024 * 1024:
+            self._reject(f"File size too large. Maximum {self.max_size // (1024 * 1024)}MB allowed; "
+                         f"use /api/uploads/ for larger recordings.")
+
+    def receive_data_chunk(self, raw_data, start):
+        if self._head is not None:
+            if self.max_size and start + len(raw_data) > self.max_size:
+                self._reject(f"File size too large. Maximum {self.max_size // (1024 * 1024)}MB allowed.")
+            if len(self._head) < audio_probe.SNIFF_BYTES:
+                self._head += raw_data[:audio_probe.SNIFF_BYTES - len(self._head)]
+                if len(self._head) == audio_probe.SNIFF_BYTES:
+                    try:
+                        audio_probe.check_header(self.file_name, self._head)
+                    except ValueError as e:
+                        self._reject(str(e))
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
+
+    def _reject(self, message):
+        self.error = message
+        # Answer now rather than reading the rest of the body first
+        raise StopUpload(connection_reset=True)
+
+
+def get_temp_dir():
+    return Path(getattr(settings, 'UPLOAD_TEMP_DIR', None) or Path(settings.MEDIA_ROOT) / 'uploads')
+
+
+def part_path(upload):
+    return get_temp_dir() / f'{upload.pk}.part'
+
+
+def max_size():
+    return getattr(settings, 'UPLOAD_MAX_SIZE', 4 * 1024 ** 3)
+
+
+def chunk_size():
+    """Chunk size suggested to clients"""
+    return getattr(settings, 'UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024)
+
+
+def parse_checksum(value):
+    """``'sha256 <hex digest>'`` into ``(algorithm, digest)``; None when no checksum was sent"""
+    if not value:
+        return None
+    algorithm, _, digest = value.strip().partition(' ')
+    algorithm = algorithm.lower()
+    if algorithm not in CHECKSUM_ALGORITHMS or not digest:
+        raise UploadError(f"Checksum must be '<algorithm> <hex digest>' with one of: {', '.join(CHECKSUM_ALGORITHMS)}")
+    return algorithm, digest.strip().lower()
+
+
+def get_upload(upload_id):
+    try:
+        return Upload.objects.get(pk=upload_id)
+    except (Upload.DoesNotExist, ValidationError, ValueError):
+        raise UploadError('Upload not found', status=404)
+
+
+def create(filename, size, meeting_fields):
+    """Start an upload of ``size`` bytes; ``meeting_fields`` are used for the meeting on finalize"""
+    prune_stale()
+    upload = Upload.objects.create(filename=filename, size=size, meeting_fields=meeting_fields)
+    get_temp_dir().mkdir(parents=True, exist_ok=True)
+    part_path(upload).touch()
+    return upload
+
+
+@contextmanager
+def _locked(upload):
+    """The upload's part file, opened and locked against other writers in any process"""
+    try:
+        f = open(part_path(upload), 'r+b')
+    except FileNotFoundError:
+        raise UploadError('Upload is no longer available', status=410)
+    with f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        yield f
+
+
+def write_chunk(upload, offset, stream, length, checksum=None):
+    """
+    Write ``length`` bytes read from ``stream`` at ``offset``, which must be
+    the upload's current offset. A short or mismatching chunk is discarded.
+    Returns the new offset.
+    """
+    max_chunk = getattr(settings, 'UPLOAD_MAX_CHUNK_SIZE', 64 * 1024 * 1024)
+    if length <= 0 or length > max_chunk:
+        raise UploadError(f'Chunks must be between 1 and {max_chunk} bytes', offset=upload.offset)
+    hasher = hashlib.new(checksum[0]) if checksum else None
+
+    with _locked(upload) as f:
+        # Another request may have written a chunk while this one waited for the lock
+        upload.refresh_from_db(fields=['offset', 'state'])
+        if upload.state != 'uploading':
+            raise UploadError(f'Upload is {upload.state}', status=409, offset=upload.offset)
+        if offset != upload.offset:
+            raise UploadError(f'Expected offset {upload.offset}', status=409, offset=upload.offset)
+        if offset + length > upload.size:
+            raise UploadError(f'Chunk ends past the declared size of {upload.size} bytes', offset=offset)
+
+        # The header may arrive over several chunks; the earlier ones are already in the file
+        head = None
+        if offset < audio_probe.SNIFF_BYTES:
+            f.seek(0)
+            head = f.read(offset)
+        f.seek(offset)
+        try:
+            remaining = length
+            while remaining:
+                data = stream.read(min(READ_SIZE, remaining))
+                if not data:
+                    raise UploadError('Chunk ended before Content-Length bytes', offset=offset)
+                if head is not None and len(head) < audio_probe.SNIFF_BYTES:
+                    head += data[:audio_probe.SNIFF_BYTES - len(head)]
+                    if len(head) == audio_probe.SNIFF_BYTES:
+                        _check_header(upload, head)
+                if hasher:
+                    hasher.update(data)
+                f.write(data)
+                remaining -= len(data)
+            if head is not None and len(head) < audio_probe.SNIFF_BYTES and offset + length == upload.size:
+                # The whole file is shorter than a header
+                _check_header(upload, head)
+            if hasher and hasher.hexdigest() != checksum[1]:
+                raise UploadError('Chunk checksum mismatch', offset=offset)
+            f.flush()
+        except BaseException:
+            f.truncate(offset)
+            raise
+
+        Upload.objects.filter(pk=upload.pk).update(offset=offset + length, updated_at=timezone.now())
+        upload.offset = offset + length
+    return upload.offset
+
+
+def _check_header(upload, head):
+    try:
+        audio_probe.check_header(upload.filename, head)
+    except ValueError as e:
+        raise _rejected(upload, str(e), 415)
+
+
+def _rejected(upload, message, status):
+    """Abort an upload whose content is unusable; the error to raise"""
+    Upload.objects.filter(pk=upload.pk).update(state='aborted', updated_at=timezone.now())
+    upload.state = 'aborted'
+    part_path(upload).unlink(missing_ok=True)
+    return UploadError(message, status=status)
+
+
+def _file_digest(path, algorithm):
+    hasher = hashlib.new(algorithm)
+    with open(path, 'rb') as f:
+        while data := f.read(1024 * 1024):
+            hasher.update(data)
+    return hasher.hexdigest()
+
+
+def finalize(upload, checksum=None):
+    """
+    Move the complete file to the recordings and create its meeting.
+    Returns ``(meeting, created)``; finalizing again returns the same meeting.
+    """
+    if upload.state == 'completed' and upload.meeting_id:
+        return upload.meeting, False
+
+    with _locked(upload) as f:
+        upload.refresh_from_db(fields=['offset', 'state', 'meeting'])
+        if upload.state == 'completed' and upload.meeting_id:
+            return upload.meeting, False
+        if upload.state != 'uploading':
+            raise UploadError(f'Upload is {upload.state}', status=409, offset=upload.offset)
+        if upload.offset != upload.size:
+            raise UploadError(
+                f'Upload is incomplete: {upload.offset} of {upload.size} bytes received',
+                status=409, offset=upload.offset,
+            )
+        if checksum and _file_digest(f.name, checksum[0]) != checksum[1]:
+            raise UploadError('File checksum mismatch', offset=upload.offset)
+        try:
+            audio_info = audio_probe.probe(f.name)
+        except ValueError as e:
+            raise _rejected(upload, f'Unreadable recording: {e}', 422)
+
+        name = default_storage.get_available_name(f'recordings/{get_valid_filename(upload.filename)}')
+        target = Path(default_storage.path(name))
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+        # Still under the lock, so a concurrent finalize sees the completed upload
+        fields = dict(upload.meeting_fields)
+        if fields.get('meeting_date'):
+            fields['meeting_date'] = parse_datetime(fields['meeting_date'])
+        meeting = Meeting(**fields, **audio_info.as_meeting_fields())
+        meeting.recording_file.name = name
+        try:
+            # The file only moves once the meeting exists; if anything fails the
+            # upload is left as it was, part file included, so finalize can be retried
+            with transaction.atomic():
+                meeting.save()
+                Upload.objects.filter(pk=upload.pk).update(
+                    state='completed', meeting=meeting, updated_at=timezone.now()
+                )
+                os.replace(f.name, target)
+        except BaseException:
+            if target.exists():
+                os.replace(target, f.name)
+            raise
+        upload.state, upload.meeting = 'completed', meeting
+    return meeting, True
+
+
+def abort(upload):
+    """Stop accepting chunks and delete what was received"""
+    if upload.state == 'completed':
+        raise UploadError('Upload is completed', status=409, offset=upload.offset)
+    Upload.objects.filter(pk=upload.pk).update(state='aborted', updated_at=timezone.now())
+    upload.state = 'aborted'
+    part_path(upload).unlink(missing_ok=True)
+
+
+def prune_stale():
+    """Abort uploads that have not received a chunk within ``UPLOAD_EXPIRY_SECONDS``, at most once a minute"""
+    global _pruned_at
+    if time.monotonic() - _pruned_at < 60:
+        return
+    _pruned_at = time.monotonic()
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'UPLOAD_EXPIRY_SECONDS', 24 * 3600))
+    for upload in Upload.objects.filter(state='uploading', updated_at__lt=cutoff)[:100]:
+        logger.info(f'Aborting stale upload {upload.pk} ({upload.offset}/{upload.size} bytes)')
+        abort(upload)
@@ -6,11 +6,17 @@ app_name = 'meeting'
 
 router = DefaultRouter()
 router.register(r'api/meetings', views.MeetingViewSet, basename='meeting')
+router.register(r'api/action-items', views.ActionItemViewSet, basename='action-item')
+router.register(r'api/decisions', views.DecisionViewSet, basename='decision')
+router.register(r'api/agenda-topics', views.AgendaTopicViewSet, basename='agenda-topic')
+router.register(r'api/uploads', views.UploadViewSet, basename='upload')
 
 urlpatterns = [
     path('', views.index, name='index'),
     path('create/', views.create_meeting, name='create_meeting'),
     path('meeting/<int:meeting_id>/', views.meeting_result, name='meeting_result'),
     path('history/', views.meeting_history, name='meeting_history'),
+    path('api/meetings/<int:meeting_id>/events/', views.meeting_events, name='meeting_events'),
+    path('api/events/', views.meeting_events, name='events'),
     path('', include(router.urls)),
 ]
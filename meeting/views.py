@@ -1,15 +1,54 @@
-from rest_framework import viewsets, status, filters
+import datetime
+import json
+
+from rest_framework import mixins, viewsets, status, filters
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.http import Http404, HttpResponseNotAllowed, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404
 from django.db.models import Q
-from .models import Meeting
-from .serializers import MeetingListSerializer, MeetingSummarySerializer, MeetingCreateSerializer
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from .models import Job, Meeting, ActionItem, Decision, AgendaTopic
+from .serializers import (
+    MeetingListSerializer, MeetingSummarySerializer, MeetingCreateSerializer,
+    JobSerializer, RecordingSessionSerializer,
+    ActionItemSerializer, DecisionSerializer, AgendaTopicSerializer,
+    UploadCreateSerializer, UploadSerializer
+)
+from .meeting_recorder import MeetingRecorder
+from .pagination import MeetingCursorPagination
 from .llm_service import LLMService
-from .meeting_recorder import MeetingBotRecorder, MeetingRecorder
-import json
-import threading
+from . import event_stream, events, jobs, llm_cache, recorder_supervisor, response_cache, routing, search, tasks, uploads
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets views answer ``Accept: text/event-stream``; error bodies become an SSE error event"""
+    media_type = 'text/event-stream'
+    format = 'sse'
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return _sse('error', data).encode('utf-8')
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """``?search=`` backed by the full-text index instead of ``icontains`` scans"""
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        return search.filter_queryset(queryset, query)
 
 
 class MeetingViewSet(viewsets.ModelViewSet):
@@ -18,8 +57,8 @@ class MeetingViewSet(viewsets.ModelViewSet):
     queryset = Meeting.objects.all()
     serializer_class = MeetingListSerializer
     parser_classes = (MultiPartParser, FormParser)
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['title', 'description', 'meeting_type']
+    filter_backends = [FullTextSearchFilter, filters.OrderingFilter]
+    pagination_class = MeetingCursorPagination
     ordering_fields = ['created_at', 'meeting_date', 'meeting_type']
     ordering = ['-created_at']
     
@@ -31,73 +70,80 @@ class MeetingViewSet(viewsets.ModelViewSet):
             return MeetingCreateSerializer
         return MeetingListSerializer
     
+    def get_queryset(self):
+        # The list only shows narrow Meeting columns; detail actions need the transcript and summary
+        queryset = super().get_queryset()
+        if self.action != 'list':
+            queryset = queryset.select_related('content')
+        return queryset
+    
     def create(self, request, *args, **kwargs):
-        """Create a new meeting and generate summary"""
+        """Create a new meeting and queue it for transcription and summarization"""
+        # Checks the recording while it streams in, before it is spooled to disk
+        upload_check = uploads.RecordingUploadHandler(request, settings.MAX_UPLOAD_SIZE)
+        request.upload_handlers.insert(0, upload_check)
         serializer = self.get_serializer(data=request.data)
+        if upload_check.error:
+            return Response({'recording_file': [upload_check.error]}, status=status.HTTP_400_BAD_REQUEST)
         serializer.is_valid(raise_exception=True)
         
         # Save the meeting
         meeting = serializer.save()
         
-        # Generate summary asynchronously or synchronously
-        try:
-            # Get transcript
-            transcript = meeting.transcript
-            
-            if not transcript and meeting.recording_file:
-                # Extract transcript from audio file
-                file_path = meeting.recording_file.path
-                try:
-                    transcript = LLMService.extract_transcript_from_audio(file_path)
-                    meeting.transcript = transcript
-                    meeting.save()
-                except Exception as e:
-                    meeting.status = 'failed'
-                    meeting.processing_error = f"Transcription failed: {str(e)}"
-                    meeting.save()
-                    return Response(
-                        {'error': f'Transcription failed: {str(e)}'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-            
-            # Generate summary from transcript
-            meeting.status = 'processing'
-            meeting.save()
-            
-            try:
-                summary_json = LLMService.generate_summary(transcript)
-                meeting.summary_json = summary_json
-                meeting.status = 'completed'
-                meeting.processing_error = None
-            except Exception as e:
-                meeting.status = 'failed'
-                meeting.processing_error = str(e)
-            
-            meeting.save()
+        # Transcription and summarization run in the background workers
+        job = jobs.enqueue('process_meeting', meeting=meeting)
+        events.publish_status(meeting.id, meeting.status)
         
-        except Exception as e:
-            meeting.status = 'failed'
-            meeting.processing_error = str(e)
-            meeting.save()
-        
-        # Return the created meeting
         output_serializer = MeetingSummarySerializer(meeting)
-        return Response(output_serializer.data, status=status.HTTP_201_CREATED)
+        return Response(
+            {**output_serializer.data, 'job_id': job.id},
+            status=status.HTTP_202_ACCEPTED
+        )
     
     def retrieve(self, request, *args, **kwargs):
         """Retrieve a specific meeting with full details"""
-        meeting = self.get_object()
-        serializer = MeetingSummarySerializer(meeting)
-        return Response(serializer.data)
+        # Answer revalidations from updated_at alone, before loading the transcript and summary
+        try:
+            updated_at = Meeting.objects.filter(pk=kwargs['pk']).values_list('updated_at', flat=True).first()
+        except (TypeError, ValueError):
+            updated_at = None
+        if updated_at is None:
+            raise Http404
+        etag = response_cache.detail_etag(kwargs['pk'], updated_at)
+        not_modified = response_cache.not_modified(request, etag, updated_at)
+        if not_modified is not None:
+            return not_modified
+        
+        data = response_cache.get_detail(kwargs['pk'], etag)
+        if data is None:
+            meeting = self.get_object()
+            updated_at = meeting.updated_at
+            etag = response_cache.detail_etag(meeting.pk, updated_at)
+            data = MeetingSummarySerializer(meeting).data
+            response_cache.set_detail(meeting.pk, etag, data)
+        return response_cache.add_validators(Response(data), etag, updated_at)
     
     def list(self, request, *args, **kwargs):
         """List all meetings with filtering"""
-        # Add filtering by meeting_type if provided
+        # Filters are served by the (meeting_type|status, created_at, id) indexes
         meeting_type = request.query_params.get('meeting_type', None)
         if meeting_type:
             self.queryset = self.queryset.filter(meeting_type=meeting_type)
         
-        return super().list(request, *args, **kwargs)
+        meeting_status = request.query_params.get('status', None)
+        if meeting_status:
+            self.queryset = self.queryset.filter(status=meeting_status)
+        
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        # A page is unchanged if it holds the same rows at the same versions
+        etag = response_cache.list_etag(page, self.paginator.count)
+        not_modified = response_cache.not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        
+        serializer = self.get_serializer(page, many=True)
+        return response_cache.add_validators(self.get_paginated_response(serializer.data), etag)
     
     @action(detail=True, methods=['delete'])
     def delete_meeting(self, request, pk=None):
@@ -120,26 +166,91 @@ class MeetingViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        try:
-            meeting.status = 'processing'
-            meeting.save()
+        # force=true bypasses the summary cache
+        force = str(request.data.get('force', request.query_params.get('force', ''))).lower() in ('1', 'true', 'yes')
+        # A user is waiting on this one, so it jumps ahead of batch work
+        job = jobs.enqueue_once('summarize', meeting, payload={'force': force}, priority=Job.PRIORITY_INTERACTIVE)
+        
+        meeting.status = 'pending'
+        meeting.save(update_fields=['status', 'updated_at'])
+        events.publish_status(meeting.id, 'pending')
+        
+        serializer = MeetingSummarySerializer(meeting)
+        return Response(
+            {**serializer.data, 'job_id': job.id},
+            status=status.HTTP_202_ACCEPTED
+        )
+    
+    @action(detail=True, methods=['get'], url_path='summary/stream',
+            renderer_classes=[JSONRenderer, EventStreamRenderer])
+    def stream_summary(self, request, pk=None):
+        """Generate the summary, sending each section as a server-sent event when it is ready"""
+        meeting = self.get_object()
+        
+        if not meeting.transcript:
+            return Response(
+                {'error': 'No transcript available for this meeting'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        force = str(request.query_params.get('force', '')).lower() in ('1', 'true', 'yes')
+        
+        def sse_events():
+            yield ': stream opened\n\n'
             
-            summary_json = LLMService.generate_summary(meeting.transcript)
-            meeting.summary_json = summary_json
-            meeting.status = 'completed'
-            meeting.processing_error = None
-            meeting.save()
+            if meeting.summary_json and not force:
+                # The same sections and final payload a fresh stream sends, without schema_version
+                sections = meeting.summary_data.sections()
+                for name, value in sections.items():
+                    yield _sse('section', {'key': name, 'value': value})
+                yield _sse('done', sections)
+                return
             
-            serializer = MeetingSummarySerializer(meeting)
-            return Response(serializer.data)
-        except Exception as e:
-            meeting.status = 'failed'
-            meeting.processing_error = str(e)
-            meeting.save()
+            try:
+                for event in LLMService.stream_summary(meeting.summary_input, force=force):
+                    if event[0] == 'section':
+                        yield _sse('section', {'key': event[1], 'value': event[2]})
+                    else:
+                        tasks.save_summary(meeting, event[1])
+                        yield _sse('done', event[1])
+            except Exception as e:
+                yield _sse('error', {'error': f'Summary generation failed: {str(e)}'})
+        
+        response = StreamingHttpResponse(sse_events(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Stop nginx and similar proxies from buffering the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
+    
+    @action(detail=True, methods=['get'], url_path='jobs')
+    def list_jobs(self, request, pk=None):
+        """List background jobs for a meeting"""
+        meeting = self.get_object()
+        serializer = JobSerializer(meeting.jobs.order_by('-created_at'), many=True)
+        return Response(serializer.data)
+    
+    @action(detail=True, methods=['get'])
+    def segments(self, request, pk=None):
+        """Timestamped, speaker-labelled transcript segments, optionally only those between ?start= and ?end= seconds"""
+        meeting = self.get_object()
+        table = meeting.segments
+        try:
+            start = float(request.query_params.get('start', 0))
+            end = float(request.query_params.get('end', 'inf'))
+        except ValueError:
             return Response(
-                {'error': f'Summary generation failed: {str(e)}'},
+                {'error': 'start and end must be numbers of seconds'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        
+        segments = table.to_json(table.index_range(start, end))
+        speaker = request.query_params.get('speaker')
+        if speaker:
+            segments = [segment for segment in segments if segment['speaker'] == speaker]
+        return Response({
+            'speakers': [name for name in table.speakers if name],
+            'segments': segments,
+        })
     
     @action(detail=True, methods=['get'])
     def download_summary(self, request, pk=None):
@@ -152,43 +263,31 @@ class MeetingViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Generate text content
-        content = f"""MEETING SUMMARY REPORT
-        
-Meeting Title: {meeting.title}
-Meeting Type: {meeting.get_meeting_type_display()}
-Date: {meeting.meeting_date.strftime('%Y-%m-%d %H:%M:%S')}
-Created: {meeting.created_at.strftime('%Y-%m-%d %H:%M:%S')}
-
-{'='*80}
-
-SUMMARY:
-{meeting.summary}
-
-{'='*80}
-
-KEY POINTS:
-"""
-        
-        for point in meeting.key_points:
-            content += f"• {point}\n"
-        
-        content += f"\n{'='*80}\n\nDECISIONS:\n"
-        for decision in meeting.decisions:
-            content += f"• {decision}\n"
-        
-        content += f"\n{'='*80}\n\nACTION ITEMS:\n"
-        for item in meeting.action_items:
-            task = item.get('task', '') if isinstance(item, dict) else item
-            owner = item.get('owner', 'N/A') if isinstance(item, dict) else 'N/A'
-            due_date = item.get('due_date', 'N/A') if isinstance(item, dict) else 'N/A'
-            content += f"• Task: {task}\n  Owner: {owner}\n  Due Date: {due_date}\n\n"
-        
-        content += f"\n{'='*80}\n\nAGENDA:\n"
-        for topic in meeting.agenda:
-            topic_name = topic.get('topic', '') if isinstance(topic, dict) else topic
-            description = topic.get('description', '') if isinstance(topic, dict) else ''
-            content += f"• {topic_name}\n  {description}\n\n"
+        summary = meeting.summary_data
+        rule = '=' * 80
+        lines = [
+            'MEETING SUMMARY REPORT',
+            '',
+            f'Meeting Title: {meeting.title}',
+            f'Meeting Type: {meeting.get_meeting_type_display()}',
+            f"Date: {meeting.meeting_date.strftime('%Y-%m-%d %H:%M:%S')}",
+            f"Created: {meeting.created_at.strftime('%Y-%m-%d %H:%M:%S')}",
+            '', rule, '',
+            'SUMMARY:',
+            summary.summary,
+            '', rule, '',
+            'KEY POINTS:',
+        ]
+        lines.extend(f'• {point}' for point in summary.key_points)
+        lines += ['', rule, '', 'DECISIONS:']
+        lines.extend(f'• {decision}' for decision in summary.decisions)
+        lines += ['', rule, '', 'ACTION ITEMS:']
+        for item in summary.action_items:
+            lines += [f'• Task: {item.task}', f"  Owner: {item.owner or 'N/A'}", f"  Due Date: {item.due_date or 'N/A'}", '']
+        lines += ['', rule, '', 'AGENDA:']
+        for topic in summary.agenda:
+            lines += [f'• {topic.topic}', f"  {topic.description or ''}", '']
+        content = '\n'.join(lines) + '\n'
         
         return Response(
             {'content': content},
@@ -225,64 +324,299 @@ KEY POINTS:
             status='processing'
         )
         
-        # Start recording in background thread
-        def record_and_summarize():
-            try:
-                # Record meeting
-                recorder = MeetingBotRecorder(meeting_link, duration_minutes)
-                recording_result = recorder.record_meeting()
-                
-                if not recording_result['success']:
-                    meeting.status = 'failed'
-                    meeting.processing_error = f"Recording failed: {recording_result.get('error', 'Unknown error')}"
-                    meeting.save()
-                    return
-                
-                # Extract audio if needed
-                audio_result = recorder.extract_audio()
-                if not audio_result['success']:
-                    meeting.processing_error = f"Audio extraction failed: {audio_result.get('error', 'Unknown error')}"
-                    # Continue with recording file anyway
-                
-                audio_file = recorder.audio_file or recorder.recording_file
-                
-                # Transcribe audio
-                transcript = LLMService.extract_transcript_from_audio(audio_file)
-                meeting.transcript = transcript
-                meeting.save()
-                
-                # Generate summary
-                summary_data = LLMService.generate_summary(transcript)
-                if summary_data:
-                    meeting.summary_json = summary_data
-                    meeting.status = 'completed'
-                else:
-                    meeting.status = 'failed'
-                    meeting.processing_error = 'Failed to generate summary'
-                
-                meeting.save()
-            
-            except Exception as e:
-                meeting.status = 'failed'
-                meeting.processing_error = str(e)
-                meeting.save()
-        
-        # Run recording in background
-        thread = threading.Thread(target=record_and_summarize)
-        thread.daemon = True
-        thread.start()
+        # Recording runs in the recorder supervisor, which caps concurrent sessions
+        session = recorder_supervisor.submit(meeting, duration_minutes)
+        position = recorder_supervisor.queue_position(session)
+        events.publish_status(meeting.id, 'processing', stage='queued')
         
         return Response(
             {
                 'id': meeting.id,
+                'session_id': session.id,
                 'title': meeting.title,
                 'meeting_link': meeting_link,
-                'status': 'recording',
-                'message': f'Recording {meeting_info["platform"]} meeting for {duration_minutes} minutes. You will be notified when complete.',
+                'status': 'queued',
+                'queue_position': position,
+                'message': f'Recording {meeting_info["platform"]} meeting for up to {duration_minutes} minutes (position {position} in the recorder queue). You will be notified when complete.',
                 'platform': meeting_info['platform']
             },
-            status=status.HTTP_201_CREATED
+            status=status.HTTP_202_ACCEPTED
         )
+    
+    @action(detail=False, methods=['get'], url_path='search')
+    def search_meetings(self, request):
+        """Ranked full-text search with highlighted snippets"""
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response(
+                {'error': 'q is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        fields = [f.strip() for f in request.query_params.get('fields', '').split(',') if f.strip()]
+        try:
+            limit = min(int(request.query_params.get('limit', 20)), 100)
+            offset = max(int(request.query_params.get('offset', 0)), 0)
+            hits = search.search(query, fields=fields, limit=limit, offset=offset)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        meetings = Meeting.objects.in_bulk([hit.meeting_id for hit in hits])
+        results = [
+            {
+                'meeting': MeetingListSerializer(meetings[hit.meeting_id]).data,
+                'score': hit.score,
+                'snippet': hit.snippet,
+            }
+            for hit in hits if hit.meeting_id in meetings
+        ]
+        return Response({
+            'query': query,
+            'count': search.filter_queryset(Meeting.objects.all(), query, fields=fields).count(),
+            'results': results,
+        })
+    
+    @action(detail=False, methods=['get'])
+    def cache_stats(self, request):
+        """Show hit/miss counts for the transcript and summary cache"""
+        return Response(llm_cache.stats())
+    
+    @action(detail=False, methods=['get'])
+    def provider_stats(self, request):
+        """Show per-provider latency histograms and circuit breaker states"""
+        return Response(routing.provider_stats())
+    
+    @action(detail=False, methods=['get'])
+    def recorder_status(self, request):
+        """Show active and queued recording sessions"""
+        snapshot = recorder_supervisor.status_snapshot()
+        return Response({
+            'max_concurrent': snapshot['max_concurrent'],
+            'active_count': snapshot['active_count'],
+            'queued_count': snapshot['queued_count'],
+            'active': RecordingSessionSerializer(snapshot['active'], many=True).data,
+            'queued': RecordingSessionSerializer(snapshot['queued'], many=True).data,
+        })
+
+
+
+def _query_date(request, name):
+    value = request.query_params.get(name, '').strip()
+    if not value:
+        return None
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: f'Invalid date: {value}'})
+    return parsed
+
+
+def _query_datetime(request, name):
+    """A datetime or a plain date (midnight) from the query string, in the current time zone if naive"""
+    value = request.query_params.get(name, '').strip()
+    if not value:
+        return None
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None and parse_date(value) is not None:
+            parsed = datetime.datetime.combine(parse_date(value), datetime.time())
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: f'Invalid date: {value}'})
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+class SummaryItemViewSet(viewsets.GenericViewSet):
+    """Shared filters for rows extracted from meeting summaries"""
+    
+    pagination_class = MeetingCursorPagination
+    
+    def get_queryset(self):
+        queryset = super().get_queryset().select_related('meeting')
+        params = self.request.query_params
+        
+        meeting_id = params.get('meeting')
+        if meeting_id:
+            if not meeting_id.isdigit():
+                raise ValidationError({'meeting': 'Must be a meeting id'})
+            queryset = queryset.filter(meeting_id=meeting_id)
+        
+        meeting_type = params.get('meeting_type')
+        if meeting_type:
+            queryset = queryset.filter(meeting__meeting_type=meeting_type)
+        
+        since = _query_datetime(self.request, 'since')
+        if since:
+            queryset = queryset.filter(created_at__gte=since)
+        until = _query_datetime(self.request, 'until')
+        if until:
+            queryset = queryset.filter(created_at__lt=until)
+        return queryset
+
+
+class ActionItemViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin,
+                        mixins.UpdateModelMixin, SummaryItemViewSet):
+    """Action items across meetings; PATCH ``status`` to mark them done"""
+    
+    queryset = ActionItem.objects.all()
+    serializer_class = ActionItemSerializer
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+        
+        # Matches the Lower(owner) index
+        owner = params.get('owner', '').strip()
+        if owner:
+            queryset = queryset.alias(owner_lower=Lower('owner')).filter(owner_lower=owner.lower())
+        
+        item_status = params.get('status')
+        if item_status:
+            queryset = queryset.filter(status=item_status)
+        
+        due_before = _query_date(self.request, 'due_before')
+        if due_before:
+            queryset = queryset.filter(due_date__lte=due_before)
+        due_after = _query_date(self.request, 'due_after')
+        if due_after:
+            queryset = queryset.filter(due_date__gte=due_after)
+        return queryset
+
+
+class DecisionViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, SummaryItemViewSet):
+    """Decisions across meetings"""
+    
+    queryset = Decision.objects.all()
+    serializer_class = DecisionSerializer
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        query = self.request.query_params.get('q', '').strip()
+        if query:
+            queryset = queryset.filter(text__icontains=query)
+        return queryset
+
+
+class AgendaTopicViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, SummaryItemViewSet):
+    """Agenda topics across meetings"""
+    
+    queryset = AgendaTopic.objects.all()
+    serializer_class = AgendaTopicSerializer
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        query = self.request.query_params.get('q', '').strip()
+        if query:
+            queryset = queryset.filter(Q(topic__icontains=query) | Q(description__icontains=query))
+        return queryset
+
+
+class UploadViewSet(viewsets.ViewSet):
+    """
+    Resumable uploads of large recordings. POST the file's name and size to
+    start one, PUT each chunk with ``Upload-Offset`` (and optionally
+    ``Upload-Checksum: sha256 <hex>``), GET or HEAD the upload to find where
+    to resume, then POST ``finalize/`` to create and process the meeting.
+    """
+    
+    def _error(self, e):
+        body = {'error': str(e)}
+        if e.offset is not None:
+            body['offset'] = e.offset
+        response = Response(body, status=e.status)
+        if e.offset is not None:
+            response['Upload-Offset'] = str(e.offset)
+        return response
+    
+    def _upload_response(self, upload, status_code=status.HTTP_200_OK):
+        response = Response(UploadSerializer(upload).data, status=status_code)
+        response['Upload-Offset'] = str(upload.offset)
+        response['Cache-Control'] = 'no-store'
+        return response
+    
+    def create(self, request):
+        """Start an upload"""
+        serializer = UploadCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = uploads.create(
+            serializer.validated_data['filename'], serializer.validated_data['size'], serializer.meeting_fields()
+        )
+        return self._upload_response(upload, status.HTTP_201_CREATED)
+    
+    def retrieve(self, request, pk=None):
+        """The upload's state and the offset to resume from"""
+        try:
+            upload = uploads.get_upload(pk)
+        except uploads.UploadError as e:
+            return self._error(e)
+        return self._upload_response(upload)
+    
+    def update(self, request, pk=None):
+        """Write one chunk at ``Upload-Offset``; the body is streamed to disk, never parsed"""
+        try:
+            upload = uploads.get_upload(pk)
+            try:
+                offset = int(request.headers['Upload-Offset'])
+                length = int(request.headers['Content-Length'])
+            except (KeyError, ValueError):
+                raise uploads.UploadError('Upload-Offset and Content-Length headers are required', offset=upload.offset)
+            checksum = uploads.parse_checksum(request.headers.get('Upload-Checksum'))
+            uploads.write_chunk(upload, offset, request.stream, length, checksum)
+        except uploads.UploadError as e:
+            return self._error(e)
+        return self._upload_response(upload)
+    
+    def destroy(self, request, pk=None):
+        """Abort the upload and delete what was received"""
+        try:
+            uploads.abort(uploads.get_upload(pk))
+        except uploads.UploadError as e:
+            return self._error(e)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    
+    @action(detail=True, methods=['post'])
+    def finalize(self, request, pk=None):
+        """Create the meeting from the complete file and queue it for processing"""
+        try:
+            upload = uploads.get_upload(pk)
+            checksum = uploads.parse_checksum(request.data.get('checksum'))
+            meeting, created = uploads.finalize(upload, checksum)
+        except uploads.UploadError as e:
+            return self._error(e)
+        
+        if created:
+            jobs.enqueue('process_meeting', meeting=meeting)
+            events.publish_status(meeting.id, meeting.status)
+        return Response(
+            {**MeetingSummarySerializer(meeting).data, 'upload': UploadSerializer(upload).data},
+            status=status.HTTP_202_ACCEPTED
+        )
+
+
+async def meeting_events(request, meeting_id=None):
+    """
+    Server-sent ``status`` events for one meeting, starting with its current
+    status, or for every meeting. ``meeting_bot.asgi`` answers these paths
+    before Django (see ``event_stream``); this view serves them under WSGI and
+    ``runserver``. Streams end after ``EVENTS_STREAM_MAX_SECONDS`` and browsers
+    reconnect, which also bounds streams whose client went away unnoticed.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    if meeting_id is not None and not await Meeting.objects.filter(pk=meeting_id).aexists():
+        raise Http404
+    
+    if isinstance(request, WSGIRequest):
+        stream = event_stream.sync_stream(meeting_id)
+    else:
+        stream = event_stream.async_stream(meeting_id)
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 
 def index(request):
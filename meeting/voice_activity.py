@@ -0,0 +1,180 @@
+"""
+Voice Activity Detection
+Finds the stretches of a recording where someone is speaking, so silence,
+hold time and long pauses are not sent to the speech provider. Audio is
+measured in short frames against ``AUDIO_SILENCE_LEVEL``; pauses longer than
+``AUDIO_VAD_MIN_SILENCE_SECONDS`` are cut out and the rest is joined into
+one shorter file. A ``SpeechMap`` records where each kept stretch came from,
+so timestamps in the shorter file can be moved back onto the recording.
+"""
+
+import math
+import sys
+import wave
+from array import array
+from bisect import bisect_left, bisect_right
+
+from django.conf import settings
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+FRAME_SECONDS = 0.03
+# Kept around speech so no word is clipped; joined stretches are separated by twice this
+PADDING_SECONDS = 0.5
+
+
+class SpeechMap:
+    """
+    The ``regions`` (``(start, end)`` seconds, in order) of a recording of
+    ``duration`` seconds that were kept, back to back, in a compacted copy.
+    """
+
+    def __init__(self, regions, duration):
+        self.regions = list(regions)
+        self.duration = duration
+        self._starts = []  # where each region starts in the compacted copy
+        position = 0.0
+        for start, end in self.regions:
+            self._starts.append(position)
+            position += end - start
+        self.kept_seconds = position
+
+    @classmethod
+    def whole(cls, duration):
+        return cls([(0.0, duration)], duration)
+
+    @property
+    def start(self):
+        """Where the compacted copy starts in the recording"""
+        return self.regions[0][0] if self.regions else 0.0
+
+    @property
+    def removed_seconds(self):
+        return self.duration - self.kept_seconds
+
+    @property
+    def removed_fraction(self):
+        return self.removed_seconds / self.duration if self.duration else 0.0
+
+    @property
+    def is_whole(self):
+        return self.regions == [(0.0, self.duration)]
+
+    def to_original(self, seconds, end=False):
+        """
+        Where ``seconds`` into the compacted copy is in the recording. A time
+        on the join of two regions is the start of the later one, or with
+        ``end`` the end of the earlier one.
+        """
+        if not self.regions:
+            return seconds
+        find = bisect_left if end else bisect_right
+        i = max(0, find(self._starts, seconds) - 1)
+        return self.regions[i][0] + seconds - self._starts[i]
+
+    def restore(self, segments):
+        """Move ``segments`` timed in the compacted copy onto the recording, in place"""
+        for segment in segments:
+            segment.start = self.to_original(segment.start)
+            segment.end = max(segment.start, self.to_original(segment.end, end=True))
+        return segments
+
+
+def _block_levels(block, frame_samples):
+    """RMS level of each ``frame_samples`` of a block of 16-bit little-endian samples"""
+    if numpy is not None:
+        squares = numpy.frombuffer(block, dtype='<i2').astype(numpy.float64) ** 2
+        starts = numpy.arange(0, len(squares), frame_samples)
+        sizes = numpy.diff(numpy.append(starts, len(squares)))
+        return numpy.sqrt(numpy.add.reduceat(squares, starts) / sizes).astype(numpy.int64).tolist()
+
+    samples = array('h', block)
+    if sys.byteorder == 'big':
+        samples.byteswap()
+    # hypot sums the squares in C, so no Python-level loop over samples
+    return [
+        int(math.hypot(*samples[i:i + frame_samples]) / math.sqrt(min(frame_samples, len(samples) - i)))
+        for i in range(0, len(samples), frame_samples)
+    ]
+
+
+def frame_levels(wav_path, frame_seconds=FRAME_SECONDS):
+    """RMS level of each ``frame_seconds`` of a mono 16-bit WAV, and the file's duration"""
+    levels = []
+    with wave.open(wav_path, 'rb') as wf:
+        rate = wf.getframerate()
+        frame_samples = int(frame_seconds * rate)
+        duration = wf.getnframes() / rate
+        # Whole frames per read, so no frame is split between two
+        while block := wf.readframes(int(10 / frame_seconds) * frame_samples):
+            levels.extend(_block_levels(block, frame_samples))
+    return levels, duration
+
+
+def speech_regions(levels, duration, level, min_silence_seconds=None, frame_seconds=FRAME_SECONDS,
+                   padding_seconds=PADDING_SECONDS):
+    """
+    ``(start, end)`` seconds around the frames louder than ``level``, padded
+    by ``padding_seconds``. Pauses shorter than ``min_silence_seconds`` stay
+    inside a region; with no ``min_silence_seconds`` only the leading and
+    trailing silence is left out. Empty when nothing is louder than ``level``.
+    """
+    runs = []
+    for i, frame_level in enumerate(levels):
+        if frame_level <= level:
+            continue
+        if runs and (not min_silence_seconds or (i - runs[-1][1]) * frame_seconds < min_silence_seconds):
+            runs[-1][1] = i + 1
+        else:
+            runs.append([i, i + 1])
+
+    regions = []
+    for first, last in runs:
+        start = max(0.0, first * frame_seconds - padding_seconds)
+        end = min(duration, last * frame_seconds + padding_seconds)
+        if regions and start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+    return regions
+
+
+def detect(wav_path, level=None, min_silence_seconds=None):
+    """
+    The ``SpeechMap`` of what to keep of a mono 16-bit WAV. The whole file
+    when it is silent throughout (left for the provider to judge) or when
+    less than a frame would be removed.
+    """
+    if level is None:
+        level = getattr(settings, 'AUDIO_SILENCE_LEVEL', 100)
+    if min_silence_seconds is None:
+        min_silence_seconds = getattr(settings, 'AUDIO_VAD_MIN_SILENCE_SECONDS', 2.0)
+    levels, duration = frame_levels(wav_path)
+    if not level:
+        return SpeechMap.whole(duration)
+    regions = speech_regions(levels, duration, level, min_silence_seconds)
+    speech = SpeechMap(regions, duration)
+    if not regions or speech.removed_seconds < FRAME_SECONDS:
+        return SpeechMap.whole(duration)
+    return speech
+
+
+def compact(wav_path, speech, out_path):
+    """Copy the regions of ``speech`` from ``wav_path`` into ``out_path``, back to back"""
+    with wave.open(wav_path, 'rb') as src:
+        rate = src.getframerate()
+        frame_bytes = src.getsampwidth() * src.getnchannels()
+        with wave.open(out_path, 'wb') as dst:
+            dst.setparams(src.getparams())
+            for start, end in speech.regions:
+                src.setpos(int(start * rate))
+                remaining = int(end * rate) - int(start * rate)
+                while remaining > 0:
+                    frames = src.readframes(min(remaining, rate * 10))
+                    if not frames:
+                        break
+                    dst.writeframes(frames)
+                    remaining -= len(frames) // frame_bytes
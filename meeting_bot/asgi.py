@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'meeting_bot.settings')
 
 application = get_asgi_application()
+
+# Status event streams are served outside Django's request handling; see meeting.event_stream
+from meeting.event_stream import EventStreamApp  # noqa: E402
+
+application = EventStreamApp(application)
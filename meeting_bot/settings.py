@@ -92,6 +92,9 @@ DATABASES = {
     }
 }
 
+# Text search configuration for the PostgreSQL full-text index (SQLite uses FTS5 with Porter stemming)
+SEARCH_CONFIG = config('SEARCH_CONFIG', default='english')
+
 # ======================
 # PASSWORD VALIDATION
 # ======================
@@ -149,6 +152,72 @@ CORS_ALLOW_CREDENTIALS = True
 OPENAI_API_KEY = config('OPENAI_API_KEY', default='')
 GOOGLE_API_KEY = config('GOOGLE_API_KEY', default='')
 HUGGINGFACE_API_KEY = config('HUGGINGFACE_API_KEY', default='')
+HUGGINGFACE_API_URL = config('HUGGINGFACE_API_URL', default='')
+
+# Provider clients are created once per process and reuse pooled connections
+OPENAI_TIMEOUT_SECONDS = config('OPENAI_TIMEOUT_SECONDS', default=60, cast=float)
+GOOGLE_TIMEOUT_SECONDS = config('GOOGLE_TIMEOUT_SECONDS', default=60, cast=float)
+HUGGINGFACE_TIMEOUT_SECONDS = config('HUGGINGFACE_TIMEOUT_SECONDS', default=30, cast=float)
+OPENAI_MAX_RETRIES = config('OPENAI_MAX_RETRIES', default=2, cast=int)
+LLM_POOL_MAXSIZE = config('LLM_POOL_MAXSIZE', default=10, cast=int)
+
+# Summarization provider: blank routes across the configured providers below,
+# a provider name pins it ('fake' uses a local stub)
+SUMMARY_SERVICE = config('SUMMARY_SERVICE', default='')
+# Priority order for routed summaries; blank means every provider with an API key
+LLM_PROVIDER_ORDER = config('LLM_PROVIDER_ORDER', default='', cast=Csv())
+# Consecutive failures that open a provider's circuit breaker, and how long it stays open
+LLM_BREAKER_FAILURE_THRESHOLD = config('LLM_BREAKER_FAILURE_THRESHOLD', default=5, cast=int)
+LLM_BREAKER_RESET_SECONDS = config('LLM_BREAKER_RESET_SECONDS', default=60, cast=float)
+# Hedge a request to the next provider once it runs past this latency percentile (0 disables)
+LLM_HEDGE_PERCENTILE = config('LLM_HEDGE_PERCENTILE', default=0, cast=float)
+LLM_HEDGE_MIN_SAMPLES = config('LLM_HEDGE_MIN_SAMPLES', default=20, cast=int)
+LLM_ROUTER_MAX_WORKERS = config('LLM_ROUTER_MAX_WORKERS', default=8, cast=int)
+LLM_ROUTER_STATS_DIR = config('LLM_ROUTER_STATS_DIR', default=str(BASE_DIR / 'cache' / 'providers'))
+
+# Requests/minute and tokens/minute per provider (0 means unlimited)
+OPENAI_RPM = config('OPENAI_RPM', default=0, cast=int)
+OPENAI_TPM = config('OPENAI_TPM', default=0, cast=int)
+GOOGLE_RPM = config('GOOGLE_RPM', default=0, cast=int)
+GOOGLE_TPM = config('GOOGLE_TPM', default=0, cast=int)
+HUGGINGFACE_RPM = config('HUGGINGFACE_RPM', default=0, cast=int)
+HUGGINGFACE_TPM = config('HUGGINGFACE_TPM', default=0, cast=int)
+# 'local' limits each process separately, 'database' shares the budget across processes
+LLM_RATE_LIMIT_BACKEND = config('LLM_RATE_LIMIT_BACKEND', default='local')
+# Share of each bucket batch jobs leave for interactive and normal requests
+LLM_RATE_LIMIT_BATCH_RESERVE = config('LLM_RATE_LIMIT_BATCH_RESERVE', default=0.2, cast=float)
+# Completion tokens counted against TPM on top of the prompt
+LLM_RATE_LIMIT_OUTPUT_TOKENS = config('LLM_RATE_LIMIT_OUTPUT_TOKENS', default=500, cast=int)
+LLM_RATE_LIMIT_TIMEOUT_SECONDS = config('LLM_RATE_LIMIT_TIMEOUT_SECONDS', default=300, cast=float)
+# Transcripts whose prompt exceeds the budget are summarized chunk by chunk and merged
+SUMMARY_TOKEN_BUDGET = config('SUMMARY_TOKEN_BUDGET', default=2500, cast=int)
+SUMMARY_CHUNK_TOKENS = config('SUMMARY_CHUNK_TOKENS', default=2000, cast=int)
+SUMMARY_MAX_WORKERS = config('SUMMARY_MAX_WORKERS', default=4, cast=int)
+
+# Cache of transcripts and summaries keyed on input hash, prompt version and model
+# Backends: 'disk', 'django' (uses the LLM_CACHE_ALIAS cache) or 'none'
+LLM_CACHE_BACKEND = config('LLM_CACHE_BACKEND', default='disk')
+LLM_CACHE_DIR = config('LLM_CACHE_DIR', default=str(BASE_DIR / 'cache'))
+LLM_CACHE_ALIAS = config('LLM_CACHE_ALIAS', default='default')
+LLM_CACHE_MAX_ENTRIES = config('LLM_CACHE_MAX_ENTRIES', default=1000, cast=int)
+LLM_CACHE_TTL_SECONDS = config('LLM_CACHE_TTL_SECONDS', default=30 * 24 * 3600, cast=int)
+
+# Serialized meeting detail responses, checked against updated_at before use
+# so a per-process cache never serves stale data. An empty alias disables it.
+RESPONSE_CACHE_ALIAS = config('RESPONSE_CACHE_ALIAS', default='default')
+RESPONSE_CACHE_TTL_SECONDS = config('RESPONSE_CACHE_TTL_SECONDS', default=300, cast=int)
+
+# Status events pushed to /api/meetings/<id>/events/. 'database' relays them from
+# job workers and the recorder supervisor through StatusEvent rows; 'local' only
+# reaches subscribers in the publishing process.
+EVENTS_BACKEND = config('EVENTS_BACKEND', default='database')
+EVENTS_POLL_SECONDS = config('EVENTS_POLL_SECONDS', default=0.5, cast=float)
+EVENTS_RETENTION_SECONDS = config('EVENTS_RETENTION_SECONDS', default=3600, cast=int)
+# Undelivered events kept per subscriber; slow ones lose the oldest
+EVENTS_QUEUE_SIZE = config('EVENTS_QUEUE_SIZE', default=100, cast=int)
+# Comment lines sent on idle streams, and how long a stream stays open before the browser reconnects
+EVENTS_HEARTBEAT_SECONDS = config('EVENTS_HEARTBEAT_SECONDS', default=15, cast=float)
+EVENTS_STREAM_MAX_SECONDS = config('EVENTS_STREAM_MAX_SECONDS', default=300, cast=float)
 
 # ======================
 # UPLOAD SETTINGS
@@ -156,11 +225,72 @@ HUGGINGFACE_API_KEY = config('HUGGINGFACE_API_KEY', default='')
 ALLOWED_UPLOAD_EXTENSIONS = ['mp3', 'wav', 'mp4', 'webm', 'm4a']
 MAX_UPLOAD_SIZE = 100 * 1024 * 1024  # 100MB
 
+# Resumable uploads (/api/uploads/) for recordings of any size up to UPLOAD_MAX_SIZE
+UPLOAD_MAX_SIZE = config('UPLOAD_MAX_SIZE', default=4 * 1024 ** 3, cast=int)
+UPLOAD_CHUNK_SIZE = config('UPLOAD_CHUNK_SIZE', default=8 * 1024 * 1024, cast=int)
+UPLOAD_MAX_CHUNK_SIZE = config('UPLOAD_MAX_CHUNK_SIZE', default=64 * 1024 * 1024, cast=int)
+# Part files live here until finalized; uploads idle this long are aborted
+UPLOAD_TEMP_DIR = config('UPLOAD_TEMP_DIR', default=str(MEDIA_ROOT / 'uploads'))
+UPLOAD_EXPIRY_SECONDS = config('UPLOAD_EXPIRY_SECONDS', default=24 * 3600, cast=int)
+
 TRANSCRIPTION_SERVICE = config(
     'TRANSCRIPTION_SERVICE',
     default='openai'
 )
 
+# Long recordings are split into overlapping segments transcribed in parallel
+TRANSCRIPTION_SEGMENT_SECONDS = config('TRANSCRIPTION_SEGMENT_SECONDS', default=120, cast=int)
+TRANSCRIPTION_OVERLAP_SECONDS = config('TRANSCRIPTION_OVERLAP_SECONDS', default=2.0, cast=float)
+TRANSCRIPTION_MAX_WORKERS = config('TRANSCRIPTION_MAX_WORKERS', default=4, cast=int)
+# Audio is sent to the provider as 16 kHz mono in this codec: flac, opus or wav (flac and opus need ffmpeg)
+AUDIO_NORMALIZE_CODEC = config('AUDIO_NORMALIZE_CODEC', default='flac')
+# RMS level below which audio is silence and not transcribed; 0 sends everything
+AUDIO_SILENCE_LEVEL = config('AUDIO_SILENCE_LEVEL', default=100, cast=int)
+# Pauses longer than this are cut out before transcription; 0 only trims both ends
+AUDIO_VAD_MIN_SILENCE_SECONDS = config('AUDIO_VAD_MIN_SILENCE_SECONDS', default=2.0, cast=float)
+# Who said each transcript segment: energy (local), pyannote (needs pyannote.audio) or none
+DIARIZATION_BACKEND = config('DIARIZATION_BACKEND', default='energy')
+DIARIZATION_MAX_SPEAKERS = config('DIARIZATION_MAX_SPEAKERS', default=6, cast=int)
+
+# ======================
+# BACKGROUND JOBS
+# ======================
+JOB_WORKERS = config('JOB_WORKERS', default=2, cast=int)
+JOB_MAX_ATTEMPTS = config('JOB_MAX_ATTEMPTS', default=3, cast=int)
+JOB_LEASE_SECONDS = config('JOB_LEASE_SECONDS', default=60, cast=int)
+JOB_HEARTBEAT_SECONDS = config('JOB_HEARTBEAT_SECONDS', default=15, cast=int)
+JOB_RETRY_BACKOFF_SECONDS = config('JOB_RETRY_BACKOFF_SECONDS', default=5, cast=int)
+JOB_RETRY_BACKOFF_MAX_SECONDS = config('JOB_RETRY_BACKOFF_MAX_SECONDS', default=300, cast=int)
+JOB_POLL_INTERVAL_SECONDS = config('JOB_POLL_INTERVAL_SECONDS', default=1.0, cast=float)
+
+# ======================
+# MEETING RECORDER
+# ======================
+RECORDER_MAX_CONCURRENT = config('RECORDER_MAX_CONCURRENT', default=2, cast=int)
+RECORDER_POLL_INTERVAL_SECONDS = config('RECORDER_POLL_INTERVAL_SECONDS', default=2.0, cast=float)
+# Set to meeting.recorder_supervisor.FakeRecorderBackend to test without Chrome/PyAudio
+RECORDER_BACKEND = config('RECORDER_BACKEND', default='meeting.recorder_supervisor.MeetingBotBackend')
+RECORDER_FAKE_SECONDS = config('RECORDER_FAKE_SECONDS', default=1.0, cast=float)
+# Stop before duration_minutes once the meeting is over: after END_SILENCE_SECONDS
+# without speech, START_TIMEOUT_SECONDS if nobody speaks, or when the page says so
+RECORDER_END_DETECTION = config('RECORDER_END_DETECTION', default=True, cast=bool)
+RECORDER_END_SILENCE_SECONDS = config('RECORDER_END_SILENCE_SECONDS', default=180, cast=float)
+RECORDER_START_TIMEOUT_SECONDS = config('RECORDER_START_TIMEOUT_SECONDS', default=600, cast=float)
+RECORDER_SILENCE_LEVEL = config('RECORDER_SILENCE_LEVEL', default=100, cast=int)  # RMS of 16-bit audio
+RECORDER_SIGNAL_POLL_SECONDS = config('RECORDER_SIGNAL_POLL_SECONDS', default=5, cast=float)
+# Browsers the supervisor keeps open for the Google Meet recorder, best set to RECORDER_MAX_CONCURRENT
+# (0 starts one per meeting); each is replaced after RECORDER_BROWSER_MAX_MEETINGS meetings or
+# once it uses more than RECORDER_BROWSER_MAX_RSS_MB
+RECORDER_BROWSER = config('RECORDER_BROWSER', default='chrome')  # chrome or fake
+RECORDER_BROWSER_POOL_SIZE = config('RECORDER_BROWSER_POOL_SIZE', default=0, cast=int)
+RECORDER_BROWSER_MAX_MEETINGS = config('RECORDER_BROWSER_MAX_MEETINGS', default=20, cast=int)
+RECORDER_BROWSER_MAX_RSS_MB = config('RECORDER_BROWSER_MAX_RSS_MB', default=1024, cast=int)
+# Transcribe and summarize while recording, in windows of about LIVE_WINDOW_SECONDS
+LIVE_TRANSCRIPTION = config('LIVE_TRANSCRIPTION', default=False, cast=bool)
+LIVE_WINDOW_SECONDS = config('LIVE_WINDOW_SECONDS', default=30, cast=float)
+# How often the provisional summary is refreshed during the meeting
+LIVE_SUMMARY_INTERVAL_SECONDS = config('LIVE_SUMMARY_INTERVAL_SECONDS', default=300, cast=float)
+
 # ======================
 # DEFAULT FIELD
 # ======================